@@ -0,0 +1 @@
+"""Benchmarks for the Outlook MCP Server hot paths (run on the simulated backend)."""
@@ -0,0 +1,105 @@
+"""Alert analysis benchmark on the simulated Outlook backend.
+
+Runs analyze_alerts' header scan with the one-pass aggregator against the
+previous approach (collect every matching email, then analyse the list) and
+reports wall-clock time, peak traced memory and items opened in Outlook.
+Both mailboxes hold copies of the same messages, so every alert is found
+twice and counted once. Time and memory are measured in separate runs, as
+tracing slows the run down several times.
+
+Usage:
+    python benchmarks/bench_alert_analyzer.py --size 100000
+    python benchmarks/bench_alert_analyzer.py --size 20000 --query "Disk usage above threshold"
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# Add parent directory to path for imports
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_path)
+
+from src.config.config_reader import Settings, config  # noqa: E402
+from src.utils.alert_analyzer import AlertAggregator  # noqa: E402
+from src.utils.email_formatter import format_alert_analysis  # noqa: E402
+from src.utils.outlook_client import OutlookClient  # noqa: E402
+from src.utils.outlook_simulator import FakeNamespace, SimulatedBackend  # noqa: E402
+
+SHARED_MAILBOX = "team@example.com"
+
+
+def build_client(args) -> OutlookClient:
+    """Create a client on a freshly generated simulated profile."""
+    config.config['shared_mailbox_email'] = SHARED_MAILBOX
+    config.config['max_search_results'] = args.size * 2
+    config.config['search_cache_ttl_seconds'] = 0
+    config.config['mailbox_search_timeout_seconds'] = 0  # traced runs are slow
+    config.settings = Settings(config.config)
+    backend = SimulatedBackend.build(personal_size=args.size, shared={SHARED_MAILBOX: args.size},
+                                     seed=args.seed, cc_shared=True)
+    client = OutlookClient(backend)
+    client.connect()
+    return client
+
+
+def measure(label: str, client: OutlookClient, func) -> None:
+    """Run func untraced and under tracemalloc; print time, peak memory and opened items."""
+    opened = [0]
+    get_item = FakeNamespace.GetItemFromID
+
+    def counting(self, entry_id, store_id=None):
+        opened[0] += 1
+        return get_item(self, entry_id, store_id)
+
+    FakeNamespace.GetItemFromID = counting
+    try:
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+    finally:
+        FakeNamespace.GetItemFromID = get_item
+
+    client._body_cache.clear()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    print(f"{label:<24} {result['summary']['total_alerts']:8d} {seconds:8.2f} s "
+          f"{peak / 2 ** 20:9.1f} MB {opened[0]:8d}")
+
+
+def run(args) -> None:
+    client = build_client(args)
+
+    def one_pass():
+        aggregator = AlertAggregator()
+        client.scan_headers(args.query, aggregator.add)
+        return format_alert_analysis(aggregator, args.query)
+
+    def collected():
+        return format_alert_analysis(client.search_emails(args.query), args.query)
+
+    print(f"Two mailboxes of {args.size} items, alerts matching '{args.query}'")
+    print(f"{'approach':<24} {'alerts':>8} {'time':>10} {'peak memory':>12} {'opened':>8}")
+    measure("header scan, one pass", client, one_pass)
+    if not args.skip_collected:
+        measure("collect, then analyse", client, collected)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000, help="items per mailbox")
+    parser.add_argument("--query", default="raised for host", help="alert text to analyse")
+    parser.add_argument("--seed", type=int, default=0, help="simulator seed")
+    parser.add_argument("--skip-collected", action="store_true",
+                        help="only run the header scan (the collecting run reads every body)")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Size and speed benchmark for quoted-history stripping.
+
+Builds reply threads in which every message quotes the whole thread below
+it, in three quoting styles (Outlook's separator and header block, an
+``-----Original Message-----`` marker, ``>``-prefixed lines after an
+``On ... wrote:`` line), each as multi-line text and collapsed to one line as
+the text normalizer returns it. Reports the body text and the encoded
+get_email_chain response per body_mode, and the reducer's throughput.
+
+Usage:
+    python benchmarks/bench_body_reducer.py
+    python benchmarks/bench_body_reducer.py --messages 50 --threads 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_path)
+
+from src.utils.body_reducer import BODY_MODES, new_content  # noqa: E402
+from src.utils.email_formatter import format_email_chain  # noqa: E402
+from src.utils.json_encoder import create_encoder  # noqa: E402
+from src.utils.text_normalizer import html_to_text  # noqa: E402
+
+PEOPLE = [("Erik Berg", "erik.berg@example.com"), ("Eva Lund", "eva.lund@example.com"),
+          ("Frank Holm", "frank.holm@example.com"), ("Alice Jensen", "alice.jensen@example.com")]
+SENTENCES = [
+    "Disk usage on the database volume is still climbing after the cleanup job ran.",
+    "I restarted the ingestion service and the queue is draining again.",
+    "The alert fired three times overnight, always around the backup window.",
+    "Can someone from the platform team check the load balancer health checks?",
+    "Rolling back the last deployment fixed the error rate on two of the nodes.",
+    "Attaching the relevant log excerpt, the timeouts start at 02:14 UTC.",
+    "This looks like the same issue as last month, see the postmortem for details.",
+    "Monitoring shows latency back under the threshold for the last hour.",
+]
+SIGNATURE = "{closing},\n{name}\nSite Reliability Engineering\nPhone +45 12 34 56 78"
+
+
+def quote(style: str, previous: str, sender, sent: datetime, subject: str) -> str:
+    if style == "outlook":
+        return (f"________________________________\nFrom: {sender[0]} <{sender[1]}>\n"
+                f"Sent: {sent:%A, %B %d, %Y %I:%M %p}\nTo: Operations\nSubject: {subject}\n\n{previous}")
+    if style == "original":
+        return (f"-----Original Message-----\nFrom: {sender[0]} [mailto:{sender[1]}]\n"
+                f"Sent: {sent:%d %B %Y %H:%M}\nTo: Operations\nSubject: {subject}\n\n{previous}")
+    return (f"On {sent:%a, %d %b %Y at %H:%M}, {sender[0]} <{sender[1]}> wrote:\n"
+            + "\n".join("> " + line for line in previous.split("\n")))
+
+
+def build_thread(style: str, messages: int, rng: random.Random, start: datetime):
+    """(body, new text) per message of one thread, oldest first."""
+    subject = f"INC-{rng.randrange(10 ** 6):06d} {rng.choice(SENTENCES)[:40]}"
+    thread = []
+    previous = None
+    for n in range(messages):
+        sender = rng.choice(PEOPLE)
+        sent = start + timedelta(minutes=17 * n)
+        new = "Hi team,\n\n" + " ".join(rng.sample(SENTENCES, rng.randint(1, 3)))
+        body = new + "\n\n" + SIGNATURE.format(closing=rng.choice(["Regards", "Thanks", "Best regards"]),
+                                               name=sender[0])
+        if previous is not None:
+            body += "\n\n" + quote(style, previous[0], previous[1], previous[2], subject)
+        thread.append({
+            "subject": ("RE: " if n else "") + subject,
+            "sender_name": sender[0],
+            "sender_email": sender[1],
+            "recipients": ["Operations"],
+            "received_time": sent,
+            "folder_name": "Inbox",
+            "mailbox_type": "personal",
+            "entry_id": f"{style}{id(thread):x}{n:04d}",
+            "conversation_id": subject,
+            "body": body,
+            "new": new,
+        })
+        previous = (body, sender, sent)
+    return thread
+
+
+def best_seconds(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(args) -> None:
+    rng = random.Random(args.seed)
+    encoder = create_encoder()
+    print(f"{args.threads} threads of {args.messages} messages; response sizes per body_mode")
+    print(f"{'style':<20} {'bodies':>9} {'new text':>9} {'exact':>6} "
+          + " ".join(f"{mode:>9}" for mode in BODY_MODES) + f" {'MB/s':>7} {'us/msg':>7}")
+    for style in ("outlook", "original", "quoted"):
+        emails = []
+        for _ in range(args.threads):
+            emails.extend(build_thread(style, args.messages, rng, datetime(2024, 5, 1, 8, 0)))
+        for collapsed in (False, True):
+            if collapsed:
+                for email in emails:
+                    email["body"] = html_to_text(email["body"])
+                    email["new"] = html_to_text(email["new"])
+            bodies = [email["body"] for email in emails]
+            exact = sum(new_content(email["body"]) == email["new"] for email in emails)
+            sizes = [len(encoder.dumps(format_email_chain(emails, "INC", False, mode)))
+                     for mode in BODY_MODES]
+            seconds = best_seconds(lambda: [new_content(body) for body in bodies], args.repeat)
+            label = style + (" (one line)" if collapsed else "")
+            print(f"{label:<20} {sum(map(len, bodies)) / 1024:8.0f}K "
+                  f"{sum(len(e['new']) for e in emails) / 1024:8.0f}K {exact / len(emails):6.0%} "
+                  + " ".join(f"{size / 1024:8.0f}K" for size in sizes)
+                  + f" {sum(map(len, bodies)) / 1e6 / seconds:7.0f}"
+                  f" {seconds / len(emails) * 1e6:7.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20, help="messages per thread")
+    parser.add_argument("--threads", type=int, default=10, help="threads per quoting style")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""format_email_chain benchmark on large result sets.
+
+Compares the single-pass formatter with the previous implementation, which
+formatted every email twice, sorted the full list twice and walked it once
+per statistic.
+
+Usage:
+    python benchmarks/bench_formatter.py --emails 10000
+    python benchmarks/bench_formatter.py --emails 10000 --threads 50
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add parent directory to path for imports
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_path)
+
+from src.utils.email_formatter import (  # noqa: E402
+    format_email_chain, format_single_email, get_date_range, get_mailbox_distribution,
+    get_participants, group_by_conversation, parse_iso_time, thread_order_key, clean_subject,
+)
+from src.utils.json_encoder import create_encoder  # noqa: E402
+from src.utils.outlook_simulator import SyntheticMailbox  # noqa: E402
+
+
+def legacy_format_email_chain(emails, search_subject):
+    """The formatter before the single-pass rewrite, kept for comparison."""
+    conversations = group_by_conversation(emails)
+    stats = {
+        "total_emails": len(emails),
+        "conversations": len(conversations),
+        "date_range": get_date_range(emails),
+        "mailbox_distribution": get_mailbox_distribution(emails),
+        "participants": get_participants(emails)
+    }
+    formatted_conversations = []
+    for conv_id, conv_emails in conversations.items():
+        conv_emails.sort(key=thread_order_key)
+        formatted_conversations.append({
+            "conversation_id": conv_id,
+            "topic": clean_subject(conv_emails[0].get('subject', '')),
+            "email_count": len(conv_emails),
+            "date_range": get_date_range(conv_emails),
+            "participants": get_participants(conv_emails),
+            "emails": [format_single_email(email) for email in conv_emails]
+        })
+    formatted_conversations.sort(
+        key=lambda x: max([parse_iso_time(e["received_time"]) for e in x["emails"] if e["received_time"]]),
+        reverse=True
+    )
+    return {
+        "status": "success",
+        "search_subject": search_subject,
+        "summary": stats,
+        "conversations": formatted_conversations,
+        "all_emails_chronological": [format_single_email(email) for email in sorted(
+            emails, key=lambda x: x.get('received_time', datetime.min), reverse=True)]
+    }
+
+
+def build_emails(count: int, threads: int, seed: int):
+    """Email dicts for ``count`` items spread over roughly ``threads`` conversations."""
+    mailbox = SyntheticMailbox("Simulated User", "user@example.com", size=count, seed=seed)
+    stride = max(1, count // max(threads, 1))
+    emails = []
+    for index in range(count - 1, -1, -1):
+        record = mailbox.record(index)
+        conversation_id, _ = mailbox.conversation((index // stride) * 4)
+        emails.append({
+            'subject': record.subject,
+            'sender_name': record.sender_name,
+            'sender_email': record.sender_email,
+            'recipients': [name for name, _ in record.to],
+            'received_time': record.received_time,
+            'folder_name': record.folder,
+            'mailbox_type': 'personal' if index % 3 else 'shared',
+            'importance': record.importance,
+            'body': record.body[:500],
+            'size': record.size,
+            'attachments_count': record.attachments,
+            'unread': record.unread,
+            'entry_id': record.entry_id,
+            'conversation_id': conversation_id,
+            'conversation_index': record.conversation_index,
+        })
+    return emails
+
+
+def best_of(func, repeat: int, *args, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(args) -> None:
+    emails = build_emails(args.emails, args.threads, args.seed)
+    print(f"{len(emails)} emails, ~{args.threads} conversations\n")
+
+    legacy = best_of(lambda: legacy_format_email_chain(emails, "bench"), args.repeat)
+    single = best_of(lambda: format_email_chain(emails, "bench"), args.repeat)
+    no_chrono = best_of(lambda: format_email_chain(emails, "bench", include_chronological=False), args.repeat)
+
+    print(f"{'legacy (two passes per email)':<34} {legacy * 1000:9.1f} ms")
+    print(f"{'single pass':<34} {single * 1000:9.1f} ms  ({legacy / single:.1f}x)")
+    print(f"{'single pass, no chronological':<34} {no_chrono * 1000:9.1f} ms  ({legacy / no_chrono:.1f}x)")
+
+    encoder = create_encoder(compact_output=False)
+    full = len(encoder.dumps(format_email_chain(emails, "bench")))
+    reduced = len(encoder.dumps(format_email_chain(emails, "bench", include_chronological=False)))
+    print(f"\nJSON size {full / 1e6:.1f} MB, without chronological list {reduced / 1e6:.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=10000, help="emails to format")
+    parser.add_argument("--threads", type=int, default=2500, help="approximate conversation count")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant")
+    parser.add_argument("--seed", type=int, default=0, help="mailbox seed")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""End-to-end search benchmark on the simulated Outlook backend.
+
+Profiles search_emails, per-item and Table-based extraction and
+format_email_chain against synthetic mailboxes of production size without a
+Windows/Outlook install.
+
+Usage:
+    python benchmarks/bench_search.py --size 100000 --latency-ms 0.2
+    python benchmarks/bench_search.py --size 10000 --profile
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+# Add parent directory to path for imports
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_path)
+
+from src.config.config_reader import Settings, config  # noqa: E402
+from src.utils.email_formatter import format_email_chain  # noqa: E402
+from src.utils.mail_index import MailIndex  # noqa: E402
+from src.utils.outlook_client import OutlookClient  # noqa: E402
+from src.utils.outlook_simulator import SimulatedBackend  # noqa: E402
+from src.utils.table_extractor import TableExtractor  # noqa: E402
+
+SHARED_MAILBOX = "team@example.com"
+
+
+def build_client(args) -> OutlookClient:
+    """Create a client on a freshly generated simulated profile."""
+    config.config['shared_mailbox_email'] = SHARED_MAILBOX
+    config.config['max_search_results'] = args.max_results
+    config.settings = Settings(config.config)
+    backend = SimulatedBackend.build(
+        personal_size=args.size,
+        shared={SHARED_MAILBOX: args.size},
+        per_call_ms=args.latency_ms,
+        search_delay_ms=args.search_delay_ms,
+        seed=args.seed,
+    )
+    return OutlookClient(backend)
+
+
+def timed(label: str, func, *args, **kwargs):
+    """Run func once and print its wall-clock time."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    print(f"{label:<28} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def run(args) -> None:
+    client = build_client(args)
+    latency = client.backend.latency
+    timed("connect", client.connect)
+
+    latency.reset()
+    emails = timed("search_emails", client.search_emails, args.query)
+    print(f"{'  results':<28} {len(emails):8d}")
+    print(f"{'  COM calls':<28} {latency.calls:8d}")
+
+    namespace = client.backend.get_application().Session
+    items = namespace.GetDefaultFolder(6).Items
+    sample = [items.Item(i) for i in range(1, min(items.Count, args.max_results) + 1)]
+    latency.reset()
+    timed(f"_extract_email_data x{len(sample)}",
+          lambda: [client._extract_email_data(item, 'Inbox', 'personal') for item in sample])
+    print(f"{'  COM calls per item':<28} {latency.calls / max(len(sample), 1):8.1f}")
+
+    latency.reset()
+    table = namespace.GetDefaultFolder(6).GetTable()
+    extractor = TableExtractor(namespace, client._read_body)
+    timed(f"TableExtractor x{len(sample)}",
+          extractor.extract, table, 'Inbox', 'personal', len(sample), set())
+    print(f"{'  COM calls per item':<28} {latency.calls / max(len(sample), 1):8.1f}")
+
+    timed("format_email_chain", format_email_chain, emails, args.query)
+
+    if args.index:
+        client._search_cache.clear()
+        client._mail_index = MailIndex(':memory:')
+        config.config['local_index_sync_interval_seconds'] = 3600
+        timed("local index crawl", client.build_index)
+        latency.reset()
+        indexed = timed("search_emails (index)", client.search_emails, args.query)
+        print(f"{'  results':<28} {len(indexed):8d}")
+        print(f"{'  COM calls':<28} {latency.calls:8d}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10000, help="items per mailbox")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latency per COM call")
+    parser.add_argument("--search-delay-ms", type=float, default=0.0,
+                        help="time until an AdvancedSearch completes")
+    parser.add_argument("--max-results", type=int, default=500)
+    parser.add_argument("--query", default="Disk usage above threshold")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--index", action="store_true",
+                        help="also crawl a local index and search it")
+    parser.add_argument("--profile", action="store_true", help="print a cProfile summary")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.runcall(run, args)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
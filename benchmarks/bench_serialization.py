@@ -0,0 +1,84 @@
+"""Serialization benchmark for get_email_chain responses.
+
+Formats synthetic search results with format_email_chain and compares the
+legacy ``str(dict)`` output with the JSON encoders in standard and compact
+mode: bytes per email and encode time.
+
+Usage:
+    python benchmarks/bench_serialization.py --emails 500
+    python benchmarks/bench_serialization.py --emails 2000 --body-chars 0
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path for imports
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_path)
+
+from src.config.config_reader import Settings, config  # noqa: E402
+from src.utils.email_formatter import format_email_chain  # noqa: E402
+from src.utils.json_encoder import JsonEncoder, OrjsonEncoder  # noqa: E402
+from src.utils.outlook_client import OutlookClient  # noqa: E402
+from src.utils.outlook_simulator import SimulatedBackend  # noqa: E402
+
+
+def build_response(args):
+    """Search a simulated mailbox and format the results."""
+    config.config['max_search_results'] = args.emails
+    config.config['max_body_chars'] = args.body_chars
+    config.config['shared_mailbox_email'] = ''
+    config.settings = Settings(config.config)
+    backend = SimulatedBackend.build(personal_size=max(args.emails * 20, 10000), seed=args.seed)
+    client = OutlookClient(backend)
+    emails = client.search_emails(args.query)
+    return format_email_chain(emails, args.query), len(emails)
+
+
+def encoders():
+    """(label, encode function) pairs available in this environment."""
+    candidates = [("repr (legacy)", str)]
+    for cls in (JsonEncoder, OrjsonEncoder):
+        for compact_output in (False, True):
+            try:
+                encoder = cls(compact_output)
+            except ImportError:
+                continue
+            mode = "compact" if compact_output else "standard"
+            candidates.append((f"{encoder.name} {mode}", encoder.dumps))
+    return candidates
+
+
+def measure(encode, response, repeat: int):
+    """Best-of-``repeat`` encode time and the encoded size in bytes."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = encode(response)
+        best = min(best, time.perf_counter() - start)
+    return best, len(text.encode('utf-8'))
+
+
+def run(args) -> None:
+    response, count = build_response(args)
+    print(f"{count} emails, max_body_chars={args.body_chars}\n")
+    print(f"{'encoder':<20} {'ms':>9} {'bytes':>11} {'bytes/email':>12}")
+    for label, encode in encoders():
+        seconds, size = measure(encode, response, args.repeat)
+        print(f"{label:<20} {seconds * 1000:9.2f} {size:11d} {size / max(count, 1):12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=500, help="emails in the response")
+    parser.add_argument("--body-chars", type=int, default=500, help="max_body_chars (0 = full body)")
+    parser.add_argument("--query", default="raised for host", help="search phrase")
+    parser.add_argument("--repeat", type=int, default=5, help="encode runs per encoder")
+    parser.add_argument("--seed", type=int, default=0, help="mailbox seed")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Cold-start benchmark: import time of the server and its modules.
+
+Imports each module in a fresh interpreter with ``python -X importtime``,
+reports the best wall time of several runs (minus a bare interpreter start),
+the import time attributed to the module and the slowest imports below it,
+and checks that importing wrote nothing to stdout, which carries the MCP
+protocol on the stdio transport.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --module src.utils.outlook_client --top 20
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Repository root, the working directory of the measured interpreters
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["outlook_mcp", "src.config.config_reader", "src.utils.outlook_client",
+                   "src.utils.email_formatter"]
+
+
+def run_import(module: str) -> Tuple[float, str, str, int]:
+    """(wall seconds, stdout, stderr, exit code) of importing ``module`` in a fresh interpreter."""
+    statement = f"import {module}" if module else "pass"
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                             cwd=parent_path, capture_output=True, text=True)
+    return time.perf_counter() - start, process.stdout, process.stderr, process.returncode
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, depth, self us, cumulative us) per line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module: str, repeat: int) -> Dict[str, object]:
+    best = None
+    for _ in range(repeat):
+        wall, stdout, stderr, code = run_import(module)
+        if best is None or wall < best["wall"]:
+            best = {"wall": wall, "stdout": stdout, "stderr": stderr, "code": code}
+    best["rows"] = parse_importtime(best["stderr"])
+    return best
+
+
+def report(module: str, result: Dict[str, object], baseline: float, top: int) -> None:
+    rows = result["rows"]
+    own = {name: cumulative for name, depth, _, cumulative in rows if depth == 0}
+    print(f"\n{module}")
+    print(f"  wall time        {(result['wall'] - baseline) * 1000:8.1f} ms (interpreter start excluded)")
+    if module in own:
+        print(f"  import time      {own[module] / 1000:8.1f} ms")
+    if result["code"]:
+        errors = [line for line in result["stderr"].splitlines() if not line.startswith("import time:")]
+        print(f"  exited with {result['code']}: {errors[-1] if errors else ''}")
+    print(f"  stdout           {'clean' if not result['stdout'] else repr(result['stdout'][:60])}")
+    print(f"  {'slowest imports':<40} {'self ms':>8} {'cum ms':>8}")
+    for name, depth, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[:top]:
+        print(f"  {name:<40} {self_us / 1000:8.1f} {cumulative_us / 1000:8.1f}")
+
+
+def run(args) -> None:
+    baseline = measure("", args.repeat)["wall"]
+    print(f"bare interpreter start: {baseline * 1000:.1f} ms (best of {args.repeat})")
+    for module in args.module or DEFAULT_MODULES:
+        report(module, measure(module, args.repeat), baseline, args.top)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", action="append", help="module to import (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports listed per module")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Throughput benchmark for email body cleaning.
+
+Measures MB/s of the previous ``_clean_html`` implementation and of
+``html_to_text`` on large alert emails: a plain-text body, the same content
+with HTML fragments (as found in ``Body``) and the full ``HTMLBody``, plus
+the same bodies cleaned one email at a time.
+
+Usage:
+    python benchmarks/bench_text_normalizer.py
+    python benchmarks/bench_text_normalizer.py --size-kb 1024 --repeat 10
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+# Add parent directory to path for imports
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_path)
+
+from src.utils.outlook_simulator import SimulatedBackend  # noqa: E402
+from src.utils.text_normalizer import html_to_text  # noqa: E402
+
+
+def legacy_clean_html(text: str) -> str:
+    """The cleaner before text_normalizer, kept for comparison."""
+    import re
+    text = re.sub(r'<[^>]+>', '', text)
+    html_entities = {
+        '&amp;': '&',
+        '&lt;': '<',
+        '&gt;': '>',
+        '&quot;': '"',
+        '&#39;': "'",
+        '&nbsp;': ' '
+    }
+    for entity, char in html_entities.items():
+        text = text.replace(entity, char)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+def build_bodies(size_kb: int, seed: int):
+    """(label, text) pairs of roughly ``size_kb`` KB built from simulated alerts."""
+    backend = SimulatedBackend.build(personal_size=4000, seed=seed)
+    inbox = backend.get_application().Session.GetDefaultFolder(6)
+    items = inbox.Items
+    body, html = [], []
+    size = 0
+    index = 1
+    while size < size_kb * 1024:
+        item = items.Item(index)
+        body.append(item.Body)
+        html.append(item.HTMLBody)
+        size += len(body[-1])
+        index += 1
+    mixed = "\r\n".join(body)
+    plain = re.sub(r'<[^>]+>', ' ', mixed).replace('&nbsp;', ' ').replace('&amp;', '&')
+    return [("plain text Body", plain), ("Body with HTML", mixed), ("HTMLBody", "".join(html)),
+            ("per-email Body", body)]
+
+
+def throughput(func, text, repeat: int) -> float:
+    """Best-of-``repeat`` MB/s of func over a text or a list of texts (one call each)."""
+    texts = text if isinstance(text, list) else [text]
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in texts:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return sum(len(item.encode('utf-8')) for item in texts) / 1e6 / best
+
+
+def run(args) -> None:
+    print(f"{'input':<18} {'size':>8} {'legacy MB/s':>12} {'new MB/s':>10} {'speedup':>8}")
+    for label, text in build_bodies(args.size_kb, args.seed):
+        legacy = throughput(legacy_clean_html, text, args.repeat)
+        new = throughput(html_to_text, text, args.repeat)
+        size = sum(map(len, text)) if isinstance(text, list) else len(text)
+        print(f"{label:<18} {size / 1024:7.0f}K {legacy:12.1f} {new:10.1f} {new / legacy:7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=512, help="approximate input size per body type")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    parser.add_argument("--seed", type=int, default=0, help="mailbox seed")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
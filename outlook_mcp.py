@@ -1,43 +1,72 @@
-"""Simplified Outlook MCP Server with three main tools."""
+"""Simplified Outlook MCP Server with seven main tools."""
 
 import asyncio
+import contextlib
 import logging
 import platform
 import sys
-from typing import Any, Sequence
-
-# Check if running on Windows
-if platform.system() != 'Windows':
-    print("[ERROR] Outlook MCP Server requires Windows with Microsoft Outlook installed")
-    print(f"   Current platform: {platform.system()}")
-    print("\n[INFO] To use this server:")
-    print("   1. Run on a Windows machine with Outlook installed")
-    print("   2. Or use a Windows virtual machine")
-    print("   3. Or access a remote Windows desktop")
+import threading
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from src.config.config_reader import config
+
+# Console output goes to stderr: stdout carries the MCP protocol on the stdio transport
+
+# Check if running on Windows (the simulated backend runs anywhere)
+if platform.system() != 'Windows' and config.get('mail_backend', 'com') == 'com':
+    print("[ERROR] Outlook MCP Server requires Windows with Microsoft Outlook installed", file=sys.stderr)
+    print(f"   Current platform: {platform.system()}", file=sys.stderr)
+    print("\n[INFO] To use this server:", file=sys.stderr)
+    print("   1. Run on a Windows machine with Outlook installed", file=sys.stderr)
+    print("   2. Or use a Windows virtual machine", file=sys.stderr)
+    print("   3. Or access a remote Windows desktop", file=sys.stderr)
+    print("   4. Or set mail_backend=simulated in config.properties for a synthetic mailbox", file=sys.stderr)
     sys.exit(1)
 
 from mcp import server, types
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 
-try:
-    from src.config.config_reader import config
-    from src.utils.outlook_client import outlook_client
-    from src.utils.email_formatter import format_mailbox_status, format_email_chain
-except ImportError as e:
-    print(f"[ERROR] Import Error: {e}")
-    print("\n[INFO] Please install required dependencies:")
-    print("   pip install -r requirements.txt")
-    print("\nNote: pywin32 is required and only works on Windows")
-    sys.exit(1)
+from src.utils.metrics import metrics, FORMAT_SECONDS, SERIALIZE_SECONDS, TOOL_SECONDS
+
+if TYPE_CHECKING:
+    from src.utils.dasl import SearchFilters
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                    stream=sys.stderr)
 logger = logging.getLogger(__name__)
 
 # Create MCP server
 app = Server("outlook-mcp-server")
 
+# The client, the formatter and the JSON encoder are imported on first use:
+# answering initialize and list_tools needs none of them, and the client
+# (pywin32, the caches, the local index) is the bulk of the server's import time.
+_encoder = None
+
+
+def get_client():
+    """The Outlook client, imported and created on first use."""
+    from src.utils.outlook_client import outlook_client
+    return outlook_client
+
+
+def get_encoder():
+    """JSON encoder for tool responses (orjson when installed), created on first use."""
+    global _encoder
+    if _encoder is None:
+        from src.utils.json_encoder import create_encoder
+        _encoder = create_encoder()
+    return _encoder
+
+
+def text_response(tool: str, result: dict) -> list[types.TextContent]:
+    """Encode a successful tool result, timing the serialization."""
+    with SERIALIZE_SECONDS.time(tool):
+        text = get_encoder().dumps(result)
+    return [types.TextContent(type="text", text=text)]
+
 
 @app.list_tools()
 async def list_tools() -> list[types.Tool]:
@@ -54,7 +83,7 @@ async def list_tools() -> list[types.Tool]:
         ),
         types.Tool(
             name="get_email_chain",
-            description="Searches for emails containing the specified text in BOTH subject and body using exact phrase matching. Retrieves complete email chains with full email bodies for comprehensive analysis. Searches ALL folders in both personal and shared mailboxes. Returns full email content including sender, recipients, timestamps, and complete message bodies. Use specific search terms (error codes, alert identifiers, unique phrases) for best results.",
+            description="Searches for emails containing the specified text in BOTH subject and body using exact phrase matching. Retrieves complete email chains with full email bodies for comprehensive analysis. Searches ALL folders in both personal and shared mailboxes. Returns full email content including sender, recipients, timestamps, and complete message bodies. Use specific search terms (error codes, alert identifiers, unique phrases) for best results. Narrow broad searches with received_after/received_before, from, importance, unread, has_attachments and folders; these filters are applied by Outlook's search itself, and with a filter search_text may be left empty. Large result sets can be paged: pass page_size, then pass the returned next_cursor (with the same search_text) to fetch the following page without re-running the search.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -71,9 +100,243 @@ async def list_tools() -> list[types.Tool]:
                         "type": "boolean", 
                         "description": "Search shared mailbox (default: true)",
                         "default": True
+                    },
+                    "page_size": {
+                        "type": "integer",
+                        "description": "Number of emails per page. Enables paging; the response contains a pagination block with next_cursor",
+                        "minimum": 1
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "next_cursor from a previous page of the same search. Cursors expire after a few minutes"
+                    },
+                    "include_chronological": {
+                        "type": "boolean",
+                        "description": "Also list all emails newest-first after the conversations (default: true). Set to false to halve the response size"
+                    },
+                    "headers_only": {
+                        "type": "boolean",
+                        "description": "Return headers (subject, sender, recipients, time, entry_id) without bodies; fetch the bodies you need with get_email_body. Much faster for broad searches"
+                    },
+                    "body_mode": {
+                        "type": "string",
+                        "enum": ["full", "new", "preview"],
+                        "description": "How much of each body to return: full (whole body as body), new (only the text each message adds, without quoted earlier messages and signature) or preview (the first body_preview_chars of the new text as body_preview). Default: default_body_mode setting (preview)"
+                    },
+                    "max_response_bytes": {
+                        "type": "integer",
+                        "description": "Upper bound on the size of the response in bytes (about 4 bytes per token). The summary is always returned; then the newest emails are included and bodies are shortened to fit, and a budget block reports what was left out. Default: max_response_bytes setting",
+                        "minimum": 1
+                    },
+                    "mailboxes": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Search only these mailboxes: \"personal\", \"shared\" (all shared mailboxes) or shared mailbox addresses as listed by check_mailbox_access. Overrides include_personal/include_shared"
+                    },
+                    "received_after": {
+                        "type": "string",
+                        "description": "Only emails received at or after this time: ISO 8601 date or date-time (e.g. 2024-05-01 or 2024-05-01T08:00:00Z) or a relative time like 12h, 3d or 2w"
+                    },
+                    "received_before": {
+                        "type": "string",
+                        "description": "Only emails received before this time, in the same formats as received_after"
+                    },
+                    "from": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Only emails whose sender name or address contains one of these texts"
+                    },
+                    "importance": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["low", "normal", "high"]},
+                        "description": "Only emails with one of these importance levels"
+                    },
+                    "unread": {
+                        "type": "boolean",
+                        "description": "Only unread (true) or read (false) emails"
+                    },
+                    "has_attachments": {
+                        "type": "boolean",
+                        "description": "Only emails with (true) or without (false) attachments"
+                    },
+                    "folders": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Search only folders whose name or path below the mailbox root matches one of these patterns, e.g. \"Inbox/Alerts\" or \"Archive*\". Replaces the configured folder selection"
+                    }
+                },
+                "required": []
+            }
+        ),
+        types.Tool(
+            name="get_email_body",
+            description="Fetches the full bodies of specific emails by their entry_id, as returned by get_email_chain. Use after a headers_only search to open only the emails that matter.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "entry_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "entry_id values of the emails to fetch",
+                        "minItems": 1
+                    },
+                    "body_mode": {
+                        "type": "string",
+                        "enum": ["full", "new", "preview"],
+                        "description": "full (default) returns whole bodies; new leaves out quoted earlier messages and signatures; preview returns the start of the new text"
+                    }
+                },
+                "required": ["entry_ids"]
+            }
+        ),
+        types.Tool(
+            name="search_many",
+            description="Searches for several phrases at once (e.g. a list of alert identifiers) and returns one email chain per phrase. All phrases share a single AdvancedSearch pass per mailbox folder, so this is much faster than calling get_email_chain once per phrase. Emails matching several phrases appear under each of them.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "queries": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Exact phrases to search for in email subject and body",
+                        "minItems": 1
+                    },
+                    "max_results_per_query": {
+                        "type": "integer",
+                        "description": "Newest emails returned per phrase (default: max_results_per_query setting, 50)",
+                        "minimum": 1
+                    },
+                    "include_personal": {
+                        "type": "boolean",
+                        "description": "Search personal mailbox (default: true)",
+                        "default": True
+                    },
+                    "include_shared": {
+                        "type": "boolean",
+                        "description": "Search shared mailbox (default: true)",
+                        "default": True
+                    },
+                    "mailboxes": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Search only these mailboxes, as for get_email_chain"
+                    },
+                    "include_chronological": {
+                        "type": "boolean",
+                        "description": "Also list each phrase's emails newest-first after its conversations"
+                    },
+                    "headers_only": {
+                        "type": "boolean",
+                        "description": "Return headers without bodies; fetch bodies with get_email_body"
+                    },
+                    "body_mode": {
+                        "type": "string",
+                        "enum": ["full", "new", "preview"],
+                        "description": "As for get_email_chain"
+                    },
+                    "max_response_bytes": {
+                        "type": "integer",
+                        "description": "Upper bound on the size of the whole response in bytes, shared among the phrases",
+                        "minimum": 1
+                    },
+                    "received_after": {"type": "string", "description": "As for get_email_chain"},
+                    "received_before": {"type": "string", "description": "As for get_email_chain"},
+                    "from": {"type": "array", "items": {"type": "string"}, "description": "As for get_email_chain"},
+                    "importance": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["low", "normal", "high"]},
+                        "description": "As for get_email_chain"
+                    },
+                    "unread": {"type": "boolean", "description": "As for get_email_chain"},
+                    "has_attachments": {"type": "boolean", "description": "As for get_email_chain"},
+                    "folders": {"type": "array", "items": {"type": "string"}, "description": "As for get_email_chain"}
+                },
+                "required": ["queries"]
+            }
+        ),
+        types.Tool(
+            name="list_attachments",
+            description="Lists the attachments of emails found by get_email_chain or search_many (name, size, MIME type), without downloading their content. Use get_attachment to read one.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "entry_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "entry_id values of the emails whose attachments to list",
+                        "minItems": 1
+                    }
+                },
+                "required": ["entry_ids"]
+            }
+        ),
+        types.Tool(
+            name="get_attachment",
+            description="Reads the content of one attachment (log bundles, CSV exports, ...) in chunks. Text files are returned as text, other files base64-encoded. When the response has a next_offset, call again with offset=next_offset for the following chunk. Extracted attachments are cached, so re-reading them is cheap.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "entry_id": {
+                        "type": "string",
+                        "description": "entry_id of the email"
+                    },
+                    "index": {
+                        "type": "integer",
+                        "description": "Attachment index as returned by list_attachments (1-based)",
+                        "minimum": 1
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Byte offset to read from (default: 0)",
+                        "minimum": 0
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": "Maximum bytes to return in this chunk (default: attachment_chunk_kb)",
+                        "minimum": 1
                     }
                 },
-                "required": ["search_text"]
+                "required": ["entry_id", "index"]
+            }
+        ),
+        types.Tool(
+            name="analyze_alerts",
+            description="Analyzes ALL emails matching an alert pattern, not just the newest max_search_results: urgent/normal split, alerts per day and per hour of day, reply ratio, top senders and mailbox distribution, plus the newest and newest urgent alerts and recommendations. Statistics are computed from email headers in one pass, without reading bodies, so tens of thousands of alerts are analyzed in one call. Accepts the same filters as get_email_chain.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "search_text": {
+                        "type": "string",
+                        "description": "Exact alert text to search for in subject and body, e.g. an alert name or monitoring rule"
+                    },
+                    "include_personal": {
+                        "type": "boolean",
+                        "description": "Search personal mailbox (default: true)",
+                        "default": True
+                    },
+                    "include_shared": {
+                        "type": "boolean",
+                        "description": "Search shared mailbox (default: true)",
+                        "default": True
+                    },
+                    "mailboxes": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Search only these mailboxes, as for get_email_chain"
+                    },
+                    "received_after": {"type": "string", "description": "As for get_email_chain"},
+                    "received_before": {"type": "string", "description": "As for get_email_chain"},
+                    "from": {"type": "array", "items": {"type": "string"}, "description": "As for get_email_chain"},
+                    "importance": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["low", "normal", "high"]},
+                        "description": "As for get_email_chain"
+                    },
+                    "unread": {"type": "boolean", "description": "As for get_email_chain"},
+                    "has_attachments": {"type": "boolean", "description": "As for get_email_chain"},
+                    "folders": {"type": "array", "items": {"type": "string"}, "description": "As for get_email_chain"}
+                },
+                "required": []
             }
         )
     ]
@@ -85,19 +348,128 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> Sequence[types.Text
     
     logger.info(f"Executing tool: {name}")
     
+    with TOOL_SECONDS.time(name):
+        return await dispatch_tool(name, arguments)
+
+
+def response_budget_argument(arguments: dict[str, Any]) -> Optional[int]:
+    """The max_response_bytes argument, or None for the configured default."""
+    max_response_bytes = arguments.get("max_response_bytes")
+    if max_response_bytes is not None and (not isinstance(max_response_bytes, int)
+                                           or isinstance(max_response_bytes, bool)
+                                           or max_response_bytes < 1):
+        raise ValueError("max_response_bytes must be a positive integer")
+    return max_response_bytes
+
+
+async def dispatch_tool(name: str, arguments: dict[str, Any]) -> Sequence[types.TextContent]:
+    """Validate arguments and run a tool."""
     try:
+        # Pick up edits to config.properties (at most one stat per interval)
+        config.reload_if_changed()
+        from src.utils.body_reducer import resolve_body_mode
+        from src.utils.dasl import SearchFilters
+        
         if name == "check_mailbox_access":
             return await handle_check_mailbox_access()
             
         elif name == "get_email_chain":
-            search_text = arguments.get("search_text")
-            if not search_text:
-                raise ValueError("search_text parameter is required")
+            search_text = (arguments.get("search_text") or "").strip()
+            filters = SearchFilters.from_arguments(arguments)
+            if not search_text and not filters and not arguments.get("cursor"):
+                raise ValueError("search_text or at least one filter is required")
             
             include_personal = arguments.get("include_personal", True)
             include_shared = arguments.get("include_shared", True)
+            cursor = arguments.get("cursor")
+            page_size = arguments.get("page_size")
+            include_chronological = arguments.get("include_chronological")
+            headers_only = arguments.get("headers_only", config.get_bool('search_headers_only', False))
+            mailboxes = arguments.get("mailboxes")
+            if mailboxes is not None and not isinstance(mailboxes, list):
+                raise ValueError("mailboxes must be a list of mailbox names")
+            body_mode = resolve_body_mode(arguments.get("body_mode"))
+            max_response_bytes = response_budget_argument(arguments)
+            
+            return await handle_get_email_chain(search_text, include_personal, include_shared,
+                                                cursor, page_size, include_chronological,
+                                                headers_only, mailboxes, filters, body_mode,
+                                                max_response_bytes)
+            
+        elif name == "get_email_body":
+            entry_ids = arguments.get("entry_ids")
+            if not entry_ids or not isinstance(entry_ids, list):
+                raise ValueError("entry_ids parameter is required")
+            max_ids = config.get_int('max_body_fetch', 50)
+            if len(entry_ids) > max_ids:
+                raise ValueError(f"At most {max_ids} entry_ids can be fetched per call")
+            body_mode = resolve_body_mode(arguments.get("body_mode", "full"))
+            
+            return await handle_get_email_body(entry_ids, body_mode)
+            
+        elif name == "search_many":
+            queries = arguments.get("queries")
+            if not queries or not isinstance(queries, list):
+                raise ValueError("queries parameter is required")
+            mailboxes = arguments.get("mailboxes")
+            if mailboxes is not None and not isinstance(mailboxes, list):
+                raise ValueError("mailboxes must be a list of mailbox names")
+            
+            return await handle_search_many(
+                queries,
+                arguments.get("include_personal", True),
+                arguments.get("include_shared", True),
+                mailboxes,
+                SearchFilters.from_arguments(arguments),
+                arguments.get("max_results_per_query"),
+                arguments.get("include_chronological"),
+                arguments.get("headers_only", config.get_bool('search_headers_only', False)),
+                resolve_body_mode(arguments.get("body_mode")),
+                response_budget_argument(arguments)
+            )
+            
+        elif name == "list_attachments":
+            entry_ids = arguments.get("entry_ids")
+            if not entry_ids or not isinstance(entry_ids, list):
+                raise ValueError("entry_ids parameter is required")
+            max_ids = config.get_int('max_body_fetch', 50)
+            if len(entry_ids) > max_ids:
+                raise ValueError(f"At most {max_ids} entry_ids can be listed per call")
+            
+            return await handle_list_attachments(entry_ids)
+            
+        elif name == "get_attachment":
+            entry_id = arguments.get("entry_id")
+            index = arguments.get("index")
+            offset = arguments.get("offset", 0)
+            max_bytes = arguments.get("max_bytes")
+            if not entry_id or not isinstance(entry_id, str):
+                raise ValueError("entry_id parameter is required")
+            if not isinstance(index, int) or index < 1:
+                raise ValueError("index must be a positive attachment index from list_attachments")
+            if not isinstance(offset, int) or offset < 0:
+                raise ValueError("offset must be a non-negative integer")
+            if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes < 1):
+                raise ValueError("max_bytes must be a positive integer")
+            
+            return await handle_get_attachment(entry_id, index, offset, max_bytes)
+            
+        elif name == "analyze_alerts":
+            search_text = (arguments.get("search_text") or "").strip()
+            filters = SearchFilters.from_arguments(arguments)
+            if not search_text and not filters:
+                raise ValueError("search_text or at least one filter is required")
+            mailboxes = arguments.get("mailboxes")
+            if mailboxes is not None and not isinstance(mailboxes, list):
+                raise ValueError("mailboxes must be a list of mailbox names")
             
-            return await handle_get_email_chain(search_text, include_personal, include_shared)
+            return await handle_analyze_alerts(
+                search_text,
+                arguments.get("include_personal", True),
+                arguments.get("include_shared", True),
+                mailboxes,
+                filters
+            )
             
         else:
             raise ValueError(f"Unknown tool: {name}")
@@ -110,7 +482,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> Sequence[types.Text
             "error": str(e),
             "message": f"Failed to execute {name}: {str(e)}"
         }
-        return [types.TextContent(type="text", text=str(error_response))]
+        return [types.TextContent(type="text", text=get_encoder().dumps(error_response))]
 
 
 async def handle_check_mailbox_access():
@@ -118,14 +490,16 @@ async def handle_check_mailbox_access():
     logger.info("Checking mailbox access...")
     
     try:
+        from src.utils.email_formatter import format_mailbox_status
         # Check access to mailboxes (non-blocking)
-        access_result = await asyncio.to_thread(outlook_client.check_access)
+        access_result = await asyncio.to_thread(get_client().check_access)
         
         # Format response
-        formatted_result = format_mailbox_status(access_result)
+        with FORMAT_SECONDS.time("check_mailbox_access"):
+            formatted_result = format_mailbox_status(access_result)
         
         logger.info("Mailbox access check completed")
-        return [types.TextContent(type="text", text=str(formatted_result))]
+        return text_response("check_mailbox_access", formatted_result)
         
     except Exception as e:
         logger.error(f"Error checking mailbox access: {e}")
@@ -138,27 +512,51 @@ async def handle_check_mailbox_access():
                 "Check network connectivity"
             ]
         }
-        return [types.TextContent(type="text", text=str(error_response))]
+        return [types.TextContent(type="text", text=get_encoder().dumps(error_response))]
 
 
-async def handle_get_email_chain(search_text: str, include_personal: bool, include_shared: bool):
+async def handle_get_email_chain(search_text: str, include_personal: bool, include_shared: bool,
+                                 cursor: str = None, page_size: int = None,
+                                 include_chronological: bool = None, headers_only: bool = False,
+                                 mailboxes: list = None, filters: 'SearchFilters' = None,
+                                 body_mode: str = None, max_response_bytes: int = None):
     """Handle email search and retrieval."""
     logger.info(f"Searching for emails containing: {search_text}")
     
     try:
+        from src.utils.email_formatter import format_email_chain
+        timed_out = []
+        if cursor or page_size or config.get_int('default_page_size', 0) > 0:
+            formatted_result = await asyncio.to_thread(
+                get_email_chain_page, search_text, include_personal, include_shared,
+                cursor, page_size, include_chronological, headers_only, mailboxes, filters, body_mode,
+                max_response_bytes, timed_out
+            )
+            return text_response("get_email_chain", formatted_result)
+        
         # Search for emails in both subject and body (non-blocking)
         emails = await asyncio.to_thread(
-            outlook_client.search_emails,
+            get_client().search_emails,
             search_text=search_text,
             include_personal=include_personal, 
-            include_shared=include_shared
+            include_shared=include_shared,
+            include_body=not headers_only,
+            mailboxes=mailboxes,
+            filters=filters,
+            timed_out=timed_out
         )
         
         # Format response
-        formatted_result = format_email_chain(emails, search_text)
+        with FORMAT_SECONDS.time("get_email_chain"):
+            formatted_result = format_email_chain(emails, search_text, include_chronological, body_mode,
+                                                  max_response_bytes)
+        if filters:
+            formatted_result["filters"] = filters.to_dict()
+        if timed_out:
+            formatted_result["timed_out_mailboxes"] = timed_out
         
         logger.info(f"Found {len(emails)} emails containing '{search_text}'")
-        return [types.TextContent(type="text", text=str(formatted_result))]
+        return text_response("get_email_chain", formatted_result)
         
     except Exception as e:
         logger.error(f"Error searching emails: {e}")
@@ -172,7 +570,195 @@ async def handle_get_email_chain(search_text: str, include_personal: bool, inclu
                 "Ensure mailboxes are accessible"
             ]
         }
-        return [types.TextContent(type="text", text=str(error_response))]
+        return [types.TextContent(type="text", text=get_encoder().dumps(error_response))]
+
+
+def get_email_chain_page(search_text: str, include_personal: bool, include_shared: bool,
+                         cursor: str = None, page_size: int = None,
+                         include_chronological: bool = None, headers_only: bool = False,
+                         mailboxes: list = None, filters: 'SearchFilters' = None,
+                         body_mode: str = None, max_response_bytes: int = None,
+                         timed_out: list = None):
+    """Format one page of a search; later pages are served from a result handle."""
+    from src.utils.email_formatter import format_email_chain
+    from src.utils.result_pager import result_pager
+    page, pagination = result_pager.fetch_page(
+        get_client(), search_text, include_personal, include_shared, cursor, page_size,
+        headers_only, mailboxes, filters, timed_out
+    )
+    with FORMAT_SECONDS.time("get_email_chain"):
+        formatted_result = format_email_chain(page, search_text, include_chronological, body_mode,
+                                              max_response_bytes)
+    if filters:
+        formatted_result["filters"] = filters.to_dict()
+    if timed_out:
+        formatted_result["timed_out_mailboxes"] = timed_out
+    if pagination:
+        formatted_result["pagination"] = pagination
+    return formatted_result
+
+
+async def handle_get_email_body(entry_ids: list, body_mode: str = 'full'):
+    """Handle body retrieval by EntryID."""
+    logger.info(f"Fetching {len(entry_ids)} email bodies")
+    
+    try:
+        from src.utils.email_formatter import format_email_bodies
+        emails = await asyncio.to_thread(get_client().get_email_bodies, entry_ids)
+        with FORMAT_SECONDS.time("get_email_body"):
+            formatted_result = format_email_bodies(emails, body_mode)
+        return text_response("get_email_body", formatted_result)
+        
+    except Exception as e:
+        logger.error(f"Error fetching email bodies: {e}")
+        error_response = {
+            "status": "error",
+            "message": f"Could not fetch email bodies: {str(e)}",
+            "troubleshooting": [
+                "Verify Outlook connection",
+                "Use entry_id values from a recent get_email_chain result"
+            ]
+        }
+        return [types.TextContent(type="text", text=get_encoder().dumps(error_response))]
+
+
+async def handle_search_many(queries: list, include_personal: bool, include_shared: bool,
+                             mailboxes: list = None, filters: 'SearchFilters' = None,
+                             max_per_query: int = None, include_chronological: bool = None,
+                             headers_only: bool = False, body_mode: str = None,
+                             max_response_bytes: int = None):
+    """Handle a combined search for several phrases."""
+    logger.info(f"Searching for {len(queries)} phrases in one pass")
+
+    try:
+        from src.utils.email_formatter import format_search_many
+        timed_out = []
+        results = await asyncio.to_thread(
+            get_client().search_many,
+            queries,
+            include_personal=include_personal,
+            include_shared=include_shared,
+            include_body=not headers_only,
+            mailboxes=mailboxes,
+            filters=filters,
+            max_per_query=max_per_query,
+            timed_out=timed_out
+        )
+        with FORMAT_SECONDS.time("search_many"):
+            formatted_result = format_search_many(results, include_chronological, body_mode,
+                                                  max_response_bytes)
+        if filters:
+            formatted_result["filters"] = filters.to_dict()
+        if timed_out:
+            formatted_result["timed_out_mailboxes"] = timed_out
+        return text_response("search_many", formatted_result)
+
+    except Exception as e:
+        logger.error(f"Error searching for several phrases: {e}")
+        error_response = {
+            "status": "error",
+            "queries": queries,
+            "message": f"Could not search emails: {str(e)}",
+            "troubleshooting": [
+                "Verify Outlook connection",
+                "Pass at most max_queries_per_search phrases",
+                "Ensure mailboxes are accessible"
+            ]
+        }
+        return [types.TextContent(type="text", text=get_encoder().dumps(error_response))]
+
+
+async def handle_list_attachments(entry_ids: list):
+    """Handle attachment listing by EntryID."""
+    logger.info(f"Listing attachments of {len(entry_ids)} emails")
+    
+    try:
+        from src.utils.email_formatter import format_attachment_list
+        results = await asyncio.to_thread(get_client().list_attachments, entry_ids)
+        with FORMAT_SECONDS.time("list_attachments"):
+            formatted_result = format_attachment_list(results)
+        return text_response("list_attachments", formatted_result)
+        
+    except Exception as e:
+        logger.error(f"Error listing attachments: {e}")
+        error_response = {
+            "status": "error",
+            "message": f"Could not list attachments: {str(e)}",
+            "troubleshooting": [
+                "Verify Outlook connection",
+                "Use entry_id values from a recent get_email_chain result"
+            ]
+        }
+        return [types.TextContent(type="text", text=get_encoder().dumps(error_response))]
+
+
+async def handle_get_attachment(entry_id: str, index: int, offset: int = 0, max_bytes: int = None):
+    """Handle reading one chunk of an attachment."""
+    logger.info(f"Reading attachment {index} of {entry_id} from offset {offset}")
+    
+    try:
+        from src.utils.email_formatter import format_attachment_chunk
+        chunk = await asyncio.to_thread(get_client().get_attachment, entry_id, index, offset, max_bytes)
+        with FORMAT_SECONDS.time("get_attachment"):
+            formatted_result = format_attachment_chunk(chunk)
+        return text_response("get_attachment", formatted_result)
+        
+    except Exception as e:
+        logger.error(f"Error reading attachment: {e}")
+        error_response = {
+            "status": "error",
+            "message": f"Could not read attachment: {str(e)}",
+            "troubleshooting": [
+                "Verify Outlook connection",
+                "Use entry_id and index values from a recent list_attachments result"
+            ]
+        }
+        return [types.TextContent(type="text", text=get_encoder().dumps(error_response))]
+
+
+async def handle_analyze_alerts(search_text: str, include_personal: bool, include_shared: bool,
+                                mailboxes: list = None, filters: 'SearchFilters' = None):
+    """Handle alert analysis over the headers of every matching email."""
+    logger.info(f"Analyzing alerts matching: {search_text}")
+    
+    try:
+        from src.utils.alert_analyzer import AlertAggregator
+        from src.utils.email_formatter import format_alert_analysis
+        aggregator = AlertAggregator()
+        timed_out = []
+        scanned = await asyncio.to_thread(
+            get_client().scan_headers,
+            search_text,
+            aggregator.add,
+            include_personal=include_personal,
+            include_shared=include_shared,
+            mailboxes=mailboxes,
+            filters=filters,
+            timed_out=timed_out
+        )
+        with FORMAT_SECONDS.time("analyze_alerts"):
+            formatted_result = format_alert_analysis(aggregator, search_text)
+        if filters:
+            formatted_result["filters"] = filters.to_dict()
+        if timed_out:
+            formatted_result["timed_out_mailboxes"] = timed_out
+        
+        logger.info(f"Analyzed {aggregator.total} alerts ({scanned} headers scanned) for '{search_text}'")
+        return text_response("analyze_alerts", formatted_result)
+        
+    except Exception as e:
+        logger.error(f"Error analyzing alerts: {e}")
+        error_response = {
+            "status": "error",
+            "search_text": search_text,
+            "message": f"Could not analyze alerts: {str(e)}",
+            "troubleshooting": [
+                "Verify Outlook connection",
+                "Narrow the search with received_after or folders",
+                "Ensure mailboxes are accessible"
+            ]
+        }
+        return [types.TextContent(type="text", text=get_encoder().dumps(error_response))]
 
 
 @app.list_resources()
@@ -184,6 +770,24 @@ async def list_resources() -> list[types.Resource]:
             name="Current Configuration", 
             description="Show current configuration settings",
             mimeType="text/plain"
+        ),
+        types.Resource(
+            uri="outlook-mcp://cache-stats",
+            name="Cache Statistics",
+            description="Hit, miss, eviction and memory counters of the search result and body caches and the attachment store",
+            mimeType="application/json"
+        ),
+        types.Resource(
+            uri="outlook-mcp://metrics",
+            name="Metrics",
+            description="Latency histograms of connect, recipient resolution, search wait, extraction, HTML cleaning, formatting and serialization, and COM, cache and fallback counters, in Prometheus text format",
+            mimeType="text/plain"
+        ),
+        types.Resource(
+            uri="outlook-mcp://metrics.json",
+            name="Metrics (JSON)",
+            description="The same metrics as a JSON snapshot with estimated p50/p95/p99 latencies",
+            mimeType="application/json"
         )
     ]
 
@@ -192,14 +796,23 @@ async def list_resources() -> list[types.Resource]:
 async def read_resource(uri: str) -> str:
     """Read resource content."""
     if uri == "outlook-mcp://config":
-        config.show_config()
-        return "Configuration displayed in console"
+        return config.format_config()
+    elif uri == "outlook-mcp://cache-stats":
+        return get_encoder().dumps({
+            "search_cache": get_client().search_cache_stats(),
+            "body_cache": get_client().body_cache_stats(),
+            "attachment_store": get_client().attachment_store_stats()
+        })
+    elif uri == "outlook-mcp://metrics":
+        return metrics.to_prometheus()
+    elif uri == "outlook-mcp://metrics.json":
+        return get_encoder().dumps(metrics.snapshot())
     else:
         raise ValueError(f"Unknown resource: {uri}")
 
 
-async def main():
-    """Main entry point."""
+def show_banner():
+    """Startup banner, configuration and tool overview."""
     print("=" * 60)
     print("[STARTING] Outlook MCP Server")
     print("=" * 60)
@@ -214,17 +827,34 @@ async def main():
     print("   * Update config.properties with your shared mailbox details")
     print("   * Server searches ALL folders, not just Inbox")
     
-    shared_email = config.get('shared_mailbox_email')
-    if not shared_email or 'your-shared-mailbox' in shared_email or 'example.com' in shared_email:
+    shared_emails = config.settings.shared_mailboxes
+    if not shared_emails or any('your-shared-mailbox' in e or 'example.com' in e for e in shared_emails):
         print("\n[WARNING] Shared mailbox not configured!")
         print("   Update 'shared_mailbox_email' in config.properties")
     
     print("\n[TOOLS] Available Tools:")
     print("   1. check_mailbox_access - Test connection and access")
     print("   2. get_email_chain - Search emails by text in subject AND body")
+    print("   3. get_email_body - Fetch full bodies of selected emails by entry_id")
+    print("   4. search_many - Search several phrases in one pass")
+    print("   5. list_attachments - List attachments of selected emails")
+    print("   6. get_attachment - Read an attachment in chunks")
+    print("   7. analyze_alerts - Statistics over all emails matching an alert pattern")
     
     print(f"\n[READY] Server ready! Listening for MCP client connections...")
     print("=" * 60)
+
+
+async def main():
+    """Main entry point."""
+    with contextlib.redirect_stdout(sys.stderr):
+        show_banner()
+    
+    # Import the client, connect and warm up in the background, so the
+    # handshake and list_tools are answered while Outlook is still attaching
+    if config.get_bool('supervisor_enabled', True):
+        threading.Thread(target=lambda: get_client().start_supervisor(),
+                         name="outlook-startup", daemon=True).start()
     
     # Start server
     async with stdio_server() as (read_stream, write_stream):
@@ -235,7 +865,7 @@ if __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("\n[INFO] Server stopped by user")
+        print("\n[INFO] Server stopped by user", file=sys.stderr)
     except Exception as e:
-        print(f"\n[ERROR] Server error: {e}")
+        print(f"\n[ERROR] Server error: {e}", file=sys.stderr)
         logger.error(f"Server error: {e}")
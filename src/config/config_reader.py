@@ -1,27 +1,133 @@
 """Simple configuration reader for properties file."""
 
+import logging
 import os
-from typing import Dict, Any, List
+import sys
+import threading
+import time
+import types
+import weakref
+from typing import Callable, Dict, Any, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def _to_int(value, default: int) -> int:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def _to_bool(value, default: bool) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'yes', 'on')
+    return default
+
+
+def _to_str(value, default: str) -> str:
+    return default if value is None else str(value)
+
+
+def _to_tuple(value, default: tuple) -> tuple:
+    if isinstance(value, (list, tuple)):
+        return tuple(str(item).strip() for item in value if str(item).strip())
+    if isinstance(value, str):
+        return tuple(item.strip() for item in value.split(',') if item.strip())
+    return default
+
+
+_CONVERTERS = {int: _to_int, bool: _to_bool, str: _to_str, tuple: _to_tuple}
+
+
+class Settings:
+    """Immutable, typed snapshot of the settings read on hot paths.
+
+    Values are converted once when the snapshot is built, so per-item code
+    reads plain attributes instead of doing a dict lookup and a conversion
+    on every call. A reload builds a new snapshot rather than changing this
+    one, so a reader holding it sees consistent values.
+    """
+
+    # name -> (type, default)
+    FIELDS = {
+        'shared_mailboxes': (tuple, ()),
+        'max_search_results': (int, 500),
+        'max_body_chars': (int, 0),
+        'body_preview_chars': (int, 500),
+        'max_recipients_display': (int, 10),
+        'batch_processing_size': (int, 50),
+        'clean_html_content': (bool, True),
+        'prefer_html_body': (bool, False),
+        'search_all_folders': (bool, True),
+        'include_timestamps': (bool, True),
+        'include_chronological_list': (bool, True),
+        'analyze_importance_levels': (bool, True),
+    }
+
+    # Fields read from a config key of a different name
+    KEYS = {'shared_mailboxes': 'shared_mailbox_email'}
+
+    __slots__ = tuple(FIELDS)
+
+    def __init__(self, values: Dict[str, Any]):
+        for name, (kind, default) in self.FIELDS.items():
+            value = values.get(self.KEYS.get(name, name), default)
+            object.__setattr__(self, name, _CONVERTERS[kind](value, default))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings are read-only; edit config.properties instead")
+
+    def __delattr__(self, name):
+        raise AttributeError("Settings are read-only; edit config.properties instead")
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"Settings({values})"
 
 
 class ConfigReader:
-    """Reads configuration from config.properties file."""
+    """Reads configuration from config.properties file.
+
+    ``settings`` holds a typed snapshot of the hot-path values. When
+    ``reload_if_changed`` finds the file modified, the configuration and the
+    snapshot are replaced and the registered listeners are told which keys
+    changed.
+    """
     
     def __init__(self, config_file: str = "config.properties"):
         self.config_file = config_file
+        self.config_path = os.path.join(os.path.dirname(__file__), config_file)
         self.config = {}
+        self.settings = Settings(self.config)
+        self._file_stamp = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[], Optional[Callable[[Set[str]], None]]]] = []
         self.load_config()
     
-    def load_config(self):
-        """Load configuration from properties file."""
+    def load_config(self, quiet: bool = False):
+        """Load configuration from properties file.
+        
+        With ``quiet`` (used for reloads) the current configuration is kept if
+        the file cannot be read. Nothing is printed: stdout is the protocol
+        channel of the stdio transport, so problems are logged instead.
+        """
         # Look for config file in the config directory
-        config_path = os.path.join(os.path.dirname(__file__), self.config_file)
+        config_path = self.config_path
+        self._file_stamp = self._stat()
         
         if not os.path.exists(config_path):
-            print(f"Warning: Config file {config_path} not found. Using defaults.")
+            if quiet:
+                logger.warning(f"Config file {config_path} not found, keeping current configuration")
+                return
+            logger.warning(f"Config file {config_path} not found. Using defaults.")
             self._set_defaults()
             return
         
+        values = {}
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 for line_num, line in enumerate(f, 1):
@@ -38,14 +144,18 @@ class ConfigReader:
                         value = value.strip()
                         
                         # Convert values to appropriate types
-                        self.config[key] = self._convert_value(value)
+                        values[key] = self._convert_value(value)
                     else:
-                        print(f"Warning: Invalid line {line_num} in config file: {line}")
+                        logger.warning(f"Invalid line {line_num} in config file: {line}")
             
-            print(f"Loaded configuration from {config_path}")
+            self._apply(values)
+            logger.debug(f"Loaded configuration from {config_path}")
             
         except Exception as e:
-            print(f"Error reading config file: {e}")
+            if quiet:
+                logger.error(f"Error reading config file, keeping current configuration: {e}")
+                return
+            logger.error(f"Error reading config file: {e}")
             self._set_defaults()
     
     def _convert_value(self, value: str) -> Any:
@@ -73,9 +183,71 @@ class ConfigReader:
         # String values
         return value
     
+    def _apply(self, values: Dict[str, Any]):
+        """Swap in new values and their settings snapshot."""
+        self.settings = Settings(values)
+        self.config = values
+    
+    def _stat(self):
+        """(mtime, size) of the config file, or None when it does not exist."""
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def add_listener(self, callback: Callable[[Set[str]], None]):
+        """Call ``callback(changed_keys)`` after a reload changed settings.
+        
+        Bound methods are held weakly so listeners do not keep their objects alive.
+        """
+        if isinstance(callback, types.MethodType):
+            self._listeners.append(weakref.WeakMethod(callback))
+        else:
+            self._listeners.append(lambda: callback)
+    
+    def reload_if_changed(self, force: bool = False) -> Set[str]:
+        """Reload config.properties if it changed on disk; returns the changed keys.
+        
+        The file is stat'ed at most once per ``config_reload_interval_seconds``
+        (0 disables watching), so this is cheap enough to call per request.
+        """
+        now = time.monotonic()
+        if not force:
+            interval = _to_int(self.config.get('config_reload_interval_seconds', 2), 2)
+            if interval <= 0 or now < self._next_check:
+                return set()
+            self._next_check = now + interval
+        
+        with self._reload_lock:
+            if self._stat() == self._file_stamp:
+                return set()
+            previous = self.config
+            self.load_config(quiet=True)
+            changed = {key for key in previous.keys() | self.config.keys()
+                       if previous.get(key) != self.config.get(key)}
+        
+        if changed:
+            logger.info(f"Configuration reloaded, changed: {', '.join(sorted(changed))}")
+            self._notify(changed)
+        return changed
+    
+    def _notify(self, changed: Set[str]):
+        alive = []
+        for reference in self._listeners:
+            callback = reference()
+            if callback is None:
+                continue
+            alive.append(reference)
+            try:
+                callback(changed)
+            except Exception as e:
+                logger.error(f"Error applying configuration change: {e}")
+        self._listeners = alive
+    
     def _set_defaults(self):
         """Set default configuration values."""
-        self.config = {
+        self._apply({
             'shared_mailbox_email': '',
             'shared_mailbox_name': 'Shared Mailbox',
             'personal_retention_months': 6,
@@ -87,13 +259,53 @@ class ConfigReader:
             'connection_timeout_minutes': 10,
             'max_retry_attempts': 3,
             'batch_processing_size': 50,
+            'com_worker_pool_size': 2,
+            'com_worker_health_check_seconds': 30,
+            'supervisor_enabled': True,
+            'supervisor_probe_interval_seconds': 30,
+            'reconnect_backoff_base_seconds': 1,
+            'reconnect_backoff_max_seconds': 60,
+            'connect_wait_seconds': 15,
+            'use_search_events': True,
+            'local_index_enabled': False,
+            'local_index_sync_interval_seconds': 60,
+            'local_index_reconcile_interval_seconds': 3600,
+            'search_cache_ttl_seconds': 3600,
+            'search_cache_max_entries': 100,
+            'search_cache_max_mb': 64,
+            'max_parallel_mailbox_searches': 4,
+            'mailbox_search_timeout_seconds': 60,
+            'search_headers_only': False,
+            'max_body_fetch': 50,
+            'default_body_mode': 'preview',
+            'body_preview_chars': 500,
+            'max_response_bytes': 0,
+            'max_queries_per_search': 30,
+            'max_results_per_query': 50,
+            'body_cache_max_mb': 32,
+            'attachment_cache_max_mb': 512,
+            'max_attachment_mb': 100,
+            'attachment_chunk_kb': 256,
+            'max_attachment_chunk_kb': 1024,
+            'default_page_size': 0,
+            'result_handle_ttl_seconds': 300,
+            'max_result_handles': 50,
             'analyze_importance_levels': True,
-            'search_all_folders': False,
-            'use_folder_traversal': False,
+            'search_all_folders': True,
+            'folder_include_patterns': [],
+            'folder_exclude_patterns': ['Sync Issues*'],
+            'folder_cache_ttl_seconds': 600,
+            'max_concurrent_folder_searches': 16,
             'use_extended_mapi_login': True,
             'include_timestamps': True,
-            'clean_html_content': True
-        }
+            'include_chronological_list': True,
+            'clean_html_content': True,
+            'prefer_html_body': False,
+            'json_encoder': 'auto',
+            'compact_json_output': False,
+            'mail_backend': 'com',
+            'config_reload_interval_seconds': 2
+        })
     
     def get(self, key: str, default=None):
         """Get configuration value by key."""
@@ -101,20 +313,11 @@ class ConfigReader:
     
     def get_int(self, key: str, default: int = 0) -> int:
         """Get configuration value as integer."""
-        value = self.config.get(key, default)
-        try:
-            return int(value)
-        except (ValueError, TypeError):
-            return default
+        return _to_int(self.config.get(key, default), default)
     
     def get_bool(self, key: str, default: bool = False) -> bool:
         """Get configuration value as boolean."""
-        value = self.config.get(key, default)
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            return value.lower() in ('true', '1', 'yes', 'on')
-        return default
+        return _to_bool(self.config.get(key, default), default)
     
     def get_list(self, key: str, default: List = None) -> List:
         """Get configuration value as list."""
@@ -128,17 +331,21 @@ class ConfigReader:
             return [item.strip() for item in value.split(',') if item.strip()]
         return default
     
-    def show_config(self):
-        """Display current configuration."""
-        print("\nCurrent Configuration:")
-        print("=" * 40)
+    def format_config(self) -> str:
+        """Current configuration as ``key: value`` lines."""
+        lines = ["Current Configuration:", "=" * 40]
         for key, value in sorted(self.config.items()):
             # Don't show empty email addresses
             if key == 'shared_mailbox_email' and not value:
-                print(f"{key}: <not configured>")
+                lines.append(f"{key}: <not configured>")
             else:
-                print(f"{key}: {value}")
-        print("=" * 40)
+                lines.append(f"{key}: {value}")
+        lines.append("=" * 40)
+        return "\n".join(lines)
+    
+    def show_config(self, stream=None):
+        """Display current configuration (on stderr unless another stream is given)."""
+        print("\n" + self.format_config(), file=stream or sys.stderr)
 
 
 # Global config instance
@@ -0,0 +1,192 @@
+"""One-pass aggregation of alert statistics over email headers.
+
+``AlertAggregator.add`` takes one header-only email at a time (as streamed
+by ``OutlookClient.scan_headers``) and keeps running counts only, so
+analysing 100,000 alerts holds no email dicts and reads no bodies:
+
+- urgency split, replies and the date range as counters;
+- alerts per day (one bucket per day in the range), per hour of day and per
+  mailbox;
+- top senders with the Misra-Gries frequent-items algorithm in at most
+  ``SENDER_SLOTS`` counters, exact while there are no more distinct senders;
+- the newest alerts and the newest urgent alerts in small heaps.
+
+Copies of a message in several mailboxes or folders are counted once, by
+Internet Message-ID; that check keeps one hash per message, a few dozen
+bytes against the kilobytes of an email dict.
+"""
+
+import heapq
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.config_reader import config
+
+# Subject words marking an alert as urgent when analyze_importance_levels is on
+URGENT_PHRASES = ('urgent', 'critical', 'emergency', 'asap', 'immediate')
+
+# A reply subject, e.g. "RE:", "AW:" or "Re[2]:"
+_REPLY_PREFIX = re.compile(r'\s*(?:re|aw|sv|reply)\s*(?:\[\d+\])?\s*:', re.IGNORECASE)
+
+# Sender counters kept for the top-senders ranking
+SENDER_SLOTS = 256
+
+# Alerts kept for the newest and newest-urgent lists
+RECENT_ALERTS = 10
+URGENT_ALERTS = 5
+
+
+class AlertAggregator:
+    """Running alert statistics; feed emails to add(), read the results after."""
+
+    __slots__ = ('analyze_importance', 'total', 'urgent', 'replies', 'copies_collapsed',
+                 'first', 'last', 'days', 'hours', 'mailboxes', 'senders', 'sender_slots',
+                 'senders_approximate', 'recent', 'recent_urgent', '_seen', '_sequence')
+
+    def __init__(self, analyze_importance: Optional[bool] = None, sender_slots: int = SENDER_SLOTS):
+        if analyze_importance is None:
+            analyze_importance = config.settings.analyze_importance_levels
+        self.analyze_importance = analyze_importance
+        self.total = 0
+        self.urgent = 0
+        self.replies = 0
+        self.copies_collapsed = 0
+        self.first: Optional[datetime] = None
+        self.last: Optional[datetime] = None
+        self.days: Dict[Any, List[int]] = {}  # date -> [alerts, urgent]
+        self.hours = [0] * 24
+        self.mailboxes: Dict[str, int] = {}
+        self.senders: Dict[str, List[Any]] = {}  # key -> [count, name, email]
+        self.sender_slots = max(1, sender_slots)
+        self.senders_approximate = False
+        # (received_time, sequence, email) min-heaps of the newest alerts
+        self.recent: List[Tuple[datetime, int, Dict[str, Any]]] = []
+        self.recent_urgent: List[Tuple[datetime, int, Dict[str, Any]]] = []
+        self._seen = set()
+        self._sequence = 0
+
+    def is_urgent(self, email: Dict[str, Any]) -> bool:
+        """High importance, or an urgent phrase in the subject when analyze_importance is on."""
+        if (email.get('importance') or 1) > 1:
+            return True
+        if self.analyze_importance:
+            subject = (email.get('subject') or '').lower()
+            return any(phrase in subject for phrase in URGENT_PHRASES)
+        return False
+
+    def add(self, email: Dict[str, Any]) -> None:
+        """Count one alert; further copies of the same message are skipped."""
+        message_id = email.get('internet_message_id')
+        if message_id:
+            key = hash(message_id)
+            if key in self._seen:
+                self.copies_collapsed += 1
+                return
+            self._seen.add(key)
+
+        urgent = self.is_urgent(email)
+        self.total += 1
+        self.urgent += urgent
+        if _REPLY_PREFIX.match(email.get('subject') or ''):
+            self.replies += 1
+
+        mailbox = email.get('mailbox_address') or email.get('mailbox_type') or 'unknown'
+        self.mailboxes[mailbox] = self.mailboxes.get(mailbox, 0) + 1
+        self._count_sender(email)
+
+        received = email.get('received_time')
+        if not isinstance(received, datetime):
+            return
+        if self.first is None or received < self.first:
+            self.first = received
+        if self.last is None or received > self.last:
+            self.last = received
+        day = self.days.get(received.date())
+        if day is None:
+            day = self.days[received.date()] = [0, 0]
+        day[0] += 1
+        day[1] += urgent
+        self.hours[received.hour] += 1
+
+        self._sequence += 1
+        self._keep_newest(self.recent, RECENT_ALERTS, received, email)
+        if urgent:
+            self._keep_newest(self.recent_urgent, URGENT_ALERTS, received, email)
+
+    def _count_sender(self, email: Dict[str, Any]) -> None:
+        """Misra-Gries step: count the sender, or decrement every counter when all slots are taken."""
+        sender_email = email.get('sender_email') or ''
+        name = email.get('sender_name') or 'Unknown'
+        key = sender_email.lower() or name
+        counter = self.senders.get(key)
+        if counter is not None:
+            counter[0] += 1
+        elif len(self.senders) < self.sender_slots:
+            self.senders[key] = [1, name, sender_email]
+        else:
+            # Every decrement round is paid for by the increments it removes
+            self.senders_approximate = True
+            for other in list(self.senders):
+                counter = self.senders[other]
+                counter[0] -= 1
+                if not counter[0]:
+                    del self.senders[other]
+
+    def _keep_newest(self, heap: list, size: int, received: datetime, email: Dict[str, Any]) -> None:
+        entry = (received, self._sequence, email)
+        if len(heap) < size:
+            heapq.heappush(heap, entry)
+        elif received > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    # -- results ---------------------------------------------------------------
+
+    def date_range(self) -> Dict[str, Optional[str]]:
+        if self.first is None:
+            return {"first": None, "last": None}
+        return {"first": self.first.isoformat(), "last": self.last.isoformat()}
+
+    def daily_frequency(self) -> float:
+        """Average alerts per day over the date range."""
+        if self.first is None:
+            return 0.0
+        days = (self.last.date() - self.first.date()).days + 1
+        return round(self.total / max(days, 1), 2)
+
+    def response_indicators(self) -> Dict[str, Any]:
+        originals = self.total - self.replies
+        return {
+            "replies_found": self.replies,
+            "total_alerts": self.total,
+            "response_rate_percent": round(self.replies / self.total * 100, 1) if self.total else 0,
+            "replies_per_alert": round(self.replies / originals, 2) if originals else None,
+        }
+
+    def mailbox_distribution(self) -> Dict[str, int]:
+        return dict(sorted(self.mailboxes.items(), key=lambda x: x[1], reverse=True))
+
+    def top_senders(self, count: int = 10) -> List[Dict[str, Any]]:
+        """Senders with the most alerts; counts are lower bounds when senders_approximate."""
+        top = heapq.nsmallest(count, self.senders.values(), key=lambda x: (-x[0], x[1]))
+        return [{"name": name, "email": email, "alerts": alerts} for alerts, name, email in top]
+
+    def hourly_distribution(self) -> Dict[str, int]:
+        """Alerts per hour of day, for the hours that have any."""
+        return {f"{hour:02d}": alerts for hour, alerts in enumerate(self.hours) if alerts}
+
+    def peak_hour(self) -> Optional[int]:
+        if not any(self.hours):
+            return None
+        return max(range(24), key=self.hours.__getitem__)
+
+    def daily_counts(self) -> List[Dict[str, Any]]:
+        """Alerts and urgent alerts per day, oldest first."""
+        return [{"date": day.isoformat(), "alerts": alerts, "urgent": urgent}
+                for day, (alerts, urgent) in sorted(self.days.items())]
+
+    def newest(self) -> List[Dict[str, Any]]:
+        return [email for _, _, email in sorted(self.recent, reverse=True)]
+
+    def newest_urgent(self) -> List[Dict[str, Any]]:
+        return [email for _, _, email in sorted(self.recent_urgent, reverse=True)]
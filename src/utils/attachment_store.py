@@ -0,0 +1,189 @@
+"""Content-addressed disk cache of extracted attachments.
+
+Attachments are written by ``Attachment.SaveAsFile`` into a spool file, hashed
+in fixed-size chunks and moved into the cache under their SHA-256 digest. The
+same file attached to many alerts, or forwarded many times, is stored once.
+Each (EntryID, attachment index) remembers its digest, so repeated requests
+for an attachment are served from disk without opening the item. The cache is
+capped by the total size of its files; least recently used files are deleted
+first.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..config.config_reader import config
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed and read per step, so memory use is independent of attachment size
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def default_path() -> str:
+    """Cache directory from ``attachment_cache_path`` or the user's home directory."""
+    path = config.get('attachment_cache_path')
+    if path:
+        return os.path.expanduser(str(path))
+    return os.path.join(os.path.expanduser('~'), '.outlook_mcp', 'attachments')
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AttachmentStore:
+    """Size-capped LRU store of attachment files named by their SHA-256."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_refs: Optional[int] = None):
+        self.directory = directory or default_path()
+        if max_bytes is None:
+            max_bytes = config.get_int('attachment_cache_max_mb', 512) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.max_refs = max_refs or config.get_int('attachment_cache_max_refs', 20000)
+        self.spool = os.path.join(self.directory, 'spool')
+        # digest -> file size, least recently used first
+        self._files: 'OrderedDict[str, int]' = OrderedDict()
+        # (entry_id, index) -> attachment metadata including 'sha256'
+        self._refs: 'OrderedDict[Tuple[str, int], Dict[str, Any]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.evictions = 0
+        self._open()
+
+    def _open(self) -> None:
+        """Create the directories and account for files left by earlier runs."""
+        os.makedirs(self.spool, exist_ok=True)
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if len(name) != 64 or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, digest, size in sorted(files):
+            self._files[digest] = size
+            self._bytes += size
+        # Spool files of an interrupted extraction are never picked up again
+        for name in os.listdir(self.spool):
+            try:
+                os.remove(os.path.join(self.spool, name))
+            except OSError:
+                pass
+        self._evict()
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest)
+
+    def spool_path(self, file_name: str = '') -> str:
+        """Fresh path in the spool directory, keeping the attachment's extension."""
+        extension = os.path.splitext(file_name)[1][:16]
+        return os.path.join(self.spool, os.urandom(8).hex() + extension)
+
+    def lookup(self, entry_id: str, index: int) -> Optional[Dict[str, Any]]:
+        """Metadata of a previously extracted attachment whose file is still cached."""
+        with self._lock:
+            ref = self._refs.get((entry_id, index))
+            if ref is None or ref['sha256'] not in self._files:
+                self.misses += 1
+                return None
+            self._refs.move_to_end((entry_id, index))
+            self._files.move_to_end(ref['sha256'])
+            self.hits += 1
+            return dict(ref)
+
+    def known(self, entry_id: str, index: int) -> Optional[str]:
+        """Digest of an attachment if its file is cached, without counting a lookup."""
+        with self._lock:
+            ref = self._refs.get((entry_id, index))
+            return ref['sha256'] if ref is not None and ref['sha256'] in self._files else None
+
+    def add(self, spool_file: str, entry_id: str, index: int,
+            metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Move a spooled attachment into the store; returns its metadata with sha256 and size."""
+        digest = file_digest(spool_file)
+        size = os.path.getsize(spool_file)
+        with self._lock:
+            if digest in self._files:
+                self.deduplicated += 1
+                self._files.move_to_end(digest)
+                stored = True
+            else:
+                stored = False
+        if stored:
+            os.remove(spool_file)
+        else:
+            os.replace(spool_file, self.path(digest))
+        ref = dict(metadata, sha256=digest, size=size)
+        with self._lock:
+            if digest not in self._files:  # unless another worker stored it meanwhile
+                self._files[digest] = size
+                self._bytes += size
+            self._refs[(entry_id, index)] = ref
+            self._refs.move_to_end((entry_id, index))
+            while len(self._refs) > self.max_refs:
+                self._refs.popitem(last=False)
+        self._evict(keep=digest)
+        return dict(ref)
+
+    def read(self, digest: str, offset: int, length: int) -> bytes:
+        """Up to ``length`` bytes of a stored file from ``offset``."""
+        with self._lock:
+            if digest in self._files:
+                self._files.move_to_end(digest)
+        with open(self.path(digest), 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def discard(self, digest: str) -> None:
+        """Forget a file that is missing from disk, so the next extraction stores it again."""
+        with self._lock:
+            size = self._files.pop(digest, None)
+            if size is not None:
+                self._bytes -= size
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Delete least recently used files until the store fits its cap."""
+        with self._lock:
+            victims = []
+            for digest, size in list(self._files.items()):
+                if self._bytes <= self.max_bytes:
+                    break
+                if digest == keep:
+                    continue
+                del self._files[digest]
+                self._bytes -= size
+                self.evictions += 1
+                victims.append(digest)
+        for digest in victims:
+            try:
+                os.remove(self.path(digest))
+            except OSError as e:
+                # Still open for reading (Windows); it is no longer served and is replaced on next use
+                logger.debug(f"Could not delete evicted attachment {digest}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "attachments_known": len(self._refs),
+                "hits": self.hits,
+                "misses": self.misses,
+                "deduplicated": self.deduplicated,
+                "evictions": self.evictions,
+            }
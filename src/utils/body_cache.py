@@ -0,0 +1,106 @@
+"""Cache of processed email bodies keyed by EntryID and LastModificationTime.
+
+A body is only served from the cache while the item's LastModificationTime
+matches the one it was read at. The versions of items seen in search results
+are remembered, so a later body request for one of them is answered without
+opening the item. Memory is capped by the total size of the cached bodies;
+least recently used bodies are evicted first.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ..config.config_reader import config
+
+# Per-entry overhead of the key, tuple and counters in bytes
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class BodyCache:
+    """Byte-bounded LRU cache of (body, attachments_count) per item version."""
+
+    def __init__(self, max_bytes: Optional[int] = None, max_versions: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = config.get_int('body_cache_max_mb', 32) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.max_versions = max_versions or config.get_int('body_cache_max_versions', 20000)
+        # entry_id -> (last_modified, body, attachments_count, size)
+        self._bodies: 'OrderedDict[str, Tuple[Any, str, int, int]]' = OrderedDict()
+        # entry_id -> last_modified of the item as last seen in search results
+        self._versions: 'OrderedDict[str, Any]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def remember(self, emails: Iterable[Dict[str, Any]]) -> None:
+        """Record item versions, and bodies when present, from search results."""
+        for email in emails:
+            entry_id = email.get('entry_id')
+            last_modified = email.get('last_modified')
+            if not entry_id or last_modified is None:
+                continue
+            with self._lock:
+                self._versions[entry_id] = last_modified
+                self._versions.move_to_end(entry_id)
+                while len(self._versions) > self.max_versions:
+                    self._versions.popitem(last=False)
+            if email.get('body') is not None and email.get('attachments_count') is not None:
+                self.put(entry_id, last_modified, email['body'], email['attachments_count'])
+
+    def version(self, entry_id: str):
+        """Last known LastModificationTime of an item, or None."""
+        with self._lock:
+            return self._versions.get(entry_id)
+
+    def get(self, entry_id: str, last_modified) -> Optional[Tuple[str, int]]:
+        """(body, attachments_count) if cached for this version of the item."""
+        with self._lock:
+            cached = self._bodies.get(entry_id)
+            if cached is None or last_modified is None or cached[0] != last_modified:
+                self.misses += 1
+                return None
+            self._bodies.move_to_end(entry_id)
+            self.hits += 1
+            return cached[1], cached[2]
+
+    def put(self, entry_id: str, last_modified, body: str, attachments_count: int) -> None:
+        if last_modified is None:
+            return
+        size = len(body) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(entry_id, None)
+            if previous is not None:
+                self._bytes -= previous[3]
+            self._bodies[entry_id] = (last_modified, body, attachments_count, size)
+            self._versions[entry_id] = last_modified
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self._bytes -= evicted[3]
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bodies.clear()
+            self._versions.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._bodies),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "known_versions": len(self._versions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
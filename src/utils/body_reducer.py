@@ -0,0 +1,151 @@
+"""Reduction of email bodies to the content each message adds to its thread.
+
+Every reply carries the thread's earlier messages below it, so a conversation
+of N messages contains the oldest text N times. ``new_content`` cuts a body at
+the first quoted block (Outlook's separator line, an ``-----Original
+Message-----`` marker, a ``From:``/``Sent:`` header block, an ``On ...
+wrote:`` line or ``>``-prefixed lines) and then drops a trailing signature
+(an RFC 3676 ``-- `` line, "Sent from my ..." or a closing such as
+"Regards," followed by a few words). The patterns work on multi-line bodies
+and on bodies already collapsed to one line by the text normalizer. Quote
+markers are searched for in a window at the start of the body that only grows
+when none is found, so the cost follows the length of the new content, not of
+the history below it.
+"""
+
+import re
+from typing import Optional
+
+from ..config.config_reader import config
+
+# body_mode values: the whole body, the new content of each message, or the
+# start of the new content
+BODY_MODES = ('full', 'new', 'preview')
+
+# A '>'-quoted line: '>' then a blank, another '>' or the line end, or two
+# '>' lines in a row, so text like ">= 5" on one line is not taken for a quote
+_QUOTED_LINE = r'[ \t]*>(?:[ \t>]|\r?$|[^\n]{0,200}\n[ \t]*>)'
+
+# Starts of quoted history. Each pattern begins with literal text, which the
+# regex engine finds with a fast substring scan; the earliest match wins, and
+# each match bounds the scans of the patterns after it (costliest last).
+_QUOTE_MARKERS = (
+    re.compile(r'__________'),                             # Outlook separator line
+    re.compile(r'\n' + _QUOTED_LINE, re.MULTILINE),        # '>'-quoted line
+    re.compile(r'On .{1,120}?\bwrote:(?=\s|$)', re.DOTALL),
+    re.compile(r'--+ ?(?:Original|Forwarded) [Mm]essage ?--'),
+    re.compile(r'From: .{1,200}?\b(?:Sent|Date): .{1,200}?\b(?:To|Subject): ', re.DOTALL),
+)
+# A body that starts with a '>'-quoted line
+_QUOTED_FIRST_LINE = re.compile(_QUOTED_LINE, re.MULTILINE)
+
+# Longest quote marker, so a marker starting before the best match so far is still found
+_QUOTE_MARKER_MAX_CHARS = 480
+
+# Characters searched for a quote marker before the search is widened
+QUOTE_SCAN_CHARS = 4096
+
+# Closing phrases and signature markers, matched in lower case. Every branch
+# begins with a literal character, so the engine skips to candidate positions
+_CLOSING = re.compile(
+    r'(?:best regards|kind regards|warm regards|regards|best wishes|many thanks|thanks'
+    r'|thank you|cheers|sincerely|br|mvh|med venlig hilsen)(?:[,!]|[ \t]*\r?\n)')
+_SIGNATURE_MARKER = re.compile(r'sent from my \w|\n-- ?\r?$', re.MULTILINE)  # RFC 3676 "-- " line
+
+# Longest text after a closing phrase that is taken for a signature (name, title, phone)
+SIGNATURE_MAX_CHARS = 160
+
+# Characters after which a closing phrase starts a new sentence or line
+_SENTENCE_ENDS = frozenset('.!?:;)\n')
+
+# A sentence of at least four words; after a closing phrase it is content, not a signature
+_SENTENCE = re.compile(r'(?:[^\W\d_]+[ \t]+){3,}[^\W\d_]+[.!?](?:\s|$)')
+
+
+def _quote_start(body: str) -> int:
+    """Offset of the first quoted block, or len(body).
+
+    New content is short compared to the history below it, so the markers are
+    looked for in a small window first, which grows until one is found.
+    """
+    if _QUOTED_FIRST_LINE.match(body):
+        return 0
+    window = QUOTE_SCAN_CHARS
+    while True:
+        end = min(window, len(body))
+        found = False
+        for marker in _QUOTE_MARKERS:
+            match = marker.search(body, 0, min(len(body), end + _QUOTE_MARKER_MAX_CHARS))
+            if match and match.start() < end:
+                end = match.start()
+                found = True
+        if found or window >= len(body):
+            return end
+        window *= 8
+
+
+def _signature_start(new: str) -> Optional[int]:
+    """Offset of a trailing signature in the new content, or None.
+
+    The last closing phrase near the end that starts a sentence or line,
+    and is followed by no sentence, starts the signature ("thanks, ..."
+    within a sentence, or "Thanks," above more text, does not).
+    """
+    offset = max(0, len(new) - SIGNATURE_MAX_CHARS - 40)
+    tail = new[offset:]
+    # lower() keeps offsets of ASCII text only
+    tail = tail.lower() if tail.isascii() else ''.join(c.lower() if c.isascii() else '\0' for c in tail)
+    start = None
+    for match in _CLOSING.finditer(tail):
+        position = offset + match.start()
+        end = offset + match.end()
+        if len(new) - end > SIGNATURE_MAX_CHARS or (position > 0 and new[position - 1].isalnum()):
+            continue
+        before = position - 1
+        while before >= 0 and new[before] in ' \t':
+            before -= 1
+        if before >= 0 and new[before] in _SENTENCE_ENDS and not _SENTENCE.search(new, end):
+            start = position
+    marker = _SIGNATURE_MARKER.search(tail)
+    if marker:
+        position = offset + marker.start() + (tail[marker.start()] == '\n')
+        if position and (start is None or position < start):
+            start = position
+    return start
+
+
+def new_content(body: str) -> str:
+    """Body without quoted history and signature."""
+    if not body:
+        return ''
+    new = body[:_quote_start(body)].rstrip()
+    start = _signature_start(new)
+    if start is not None:
+        new = new[:start].rstrip()
+    # Nothing but quoted text (e.g. a bare forward) is kept as it is
+    return new or body
+
+
+def reduce_body(body: Optional[str], mode: str, preview_chars: Optional[int] = None) -> str:
+    """Text of a body in the given body_mode."""
+    if not body:
+        return ''
+    if mode == 'full':
+        return body
+    text = new_content(body)
+    if mode == 'preview':
+        if preview_chars is None:
+            preview_chars = config.settings.body_preview_chars
+        if preview_chars > 0:
+            text = text[:preview_chars]
+    return text
+
+
+def resolve_body_mode(mode: Optional[str]) -> str:
+    """The given body_mode, or the ``default_body_mode`` setting; ValueError for unknown modes."""
+    if mode is None:
+        mode = config.get('default_body_mode', 'preview') or 'preview'
+    mode = str(mode).strip().lower()
+    if mode not in BODY_MODES:
+        raise ValueError(f"body_mode must be one of {', '.join(BODY_MODES)}")
+    return mode
@@ -0,0 +1,216 @@
+"""Persistent apartment-threaded workers for Outlook object model access.
+
+COM objects of an STA thread must only be used on that thread, and creating
+them (COM init, Application dispatch, recipient resolution, shared folder
+lookup) is expensive. Each worker here owns one long-lived set of those
+objects; jobs are marshalled to the workers through a queue and run with the
+worker's context as their first argument.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config.config_reader import config
+from .mail_backend import MailBackend
+from .metrics import RECIPIENT_RESOLVE_SECONDS
+from .search_events import SearchCompletionTracker
+
+logger = logging.getLogger(__name__)
+
+OL_FOLDER_INBOX = 6
+
+
+class ComWorkerContext:
+    """Outlook objects owned by one worker thread."""
+
+    def __init__(self, backend: MailBackend):
+        self.backend = backend
+        self.search_tracker: Optional[SearchCompletionTracker] = None
+        self.application = None
+        if config.get_bool('use_search_events', True):
+            tracker = SearchCompletionTracker()
+            try:
+                self.application = backend.dispatch_application(events=tracker.sink_class())
+                self.search_tracker = tracker
+            except Exception as e:
+                logger.warning(f"AdvancedSearch events unavailable, polling instead: {e}")
+        if self.application is None:
+            self.application = backend.dispatch_application()
+        self.namespace = self.application.Session  # same as GetNamespace("MAPI")
+        self._personal_inbox = None
+        self._shared_recipients: Dict[str, Any] = {}
+        self._shared_inboxes: Dict[str, Any] = {}
+
+    def personal_inbox(self):
+        """Inbox of the default store, resolved once per worker."""
+        if self._personal_inbox is None:
+            self._personal_inbox = self.namespace.GetDefaultFolder(OL_FOLDER_INBOX)
+        return self._personal_inbox
+
+    def shared_recipient(self, address: str):
+        """Resolved Recipient of a shared mailbox, cached per worker and address."""
+        key = address.lower()
+        recipient = self._shared_recipients.get(key)
+        if recipient is None:
+            with RECIPIENT_RESOLVE_SECONDS.time():
+                recipient = self.namespace.CreateRecipient(address)
+                recipient.Resolve()
+            if not recipient.Resolved:
+                raise LookupError(f"Could not resolve shared recipient: {address}")
+            self._shared_recipients[key] = recipient
+        return recipient
+
+    def shared_inbox(self, address: str):
+        """Inbox of a shared mailbox, resolved once per worker and address."""
+        key = address.lower()
+        inbox = self._shared_inboxes.get(key)
+        if inbox is None:
+            inbox = self.namespace.GetSharedDefaultFolder(self.shared_recipient(address),
+                                                          OL_FOLDER_INBOX)
+            self._shared_inboxes[key] = inbox
+        return inbox
+
+    def forget_shared_inbox(self, address: str) -> None:
+        """Drop a cached shared inbox and its recipient, e.g. after an access error."""
+        self._shared_inboxes.pop(address.lower(), None)
+        self._shared_recipients.pop(address.lower(), None)
+
+    def is_alive(self) -> bool:
+        """Cheap liveness probe of the underlying Outlook session."""
+        try:
+            self.namespace.CurrentProfileName
+            return True
+        except Exception as e:
+            logger.warning(f"COM worker health check failed: {e}")
+            return False
+
+
+class ComWorker(threading.Thread):
+    """Worker thread owning a ComWorkerContext for its whole lifetime."""
+
+    def __init__(self, pool: 'ComWorkerPool', index: int):
+        super().__init__(name=f"outlook-com-{index}", daemon=True)
+        self.pool = pool
+        self.context: Optional[ComWorkerContext] = None
+        self.jobs_completed = 0
+        self.restarts = 0
+        self._last_health_check = 0.0
+        self._session_generation = pool.session_generation
+
+    def run(self) -> None:
+        backend = self.pool.backend
+        backend.initialize_thread()
+        try:
+            while True:
+                job = self.pool._jobs.get()
+                if job is None:
+                    break
+                future, func, args, kwargs = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    context = self._healthy_context()
+                    result = func(context, *args, **kwargs)
+                except Exception as e:
+                    # Re-check the session before the next job
+                    self._last_health_check = 0.0
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+                finally:
+                    self.jobs_completed += 1
+        finally:
+            self.context = None
+            backend.uninitialize_thread()
+
+    def _healthy_context(self) -> ComWorkerContext:
+        """Return the worker context, (re)creating it if the probe fails."""
+        now = time.monotonic()
+        if self.context is not None and self._session_generation != self.pool.session_generation:
+            logger.info(f"{self.name}: replacing Outlook session after reconnect")
+            self.context = None
+            self.restarts += 1
+        elif self.context is not None and now - self._last_health_check >= self.pool.health_check_interval:
+            self._last_health_check = now
+            if not self.context.is_alive():
+                logger.info(f"{self.name}: recreating Outlook session")
+                self.context = None
+                self.restarts += 1
+
+        if self.context is None:
+            self._session_generation = self.pool.session_generation
+            self.context = ComWorkerContext(self.pool.backend)
+            self._last_health_check = time.monotonic()
+        return self.context
+
+
+class ComWorkerPool:
+    """Fixed-size pool of ComWorker threads fed from a shared job queue."""
+
+    def __init__(self, backend: MailBackend, size: Optional[int] = None,
+                 health_check_interval: Optional[float] = None):
+        self.backend = backend
+        self.size = max(1, size if size is not None else config.get_int('com_worker_pool_size', 2))
+        if health_check_interval is None:
+            health_check_interval = config.get_int('com_worker_health_check_seconds', 30)
+        self.health_check_interval = health_check_interval
+        self._jobs: 'queue.Queue' = queue.Queue()
+        self._workers: List[ComWorker] = []
+        self._lock = threading.Lock()
+        self._worker_ids = itertools.count()
+        self._shutdown = False
+        self.session_generation = 0  # Bumped to make every worker open a new session
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("COM worker pool has been shut down")
+            self._workers = [w for w in self._workers if w.is_alive()]
+            while len(self._workers) < self.size:
+                worker = ComWorker(self, next(self._worker_ids))
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """Run ``func(context, *args, **kwargs)`` on a worker thread."""
+        self._ensure_started()
+        future: Future = Future()
+        self._jobs.put((future, func, args, kwargs))
+        return future
+
+    def reset_sessions(self) -> None:
+        """Make every worker replace its Outlook session before its next job."""
+        with self._lock:
+            self.session_generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-worker job and restart counters."""
+        return {
+            "size": self.size,
+            "queued_jobs": self._jobs.qsize(),
+            "workers": [
+                {
+                    "name": w.name,
+                    "alive": w.is_alive(),
+                    "jobs_completed": w.jobs_completed,
+                    "restarts": w.restarts,
+                }
+                for w in self._workers
+            ],
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop all workers after the queued jobs have run."""
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._jobs.put(None)
+        if wait:
+            for worker in workers:
+                worker.join()
@@ -0,0 +1,198 @@
+"""Structured search filters compiled into DASL for AdvancedSearch and Restrict.
+
+Every condition in the query is evaluated by Outlook's search indexer, so
+narrowing a search by date, sender or flags here means far fewer items are
+matched, extracted and formatted than when the same filtering is done on the
+results afterwards.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+SUBJECT = 'urn:schemas:httpmail:subject'
+TEXT_DESCRIPTION = 'urn:schemas:httpmail:textdescription'
+DATE_RECEIVED = 'urn:schemas:httpmail:datereceived'
+FROM_NAME = 'urn:schemas:httpmail:fromname'
+FROM_EMAIL = 'urn:schemas:httpmail:fromemail'
+IMPORTANCE = 'urn:schemas:httpmail:importance'
+READ = 'urn:schemas:httpmail:read'
+HAS_ATTACHMENT = 'urn:schemas:httpmail:hasattachment'
+
+IMPORTANCE_LEVELS = {'low': 0, 'normal': 1, 'high': 2}
+
+# Relative times such as "3d" (three days ago), "12h" or "2w"
+_RELATIVE_TIME = re.compile(r'^\s*(\d+)\s*([hdw])\s*$', re.IGNORECASE)
+_RELATIVE_UNITS = {'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+
+def quote(value: str) -> str:
+    """DASL string literal: single-quoted with apostrophes doubled."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _like_literal(value: str) -> str:
+    # % and _ are LIKE wildcards; search for them literally as single-character matches
+    return quote('%' + str(value).replace('%', '_') + '%')
+
+
+def dasl_date(value: datetime) -> str:
+    """DASL date literal; DASL compares date-time properties in UTC."""
+    return quote(value.astimezone(timezone.utc).strftime('%m/%d/%Y %I:%M %p'))
+
+
+def parse_time(value: Any, name: str) -> datetime:
+    """Local naive datetime from an ISO 8601 string or a relative "3d"/"12h"/"2w"."""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value or '').strip()
+        relative = _RELATIVE_TIME.match(text)
+        if relative:
+            amount, unit = relative.groups()
+            return datetime.now() - timedelta(**{_RELATIVE_UNITS[unit.lower()]: int(amount)})
+        try:
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"{name} must be an ISO 8601 date/time or a relative time like '3d'")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item for item in [str(value).strip()] if item]
+
+
+class SearchFilters:
+    """Optional narrowing of a phrase search.
+
+    ``senders`` match sender names or addresses as substrings, ``importance``
+    holds Outlook levels (0 low, 1 normal, 2 high) and ``folders`` are
+    folder patterns as used by folder_include_patterns.
+    """
+
+    __slots__ = ('received_after', 'received_before', 'senders', 'importance',
+                 'unread', 'has_attachments', 'folders')
+
+    def __init__(self, received_after: Optional[datetime] = None,
+                 received_before: Optional[datetime] = None,
+                 senders: Sequence[str] = (), importance: Sequence[int] = (),
+                 unread: Optional[bool] = None, has_attachments: Optional[bool] = None,
+                 folders: Sequence[str] = ()):
+        self.received_after = received_after
+        self.received_before = received_before
+        self.senders = tuple(senders)
+        self.importance = tuple(sorted(set(importance)))
+        self.unread = unread
+        self.has_attachments = has_attachments
+        self.folders = tuple(folders)
+
+    @classmethod
+    def from_arguments(cls, arguments: Dict[str, Any]) -> Optional['SearchFilters']:
+        """Filters from tool arguments, or None when none are given.
+
+        Raises ValueError for malformed values.
+        """
+        received_after = arguments.get('received_after')
+        received_before = arguments.get('received_before')
+        importance = []
+        for level in _as_list(arguments.get('importance')):
+            if level.lower() in IMPORTANCE_LEVELS:
+                importance.append(IMPORTANCE_LEVELS[level.lower()])
+            else:
+                raise ValueError(f"importance must be one of: {', '.join(IMPORTANCE_LEVELS)}")
+        for flag in ('unread', 'has_attachments'):
+            if arguments.get(flag) is not None and not isinstance(arguments[flag], bool):
+                raise ValueError(f"{flag} must be true or false")
+
+        filters = cls(
+            received_after=parse_time(received_after, 'received_after') if received_after else None,
+            received_before=parse_time(received_before, 'received_before') if received_before else None,
+            senders=_as_list(arguments.get('from')),
+            importance=importance,
+            unread=arguments.get('unread'),
+            has_attachments=arguments.get('has_attachments'),
+            folders=_as_list(arguments.get('folders')),
+        )
+        if (filters.received_after and filters.received_before
+                and filters.received_after >= filters.received_before):
+            raise ValueError("received_after must be earlier than received_before")
+        return filters if filters else None
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, name) not in (None, ()) for name in self.__slots__)
+
+    def conditions(self) -> List[str]:
+        """DASL conditions (without the @SQL= prefix) for the message filters."""
+        conditions = []
+        if self.received_after:
+            conditions.append(f'"{DATE_RECEIVED}" >= {dasl_date(self.received_after)}')
+        if self.received_before:
+            conditions.append(f'"{DATE_RECEIVED}" < {dasl_date(self.received_before)}')
+        if self.senders:
+            matches = [f'"{field}" LIKE {_like_literal(sender)}'
+                       for sender in self.senders for field in (FROM_NAME, FROM_EMAIL)]
+            conditions.append('(' + ' OR '.join(matches) + ')')
+        if self.importance:
+            conditions.append('(' + ' OR '.join(f'"{IMPORTANCE}" = {level}'
+                                                for level in self.importance) + ')')
+        if self.unread is not None:
+            conditions.append(f'"{READ}" = {0 if self.unread else 1}')
+        if self.has_attachments is not None:
+            conditions.append(f'"{HAS_ATTACHMENT}" = {1 if self.has_attachments else 0}')
+        return conditions
+
+    def cache_key(self) -> str:
+        return repr(tuple(getattr(self, name) for name in self.__slots__))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The filters as given to the search, for echoing in responses."""
+        levels = {level: name for name, level in IMPORTANCE_LEVELS.items()}
+        result = {
+            "received_after": self.received_after,
+            "received_before": self.received_before,
+            "from": list(self.senders),
+            "importance": [levels[level] for level in self.importance],
+            "unread": self.unread,
+            "has_attachments": self.has_attachments,
+            "folders": list(self.folders),
+        }
+        return {key: value for key, value in result.items() if value not in (None, [])}
+
+
+def phrases_of(search_text: Union[str, Sequence[str]]) -> List[str]:
+    """Non-empty phrases of a search: one phrase, or several OR'ed together."""
+    if isinstance(search_text, str):
+        search_text = [search_text]
+    return [phrase for phrase in (str(text or '').strip() for text in search_text) if phrase]
+
+
+def phrase_filter(search_text: Union[str, Sequence[str]],
+                  filters: Optional[SearchFilters] = None) -> str:
+    """AdvancedSearch filter: any of the phrases in subject or body, AND the filters."""
+    conditions = []
+    matches = []
+    for phrase in map(quote, phrases_of(search_text)):
+        matches.append(f'"{SUBJECT}" ci_phrasematch {phrase} '
+                       f'OR "{TEXT_DESCRIPTION}" ci_phrasematch {phrase}')
+    if matches:
+        conditions.append('(' + ' OR '.join(matches) + ')')
+    if filters:
+        conditions.extend(filters.conditions())
+    return "@SQL=" + " AND ".join(conditions)
+
+
+def subject_filter(search_text: Union[str, Sequence[str]],
+                   filters: Optional[SearchFilters] = None) -> str:
+    """Restrict filter used when AdvancedSearch is unavailable: subject LIKE, AND the filters."""
+    phrases = phrases_of(search_text) or ['']
+    conditions = ['(' + ' OR '.join(f'"{SUBJECT}" LIKE {quote("%" + phrase + "%")}'
+                                    for phrase in phrases) + ')']
+    if filters:
+        conditions.extend(filters.conditions())
+    return "@SQL=" + " AND ".join(conditions)
@@ -1,21 +1,43 @@
 """Simple email formatting for AI-readable responses."""
 
-from typing import List, Dict, Any
+import heapq
+import re
+from typing import List, Dict, Any, Union
 from datetime import datetime
 from collections import defaultdict
 
 from ..config.config_reader import config
+from .alert_analyzer import AlertAggregator
+from .body_reducer import reduce_body, resolve_body_mode
+from .json_encoder import estimate_size
+
+# Marker appended to bodies shortened to fit a response budget
+TRUNCATION_MARKER = " [truncated]"
+
+# Room kept in a budgeted response for the budget report and the
+# body_chars_removed statistic, and per conversation for its emails list
+# and emails_omitted count
+BUDGET_REPORT_BYTES = 340
+CONVERSATION_FRAME_BYTES = 40
+
+# Any run of reply/forward prefixes, e.g. "RE: Fwd: AW:" or "Re[2]:"
+_REPLY_PREFIXES = re.compile(r'^(?:\s*(?:re|fwd?|aw|sv|wg|reply|forward)\s*(?:\[\d+\])?\s*:)+\s*',
+                             re.IGNORECASE)
 
 
 def format_mailbox_status(access_result: Dict[str, Any]) -> Dict[str, Any]:
     """Format mailbox access status for AI consumption."""
     
+    connection = {
+        "outlook_connected": access_result.get("outlook_connected", False),
+        "timestamp": datetime.now().isoformat()
+    }
+    if "supervisor" in access_result:
+        connection["supervisor"] = access_result["supervisor"]
+    
     return {
         "status": "success",
-        "connection": {
-            "outlook_connected": access_result.get("outlook_connected", False),
-            "timestamp": datetime.now().isoformat()
-        },
+        "connection": connection,
         "personal_mailbox": {
             "accessible": access_result.get("personal_accessible", False),
             "name": access_result.get("personal_name", "Personal Mailbox"),
@@ -25,9 +47,10 @@ def format_mailbox_status(access_result: Dict[str, Any]) -> Dict[str, Any]:
             "configured": access_result.get("shared_configured", False),
             "accessible": access_result.get("shared_accessible", False),
             "name": access_result.get("shared_name", "Shared Mailbox"),
-            "email": config.get("shared_mailbox_email", "Not configured"),
+            "email": ", ".join(config.settings.shared_mailboxes) or "Not configured",
             "retention_months": access_result.get("retention_shared_months", 12)
         },
+        "shared_mailboxes": access_result.get("shared_mailboxes", []),
         "errors": access_result.get("errors", []),
         "notes": {
             "security_dialog": "You may need to grant permission when Outlook security dialog appears",
@@ -36,8 +59,63 @@ def format_mailbox_status(access_result: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def format_email_chain(emails: List[Dict[str, Any]], search_subject: str) -> Dict[str, Any]:
-    """Format email chain results for AI analysis."""
+class _Aggregate:
+    """Running date range and participant counts over a set of emails."""
+
+    __slots__ = ('first', 'last', 'participant_counts', 'participant_emails')
+
+    def __init__(self):
+        self.first = None
+        self.last = None
+        self.participant_counts: Dict[str, int] = {}
+        self.participant_emails: Dict[str, str] = {}
+
+    def add(self, received_time, sender: str, sender_email: str, recipients: List[str]) -> None:
+        if received_time:
+            if self.first is None or received_time < self.first:
+                self.first = received_time
+            if self.last is None or received_time > self.last:
+                self.last = received_time
+
+        counts = self.participant_counts
+        counts[sender] = counts.get(sender, 0) + 1
+        if sender_email:
+            self.participant_emails[sender] = sender_email
+        for recipient in recipients:
+            counts[recipient] = counts.get(recipient, 0) + 1
+
+    def date_range(self) -> Dict[str, str]:
+        if self.first is None:
+            return {"first": None, "last": None}
+        return {"first": self.first.isoformat(), "last": self.last.isoformat()}
+
+    def participants(self) -> List[Dict[str, Any]]:
+        top = heapq.nlargest(10, self.participant_counts.items(), key=lambda x: x[1])
+        return [
+            {"name": name, "email": self.participant_emails.get(name, ''), "participation_count": count}
+            for name, count in top
+        ]
+
+
+def format_email_chain(emails: List[Dict[str, Any]], search_subject: str,
+                       include_chronological: bool = None, body_mode: str = None,
+                       max_response_bytes: int = None) -> Dict[str, Any]:
+    """Format email chain results for AI analysis.
+
+    All statistics are gathered in one pass and every email is formatted once;
+    the conversation view and the chronological list share the formatted
+    email dicts. ``include_chronological`` (default: the
+    ``include_chronological_list`` setting) controls the chronological list,
+    ``body_mode`` (default: the ``default_body_mode`` setting) how much of each
+    body is returned.
+
+    ``max_response_bytes`` (default: the ``max_response_bytes`` setting, 0 =
+    unlimited) caps the encoded size of the response. The summary is always
+    returned; then the headers of the newest emails are admitted while they
+    fit, and the remaining room is shared among their bodies, shortening the
+    longest bodies first. Emails that do not fit are never formatted, and the
+    response reports what was left out under ``budget``.
+    """
     
     if not emails:
         return {
@@ -46,110 +124,396 @@ def format_email_chain(emails: List[Dict[str, Any]], search_subject: str) -> Dic
             "message": f"No emails found for subject: '{search_subject}'"
         }
     
-    # Group emails by conversation (based on subject similarity)
-    conversations = group_by_conversation(emails)
+    if include_chronological is None:
+        include_chronological = config.settings.include_chronological_list
+    if max_response_bytes is None:
+        max_response_bytes = config.get_int('max_response_bytes', 0)
+    include_timestamps = config.settings.include_timestamps
+    body_mode = resolve_body_mode(body_mode)
+    body_key = "body_preview" if body_mode == 'preview' else "body"
+    
+    totals = _Aggregate()
+    distribution = {"personal": 0, "shared": 0, "unknown": 0}
+    shared_distribution: Dict[str, int] = defaultdict(int)
+    copies_collapsed = 0
+    # Conversation key (ConversationID, subject as fallback) -> (aggregate, [[email, formatted]])
+    conversations: Dict[str, tuple] = {}
+    entries = []
+    
+    for email in emails:
+        entry = [email, None]  # formatted below, newest first
+        entries.append(entry)
+        participant_values = (email.get('received_time'), email.get('sender_name', 'Unknown'),
+                              email.get('sender_email', ''), email.get('recipients', []))
+        totals.add(*participant_values)
+        
+        mailbox_type = email.get('mailbox_type', 'unknown')
+        if mailbox_type in distribution:
+            distribution[mailbox_type] += 1
+        else:
+            distribution['unknown'] += 1
+        mailbox_address = email.get('mailbox_address')
+        if mailbox_address:
+            shared_distribution[mailbox_address] += 1
+        if email.get('locations'):
+            copies_collapsed += len(email['locations']) - 1
+        
+        key = conversation_key(email)
+        conversation = conversations.get(key)
+        if conversation is None:
+            conversation = conversations[key] = (_Aggregate(), [])
+        conversation[0].add(*participant_values)
+        conversation[1].append(entry)
     
-    # Calculate statistics
     stats = {
         "total_emails": len(emails),
         "conversations": len(conversations),
-        "date_range": get_date_range(emails),
-        "mailbox_distribution": get_mailbox_distribution(emails),
-        "participants": get_participants(emails)
+        "body_mode": body_mode,
+        "date_range": totals.date_range(),
+        "mailbox_distribution": distribution,
+        "participants": totals.participants()
     }
+    if shared_distribution:
+        stats["shared_mailbox_distribution"] = dict(shared_distribution)
+    if copies_collapsed:
+        # Copies of returned messages found in other mailboxes or folders
+        stats["copies_collapsed"] = copies_collapsed
+    
+    entries.sort(key=lambda entry: entry[0].get('received_time') or datetime.min, reverse=True)
+    if max_response_bytes > 0:
+        budget = _fit_to_budget(entries, stats, search_subject, conversations, max_response_bytes,
+                                include_chronological, include_timestamps, body_mode, body_key)
+    else:
+        budget = None
+        for entry in entries:
+            entry[1] = format_single_email(entry[0], include_timestamps, body_mode)
+    
+    body_chars_removed = sum(len(email['body']) - len(formatted[body_key])
+                             for email, formatted in entries if formatted and email.get('body'))
+    if body_chars_removed:
+        # Quoted history, signatures and text beyond the preview or budget left out of the bodies
+        stats["body_chars_removed"] = body_chars_removed
     
-    # Format conversations chronologically
     formatted_conversations = []
-    for conv_id, conv_emails in conversations.items():
-        # Sort emails in conversation by time
-        conv_emails.sort(key=lambda x: x.get('received_time', datetime.min))
-        
-        formatted_conv = {
-            "conversation_id": conv_id,
-            "email_count": len(conv_emails),
-            "date_range": get_date_range(conv_emails),
-            "participants": get_participants(conv_emails),
-            "emails": [format_single_email(email) for email in conv_emails]
-        }
-        formatted_conversations.append(formatted_conv)
+    for conv_id, (aggregate, conv_entries) in conversations.items():
+        included = [entry for entry in conv_entries if entry[1] is not None]
+        if not included:
+            continue
+        # Sort emails in conversation by thread position
+        included.sort(key=lambda entry: thread_order_key(entry[0]))
+        conversation = _conversation_header(conv_id, aggregate, conv_entries)
+        conversation["emails"] = [formatted for _, formatted in included]
+        if len(included) < len(conv_entries):
+            conversation["emails_omitted"] = len(conv_entries) - len(included)
+        formatted_conversations.append((aggregate.last or datetime.min, conversation))
     
     # Sort conversations by most recent email
-    formatted_conversations.sort(
-        key=lambda x: max([parse_iso_time(e["received_time"]) for e in x["emails"] if e["received_time"]]),
-        reverse=True
-    )
+    formatted_conversations.sort(key=lambda item: item[0], reverse=True)
     
-    return {
+    result = {
         "status": "success",
         "search_subject": search_subject,
         "summary": stats,
-        "conversations": formatted_conversations,
-        "all_emails_chronological": [format_single_email(email) for email in sorted(emails, key=lambda x: x.get('received_time', datetime.min), reverse=True)]
+        "conversations": [conversation for _, conversation in formatted_conversations]
+    }
+    if include_chronological:
+        result["all_emails_chronological"] = [formatted for _, formatted in entries if formatted]
+    if budget is not None:
+        result["budget"] = budget
+    return result
+
+
+def _conversation_header(conv_id: str, aggregate: '_Aggregate', conv_entries: list) -> Dict[str, Any]:
+    return {
+        "conversation_id": conv_id,
+        "topic": clean_subject(conv_entries[0][0].get('subject', '')),
+        "email_count": len(conv_entries),
+        "date_range": aggregate.date_range(),
+        "participants": aggregate.participants(),
+    }
+
+
+def _fit_to_budget(entries: list, stats: Dict[str, Any], search_subject: str,
+                   conversations: Dict[str, tuple], max_bytes: int, include_chronological: bool,
+                   include_timestamps: bool, body_mode: str, body_key: str) -> Dict[str, Any]:
+    """Format the newest emails that fit in ``max_bytes``; returns the budget report.
+    
+    ``entries`` are newest first; the formatted dict of each admitted entry is
+    filled in, the others stay None.
+    """
+    # Envelope and summary
+    used = estimate_size({"status": "success", "search_subject": search_subject, "summary": stats,
+                          "conversations": [], "all_emails_chronological": []})
+    used += BUDGET_REPORT_BYTES
+    # An email is written once per view
+    views = 2 if include_chronological else 1
+    
+    # Headers of the newest emails, and the frame of their conversations
+    admitted = []
+    framed = set()
+    for entry in entries:
+        email = entry[0]
+        formatted = format_single_email(email, include_timestamps, body_mode)
+        text = formatted[body_key]
+        formatted[body_key] = ''
+        size = (estimate_size(formatted) + 1) * views
+        key = conversation_key(email)
+        if key not in framed:
+            aggregate, conv_entries = conversations[key]
+            size += estimate_size(_conversation_header(key, aggregate, conv_entries)) + CONVERSATION_FRAME_BYTES
+        if used + size > max_bytes:
+            break
+        used += size
+        framed.add(key)
+        entry[1] = formatted
+        admitted.append((formatted, text, (estimate_size(text) - 2) * views))
+    
+    # Bodies: the largest share every body can have; shorter bodies are kept whole
+    cap = _water_level([size for _, text, size in admitted if text], max_bytes - used)
+    truncated = omitted = 0
+    for formatted, text, size in admitted:
+        if not text:
+            continue
+        if size > cap:
+            text = _truncate_to_size(text, int(cap / views))
+            if text:
+                truncated += 1
+            else:
+                omitted += 1
+            size = (estimate_size(text) - 2) * views
+        formatted[body_key] = text
+        used += size
+    
+    report = {
+        "max_response_bytes": max_bytes,
+        "estimated_bytes": used,
+        "emails_omitted": len(entries) - len(admitted),
+        "bodies_truncated": truncated,
+        "bodies_omitted": omitted,
     }
+    if report["emails_omitted"]:
+        report["message"] = ("The oldest emails did not fit in the response; narrow the search, "
+                             "use page_size or raise max_response_bytes")
+    return report
+
+
+def _truncate_to_size(text: str, max_bytes: int) -> str:
+    """Longest prefix of ``text`` plus the truncation marker whose encoded size is within ``max_bytes``."""
+    chars = min(len(text), max_bytes) - len(TRUNCATION_MARKER)
+    while chars > 0:
+        candidate = text[:chars] + TRUNCATION_MARKER
+        size = estimate_size(candidate) - 2
+        if size <= max_bytes:
+            return candidate
+        # Escapes and multi-byte characters take more than a byte each
+        chars = min(chars - 1, int(chars * max_bytes / size))
+    return ''
+
 
+def _water_level(sizes: List[int], room: int) -> float:
+    """Largest cap c with sum(min(size, c)) <= room (infinite when everything fits)."""
+    remaining = len(sizes)
+    for size in sorted(sizes):
+        if size * remaining > room:
+            return max(0, room) / remaining
+        room -= size
+        remaining -= 1
+    return float('inf')
 
-def format_alert_analysis(alerts: List[Dict[str, Any]], search_pattern: str) -> Dict[str, Any]:
-    """Format alert analysis results for AI consumption."""
+
+def format_search_many(results: Dict[str, List[Dict[str, Any]]],
+                       include_chronological: bool = None, body_mode: str = None,
+                       max_response_bytes: int = None) -> Dict[str, Any]:
+    """Format a multi-query search as one email chain per query, in query order.
+    
+    Under a ``max_response_bytes`` budget each query gets an equal share of
+    what the queries before it left over.
+    """
+    matches: Dict[str, int] = defaultdict(int)
+    for emails in results.values():
+        for email in emails:
+            matches[email.get('entry_id', '')] += 1
+    
+    result = {
+        "status": "success" if matches else "no_emails_found",
+        "summary": {
+            "queries": len(results),
+            "queries_with_results": sum(1 for emails in results.values() if emails),
+            "unique_emails": len(matches),
+            "emails_matching_several_queries": sum(1 for count in matches.values() if count > 1)
+        },
+        "results": []
+    }
+    if max_response_bytes is None:
+        max_response_bytes = config.get_int('max_response_bytes', 0)
+    room = max_response_bytes - estimate_size(result)
+    for n, (query, emails) in enumerate(results.items()):
+        share = max(1, room // (len(results) - n)) if max_response_bytes > 0 else 0
+        chain = format_email_chain(emails, query, include_chronological, body_mode, share)
+        if share:
+            room -= chain["budget"]["estimated_bytes"] if "budget" in chain else estimate_size(chain)
+        result["results"].append(chain)
+    return result
+
+
+def format_pagination(cursor: str, offset: int, page_size: int, total_results: int,
+                      next_cursor: str, expires_in_seconds: int) -> Dict[str, Any]:
+    """Format the paging block attached to one page of an email chain."""
+    return {
+        "cursor": cursor,
+        "offset": offset,
+        "page_size": page_size,
+        "returned": max(0, min(page_size, total_results - offset)),
+        "total_results": total_results,
+        "has_more": bool(next_cursor),
+        "next_cursor": next_cursor,
+        "expires_in_seconds": expires_in_seconds
+    }
+
+
+def format_email_bodies(emails: List[Dict[str, Any]], body_mode: str = 'full') -> Dict[str, Any]:
+    """Format bodies fetched by EntryID for AI consumption, whole unless ``body_mode`` says otherwise."""
+    bodies = []
+    errors = []
+    for email in emails:
+        if email.get('error'):
+            errors.append({"entry_id": email['entry_id'], "error": email['error']})
+            continue
+        last_modified = email.get('last_modified')
+        bodies.append({
+            "entry_id": email['entry_id'],
+            "body": reduce_body(email.get('body'), body_mode),
+            "attachments": email.get('attachments_count') or 0,
+            "last_modified": last_modified.isoformat() if last_modified else None
+        })
     
-    if not alerts:
+    return {
+        "status": "success" if bodies or not errors else "error",
+        "requested": len(emails),
+        "bodies": bodies,
+        "errors": errors
+    }
+
+
+def format_attachment_list(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Format attachment metadata of items fetched by EntryID."""
+    emails = []
+    errors = []
+    for result in results:
+        if result.get('error'):
+            errors.append({"entry_id": result['entry_id'], "error": result['error']})
+            continue
+        emails.append({
+            "entry_id": result['entry_id'],
+            "subject": result.get('subject'),
+            "attachments": [
+                {
+                    "index": attachment['index'],
+                    "name": attachment['name'],
+                    "size": attachment['size'],
+                    "mime_type": attachment['mime_type'],
+                    "type": attachment['type'],
+                    "cached": attachment.get('sha256') is not None,
+                }
+                for attachment in result['attachments']
+            ]
+        })
+    
+    return {
+        "status": "success" if emails or not errors else "error",
+        "requested": len(results),
+        "total_attachments": sum(len(email['attachments']) for email in emails),
+        "emails": emails,
+        "errors": errors
+    }
+
+
+def format_attachment_chunk(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """Format one chunk of attachment content for AI consumption."""
+    if chunk.get('error'):
+        return {
+            "status": "error",
+            "entry_id": chunk['entry_id'],
+            "index": chunk['index'],
+            "message": chunk['error']
+        }
+    
+    return {
+        "status": "success",
+        "entry_id": chunk['entry_id'],
+        "index": chunk['index'],
+        "name": chunk['name'],
+        "mime_type": chunk['mime_type'],
+        "size": chunk['size'],
+        "sha256": chunk['sha256'],
+        "offset": chunk['offset'],
+        "length": chunk['length'],
+        "next_offset": chunk['next_offset'],
+        "complete": chunk['next_offset'] is None,
+        "encoding": chunk['encoding'],
+        "content": chunk['content']
+    }
+
+
+def format_alert_analysis(analysis: Union[AlertAggregator, List[Dict[str, Any]]],
+                          search_pattern: str) -> Dict[str, Any]:
+    """Format alert analysis results for AI consumption.
+    
+    ``analysis`` is an AlertAggregator fed by a header scan, or a list of
+    alerts, which is aggregated here in one pass.
+    """
+    if not isinstance(analysis, AlertAggregator):
+        aggregator = AlertAggregator()
+        for alert in analysis:
+            aggregator.add(alert)
+        analysis = aggregator
+    
+    if not analysis.total:
         return {
             "status": "no_alerts_found",
             "search_pattern": search_pattern,
             "message": f"No alerts found for pattern: '{search_pattern}'"
         }
     
-    # Analyze alert patterns based on importance levels
-    urgent_alerts = []
-    normal_alerts = []
-    
-    analyze_importance = config.get_bool('analyze_importance_levels', True)
-    
-    for alert in alerts:
-        # Check if alert is marked as high importance by sender
-        is_urgent = alert.get('importance', 1) > 1
-        
-        # Additional urgency indicators if enabled
-        if analyze_importance:
-            subject = alert.get('subject', '').lower()
-            # Simple urgency detection based on common urgent phrases
-            urgent_phrases = ['urgent', 'critical', 'emergency', 'asap', 'immediate']
-            is_urgent = is_urgent or any(phrase in subject for phrase in urgent_phrases)
-        
-        if is_urgent:
-            urgent_alerts.append(alert)
-        else:
-            normal_alerts.append(alert)
-    
-    # Calculate alert frequency by day
-    alert_frequency = calculate_daily_frequency(alerts)
-    
-    # Get recent alerts (last 10)
-    recent_alerts = sorted(alerts, key=lambda x: x.get('received_time', datetime.min), reverse=True)[:10]
-    
     # Summary statistics
     stats = {
-        "total_alerts": len(alerts),
-        "urgent_alerts": len(urgent_alerts),
-        "normal_alerts": len(normal_alerts),
-        "date_range": get_date_range(alerts),
-        "mailbox_distribution": get_mailbox_distribution(alerts),
-        "daily_frequency": alert_frequency,
-        "response_indicators": analyze_responses(alerts)
+        "total_alerts": analysis.total,
+        "urgent_alerts": analysis.urgent,
+        "normal_alerts": analysis.total - analysis.urgent,
+        "date_range": analysis.date_range(),
+        "mailbox_distribution": analysis.mailbox_distribution(),
+        "daily_frequency": analysis.daily_frequency(),
+        "peak_hour": analysis.peak_hour(),
+        "response_indicators": analysis.response_indicators()
     }
+    if analysis.copies_collapsed:
+        stats["copies_collapsed"] = analysis.copies_collapsed
     
-    return {
+    result = {
         "status": "success",
         "search_pattern": search_pattern,
         "summary": stats,
-        "urgent_alerts": [format_single_email(alert) for alert in urgent_alerts[:5]],  # Top 5 urgent
-        "recent_alerts": [format_single_email(alert) for alert in recent_alerts],
-        "timeline": create_alert_timeline(alerts),
-        "recommendations": generate_alert_recommendations(stats, urgent_alerts)
+        "top_senders": analysis.top_senders(),
+        "hourly_distribution": analysis.hourly_distribution(),
+        "timeline": analysis.daily_counts(),
+        "urgent_alerts": [format_single_email(alert) for alert in analysis.newest_urgent()],
+        "recent_alerts": [format_single_email(alert) for alert in analysis.newest()],
+        "recommendations": generate_alert_recommendations(stats)
     }
+    if analysis.senders_approximate:
+        # More distinct senders than counters: counts are lower bounds
+        result["top_senders_approximate"] = True
+    return result
 
 
-def format_single_email(email: Dict[str, Any]) -> Dict[str, Any]:
-    """Format a single email for AI consumption."""
+def format_single_email(email: Dict[str, Any], include_timestamps: bool = None,
+                        body_mode: str = 'preview') -> Dict[str, Any]:
+    """Format a single email for AI consumption.
+    
+    The body is returned as ``body`` in the full and new body modes and as
+    ``body_preview`` in preview mode.
+    """
+    body = reduce_body(email.get('body'), body_mode)
     
     formatted = {
         "subject": email.get('subject', 'No Subject'),
@@ -157,40 +521,64 @@ def format_single_email(email: Dict[str, Any]) -> Dict[str, Any]:
         "sender_email": email.get('sender_email', ''),
         "recipients": email.get('recipients', []),
         "folder": email.get('folder_name', 'Unknown'),
-        "mailbox": email.get('mailbox_type', 'unknown'),
-        "body_preview": email.get('body', '')[:500] if email.get('body') else '',
+        "mailbox": email.get('mailbox_address') or email.get('mailbox_type', 'unknown'),
+        ("body_preview" if body_mode == 'preview' else "body"): body,
         "attachments": email.get('attachments_count', 0),
         "importance": get_importance_text(email.get('importance', 1)),
         "unread": email.get('unread', False),
-        "size_kb": round(email.get('size', 0) / 1024, 1)
+        "size_kb": round(email.get('size', 0) / 1024, 1),
+        "entry_id": email.get('entry_id', '')
     }
+    locations = email.get('locations')
+    if locations:
+        # The same message was found in several mailboxes or folders
+        formatted["locations"] = [
+            {
+                "mailbox": location.get('mailbox_address') or location.get('mailbox_type') or 'unknown',
+                "folder": location.get('folder_name') or 'Unknown',
+                "entry_id": location.get('entry_id', '')
+            }
+            for location in locations
+        ]
     
     # Add timestamp if configured
-    if config.get_bool('include_timestamps', True):
+    if include_timestamps is None:
+        include_timestamps = config.settings.include_timestamps
+    if include_timestamps:
         received_time = email.get('received_time')
         formatted["received_time"] = received_time.isoformat() if received_time else None
     
     return formatted
 
 
+def clean_subject(subject: str) -> str:
+    """Subject without leading reply/forward prefixes."""
+    return _REPLY_PREFIXES.sub('', subject or '').strip()
+
+
+def conversation_key(email: Dict[str, Any]) -> str:
+    """ConversationID of an email, or its normalized subject when it has none."""
+    conversation_id = email.get('conversation_id')
+    if conversation_id:
+        return conversation_id
+    return "subject:" + clean_subject(email.get('subject', '')).lower()
+
+
+def thread_order_key(email: Dict[str, Any]):
+    """Sort key placing emails in thread order.
+
+    A ConversationIndex is the thread header followed by one block per reply
+    level, so its hex form sorts parents before their replies and siblings by
+    time. Emails without one fall back to received time.
+    """
+    return (email.get('conversation_index') or '', email.get('received_time') or datetime.min)
+
+
 def group_by_conversation(emails: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
-    """Group emails by conversation based on subject similarity."""
+    """Group emails by ConversationID, falling back to the normalized subject."""
     conversations = defaultdict(list)
-    
     for email in emails:
-        subject = email.get('subject', '').strip()
-        
-        # Clean subject for grouping (remove Re:, Fwd:, etc.)
-        clean_subject = subject
-        prefixes = ['re:', 'fwd:', 'fw:', 'reply:', 'forward:']
-        for prefix in prefixes:
-            if clean_subject.lower().startswith(prefix):
-                clean_subject = clean_subject[len(prefix):].strip()
-        
-        # Use cleaned subject as conversation key
-        conv_key = clean_subject.lower()
-        conversations[conv_key].append(email)
-    
+        conversations[conversation_key(email)].append(email)
     return dict(conversations)
 
 
@@ -252,53 +640,7 @@ def get_participants(emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return participants[:10]  # Top 10 participants
 
 
-def calculate_daily_frequency(alerts: List[Dict[str, Any]]) -> float:
-    """Calculate average alerts per day."""
-    if not alerts:
-        return 0.0
-    
-    dates = [alert.get('received_time').date() for alert in alerts if alert.get('received_time')]
-    if not dates:
-        return 0.0
-    
-    date_range_days = (max(dates) - min(dates)).days + 1
-    return round(len(alerts) / max(date_range_days, 1), 2)
-
-
-def analyze_responses(alerts: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Analyze response patterns in alerts."""
-    replies = sum(1 for alert in alerts if alert.get('subject', '').lower().startswith(('re:', 'reply:')))
-    total = len(alerts)
-    
-    return {
-        "replies_found": replies,
-        "total_alerts": total,
-        "response_rate_percent": round((replies / total) * 100, 1) if total > 0 else 0
-    }
-
-
-def create_alert_timeline(alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Create chronological timeline of alerts."""
-    timeline = []
-    
-    # Sort alerts by time
-    sorted_alerts = sorted(alerts, key=lambda x: x.get('received_time', datetime.min))
-    
-    for alert in sorted_alerts:
-        timeline_entry = {
-            "timestamp": alert.get('received_time').isoformat() if alert.get('received_time') else None,
-            "subject": alert.get('subject', 'No Subject')[:100],  # Truncate long subjects
-            "sender": alert.get('sender_name', 'Unknown'),
-            "mailbox": alert.get('mailbox_type', 'unknown'),
-            "folder": alert.get('folder_name', 'Unknown'),
-            "importance": get_importance_text(alert.get('importance', 1))
-        }
-        timeline.append(timeline_entry)
-    
-    return timeline
-
-
-def generate_alert_recommendations(stats: Dict[str, Any], urgent_alerts: List[Dict[str, Any]]) -> List[str]:
+def generate_alert_recommendations(stats: Dict[str, Any]) -> List[str]:
     """Generate actionable recommendations based on alert analysis."""
     recommendations = []
     
@@ -327,7 +669,7 @@ def generate_alert_recommendations(stats: Dict[str, Any], urgent_alerts: List[Di
     
     # Mailbox distribution
     mailbox_dist = stats.get('mailbox_distribution', {})
-    if mailbox_dist.get('personal', 0) > 0 and mailbox_dist.get('shared', 0) == 0:
+    if mailbox_dist.get('personal', 0) > 0 and len(mailbox_dist) == 1:
         recommendations.append("Alerts found only in personal mailbox - verify shared mailbox routing")
     
     if not recommendations:
@@ -0,0 +1,214 @@
+"""Cached folder trees of Outlook stores.
+
+Walking a store's folder hierarchy costs several COM calls per folder, so the
+tree is built once per store and kept under its StoreID and root EntryID until
+it is older than ``folder_cache_ttl_seconds`` or invalidated, e.g. after the
+search of one of its folders failed because the folder was moved or deleted.
+Trees hold plain strings only, never COM objects, so all COM worker threads
+can share them.
+"""
+
+import fnmatch
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..config.config_reader import config
+
+logger = logging.getLogger(__name__)
+
+# Outlook default folder numbers (OlDefaultFolders) of folders with a search role
+SPECIAL_FOLDERS = {'deleted': 3, 'sent': 5, 'junk': 23}
+
+# Fallback for stores that cannot report their default folders
+SPECIAL_FOLDER_NAMES = {
+    'deleted items': 'deleted',
+    'gelöschte elemente': 'deleted',
+    'sent items': 'sent',
+    'gesendete elemente': 'sent',
+    'junk email': 'junk',
+    'junk e-mail': 'junk',
+    'junk-e-mail': 'junk',
+}
+
+# Localized folder names AdvancedSearch scopes need in English
+_ENGLISH_FOLDER_NAMES = {
+    "\\Posteingang": "\\Inbox",
+    "\\Gesendete Elemente": "\\Sent Items",
+    "\\Entwürfe": "\\Drafts",
+    "\\Gelöschte Elemente": "\\Deleted Items",
+    "\\Junk-E-Mail": "\\Junk Email",
+}
+
+# MAPIFolder.DefaultItemType of folders holding mail
+OL_MAIL_ITEM = 0
+
+
+def search_scope(folder_path: str) -> str:
+    """AdvancedSearch scope (single-quoted, apostrophes doubled) of a folder path."""
+    # FolderPath uses localized names (like "Posteingang"); map common locales to English
+    path = folder_path or ""
+    for localized, english in _ENGLISH_FOLDER_NAMES.items():
+        if path.endswith(localized):
+            path = path.replace(localized, english)
+    escaped = path.replace("'", "''")
+    return f"'{escaped}'"
+
+
+def folder_matches(name: str, relative_path: str, patterns: Iterable[str]) -> bool:
+    """Whether a folder's name or path below the root matches a lowercased shell-style pattern."""
+    name = name.lower()
+    relative_path = relative_path.lower()
+    return any(fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(relative_path, pattern)
+               for pattern in patterns)
+
+
+class FolderNode:
+    """One mail folder of a tree."""
+
+    __slots__ = ('entry_id', 'name', 'path', 'relative_path', 'depth', 'role', 'scope')
+
+    def __init__(self, entry_id: str, name: str, path: str, relative_path: str = '',
+                 depth: int = 0, role: str = ''):
+        self.entry_id = entry_id
+        self.name = name
+        self.path = path
+        self.relative_path = relative_path or name
+        self.depth = depth
+        self.role = role
+        self.scope = search_scope(path)
+
+    @classmethod
+    def from_folder(cls, folder) -> 'FolderNode':
+        return cls(folder.EntryID, folder.Name, folder.FolderPath)
+
+    def matches(self, patterns: Iterable[str]) -> bool:
+        """Whether the name or path below the root matches a shell-style pattern."""
+        return folder_matches(self.name, self.relative_path, patterns)
+
+
+class FolderTree:
+    """Mail folders below a store's root, in depth-first order."""
+
+    __slots__ = ('store_id', 'root_id', 'folders', 'built')
+
+    def __init__(self, store_id: str, root_id: str, folders: List[FolderNode]):
+        self.store_id = store_id
+        self.root_id = root_id
+        self.folders = folders
+        self.built = time.monotonic()
+
+    def select(self, include: Iterable[str] = (), exclude: Iterable[str] = (),
+               include_sent: bool = True, include_deleted: bool = False) -> List[FolderNode]:
+        """Folders to search, in tree order.
+
+        Patterns are matched case-insensitively against a folder's name and
+        its path below the root ("Inbox/Alerts"); an empty ``include`` selects
+        every folder. Excluding a folder excludes its subfolders too. Deleted
+        Items and Junk Email are left out unless ``include_deleted``, Sent
+        Items unless ``include_sent``.
+        """
+        include = [pattern.lower() for pattern in include]
+        exclude = [pattern.lower() for pattern in exclude]
+        selected = []
+        skip_below = None
+        for node in self.folders:
+            if skip_below is not None:
+                if node.depth > skip_below:
+                    continue
+                skip_below = None
+            if (node.matches(exclude)
+                    or (node.role in ('deleted', 'junk') and not include_deleted)
+                    or (node.role == 'sent' and not include_sent)):
+                skip_below = node.depth
+                continue
+            if not include or node.matches(include):
+                selected.append(node)
+        return selected
+
+
+def build_tree(store_id: str, root, store=None) -> FolderTree:
+    """Walk the mail folders below ``root`` once.
+
+    Roles (sent, deleted, junk) come from the store's default folders, or from
+    the folder names when ``store`` is not available; subfolders inherit them.
+    """
+    roles: Dict[str, str] = {}
+    if store is not None:
+        for role, number in SPECIAL_FOLDERS.items():
+            try:
+                roles[store.GetDefaultFolder(number).EntryID] = role
+            except Exception:
+                pass
+
+    nodes: List[FolderNode] = []
+
+    def walk(folder, relative_path: str, depth: int, inherited_role: str) -> None:
+        for child in folder.Folders:
+            try:
+                if getattr(child, 'DefaultItemType', OL_MAIL_ITEM) != OL_MAIL_ITEM:
+                    continue
+                entry_id = child.EntryID
+                name = child.Name
+                role = inherited_role or roles.get(entry_id, '')
+                if not role and not roles and depth == 0:
+                    role = SPECIAL_FOLDER_NAMES.get(name.lower(), '')
+                child_path = f"{relative_path}/{name}" if relative_path else name
+                nodes.append(FolderNode(entry_id, name, child.FolderPath, child_path, depth, role))
+                walk(child, child_path, depth + 1, role)
+            except Exception as e:
+                logger.debug(f"Skipping folder while building folder tree: {e}")
+
+    walk(root, '', 0, '')
+    return FolderTree(store_id, root.EntryID, nodes)
+
+
+class FolderTreeCache:
+    """Folder trees by (StoreID, root EntryID), rebuilt after ``ttl_seconds``."""
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        if ttl_seconds is None:
+            ttl_seconds = config.get_int('folder_cache_ttl_seconds', 600)
+        self.ttl_seconds = ttl_seconds
+        self._trees: Dict[Tuple[str, str], FolderTree] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, store_id: str, root_id: str, build: Callable[[], FolderTree]) -> FolderTree:
+        """Cached tree of a store, built with ``build()`` when missing or expired."""
+        key = (store_id, root_id)
+        with self._lock:
+            tree = self._trees.get(key)
+            if tree is not None and time.monotonic() - tree.built < self.ttl_seconds:
+                self.hits += 1
+                return tree
+        # Built outside the lock; workers searching other stores are not held up
+        tree = build()
+        with self._lock:
+            self._trees[key] = tree
+            self.builds += 1
+        logger.info(f"Built folder tree of store {store_id}: {len(tree.folders)} folders")
+        return tree
+
+    def invalidate(self, store_id: Optional[str] = None) -> None:
+        """Drop the trees of one store, or all trees."""
+        with self._lock:
+            if store_id is None:
+                self._trees.clear()
+            else:
+                for key in [key for key in self._trees if key[0] == store_id]:
+                    del self._trees[key]
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "stores": len(self._trees),
+                "folders": sum(len(tree.folders) for tree in self._trees.values()),
+                "hits": self.hits,
+                "builds": self.builds,
+            }
@@ -0,0 +1,151 @@
+"""JSON encoding of tool responses.
+
+Responses are serialized with orjson when it is installed and with the
+standard library otherwise; both produce the same document. Datetimes are
+written as ISO 8601 strings. The compact mode drops null and empty fields and
+renames the common response keys to the short aliases in COMPACT_KEYS.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from ..config.config_reader import config
+
+logger = logging.getLogger(__name__)
+
+# Response key -> short alias used in compact mode
+COMPACT_KEYS: Dict[str, str] = {
+    "subject": "sub",
+    "sender_name": "from",
+    "sender_email": "from_addr",
+    "recipients": "to",
+    "received_time": "at",
+    "folder": "fld",
+    "mailbox": "mbx",
+    "body_preview": "body",
+    "attachments": "att",
+    "importance": "imp",
+    "size_kb": "kb",
+    "conversation_id": "conv",
+    "conversations": "convs",
+    "email_count": "n",
+    "participants": "ppl",
+    "date_range": "dates",
+    "total_emails": "total",
+    "mailbox_distribution": "by_mbx",
+    "all_emails_chronological": "chrono",
+    "search_subject": "q",
+    "pagination": "page",
+    "entry_id": "id",
+}
+
+
+def _default(value: Any) -> Any:
+    """Fallback for types the encoders do not handle natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def compact(value: Any) -> Any:
+    """Drop null/empty fields and shorten keys, recursively."""
+    if isinstance(value, dict):
+        result = {}
+        aliases = COMPACT_KEYS
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                item = compact(item)
+                if not item:
+                    continue
+            elif item is None or item == "":
+                continue
+            result[aliases.get(key, key)] = item
+        return result
+    if isinstance(value, list):
+        return [compact(item) if isinstance(item, (dict, list)) else item for item in value]
+    return value
+
+
+def estimate_size(value: Any) -> int:
+    """Bytes of ``value`` encoded as JSON without whitespace, without encoding it.
+
+    Exact for ASCII text; escapes of quotes, backslashes and line breaks are
+    counted, other control characters are not.
+    """
+    if isinstance(value, str):
+        size = len(value) if value.isascii() else len(value.encode('utf-8'))
+        for escaped in ('"', '\\', '\n', '\r', '\t'):
+            if escaped in value:
+                size += value.count(escaped)
+        return size + 2
+    if isinstance(value, dict):
+        return 1 + sum(estimate_size(key) + 1 + estimate_size(item) + 1
+                       for key, item in value.items()) + (not value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return 1 + sum(estimate_size(item) + 1 for item in value) + (not value)
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    if isinstance(value, (datetime, date)):
+        return len(value.isoformat()) + 2
+    return len(str(value))
+
+
+class JsonEncoder:
+    """Standard library encoder."""
+
+    name = "json"
+
+    def __init__(self, compact_output: bool = False):
+        self.compact_output = compact_output
+
+    def dumps(self, obj: Any) -> str:
+        """Serialize a response to a JSON string."""
+        if self.compact_output:
+            obj = compact(obj)
+        return self._encode(obj)
+
+    def _encode(self, obj: Any) -> str:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+
+class OrjsonEncoder(JsonEncoder):
+    """orjson encoder; serializes datetimes natively."""
+
+    name = "orjson"
+
+    def __init__(self, compact_output: bool = False):
+        super().__init__(compact_output)
+        import orjson
+        self._orjson = orjson
+
+    def _encode(self, obj: Any) -> str:
+        return self._orjson.dumps(obj, default=_default,
+                                  option=self._orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+def create_encoder(name: Optional[str] = None, compact_output: Optional[bool] = None) -> JsonEncoder:
+    """Create the encoder selected by the ``json_encoder`` config key.
+
+    ``auto`` (default) uses orjson when it can be imported.
+    """
+    name = (name or config.get('json_encoder', 'auto') or 'auto').lower()
+    if compact_output is None:
+        compact_output = config.get_bool('compact_json_output', False)
+
+    if name in ('auto', 'orjson'):
+        try:
+            return OrjsonEncoder(compact_output)
+        except ImportError:
+            if name == 'orjson':
+                logger.warning("orjson is not installed, using the standard json encoder")
+        return JsonEncoder(compact_output)
+    if name == 'json':
+        return JsonEncoder(compact_output)
+
+    raise ValueError(f"Unknown JSON encoder: {name}")
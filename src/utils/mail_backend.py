@@ -0,0 +1,108 @@
+"""Mail backend abstraction used by the Outlook client.
+
+A backend supplies the Outlook object model (Application, Namespace, Folder,
+Items, ...) together with the per-thread COM lifecycle. The COM backend talks
+to a real Outlook instance through pywin32; the simulated backend serves a
+synthetic in-memory mailbox so the client can be exercised and profiled on
+any platform.
+"""
+
+import logging
+from typing import Optional
+
+from ..config.config_reader import config
+
+logger = logging.getLogger(__name__)
+
+
+class MailBackend:
+    """Base class for Outlook object model providers."""
+
+    name = "base"
+
+    def initialize_thread(self) -> None:
+        """Prepare the calling thread for object model access."""
+
+    def uninitialize_thread(self) -> None:
+        """Release per-thread resources acquired by initialize_thread()."""
+
+    def get_application(self):
+        """Attach to a running Outlook application or launch one."""
+        raise NotImplementedError
+
+    def dispatch_application(self, events: Optional[type] = None):
+        """Create an Application handle owned by the calling thread.
+
+        ``events`` is an optional event sink class connected to the
+        Application; its handlers run while the thread pumps messages.
+        """
+        return self.get_application()
+
+    def pump_messages(self) -> None:
+        """Deliver pending events to sinks connected on the calling thread."""
+
+    def com_calls(self) -> Optional[int]:
+        """Object model calls made so far, or None when the backend cannot count them."""
+        return None
+
+
+class ComBackend(MailBackend):
+    """Backend for the Outlook desktop application via pywin32 COM."""
+
+    name = "com"
+
+    def __init__(self):
+        self._client = None
+        self._pythoncom = None
+
+    def _modules(self):
+        """Import pywin32 on first use so the module loads on any platform."""
+        if self._client is None:
+            import pythoncom
+            import win32com.client
+            self._pythoncom = pythoncom
+            self._client = win32com.client
+        return self._client, self._pythoncom
+
+    def initialize_thread(self) -> None:
+        _, pythoncom = self._modules()
+        pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
+
+    def uninitialize_thread(self) -> None:
+        _, pythoncom = self._modules()
+        pythoncom.CoUninitialize()
+
+    def get_application(self):
+        client, _ = self._modules()
+        # Try to connect to existing Outlook instance first (much faster)
+        try:
+            application = client.GetActiveObject("Outlook.Application")
+            logger.info("Connected to existing Outlook instance")
+            return application
+        except Exception:
+            # Fall back to creating new instance
+            logger.info("No existing Outlook instance, launching new one...")
+            return client.Dispatch("Outlook.Application")
+
+    def dispatch_application(self, events: Optional[type] = None):
+        client, _ = self._modules()
+        if events is not None:
+            return client.DispatchWithEvents("Outlook.Application", events)
+        return client.gencache.EnsureDispatch("Outlook.Application")
+
+    def pump_messages(self) -> None:
+        _, pythoncom = self._modules()
+        pythoncom.PumpWaitingMessages()
+
+
+def create_backend(name: Optional[str] = None) -> MailBackend:
+    """Create the backend selected by the ``mail_backend`` config key."""
+    name = (name or config.get('mail_backend', 'com') or 'com').lower()
+
+    if name == 'com':
+        return ComBackend()
+    if name == 'simulated':
+        from .outlook_simulator import SimulatedBackend
+        return SimulatedBackend.from_config()
+
+    raise ValueError(f"Unknown mail backend: {name}")
@@ -0,0 +1,584 @@
+"""Local full-text index of mailbox contents.
+
+Headers and normalized bodies are stored in SQLite with an FTS5 table keyed by
+EntryID, so phrase searches are answered locally in milliseconds instead of
+through Outlook's AdvancedSearch. The index is filled from a MailSource: an
+initial bulk crawl, then incremental syncs that only fetch items whose
+``LastModificationTime`` is at or after the per-folder watermark. Deleted
+items leave no trace a watermark can see, so a periodic reconciling sync
+also compares each folder's EntryIDs with the index and drops the rest.
+
+MailSource is deliberately small so the index can be built from any source;
+OutlookMailSource reads the folders of an Outlook store, DictMailSource plain email dicts.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..config.config_reader import config
+from .dasl import SearchFilters, phrases_of
+from .folder_tree import folder_matches
+from .metrics import COM_OPERATIONS
+from .table_extractor import TableExtractor
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    rowid INTEGER PRIMARY KEY,
+    entry_id TEXT NOT NULL UNIQUE,
+    mailbox_type TEXT NOT NULL,
+    folder_key TEXT NOT NULL,
+    folder_name TEXT,
+    folder_path TEXT,
+    subject TEXT,
+    sender_name TEXT,
+    sender_email TEXT,
+    recipients TEXT,
+    received_time TEXT,
+    importance INTEGER,
+    size INTEGER,
+    attachments_count INTEGER,
+    unread INTEGER,
+    body TEXT,
+    last_modified TEXT,
+    conversation_id TEXT,
+    conversation_index TEXT,
+    internet_message_id TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_received ON messages (mailbox_type, received_time);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    subject, body, content='messages', content_rowid='rowid', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, subject, body) VALUES (new.rowid, new.subject, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, subject, body)
+    VALUES ('delete', old.rowid, old.subject, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, subject, body)
+    VALUES ('delete', old.rowid, old.subject, old.body);
+    INSERT INTO messages_fts (rowid, subject, body) VALUES (new.rowid, new.subject, new.body);
+END;
+CREATE TABLE IF NOT EXISTS sync_state (
+    folder_key TEXT PRIMARY KEY,
+    mailbox_type TEXT NOT NULL,
+    folder_name TEXT,
+    watermark TEXT,
+    synced_at REAL,
+    item_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS mailbox_state (
+    mailbox_type TEXT PRIMARY KEY,
+    synced_at REAL,
+    reconciled_at REAL
+);
+"""
+
+_COLUMNS = ('entry_id', 'mailbox_type', 'folder_key', 'folder_name', 'folder_path', 'subject',
+            'sender_name', 'sender_email', 'recipients', 'received_time', 'importance', 'size',
+            'attachments_count', 'unread', 'body', 'last_modified', 'conversation_id',
+            'conversation_index', 'internet_message_id')
+
+# EntryIDs read per GetArray call when listing a folder for reconciliation
+ENTRY_ID_BATCH = 1000
+
+
+class SourceFolder:
+    """A folder exposed by a MailSource; ``path`` is its path below the mailbox root."""
+
+    __slots__ = ('key', 'name', 'mailbox_type', 'handle', 'path')
+
+    def __init__(self, key: str, name: str, mailbox_type: str, handle: Any = None,
+                 path: Optional[str] = None):
+        self.key = key
+        self.name = name
+        self.mailbox_type = mailbox_type
+        self.handle = handle
+        self.path = path or name
+
+
+class MailSource:
+    """Provider of folders and their changed items for MailIndex.sync()."""
+
+    def folders(self) -> Iterable[SourceFolder]:
+        raise NotImplementedError
+
+    def changed_since(self, folder: SourceFolder,
+                      watermark: Optional[datetime]) -> Iterator[Dict[str, Any]]:
+        """Email dicts (with ``last_modified``) modified at or after ``watermark``."""
+        raise NotImplementedError
+
+    def entry_ids(self, folder: SourceFolder) -> Iterable[str]:
+        """EntryIDs of every item currently in the folder."""
+        raise NotImplementedError
+
+
+class DictMailSource(MailSource):
+    """MailSource over in-memory email dicts, grouped by ``folder_key``."""
+
+    def __init__(self, emails: Sequence[Dict[str, Any]]):
+        self.emails = list(emails)
+
+    def folders(self) -> Iterable[SourceFolder]:
+        seen = {}
+        for email in self.emails:
+            key = email.get('folder_key') or f"{email['mailbox_type']}:{email['folder_name']}"
+            seen.setdefault(key, SourceFolder(key, email['folder_name'], email['mailbox_type'],
+                                              path=email.get('folder_path')))
+        return list(seen.values())
+
+    def changed_since(self, folder, watermark):
+        for email in self.emails:
+            key = email.get('folder_key') or f"{email['mailbox_type']}:{email['folder_name']}"
+            if key == folder.key and (watermark is None or email['last_modified'] >= watermark):
+                yield email
+
+    def entry_ids(self, folder):
+        return [email['entry_id'] for email in self.emails
+                if (email.get('folder_key') or f"{email['mailbox_type']}:{email['folder_name']}") == folder.key]
+
+
+class OutlookMailSource(MailSource):
+    """MailSource reading selected folders of an Outlook store through the Table API."""
+
+    def __init__(self, namespace, mailbox_type: str, store_id: str, folders: Sequence[Any],
+                 body_reader: Callable[[Any], str]):
+        """``folders`` are the FolderNodes to index, as selected for searches."""
+        self.namespace = namespace
+        self.mailbox_type = mailbox_type
+        self.store_id = store_id
+        self.nodes = folders
+        self.body_reader = body_reader
+
+    def folders(self) -> Iterable[SourceFolder]:
+        return [SourceFolder(f"{self.store_id}:{node.entry_id}", node.name, self.mailbox_type, node,
+                             node.relative_path)
+                for node in self.nodes]
+
+    def changed_since(self, folder, watermark):
+        restriction = ""
+        if watermark is not None:
+            # Jet date literals have minute precision; re-fetching that minute is harmless
+            restriction = f"[LastModificationTime] >= '{watermark:%m/%d/%Y %I:%M %p}'"
+        table = self._open(folder).GetTable(restriction)
+        extractor = TableExtractor(self.namespace, self.body_reader)
+        yield from extractor.extract(table, folder.name, folder.mailbox_type,
+                                     table.GetRowCount(), set())
+
+    def entry_ids(self, folder):
+        table = self._open(folder).GetTable("")
+        columns = table.Columns
+        columns.RemoveAll()
+        columns.Add("EntryID")
+        while not table.EndOfTable:
+            rows = table.GetArray(ENTRY_ID_BATCH)
+            COM_OPERATIONS.inc('table_get_array')
+            if not rows:
+                break
+            for row in rows:
+                yield row[0]
+
+    def _open(self, folder: SourceFolder):
+        return self.namespace.GetFolderFromID(folder.handle.entry_id, self.store_id)
+
+
+def _to_iso(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        # COM datetimes are timezone-aware; the index stores naive local times
+        return value.replace(tzinfo=None).isoformat()
+    return str(value)
+
+
+def _from_iso(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _filter_conditions(filters: SearchFilters) -> Tuple[List[str], List[Any]]:
+    """SQL conditions and parameters equivalent to the DASL of SearchFilters."""
+    conditions: List[str] = []
+    params: List[Any] = []
+    if filters.received_after:
+        conditions.append("m.received_time >= ?")
+        params.append(_to_iso(filters.received_after))
+    if filters.received_before:
+        conditions.append("m.received_time < ?")
+        params.append(_to_iso(filters.received_before))
+    if filters.senders:
+        conditions.append('(' + ' OR '.join(
+            "m.sender_name LIKE ? ESCAPE '\\' OR m.sender_email LIKE ? ESCAPE '\\'"
+            for _ in filters.senders) + ')')
+        for sender in filters.senders:
+            pattern = '%' + re.sub(r'([%_\\])', r'\\\1', sender) + '%'
+            params.extend((pattern, pattern))
+    if filters.importance:
+        conditions.append(f"m.importance IN ({', '.join('?' for _ in filters.importance)})")
+        params.extend(filters.importance)
+    if filters.unread is not None:
+        conditions.append("m.unread = ?")
+        params.append(int(filters.unread))
+    if filters.has_attachments is not None:
+        conditions.append("m.attachments_count > 0" if filters.has_attachments
+                          else "m.attachments_count = 0")
+    if filters.folders:
+        # The rules of FolderNode.matches, so the index selects the folders a live search would
+        conditions.append('(' + ' OR '.join("folder_matches(m.folder_name, m.folder_path, ?)"
+                                            for _ in filters.folders) + ')')
+        params.extend(pattern.lower() for pattern in filters.folders)
+    return conditions, params
+
+
+def _folder_matches(name: Optional[str], path: Optional[str], pattern: str) -> bool:
+    return folder_matches(name or '', path or name or '', (pattern,))
+
+
+def _selected_columns(include_body: bool) -> str:
+    """Columns of a search, in _COLUMNS order, with NULL for the body when it is not wanted."""
+    return ', '.join('m.' + c if include_body or c != 'body' else 'NULL' for c in _COLUMNS)
+
+
+def _truncated(body: str) -> str:
+    max_body_chars = config.settings.max_body_chars
+    if max_body_chars > 0 and len(body) > max_body_chars:
+        return body[:max_body_chars] + " [truncated]"
+    return body
+
+
+def default_index_path() -> str:
+    """Index location from ``local_index_path`` or the user's home directory."""
+    path = config.get('local_index_path')
+    if path:
+        return os.path.expanduser(str(path))
+    return os.path.join(os.path.expanduser('~'), '.outlook_mcp', 'mail_index.sqlite3')
+
+
+class MailIndex:
+    """SQLite FTS5 index of email headers and normalized bodies."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_index_path()
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.create_function('folder_matches', 3, _folder_matches, deterministic=True)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- writing ---------------------------------------------------------------
+
+    def upsert(self, emails: Iterable[Dict[str, Any]], folder_key: str,
+               folder_path: Optional[str] = None) -> int:
+        """Insert or update emails of one folder; returns the number written.
+
+        ``folder_path`` is the folder's path below the mailbox root, by default its name.
+        """
+        rows = []
+        for email in emails:
+            rows.append((
+                email['entry_id'], email['mailbox_type'], folder_key, email.get('folder_name'),
+                folder_path or email.get('folder_name'),
+                email.get('subject'), email.get('sender_name'), email.get('sender_email'),
+                json.dumps(email.get('recipients') or []), _to_iso(email.get('received_time')),
+                email.get('importance', 1), email.get('size', 0),
+                email.get('attachments_count', 0), int(bool(email.get('unread'))),
+                email.get('body') or '', _to_iso(email.get('last_modified')),
+                email.get('conversation_id') or None, email.get('conversation_index') or None,
+                email.get('internet_message_id') or None,
+            ))
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c != 'entry_id')
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO messages ({', '.join(_COLUMNS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT(entry_id) DO UPDATE SET {updates}",
+                rows,
+            )
+        return len(rows)
+
+    def sync(self, source: MailSource, batch_size: int = 500,
+             reconcile: bool = False) -> Dict[str, Any]:
+        """Bring every folder of ``source`` up to date with its watermark.
+
+        With ``reconcile`` items that are no longer in their folder (deleted,
+        or moved out of the indexed folders) are removed too, as are the
+        folders of the synced mailboxes that ``source`` no longer lists.
+        """
+        stats = {"folders": 0, "items": 0, "removed": 0, "seconds": 0.0}
+        start = time.perf_counter()
+        started_at = time.time()
+        folder_keys: Dict[str, List[str]] = {}
+        for folder in source.folders():
+            folder_keys.setdefault(folder.mailbox_type, []).append(folder.key)
+            state = self.folder_state(folder.key)
+            watermark = _from_iso(state['watermark']) if state else None
+            # A full fetch sees every item, so it needs no separate EntryID listing
+            present = set() if reconcile and watermark is None else None
+            newest = watermark
+            batch = []
+            count = 0
+            for email in source.changed_since(folder, watermark):
+                batch.append(email)
+                if present is not None:
+                    present.add(email['entry_id'])
+                modified = email.get('last_modified')
+                if isinstance(modified, datetime):
+                    modified = modified.replace(tzinfo=None)
+                    if newest is None or modified > newest:
+                        newest = modified
+                if len(batch) >= batch_size:
+                    count += self.upsert(batch, folder.key, folder.path)
+                    batch = []
+            count += self.upsert(batch, folder.key, folder.path)
+            if reconcile:
+                if present is None:
+                    present = set(source.entry_ids(folder))
+                stats["removed"] += self._remove_missing(folder.key, present)
+            self._set_folder_state(folder, newest)
+            stats["folders"] += 1
+            stats["items"] += count
+        if reconcile:
+            for mailbox_type, keys in folder_keys.items():
+                stats["removed"] += self._remove_other_folders(mailbox_type, keys)
+        self._set_mailbox_state(folder_keys, started_at, reconcile)
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(f"Index sync: {stats['items']} items in {stats['folders']} folders, "
+                    f"{stats['removed']} removed ({stats['seconds']} s)")
+        return stats
+
+    def _remove_missing(self, folder_key: str, present: set) -> int:
+        """Delete the folder's rows whose EntryID is not in ``present``."""
+        with self._lock:
+            indexed = self._conn.execute(
+                "SELECT entry_id FROM messages WHERE folder_key = ?", (folder_key,)
+            ).fetchall()
+        missing = [row for row in indexed if row[0] not in present]
+        if missing:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM messages WHERE entry_id = ?", missing)
+        return len(missing)
+
+    def _remove_other_folders(self, mailbox_type: str, folder_keys: List[str]) -> int:
+        """Delete the rows and sync state of a mailbox's folders not in ``folder_keys``."""
+        placeholders = ', '.join('?' for _ in folder_keys)
+        params = [mailbox_type] + folder_keys
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                f"DELETE FROM messages WHERE mailbox_type = ? AND folder_key NOT IN ({placeholders})",
+                params,
+            ).rowcount
+            self._conn.execute(
+                f"DELETE FROM sync_state WHERE mailbox_type = ? AND folder_key NOT IN ({placeholders})",
+                params,
+            )
+        return removed
+
+    def _set_folder_state(self, folder: SourceFolder, watermark: Optional[datetime]) -> None:
+        with self._lock, self._conn:
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE folder_key = ?", (folder.key,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO sync_state (folder_key, mailbox_type, folder_name, watermark, synced_at, item_count) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(folder_key) DO UPDATE SET "
+                "watermark = excluded.watermark, synced_at = excluded.synced_at, "
+                "item_count = excluded.item_count, folder_name = excluded.folder_name",
+                (folder.key, folder.mailbox_type, folder.name, _to_iso(watermark), time.time(), count),
+            )
+
+    def _set_mailbox_state(self, mailbox_types: Iterable[str], synced_at: float,
+                           reconciled: bool) -> None:
+        """Record a completed (and maybe reconciling) sync of every folder of these mailboxes."""
+        reconciled_at = synced_at if reconciled else None
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO mailbox_state (mailbox_type, synced_at, reconciled_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(mailbox_type) DO UPDATE SET synced_at = excluded.synced_at, "
+                "reconciled_at = COALESCE(excluded.reconciled_at, reconciled_at)",
+                [(mailbox_type, synced_at, reconciled_at) for mailbox_type in mailbox_types],
+            )
+
+    def invalidate(self) -> None:
+        """Forget every watermark, so the next sync of each mailbox is a full crawl again.
+
+        Stored items stay until the crawl overwrites or reconciles them away;
+        until it completes the mailboxes count as never synced.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sync_state")
+            self._conn.execute("DELETE FROM mailbox_state")
+
+    # -- reading ---------------------------------------------------------------
+
+    def folder_state(self, folder_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT folder_key, mailbox_type, folder_name, watermark, synced_at, item_count "
+                "FROM sync_state WHERE folder_key = ?", (folder_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('folder_key', 'mailbox_type', 'folder_name', 'watermark',
+                         'synced_at', 'item_count'), row))
+
+    def last_synced(self, mailbox_type: str) -> Optional[float]:
+        """Start time of the last completed sync of a mailbox, or None before its first crawl completes."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at FROM mailbox_state WHERE mailbox_type = ?", (mailbox_type,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def last_reconciled(self, mailbox_type: str) -> Optional[float]:
+        """Start time of the last completed reconciling sync of a mailbox, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reconciled_at FROM mailbox_state WHERE mailbox_type = ?", (mailbox_type,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT mailbox_type, COUNT(*), SUM(item_count), MIN(synced_at), MIN(watermark) "
+                "FROM sync_state GROUP BY mailbox_type"
+            ).fetchall()
+        return {
+            mailbox_type: {
+                "folders": folders,
+                "items": items or 0,
+                "oldest_sync_age_seconds": round(time.time() - synced_at, 1) if synced_at else None,
+                "watermark": watermark,
+            }
+            for mailbox_type, folders, items, synced_at, watermark in rows
+        }
+
+    def search(self, phrase: Union[str, Sequence[str]],
+               mailbox_types: Optional[Sequence[str]] = None,
+               limit: int = 500, filters: Optional[SearchFilters] = None,
+               include_body: bool = True) -> List[Dict[str, Any]]:
+        """Phrase search over subject and body, newest first.
+
+        ``phrase`` may be several phrases, any of which matches. ``filters``
+        narrow the search in SQL; without a phrase the newest messages
+        matching the filters are returned. With ``include_body=False``
+        bodies are not read and ``body`` is None.
+        """
+        query = self._query(phrase, _selected_columns(include_body), mailbox_types, filters)
+        if query is None:
+            return []
+        sql, params = query
+        sql += " ORDER BY m.received_time DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_email(row) for row in rows]
+
+    def scan(self, phrase: Union[str, Sequence[str]], mailbox_types: Optional[Sequence[str]],
+             filters: Optional[SearchFilters], sink: Callable[[Dict[str, Any]], None],
+             batch_size: int = 1000) -> int:
+        """Pass every match of a search to ``sink``, headers only and unordered.
+
+        Rows are fetched ``batch_size`` at a time without their bodies, so
+        memory does not grow with the number of matches. Returns the number
+        of emails passed.
+        """
+        query = self._query(phrase, _selected_columns(False), mailbox_types, filters)
+        if query is None:
+            return 0
+        count = 0
+        with self._lock:
+            cursor = self._conn.execute(*query)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return count
+            for row in rows:
+                sink(self._row_to_email(row))
+            count += len(rows)
+
+    def bodies(self, entry_ids: Sequence[str]) -> Dict[str, Tuple[str, Optional[datetime]]]:
+        """Indexed (body, last_modified) of the given items, by EntryID."""
+        result = {}
+        with self._lock:
+            for start in range(0, len(entry_ids), 500):
+                chunk = list(entry_ids[start:start + 500])
+                rows = self._conn.execute(
+                    f"SELECT entry_id, body, last_modified FROM messages "
+                    f"WHERE entry_id IN ({', '.join('?' for _ in chunk)})", chunk
+                ).fetchall()
+                for entry_id, body, last_modified in rows:
+                    result[entry_id] = (_truncated(body or ''), _from_iso(last_modified))
+        return result
+
+    @staticmethod
+    def _query(phrase: Union[str, Sequence[str]], selected: str,
+               mailbox_types: Optional[Sequence[str]],
+               filters: Optional[SearchFilters]) -> Optional[Tuple[str, List[Any]]]:
+        """SELECT of the ``selected`` columns for a search and its parameters, or None when nothing can match."""
+        phrases = phrases_of(phrase)
+        params: List[Any] = []
+        if phrases:
+            sql = (f"SELECT {selected} FROM messages_fts "
+                   "JOIN messages m ON m.rowid = messages_fts.rowid WHERE messages_fts MATCH ?")
+            params.append('{subject body} : (' + ' OR '.join(
+                '"' + terms.replace('"', '""') + '"' for terms in phrases) + ')')
+        elif filters:
+            sql = f"SELECT {selected} FROM messages m WHERE 1"
+        else:
+            return None
+        if mailbox_types:
+            sql += f" AND m.mailbox_type IN ({', '.join('?' for _ in mailbox_types)})"
+            params.extend(mailbox_types)
+        if filters:
+            conditions, filter_params = _filter_conditions(filters)
+            sql += ''.join(f" AND {condition}" for condition in conditions)
+            params.extend(filter_params)
+        return sql, params
+
+    @staticmethod
+    def _row_to_email(row) -> Dict[str, Any]:
+        data = dict(zip(_COLUMNS, row))
+        # NULL when the body was not selected; stored bodies are never NULL
+        body = data['body']
+        if body is not None:
+            body = _truncated(body)
+        return {
+            'subject': data['subject'] or 'No Subject',
+            'sender_name': data['sender_name'] or 'Unknown',
+            'sender_email': data['sender_email'] or '',
+            'recipients': json.loads(data['recipients'] or '[]'),
+            'received_time': _from_iso(data['received_time']),
+            'folder_name': data['folder_name'],
+            'mailbox_type': data['mailbox_type'],
+            'importance': data['importance'],
+            'body': body,
+            'size': data['size'],
+            'attachments_count': data['attachments_count'],
+            'unread': bool(data['unread']),
+            'entry_id': data['entry_id'],
+            'last_modified': _from_iso(data['last_modified']),
+            'conversation_id': data['conversation_id'] or '',
+            'conversation_index': data['conversation_index'] or '',
+            'internet_message_id': data['internet_message_id'] or '',
+        }
@@ -0,0 +1,285 @@
+"""Latency histograms and counters of the server's phases.
+
+The phases of a tool call (connecting, resolving recipients, waiting for
+AdvancedSearch, extracting items, cleaning HTML, formatting, serializing) are
+timed into fixed-bucket histograms, and notable events (COM operations, cache
+hits, fallbacks) into counters. Recording is a bucket lookup and a few
+additions under a lock. ``metrics`` is rendered as Prometheus text or a JSON
+snapshot by the ``outlook-mcp://metrics`` resources.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Bucket upper bounds in seconds
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+SLOW_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic count, optionally split by labels."""
+
+    __slots__ = ('name', 'help', 'label_names', '_values', '_lock')
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Distribution of durations in fixed buckets, optionally split by labels."""
+
+    __slots__ = ('name', 'help', 'label_names', 'buckets', '_series', '_lock')
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = SLOW_BUCKETS,
+                 label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], List[int], float, int]]:
+        """(labels, cumulative bucket counts, sum, count) per label set."""
+        with self._lock:
+            series = [(labels, list(counts), total, count)
+                      for labels, (counts, total, count) in self._series.items()]
+        result = []
+        for labels, counts, total, count in sorted(series):
+            cumulative, running = [], 0
+            for bucket_count in counts:
+                running += bucket_count
+                cumulative.append(running)
+            result.append((labels, cumulative, total, count))
+        return result
+
+    def quantile(self, q: float, cumulative: List[int]) -> Optional[float]:
+        """Estimate of a quantile from cumulative bucket counts (linear within a bucket)."""
+        count = cumulative[-1] if cumulative else 0
+        if not count:
+            return None
+        rank = q * count
+        lower_bound, lower_count = 0.0, 0
+        for bound, upper_count in zip(self.buckets, cumulative):
+            if upper_count >= rank:
+                if upper_count == lower_count:
+                    return bound
+                return lower_bound + (bound - lower_bound) * (rank - lower_count) / (upper_count - lower_count)
+            lower_bound, lower_count = bound, upper_count
+        return self.buckets[-1]  # in the +Inf bucket
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Named counters and histograms, plus collectors sampled at render time.
+
+    A collector returns ``(name, help, {labels: value})`` tuples for counters
+    whose source of truth lives elsewhere, such as the hit counters of the
+    caches, so they are read when rendered instead of being kept twice.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, str, Dict[Tuple[Tuple[str, str], ...], float]]]]] = []
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(name, lambda: Counter(name, help, label_names))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = SLOW_BUCKETS,
+                  label_names: Sequence[str] = ()) -> Histogram:
+        return self._register(name, lambda: Histogram(name, help, buckets, label_names))
+
+    def _register(self, name: str, create):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = create()
+            return metric
+
+    def add_collector(self, collector: Callable[[], list]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _collected(self) -> List[Tuple[str, str, Dict[tuple, float]]]:
+        with self._lock:
+            collectors = list(self._collectors)
+        collected = []
+        for collector in collectors:
+            try:
+                collected.extend(collector())
+            except Exception:
+                continue  # a collector of a closed client must not break rendering
+        return collected
+
+    def reset(self) -> None:
+        """Zero all counters and histograms (collectors are left alone)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if metric.kind == 'counter':
+                for labels, value in metric.samples():
+                    lines.append(f"{metric.name}{_label_text(metric.label_names, labels)} {_number(value)}")
+                continue
+            for labels, cumulative, total, count in metric.samples():
+                for bound, bucket_count in zip(metric.buckets + (float('inf'),), cumulative):
+                    le = '+Inf' if bound == float('inf') else _number(bound)
+                    label_text = _label_text(metric.label_names, labels, f'le="{le}"')
+                    lines.append(f"{metric.name}_bucket{label_text} {bucket_count}")
+                label_text = _label_text(metric.label_names, labels)
+                lines.append(f"{metric.name}_sum{label_text} {_number(total)}")
+                lines.append(f"{metric.name}_count{label_text} {count}")
+        for name, help, values in self._collected():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(values.items()):
+                lines.append(f"{name}{_label_text([k for k, _ in labels], [v for _, v in labels])} "
+                             f"{_number(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-ready view: counters by label, histograms with count, sum and estimated quantiles."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        histograms: Dict[str, Any] = {}
+        counters: Dict[str, Any] = {}
+        for metric in metrics:
+            if metric.kind == 'counter':
+                counters[metric.name] = [
+                    {"labels": dict(zip(metric.label_names, labels)), "value": value}
+                    for labels, value in metric.samples()
+                ]
+                continue
+            series = []
+            for labels, cumulative, total, count in metric.samples():
+                series.append({
+                    "labels": dict(zip(metric.label_names, labels)),
+                    "count": count,
+                    "sum_seconds": round(total, 6),
+                    "mean_seconds": round(total / count, 6) if count else None,
+                    "p50_seconds": _rounded(metric.quantile(0.5, cumulative)),
+                    "p95_seconds": _rounded(metric.quantile(0.95, cumulative)),
+                    "p99_seconds": _rounded(metric.quantile(0.99, cumulative)),
+                })
+            histograms[metric.name] = series
+        for name, _, values in self._collected():
+            counters[name] = [{"labels": dict(labels), "value": value}
+                              for labels, value in sorted(values.items())]
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "histograms": histograms,
+            "counters": counters,
+        }
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return round(value, 6) if value is not None else None
+
+
+# Global registry and the server's standard metrics
+metrics = MetricsRegistry()
+
+CONNECT_SECONDS = metrics.histogram(
+    'outlook_connect_seconds', 'Time to attach to Outlook and open the MAPI namespace')
+RECIPIENT_RESOLVE_SECONDS = metrics.histogram(
+    'outlook_recipient_resolve_seconds', 'Time to create and resolve a shared mailbox recipient')
+SEARCH_WAIT_SECONDS = metrics.histogram(
+    'outlook_search_wait_seconds', 'Wait for one AdvancedSearch to complete', label_names=('mode',))
+ITEM_EXTRACT_SECONDS = metrics.histogram(
+    'outlook_item_extract_seconds', 'Time to build the email data of one search result',
+    FAST_BUCKETS, label_names=('source',))
+HTML_CLEAN_SECONDS = metrics.histogram(
+    'outlook_html_clean_seconds', 'Time to convert one body to plain text', FAST_BUCKETS)
+FORMAT_SECONDS = metrics.histogram(
+    'outlook_format_seconds', 'Time to format a tool response', FAST_BUCKETS + (2.5, 10.0),
+    label_names=('tool',))
+SERIALIZE_SECONDS = metrics.histogram(
+    'outlook_serialize_seconds', 'Time to encode a tool response as JSON', FAST_BUCKETS + (2.5, 10.0),
+    label_names=('tool',))
+ATTACHMENT_SAVE_SECONDS = metrics.histogram(
+    'outlook_attachment_save_seconds', 'Time for Attachment.SaveAsFile to write one attachment')
+TOOL_SECONDS = metrics.histogram(
+    'outlook_tool_seconds', 'Total time of a tool call', label_names=('tool',))
+
+COM_OPERATIONS = metrics.counter(
+    'outlook_com_operations_total', 'Outlook object model operations issued, by kind',
+    label_names=('operation',))
+FALLBACKS = metrics.counter(
+    'outlook_fallbacks_total', 'Searches that fell back from the preferred method, by kind',
+    label_names=('kind',))
@@ -1,57 +1,221 @@
 """High-performance Outlook client for mailbox access and email search."""
 
-import win32com.client
+import base64
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, List, Dict, Any, Optional, Tuple, Union
 import logging
-import pythoncom
+import mimetypes
+import os
 import re
+import sys
 import time
 import threading
-from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, TimeoutError as FutureTimeoutError, wait
+import itertools
 import queue
-import uuid
+from collections import deque
 
 from ..config.config_reader import config
+from .attachment_store import AttachmentStore
+from .body_cache import BodyCache
+from .com_worker_pool import ComWorkerContext, ComWorkerPool
+from .dasl import SearchFilters, phrase_filter, phrases_of, subject_filter
+from .folder_tree import FolderNode, FolderTree, FolderTreeCache, build_tree
+from .mail_backend import MailBackend, create_backend
+from .metrics import (ATTACHMENT_SAVE_SECONDS, COM_OPERATIONS, CONNECT_SECONDS, FALLBACKS,
+                      ITEM_EXTRACT_SECONDS, metrics, SEARCH_WAIT_SECONDS)
+from .search_cache import SearchCache
+from .supervisor import ConnectionSupervisor, backoff_delay
+from .search_events import SearchWait, wait_for_search
+from .table_extractor import PR_INTERNET_MESSAGE_ID, TableExtractor
+from .text_normalizer import read_item_text
+
+if TYPE_CHECKING:  # sqlite3 is only loaded when the local index is enabled
+    from .mail_index import MailIndex
 
-logging.basicConfig(
-    level=logging.WARNING,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    force=True  # <- overrides any prior basicConfig
-)
 logger = logging.getLogger(__name__)
 
+# Settings that change how bodies are read; cached bodies are dropped when they change
+BODY_SETTINGS = frozenset({'max_body_chars', 'clean_html_content', 'prefer_html_body'})
+
+# Body settings that change the untruncated bodies stored in the local index
+INDEXED_BODY_SETTINGS = BODY_SETTINGS - {'max_body_chars'}
+
+# Settings that change search results; cached searches are dropped when they change
+SEARCH_SETTINGS = BODY_SETTINGS | {
+    'shared_mailbox_email', 'max_search_results', 'max_recipients_display',
+    'include_sent_items', 'include_deleted_items', 'search_all_folders',
+    'folder_include_patterns', 'folder_exclude_patterns', 'local_index_enabled',
+}
+
+PERSONAL_MAILBOX = 'personal'
+
+# Longest a warm-up job waits for the other workers to take theirs
+WARM_UP_BARRIER_SECONDS = 1.0
+
+# MIME type of an attachment as recorded by the sender's client
+PR_ATTACH_MIME_TAG = "http://schemas.microsoft.com/mapi/proptag/0x370E001F"
+
+# OlAttachmentType values
+ATTACHMENT_TYPES = {1: 'by_value', 4: 'by_reference', 5: 'embedded_item', 6: 'ole'}
+
+# MIME types returned as text by get_attachment (besides text/*)
+TEXT_MIME_TYPES = frozenset({'application/json', 'application/xml', 'application/x-ndjson',
+                             'application/csv', 'application/x-yaml'})
+
+_WORDS = re.compile(r'\w+')
+
+
+def _phrase_words(text: Optional[str]) -> str:
+    """Lower-case words of a text, space-delimited, for whole-word phrase containment."""
+    return ' ' + ' '.join(_WORDS.findall((text or '').lower())) + ' '
+
+
+def _is_text(mime_type: Optional[str]) -> bool:
+    mime_type = (mime_type or '').split(';')[0].strip().lower()
+    return mime_type.startswith('text/') or mime_type in TEXT_MIME_TYPES
+
+
+def _utf8_boundary(data: bytes, end_of_file: bool) -> int:
+    """Length of ``data`` without a UTF-8 character cut off at its end."""
+    if end_of_file:
+        return len(data)
+    start = len(data) - 1
+    # Step back over continuation bytes to the lead byte of the last character
+    while start >= 0 and len(data) - start <= 3 and data[start] & 0xC0 == 0x80:
+        start -= 1
+    if start < 0 or data[start] < 0xC0:
+        return len(data)
+    needed = 2 if data[start] < 0xE0 else 3 if data[start] < 0xF0 else 4
+    return len(data) if len(data) - start >= needed else start
+
+
+def _internet_message_id(item) -> str:
+    """Message-ID header of an item, or '' when the store does not provide it."""
+    try:
+        return item.PropertyAccessor.GetProperty(PR_INTERNET_MESSAGE_ID) or ''
+    except Exception:
+        return ''
+
+
+def _location(email: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'mailbox_type': email.get('mailbox_type'),
+        'mailbox_address': email.get('mailbox_address'),
+        'folder_name': email.get('folder_name'),
+        'entry_id': email.get('entry_id'),
+    }
+
+
+def _collapse_copies(emails: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """First ``limit`` distinct messages of ``emails``, by Internet Message-ID.
+    
+    Later copies of a kept message are not returned; each is added to the
+    ``locations`` of the kept copy, which lists the kept copy first.
+    """
+    kept = []
+    by_message_id = {}
+    for email in emails:
+        message_id = email.get('internet_message_id')
+        first = by_message_id.get(message_id) if message_id else None
+        if first is not None:
+            if first.get('entry_id') != email.get('entry_id'):
+                first.setdefault('locations', [_location(first)]).append(_location(email))
+            continue
+        if len(kept) >= limit:
+            continue  # copies of kept messages further down are still recorded
+        email.pop('locations', None)
+        kept.append(email)
+        if message_id:
+            by_message_id[message_id] = email
+    return kept
+
+
+def _from_index(email: Dict[str, Any]) -> Dict[str, Any]:
+    """Index emails of shared mailboxes carry the address as mailbox_type."""
+    if email['mailbox_type'] != PERSONAL_MAILBOX:
+        email['mailbox_address'] = email['mailbox_type']
+        email['mailbox_type'] = 'shared'
+    return email
+
+
+def _newest_first(email: Dict[str, Any]):
+    # EntryID keeps ties independent of the order mailboxes answered in
+    return email.get('received_time', datetime.min), email.get('entry_id', '')
+
+
 class OutlookClient:
     """High-performance client for accessing Outlook mailboxes with optimized search."""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[MailBackend] = None,
+                 mail_index: Optional['MailIndex'] = None):
+        self.backend = backend or create_backend()
         self.outlook = None
         self.namespace = None
         self.connected = False
-        self._search_cache = {}  # Cache for search results
-        self._folder_cache = {}  # Cache for folder references
-        self._shared_recipient_cache = None  # Cache for resolved shared recipient
+        self._search_cache = SearchCache()  # TTL/LRU cache for search results
+        self._body_cache = BodyCache()  # Processed bodies by EntryID and LastModificationTime
+        self._folder_trees = FolderTreeCache()  # Folder trees by StoreID and root EntryID
+        self._attachment_store = None  # Extracted attachments on disk, created on first use
+        self._worker_pool = None  # Persistent COM workers, started on first search
+        self._worker_pool_lock = threading.Lock()
+        self.search_waits = deque(maxlen=100)  # Recent AdvancedSearch completion waits
+        self._mail_index = mail_index  # Local full-text index, created on demand if enabled
+        self._index_pool = None  # One COM worker for index syncs, apart from the search workers
+        self._index_syncs = {}  # Latest index sync (crawl or incremental) by mailbox type
+        self._index_sync_lock = threading.Lock()  # Guards checking and submitting _index_syncs
+        self._index_folders = {}  # (folder tree, indexed folder EntryIDs) of the last sync, by mailbox type
         self._connection_retry_count = 0
         self._max_retries = config.get_int('max_connection_retries', 3)
+        self.supervisor: Optional[ConnectionSupervisor] = None  # Started by start_supervisor()
+        config.add_listener(self._on_config_change)
+    
+    def _on_config_change(self, changed: set):
+        """Drop cached state that depends on changed settings."""
+        if changed & BODY_SETTINGS:
+            self._body_cache.clear()
+        if changed & SEARCH_SETTINGS:
+            self._search_cache.clear()
+        if 'shared_mailbox_email' in changed:
+            self._folder_trees.invalidate()
+        if changed & INDEXED_BODY_SETTINGS and self._mail_index is not None:
+            self._recrawl_index()
+    
+    def _recrawl_index(self) -> None:
+        """Make the next sync of every mailbox re-read all of its items.
+        
+        The index is reset on the index worker once a running sync has
+        finished; until then the reset counts as a running sync of every
+        mailbox, so searches do not use the bodies it is about to replace.
+        """
+        with self._index_sync_lock:
+            reset = self.index_pool.submit(lambda context: self._mail_index.invalidate())
+            for mailbox in [*self._index_syncs, *self.select_mailboxes()]:
+                self._index_syncs[mailbox] = reset
     
     def connect(self, retry_attempt: int = 0) -> bool:
-        """Connect to Outlook application with retry logic."""
+        """Connect to Outlook application, retrying with jittered exponential backoff."""
+        attempt = retry_attempt
+        while not self.connect_once(attempt):
+            if attempt >= self._max_retries - 1:
+                return False
+            wait_time = backoff_delay(attempt, 1.0, 30.0)  # about 1s, 2s, 4s
+            logger.info(f"Retrying connection in {wait_time:.1f} seconds...")
+            time.sleep(wait_time)
+            attempt += 1
+        return True
+    
+    def connect_once(self, attempt: int = 0) -> bool:
+        """One attempt to attach to Outlook and open the MAPI namespace."""
         try:
             logger.info("Connecting to Outlook...")
             start_time = time.time()
             
             # Initialize COM for thread
-            pythoncom.CoInitialize()
+            self.backend.initialize_thread()
             
-            # Try to connect to existing Outlook instance first (much faster)
-            try:
-                self.outlook = win32com.client.GetActiveObject("Outlook.Application")
-                logger.info("Connected to existing Outlook instance")
-            except:
-                # Fall back to creating new instance
-                logger.info("No existing Outlook instance, launching new one...")
-                self.outlook = win32com.client.Dispatch("Outlook.Application")
+            # Attach to a running Outlook instance or launch one
+            self.outlook = self.backend.get_application()
             
             self.namespace = self.outlook.GetNamespace("MAPI")
             
@@ -66,174 +230,590 @@ class OutlookClient:
             
             self.connected = True
             connection_time = time.time() - start_time
+            CONNECT_SECONDS.observe(connection_time)
             logger.info(f"Successfully connected to Outlook in {connection_time:.2f} seconds")
             return True
         except Exception as e:
-            logger.error(f"Failed to connect to Outlook (attempt {retry_attempt + 1}): {e}")
+            logger.error(f"Failed to connect to Outlook (attempt {attempt + 1}): {e}")
             self.connected = False
-            
-            # Implement exponential backoff retry
-            if retry_attempt < self._max_retries - 1:
-                wait_time = (2 ** retry_attempt) * 1  # 1s, 2s, 4s
-                logger.info(f"Retrying connection in {wait_time} seconds...")
-                time.sleep(wait_time)
-                return self.connect(retry_attempt + 1)
-            
             return False
     
+    def ensure_connected(self) -> bool:
+        """Whether Outlook is connected, connecting first if needed.
+        
+        While the supervisor runs it owns (re)connecting: callers wake it and
+        wait up to ``connect_wait_seconds`` instead of sleeping through a
+        backoff of their own.
+        """
+        if self.connected:
+            return True
+        if self.supervisor is not None and self.supervisor.running:
+            return self.supervisor.wait_connected(config.get_int('connect_wait_seconds', 15))
+        return self.connect()
+    
+    def is_alive(self) -> bool:
+        """Cheap liveness probe of the client's Outlook session."""
+        if not self.connected or self.namespace is None:
+            return False
+        try:
+            self.namespace.CurrentProfileName
+            return True
+        except Exception as e:
+            logger.warning(f"Outlook liveness probe failed: {e}")
+            return False
+    
+    def mark_disconnected(self) -> None:
+        """Forget a session that stopped responding, including the workers' sessions."""
+        self.connected = False
+        self.outlook = None
+        self.namespace = None
+        for pool in (self._worker_pool, self._index_pool):
+            if pool is not None:
+                pool.reset_sessions()
+    
+    def start_supervisor(self) -> ConnectionSupervisor:
+        """Connect, warm up and watch the session in the background."""
+        if self.supervisor is None:
+            self.supervisor = ConnectionSupervisor(self)
+        self.supervisor.start()
+        return self.supervisor
+    
+    def warm_up(self) -> Dict[str, Any]:
+        """Open every COM worker's Outlook session ahead of the first search.
+        
+        Each worker resolves the configured mailboxes, opens their Inboxes and,
+        with ``search_all_folders``, reads their folder trees into the cache.
+        One job per worker waits on a barrier, so no worker takes two jobs;
+        the wait is short, so workers busy with searches do not hold up the
+        others for long.
+        """
+        mailboxes = self.select_mailboxes()
+        pool = self.worker_pool
+        barrier = threading.Barrier(pool.size, timeout=WARM_UP_BARRIER_SECONDS)
+        futures = [pool.submit(self._warm_up_job, mailboxes, barrier) for _ in range(pool.size)]
+        failed = set()
+        for future in futures:
+            try:
+                failed.update(future.result())
+            except Exception as e:
+                logger.error(f"Warm-up job failed: {e}")
+        return {
+            "workers": pool.size,
+            "mailboxes": len(mailboxes),
+            "unavailable": sorted(failed),
+            "folder_trees": self._folder_trees.stats()["stores"],
+        }
+    
+    def _warm_up_job(self, context: ComWorkerContext, mailboxes: List[str],
+                     barrier: threading.Barrier) -> List[str]:
+        failed = []
+        for mailbox in mailboxes:
+            try:
+                if mailbox == PERSONAL_MAILBOX:
+                    inbox = context.personal_inbox()
+                else:
+                    inbox = context.shared_inbox(mailbox)
+                if config.settings.search_all_folders:
+                    self._folder_tree(inbox)
+            except Exception as e:
+                logger.warning(f"Warm-up of {mailbox} mailbox failed: {e}")
+                if mailbox != PERSONAL_MAILBOX:
+                    context.forget_shared_inbox(mailbox)
+                failed.append(mailbox)
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            pass  # a worker was busy; it warms up on its first job instead
+        return failed
+    
+    @property
+    def worker_pool(self) -> ComWorkerPool:
+        """Persistent COM worker pool used for mailbox searches."""
+        with self._worker_pool_lock:
+            if self._worker_pool is None:
+                self._worker_pool = ComWorkerPool(self.backend)
+            return self._worker_pool
+    
+    @property
+    def index_pool(self) -> ComWorkerPool:
+        """Single COM worker running local index syncs, so crawls never hold up searches."""
+        with self._worker_pool_lock:
+            if self._index_pool is None:
+                self._index_pool = ComWorkerPool(self.backend, size=1)
+            return self._index_pool
+    
+    @property
+    def mail_index(self) -> Optional['MailIndex']:
+        """Local full-text index, or None when local_index_enabled is off."""
+        if self._mail_index is None and config.get_bool('local_index_enabled', False):
+            with self._worker_pool_lock:
+                if self._mail_index is None:
+                    from .mail_index import MailIndex
+                    self._mail_index = MailIndex()
+        return self._mail_index
+    
+    def build_index(self, mailboxes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Crawl or incrementally sync mailboxes into the local index."""
+        if self.mail_index is None:
+            raise RuntimeError("Local index is disabled (local_index_enabled=false)")
+        if mailboxes is None:
+            mailboxes = self.select_mailboxes()
+        futures = {}
+        with self._index_sync_lock:
+            for mailbox in mailboxes:
+                running = self._index_syncs.get(mailbox)
+                if running is None or running.done():
+                    running = self._index_syncs[mailbox] = self.index_pool.submit(
+                        self._sync_index_job, mailbox
+                    )
+                futures[mailbox] = running
+        return {m: future.result() for m, future in futures.items()}
+    
+    def select_mailboxes(self, include_personal: bool = True, include_shared: bool = True,
+                         mailboxes: Optional[List[str]] = None) -> List[str]:
+        """Mailboxes to search: 'personal' and/or configured shared addresses.
+        
+        ``mailboxes`` picks a subset by name ('personal', 'shared' for all shared
+        mailboxes, or a shared address) and takes precedence over the flags.
+        """
+        shared = list(config.settings.shared_mailboxes)
+        if not mailboxes:
+            return ([PERSONAL_MAILBOX] if include_personal else []) + (shared if include_shared else [])
+        
+        by_address = {address.lower(): address for address in shared}
+        selected = []
+        for name in mailboxes:
+            key = (name or '').strip().lower()
+            if key == PERSONAL_MAILBOX:
+                selected.append(PERSONAL_MAILBOX)
+            elif key == 'shared':
+                selected.extend(shared)
+            elif key in by_address:
+                selected.append(by_address[key])
+            else:
+                known = ', '.join([PERSONAL_MAILBOX, 'shared'] + shared)
+                raise ValueError(f"Unknown mailbox '{name}'; configured mailboxes: {known}")
+        return list(dict.fromkeys(selected))
+    
+    def _indexed_mailboxes(self, mailbox_types: List[str],
+                           filters: Optional[SearchFilters] = None) -> List[str]:
+        """Mailboxes the local index can answer for, syncing them if they are stale.
+        
+        Syncs run on the index worker. Until a mailbox's initial crawl has
+        completed, and while a sync of it is running, it is searched live; a
+        stale mailbox is synced first, or searched live if that sync does not
+        finish within ``mailbox_search_timeout_seconds``. So is a mailbox
+        whose ``filters.folders`` select folders that are not indexed.
+        """
+        index = self.mail_index
+        if index is None:
+            return []
+        
+        interval = config.get_int('local_index_sync_interval_seconds', 60)
+        timeout = config.get_int('mailbox_search_timeout_seconds', 60)
+        ready = []
+        for mailbox_type in mailbox_types:
+            # One search starts a sync; concurrent searches see it running
+            with self._index_sync_lock:
+                running = self._index_syncs.get(mailbox_type)
+                if running is not None and not running.done():
+                    continue
+                last_synced = index.last_synced(mailbox_type)
+                if last_synced is not None and time.time() - last_synced <= interval:
+                    ready.append(mailbox_type)
+                    continue
+                sync = self._index_syncs[mailbox_type] = self.index_pool.submit(
+                    self._sync_index_job, mailbox_type
+                )
+            if last_synced is None:
+                # Initial bulk crawl runs in the background; COM answers meanwhile
+                logger.info(f"Started initial index crawl of {mailbox_type} mailbox")
+                continue
+            try:
+                sync.result(timeout=timeout if timeout > 0 else None)
+            except FutureTimeoutError:
+                logger.info(f"Index sync of {mailbox_type} still running; searching it live")
+                continue
+            except Exception as e:
+                logger.warning(f"Incremental index sync of {mailbox_type} failed: {e}")
+                continue
+            ready.append(mailbox_type)
+        return [mailbox_type for mailbox_type in ready if self._index_covers(mailbox_type, filters)]
+    
+    def _index_covers(self, mailbox_type: str, filters: Optional[SearchFilters]) -> bool:
+        """Whether every folder a live search with ``filters`` would cover is indexed."""
+        if not filters or not filters.folders:
+            return True
+        tree, indexed = self._index_folders.get(mailbox_type, (None, ()))
+        if tree is None:
+            return False
+        selected = tree.select(include=filters.folders, include_sent=True, include_deleted=True)
+        return all(node.entry_id in indexed for node in selected)
+    
+    def _sync_index_job(self, context: ComWorkerContext, mailbox: str) -> Dict[str, Any]:
+        """Sync one mailbox into the local index on a COM worker.
+        
+        Items are stored under the mailbox name ('personal' or the shared address).
+        """
+        if mailbox == PERSONAL_MAILBOX:
+            inbox = context.personal_inbox()
+        else:
+            inbox = context.shared_inbox(mailbox)
+        
+        # The same folders a live search of the mailbox would cover
+        folders = [FolderNode.from_folder(inbox)]
+        if config.settings.search_all_folders:
+            folders = self._folders_to_search(inbox, folders[0])
+        
+        from .mail_index import OutlookMailSource
+        source = OutlookMailSource(context.namespace, mailbox, inbox.StoreID, folders,
+                                   lambda item: self._read_body(item, truncate=False))
+        # Deletions are only found by listing every folder, so that runs less often
+        last_reconciled = self.mail_index.last_reconciled(mailbox)
+        reconcile = (last_reconciled is None or time.time() - last_reconciled
+                     > config.get_int('local_index_reconcile_interval_seconds', 3600))
+        stats = self.mail_index.sync(source, reconcile=reconcile)
+        
+        # Searches with a folders filter use the index only when it holds every folder they select
+        try:
+            self._index_folders[mailbox] = (self._folder_tree(inbox),
+                                            {node.entry_id for node in folders})
+        except Exception as e:
+            logger.error("Error reading folder tree: %s", e)
+            self._index_folders.pop(mailbox, None)
+        return stats
+    
     def check_access(self) -> Dict[str, Any]:
         """Check access to personal and shared mailboxes."""
-        if not self.connected:
-            if not self.connect():
-                return {"error": "Could not connect to Outlook"}
+        if not self.ensure_connected():
+            return {"error": "Could not connect to Outlook"}
         
         result = {
             "outlook_connected": True,
             "personal_accessible": False,
             "shared_accessible": False,
-            "shared_configured": bool(config.get('shared_mailbox_email')),
+            "shared_configured": bool(config.settings.shared_mailboxes),
             "retention_personal_months": config.get_int('personal_retention_months', 6),
             "retention_shared_months": config.get_int('shared_retention_months', 12),
             "errors": []
         }
         
-        # Test personal mailbox
+        # Each COM object is used on the thread that created it, so a worker
+        # opens the Inboxes with its own session
         try:
-            personal_inbox = self.namespace.GetDefaultFolder(6)  # 6 = Inbox
-            if personal_inbox:
-                result["personal_accessible"] = True
-                result["personal_name"] = self._get_store_display_name(personal_inbox)
+            probes = self.worker_pool.submit(self._check_access_job, self.select_mailboxes()).result()
         except Exception as e:
-            result["errors"].append(f"Personal mailbox error: {str(e)}")
+            result["errors"].append(f"Mailbox check failed: {str(e)}")
+            probes = {}
         
-        # Test shared mailbox
-        shared_email = config.get('shared_mailbox_email')
-        if shared_email:
-            try:
-                # Use cached recipient if available
-                if not self._shared_recipient_cache:
-                    self._shared_recipient_cache = self.namespace.CreateRecipient(shared_email)
-                    self._shared_recipient_cache.Resolve()
-                
-                if self._shared_recipient_cache.Resolved:
-                    shared_inbox = self.namespace.GetSharedDefaultFolder(self._shared_recipient_cache, 6)
-                    if shared_inbox:
-                        result["shared_accessible"] = True
-                        result["shared_name"] = self._get_store_display_name(shared_inbox)
-            except Exception as e:
-                result["errors"].append(f"Shared mailbox error: {str(e)}")
-                self._shared_recipient_cache = None  # Clear cache on error
+        name, error = probes.get(PERSONAL_MAILBOX, (None, None))
+        if name is not None:
+            result["personal_accessible"] = True
+            result["personal_name"] = name
+        elif error:
+            result["errors"].append(f"Personal mailbox error: {error}")
+        
+        shared_results = []
+        for shared_email in config.settings.shared_mailboxes:
+            shared = {"email": shared_email, "accessible": False}
+            name, error = probes.get(shared_email, (None, None))
+            if name is not None:
+                shared["accessible"] = True
+                shared["name"] = name
+            elif error:
+                result["errors"].append(f"Shared mailbox error ({shared_email}): {error}")
+            shared_results.append(shared)
+        
+        if shared_results:
+            result["shared_mailboxes"] = shared_results
+            result["shared_accessible"] = all(shared["accessible"] for shared in shared_results)
+            if shared_results[0].get("name"):
+                result["shared_name"] = shared_results[0]["name"]
+        
+        if self.supervisor is not None:
+            result["supervisor"] = self.supervisor.stats()
         
         return result
     
+    def _check_access_job(self, context: ComWorkerContext,
+                          mailboxes: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """(store display name, error) of each mailbox's Inbox, opened on a COM worker."""
+        probes = {}
+        for mailbox in mailboxes:
+            try:
+                if mailbox == PERSONAL_MAILBOX:
+                    inbox = context.personal_inbox()
+                else:
+                    inbox = context.shared_inbox(mailbox)
+                probes[mailbox] = (self._get_store_display_name(inbox), None)
+            except Exception as e:
+                if mailbox != PERSONAL_MAILBOX:
+                    context.forget_shared_inbox(mailbox)
+                probes[mailbox] = (None, str(e))
+        return probes
+    
     def search_emails(self, search_text: str, 
                      include_personal: bool = True, 
-                     include_shared: bool = True) -> List[Dict[str, Any]]:
-        """Search emails in both subject and body using exact phrase matching with parallel execution."""
-        if not self.connected:
-            if not self.connect():
-                return []
+                     include_shared: bool = True,
+                     include_body: bool = True,
+                     mailboxes: Optional[List[str]] = None,
+                     filters: Optional[SearchFilters] = None,
+                     timed_out: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Search emails in both subject and body using exact phrase matching with parallel execution.
+
+        With ``include_body=False`` only headers are read (no MailItem is opened);
+        ``body`` is None until load_bodies() fills it in. ``mailboxes`` limits
+        the search to some of the configured mailboxes (see select_mailboxes).
+        ``filters`` (date range, sender, importance, flags, folders) become
+        part of the search query, so Outlook only returns matching items; with
+        filters the search text may be empty. Results of all mailboxes are
+        merged newest first and capped at ``max_search_results`` overall.
+        Mailboxes whose search timed out are appended to ``timed_out``; such
+        partial results are not cached.
+        """
+        selected = self.select_mailboxes(include_personal, include_shared, mailboxes)
+        if not self.ensure_connected():
+            return []
         
         # Enhanced cache key including max_results
-        max_results = config.get_int('max_search_results', 500)
-        cache_key = f"{search_text}_{include_personal}_{include_shared}_{max_results}"
-        
-        if cache_key in self._search_cache:
-            # Check cache age (simple time-based invalidation)
-            cache_entry = self._search_cache[cache_key]
-            if time.time() - cache_entry['timestamp'] < 3600:  # 1 hour cache
-                logger.info(f"Returning cached results for '{search_text}'")
-                return cache_entry['data']
-        
-        all_emails = []
-        
-        # Use parallel search for multiple mailboxes
-        if include_personal and include_shared and config.get('shared_mailbox_email'):
-            # Parallel search using threading
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                futures = []
-                
-                # Submit personal mailbox search
-                if include_personal:
-                    futures.append(
-                        executor.submit(
-                            self._search_mailbox_wrapper,
-                            'personal',
-                            search_text,
-                            max_results
-                        )
-                    )
-                
-                # Submit shared mailbox search
-                if include_shared:
-                    futures.append(
-                        executor.submit(
-                            self._search_mailbox_wrapper,
-                            'shared',
-                            search_text,
-                            max_results
-                        )
-                    )
-                
-                # Collect results
-                for future in as_completed(futures):
-                    try:
-                        emails = future.result()
-                        all_emails.extend(emails)
-                    except Exception as e:
-                        logger.error(f"Error in parallel search: {e}")
+        max_results = config.settings.max_search_results
+        cache_key = f"{search_text}_{'|'.join(selected)}_{max_results}_{include_body}"
+        if filters:
+            cache_key += f"_{filters.cache_key()}"
+        
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached results for '{search_text}'")
+            return cached
+        
+        missing = []
+        limited_results = self._search_merged(search_text, selected, max_results,
+                                              include_body, filters, missing)
+        
+        # Cache complete results (evicted by TTL, entry count and estimated size)
+        if missing:
+            logger.info(f"Not caching results for '{search_text}'; timed out: {', '.join(missing)}")
+            if timed_out is not None:
+                timed_out.extend(missing)
         else:
-            # Sequential search for single mailbox
-            if include_personal:
-                personal_emails = self._search_mailbox_comprehensive(
-                    self.namespace.GetDefaultFolder(6), 
-                    search_text, 
-                    'personal',
-                    max_results
+            self._search_cache.put(cache_key, limited_results)
+        self._body_cache.remember(limited_results)
+        
+        return limited_results
+    
+    def search_many(self, queries: List[str],
+                    include_personal: bool = True,
+                    include_shared: bool = True,
+                    include_body: bool = True,
+                    mailboxes: Optional[List[str]] = None,
+                    filters: Optional[SearchFilters] = None,
+                    max_per_query: Optional[int] = None,
+                    timed_out: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Search several phrases with one combined search per mailbox and folder.
+        
+        The phrases are OR'ed into a single DASL filter, so every folder is
+        searched once instead of once per phrase, and an email matching
+        several phrases is extracted once and shared by their result lists.
+        Hits are assigned to the phrases they contain, by subject and, where
+        the subject does not settle it, by body. Each phrase keeps its newest
+        ``max_per_query`` emails (default ``max_results_per_query``); a phrase
+        that may have been crowded out of a full combined result by the
+        others is searched again on its own. Mailboxes whose search timed
+        out are appended to ``timed_out``.
+        """
+        phrases = list(dict.fromkeys(phrases_of(queries)))
+        max_queries = config.get_int('max_queries_per_search', 30)
+        if len(phrases) > max_queries:
+            raise ValueError(f"At most {max_queries} queries can be searched at once")
+        selected = self.select_mailboxes(include_personal, include_shared, mailboxes)
+        if not phrases:
+            return {}
+        if not self.ensure_connected():
+            return {phrase: [] for phrase in phrases}
+        
+        per_query = max(1, max_per_query or config.get_int('max_results_per_query', 50))
+        capacity = per_query * len(phrases)
+        missing = []
+        hits = self._search_merged(phrases, selected, capacity, False, filters, missing)
+        results = self._assign_to_queries(hits, phrases, per_query)
+        logger.info(f"Combined search for {len(phrases)} queries found {len(hits)} emails")
+        
+        by_id = {email['entry_id']: email for email in hits}
+        if len(hits) >= capacity:
+            for phrase in phrases:
+                if len(results[phrase]) < per_query:
+                    found = self._search_merged(phrase, selected, per_query, False, filters, missing)
+                    results[phrase] = [by_id.setdefault(email['entry_id'], email) for email in found]
+        
+        if timed_out is not None:
+            timed_out.extend(dict.fromkeys(missing))
+        
+        emails = list({email['entry_id']: email
+                       for found in results.values() for email in found}.values())
+        self._body_cache.remember(emails)
+        if include_body:
+            self.load_bodies(emails)
+        else:
+            # Bodies read to assign hits stay out of header-only results
+            headers = {email['entry_id']: dict(email, body=None) for email in emails}
+            results = {phrase: [headers[email['entry_id']] for email in found]
+                       for phrase, found in results.items()}
+        return results
+    
+    def scan_headers(self, search_text: str, sink: Callable[[Dict[str, Any]], None],
+                     include_personal: bool = True,
+                     include_shared: bool = True,
+                     mailboxes: Optional[List[str]] = None,
+                     filters: Optional[SearchFilters] = None,
+                     timed_out: Optional[List[str]] = None) -> int:
+        """Pass the headers of every matching email to ``sink``; returns how many were passed.
+        
+        Unlike search_emails there is no result cap and nothing is collected,
+        sorted or cached: each email goes to ``sink`` as soon as its Table
+        row (or index row) is read, and no MailItem is opened, so ``body`` is
+        None. Copies of a message in several mailboxes or folders are all
+        passed. ``sink`` runs on the COM workers, one call at a time, and is
+        not called after the scan has returned, also not by the search of a
+        mailbox that timed out; such mailboxes are appended to ``timed_out``.
+        """
+        selected = self.select_mailboxes(include_personal, include_shared, mailboxes)
+        if not self.ensure_connected():
+            return 0
+        
+        lock = threading.Lock()
+        state = {'open': True, 'count': 0}
+        
+        def deliver(email):
+            with lock:
+                if state['open']:
+                    state['count'] += 1
+                    sink(email)
+        
+        indexed = self._indexed_mailboxes(selected, filters)
+        if indexed:
+            self.mail_index.scan(search_text, indexed, filters, lambda email: deliver(_from_index(email)))
+        remaining = [mailbox for mailbox in selected if mailbox not in indexed]
+        self._fan_out(remaining, search_text, sys.maxsize, False, filters, deliver, timed_out)
+        
+        with lock:
+            state['open'] = False
+        logger.info(f"Header scan for '{search_text}' passed {state['count']} emails")
+        return state['count']
+    
+    def _assign_to_queries(self, emails: List[Dict[str, Any]], phrases: List[str],
+                           per_query: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Newest ``per_query`` emails (newest first) containing each phrase."""
+        keys = [(phrase, _phrase_words(phrase)) for phrase in phrases]
+        results: Dict[str, List[Dict[str, Any]]] = {phrase: [] for phrase in phrases}
+        if len(phrases) == 1:
+            results[phrases[0]] = emails[:per_query]
+            return results
+        
+        # Bodies are only needed when the subject does not contain every phrase
+        undecided = [email for email in emails
+                     if not all(key in _phrase_words(email.get('subject')) for _, key in keys)]
+        self.load_bodies(undecided)
+        
+        unassigned = 0
+        for email in emails:
+            text = _phrase_words(email.get('subject')) + _phrase_words(email.get('body'))
+            matched = False
+            for phrase, key in keys:
+                if key in text:
+                    matched = True
+                    if len(results[phrase]) < per_query:
+                        results[phrase].append(email)
+            unassigned += not matched
+        if unassigned:
+            logger.info(f"{unassigned} emails of a combined search matched no query text")
+        return results
+    
+    def _search_merged(self, search_text: Union[str, List[str]], selected: List[str],
+                       max_results: int, include_body: bool,
+                       filters: Optional[SearchFilters],
+                       timed_out: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Newest ``max_results`` distinct emails of the selected mailboxes, from the index or Outlook.
+        
+        Mailboxes are searched for headers only. Copies of one message in
+        several mailboxes or folders (same Internet Message-ID) are collapsed
+        into one email listing every copy under ``locations``, and bodies are
+        then read for the emails that are returned and nothing else.
+        """
+        results = []
+        
+        # Answer synced mailboxes from the local index
+        indexed = self._indexed_mailboxes(selected, filters)
+        if indexed:
+            index_emails = [_from_index(email)
+                            for email in self.mail_index.search(search_text, indexed, max_results,
+                                                                filters, include_body)]
+            results.append(index_emails)
+            logger.info(f"Found {len(index_emails)} emails in local index ({', '.join(indexed)})")
+        
+        # Search the remaining mailboxes on the persistent COM workers in parallel
+        remaining = [mailbox for mailbox in selected if mailbox not in indexed]
+        results.extend(self._fan_out(remaining, search_text, max_results, False, filters,
+                                     timed_out=timed_out))
+        
+        # Newest max_results distinct messages across all mailboxes
+        emails = _collapse_copies(sorted(itertools.chain.from_iterable(results),
+                                         key=_newest_first, reverse=True), max_results)
+        if include_body:
+            self.load_bodies(emails)
+        return emails
+    
+    def _fan_out(self, mailboxes: List[str], search_text: str, max_results: int,
+                 include_body: bool,
+                 filters: Optional[SearchFilters] = None,
+                 sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 timed_out: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+        """Search mailboxes on the COM workers, at most ``max_parallel_mailbox_searches`` at a time.
+        
+        A mailbox that has not answered ``mailbox_search_timeout_seconds`` after
+        its search was queued is left out (and cancelled if it has not started)
+        and appended to ``timed_out``.
+        With a ``sink`` the emails are passed to it on the workers instead of
+        being returned.
+        """
+        limit = max(1, config.get_int('max_parallel_mailbox_searches', 4))
+        timeout = config.get_int('mailbox_search_timeout_seconds', 60)
+        pending = deque(mailboxes)
+        running = {}  # future -> (mailbox, deadline)
+        results = []
+        
+        while pending or running:
+            while pending and len(running) < limit:
+                mailbox = pending.popleft()
+                future = self.worker_pool.submit(
+                    self._search_mailbox_job, mailbox, search_text, max_results,
+                    include_body=include_body, filters=filters, sink=sink
                 )
-                all_emails.extend(personal_emails)
-                logger.info(f"Found {len(personal_emails)} emails in personal mailbox")
+                running[future] = (mailbox, time.monotonic() + timeout if timeout > 0 else None)
             
-            if include_shared and config.get('shared_mailbox_email'):
+            deadlines = [deadline for _, deadline in running.values() if deadline is not None]
+            wait_seconds = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            done, _ = wait(running, timeout=wait_seconds, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                mailbox, _ = running.pop(future)
                 try:
-                    # Use cached recipient if available
-                    if not self._shared_recipient_cache:
-                        shared_email = config.get('shared_mailbox_email')
-                        self._shared_recipient_cache = self.namespace.CreateRecipient(shared_email)
-                        self._shared_recipient_cache.Resolve()
-                    
-                    if self._shared_recipient_cache.Resolved:
-                        shared_inbox = self.namespace.GetSharedDefaultFolder(self._shared_recipient_cache, 6)
-                        shared_emails = self._search_mailbox_comprehensive(
-                            shared_inbox,
-                            search_text,
-                            'shared',
-                            max_results - len(all_emails)
-                        )
-                        all_emails.extend(shared_emails)
-                        logger.info(f"Found {len(shared_emails)} emails in shared mailbox")
+                    emails = future.result()
+                    results.append(emails)
+                    if sink is None:
+                        logger.info(f"Found {len(emails)} emails in {mailbox} mailbox")
                 except Exception as e:
-                    logger.error(f"Error searching shared mailbox: {e}")
-                    self._shared_recipient_cache = None
-        
-        # Sort by received time (newest first)
-        all_emails.sort(key=lambda x: x.get('received_time', datetime.min), reverse=True)
-        
-        # Cache results with timestamp
-        limited_results = all_emails[:max_results]
-        self._search_cache[cache_key] = {
-            'data': limited_results,
-            'timestamp': time.time()
-        }
-        
-        # Limit cache size
-        if len(self._search_cache) > 100:
-            # Remove oldest entries
-            oldest_key = min(self._search_cache.keys(), 
-                           key=lambda k: self._search_cache[k].get('timestamp', 0))
-            del self._search_cache[oldest_key]
+                    logger.error(f"Error in parallel search of {mailbox} mailbox: {e}")
+            
+            now = time.monotonic()
+            for future, (mailbox, deadline) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    future.cancel()
+                    del running[future]
+                    logger.warning(f"Search of {mailbox} mailbox timed out after {timeout}s")
+                    if timed_out is not None:
+                        timed_out.append(mailbox)
         
-        return limited_results
+        return results
     
     def search_emails_by_subject(self, subject: str, 
                                 include_personal: bool = True, 
@@ -241,111 +821,388 @@ class OutlookClient:
         """Legacy method - redirects to search_emails for backward compatibility."""
         return self.search_emails(subject, include_personal, include_shared)
 
-    def _search_mailbox_wrapper(self, mailbox_type: str, search_text: str, 
-                                max_results: int) -> List[Dict[str, Any]]:
-        """Wrapper for parallel mailbox search with proper per-thread COM usage."""
-        # Explicit STA init for this thread
-        pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
+    def load_bodies(self, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fill in bodies of header-only search results, in place.
+
+        Bodies come from the body cache or the local index when the item's
+        LastModificationTime is unchanged; the rest are read on the COM
+        workers in batches of ``batch_processing_size``. Only the given emails are opened, so callers
+        paging through a large result set pay for the bodies of the current
+        page alone. Emails that cannot be opened get an empty body and an
+        ``error`` entry.
+        """
+        pending = []
+        for email in emails:
+            if email.get('body') is not None:
+                continue
+            cached = self._body_cache.get(email['entry_id'], email.get('last_modified'))
+            if cached is None:
+                pending.append(email)
+                continue
+            email['body'] = cached[0]
+            if email.get('attachments_count') is None:
+                email['attachments_count'] = cached[1]
+        if pending and self.mail_index is not None:
+            indexed = self.mail_index.bodies([email['entry_id'] for email in pending])
+            remaining = []
+            for email in pending:
+                body, last_modified = indexed.get(email['entry_id'], (None, None))
+                if body is not None and last_modified == email.get('last_modified'):
+                    email['body'] = body
+                else:
+                    remaining.append(email)
+            pending = remaining
+        if not pending:
+            return emails
+        if not self.ensure_connected():
+            return emails
+
+        batch_size = max(1, config.settings.batch_processing_size)
+        futures = [
+            self.worker_pool.submit(self._load_bodies_job, pending[i:i + batch_size])
+            for i in range(0, len(pending), batch_size)
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error loading email bodies: {e}")
+        return emails
+
+    def get_email_bodies(self, entry_ids: List[str]) -> List[Dict[str, Any]]:
+        """Bodies of the given items by EntryID, from the body cache or Outlook."""
+        emails = [
+            {
+                'entry_id': entry_id,
+                'body': None,
+                'attachments_count': None,
+                'last_modified': self._body_cache.version(entry_id),
+            }
+            for entry_id in dict.fromkeys(entry_ids) if entry_id
+        ]
+        return self.load_bodies(emails)
+
+    @property
+    def attachment_store(self) -> AttachmentStore:
+        """Disk cache of extracted attachments, opened on first use."""
+        if self._attachment_store is None:
+            with self._worker_pool_lock:
+                if self._attachment_store is None:
+                    self._attachment_store = AttachmentStore()
+        return self._attachment_store
+    
+    def list_attachments(self, entry_ids: List[str]) -> List[Dict[str, Any]]:
+        """Attachment metadata (name, size, MIME type) of the given items; no content is read.
+        
+        Items that cannot be opened get an ``error`` entry.
+        """
+        results = [{'entry_id': entry_id, 'subject': None, 'attachments': []}
+                   for entry_id in dict.fromkeys(entry_ids) if entry_id]
+        if not results:
+            return results
+        if not self.ensure_connected():
+            for result in results:
+                result['error'] = "Not connected to Outlook"
+            return results
+        
+        batch_size = max(1, config.settings.batch_processing_size)
+        futures = [
+            self.worker_pool.submit(self._list_attachments_job, results[i:i + batch_size])
+            for i in range(0, len(results), batch_size)
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error listing attachments: {e}")
+        return results
+    
+    def get_attachment(self, entry_id: str, index: int, offset: int = 0,
+                       max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """One chunk of an attachment's content, extracted into the attachment store.
+        
+        The first request for an attachment saves it with SaveAsFile on a COM
+        worker; later chunks, repeated requests and identical files attached to
+        other items are read from the store. Text attachments are returned as
+        text cut at a character boundary, others base64-encoded. Failures are
+        reported in an ``error`` entry.
+        """
+        result = {'entry_id': entry_id, 'index': index, 'offset': offset}
+        limit = config.get_int('max_attachment_chunk_kb', 1024) * 1024
+        chunk_size = max(1, min(max_bytes or config.get_int('attachment_chunk_kb', 256) * 1024, limit))
+        
+        store = self.attachment_store
+        ref = store.lookup(entry_id, index)
+        data = None
+        # A file evicted between the lookup and the read is extracted once more
+        for attempt in range(2):
+            if ref is None:
+                if not self.ensure_connected():
+                    result['error'] = "Not connected to Outlook"
+                    return result
+                try:
+                    ref = self.worker_pool.submit(self._save_attachment_job, entry_id, index).result()
+                except Exception as e:
+                    logger.error(f"Error extracting attachment {index} of {entry_id}: {e}")
+                    result['error'] = str(e)
+                    return result
+            result.update(ref)
+            
+            size = ref['size']
+            if offset > size:
+                result['error'] = f"offset {offset} is beyond the end of the attachment ({size} bytes)"
+                return result
+            try:
+                data = store.read(ref['sha256'], offset, chunk_size)
+                break
+            except FileNotFoundError as e:
+                if attempt:
+                    logger.error(f"Cached attachment {ref['sha256']} was evicted while reading it: {e}")
+                    result['error'] = str(e)
+                    return result
+                logger.info(f"Cached attachment {ref['sha256']} was evicted; extracting it again")
+                store.discard(ref['sha256'])
+                ref = None
+            except OSError as e:
+                logger.error(f"Error reading cached attachment {ref['sha256']}: {e}")
+                result['error'] = str(e)
+                return result
+        
+        end_of_file = offset + len(data) >= size
+        content = None
+        if _is_text(ref['mime_type']):
+            data = data[:_utf8_boundary(data, end_of_file)]
+            try:
+                content = data.decode('utf-8')
+                result['encoding'] = 'text'
+            except UnicodeDecodeError:
+                content = None  # not UTF-8 after all; sent as base64 below
+        if content is None:
+            content = base64.b64encode(data).decode('ascii')
+            result['encoding'] = 'base64'
+        result['length'] = len(data)
+        result['next_offset'] = None if offset + len(data) >= size else offset + len(data)
+        result['content'] = content
+        return result
+    
+    def attachment_store_stats(self) -> Dict[str, Any]:
+        """File, byte, hit and deduplication counters of the attachment store.
+        
+        Empty until the store is first used; reading statistics does not open it.
+        """
+        if self._attachment_store is None:
+            return {}
+        return self._attachment_store.stats()
+    
+    def _attachment_metadata(self, attachment, index: int) -> Dict[str, Any]:
+        """Name, size, type and MIME type of an Attachment, without reading its content."""
+        name = attachment.FileName or attachment.DisplayName or f"attachment-{index}"
+        attachment_type = ATTACHMENT_TYPES.get(attachment.Type, 'other')
+        mime_type = None
         try:
-            # Create Outlook COM objects *in this thread*
-            outlook = win32com.client.gencache.EnsureDispatch("Outlook.Application")
-            session = outlook.Session  # same as outlook.GetNamespace("MAPI")
+            mime_type = attachment.PropertyAccessor.GetProperty(PR_ATTACH_MIME_TAG) or None
+        except Exception:
+            pass  # not set by every client
+        if mime_type is None:
+            if attachment_type == 'embedded_item':
+                mime_type = 'application/vnd.ms-outlook'
+            else:
+                mime_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        return {
+            'name': name,
+            'size': attachment.Size,
+            'mime_type': mime_type,
+            'type': attachment_type,
+        }
+    
+    def _list_attachments_job(self, context: ComWorkerContext,
+                              results: List[Dict[str, Any]]) -> None:
+        """Open each item on a COM worker and read its attachments' metadata."""
+        store = self.attachment_store
+        for result in results:
+            try:
+                item = context.namespace.GetItemFromID(result['entry_id'])
+                COM_OPERATIONS.inc('open_item')
+                result['subject'] = item.Subject
+                attachments = item.Attachments
+                for index in range(1, attachments.Count + 1):
+                    metadata = self._attachment_metadata(attachments.Item(index), index)
+                    metadata['index'] = index
+                    metadata['sha256'] = store.known(result['entry_id'], index)
+                    result['attachments'].append(metadata)
+                item = attachments = None
+            except Exception as e:
+                logger.error(f"Error listing attachments of {result.get('entry_id')}: {e}")
+                result['error'] = str(e)
+    
+    def _save_attachment_job(self, context: ComWorkerContext, entry_id: str,
+                             index: int) -> Dict[str, Any]:
+        """Save one attachment into the store's spool on a COM worker; returns its metadata."""
+        item = context.namespace.GetItemFromID(entry_id)
+        COM_OPERATIONS.inc('open_item')
+        attachments = item.Attachments
+        if not 1 <= index <= attachments.Count:
+            raise ValueError(f"Item has no attachment {index} ({attachments.Count} attachments)")
+        attachment = attachments.Item(index)
+        metadata = self._attachment_metadata(attachment, index)
+        if metadata['type'] == 'by_reference':
+            raise ValueError(f"{metadata['name']} is a link to a file, not an attached copy")
+        max_mb = config.get_int('max_attachment_mb', 100)
+        if max_mb and metadata['size'] > max_mb * 1024 * 1024:
+            raise ValueError(f"{metadata['name']} is larger than max_attachment_mb ({max_mb} MB)")
+        
+        store = self.attachment_store
+        spool_file = store.spool_path(metadata['name'])
+        try:
+            with ATTACHMENT_SAVE_SECONDS.time():
+                attachment.SaveAsFile(spool_file)
+            COM_OPERATIONS.inc('save_attachment')
+            return store.add(spool_file, entry_id, index, metadata)
+        finally:
+            if os.path.exists(spool_file):
+                try:
+                    os.remove(spool_file)
+                except OSError:
+                    pass
+    
+    def body_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the body cache."""
+        return self._body_cache.stats()
+    
+    def metric_samples(self) -> List[Tuple[str, str, Dict[tuple, float]]]:
+        """Cache and COM call counters of this client, for the metrics registry."""
+        search, body, trees = (self._search_cache.stats(), self._body_cache.stats(),
+                               self._folder_trees.stats())
+        samples = [
+            ('outlook_cache_hits_total', 'Cache lookups answered from the cache', {
+                (('cache', 'search'),): search['hits'],
+                (('cache', 'body'),): body['hits'],
+                (('cache', 'folder_tree'),): trees['hits'],
+            }),
+            ('outlook_cache_misses_total', 'Cache lookups that had to go to Outlook', {
+                (('cache', 'search'),): search['misses'],
+                (('cache', 'body'),): body['misses'],
+                (('cache', 'folder_tree'),): trees['builds'],
+            }),
+        ]
+        if self._attachment_store is not None:
+            attachments = self._attachment_store.stats()
+            samples[0][2][(('cache', 'attachment'),)] = attachments['hits']
+            samples[1][2][(('cache', 'attachment'),)] = attachments['misses']
+        com_calls = self.backend.com_calls()
+        if com_calls is not None:
+            samples.append(('outlook_com_calls_total', 'Object model calls made by the backend',
+                            {(): com_calls}))
+        return samples
+
+    def _load_bodies_job(self, context: ComWorkerContext,
+                         emails: List[Dict[str, Any]]) -> None:
+        """Open each email by EntryID on a COM worker and read its body."""
+        for email in emails:
+            try:
+                item = context.namespace.GetItemFromID(email['entry_id'])
+                COM_OPERATIONS.inc('open_item')
+                last_modified = email.get('last_modified')
+                if last_modified is None:
+                    last_modified = email['last_modified'] = item.LastModificationTime
+                    cached = self._body_cache.get(email['entry_id'], last_modified)
+                    if cached is not None:
+                        email['body'] = cached[0]
+                        if email.get('attachments_count') is None:
+                            email['attachments_count'] = cached[1]
+                        continue
+                email['body'] = self._read_body(item)
+                if email.get('attachments_count') is None:
+                    email['attachments_count'] = item.Attachments.Count
+                item = None
+                self._body_cache.put(email['entry_id'], last_modified,
+                                     email['body'], email['attachments_count'])
+            except Exception as e:
+                logger.error(f"Error loading body for {email.get('entry_id')}: {e}")
+                email['body'] = ''
+                email['error'] = str(e)
+                if email.get('attachments_count') is None:
+                    email['attachments_count'] = 0
 
-            if mailbox_type == 'personal':
-                inbox = session.GetDefaultFolder(6)  # olFolderInbox
+    def _search_mailbox_job(self, context: ComWorkerContext, mailbox: str,
+                            search_text: str, max_results: int,
+                            include_body: bool = True,
+                            filters: Optional[SearchFilters] = None,
+                            sink: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Search one mailbox ('personal' or a shared address) on a COM worker
+        using the worker's own Outlook objects."""
+        try:
+            if mailbox == PERSONAL_MAILBOX:
+                inbox = context.personal_inbox()
                 return self._search_mailbox_comprehensive(
-                    inbox, search_text, 'personal', max_results
+                    inbox, search_text, 'personal', max_results, context, include_body, filters,
+                    sink
                 )
 
-            elif mailbox_type == 'shared':
-                # Don't reuse a cached Recipient across threads.
-                shared_email = config.get('shared_mailbox_email')
-                recip = session.CreateRecipient(shared_email)
-                recip.Resolve()
-                if recip.Resolved:
-                    shared_inbox = session.GetSharedDefaultFolder(recip, 6)  # olFolderInbox
-                    return self._search_mailbox_comprehensive(
-                        shared_inbox, search_text, 'shared', max_results
-                    )
-                else:
-                    logger.error(f"Could not resolve shared recipient: {shared_email}")
-                    return []
+            if sink is not None:
+                deliver = sink
 
-            return []
+                def sink(email):
+                    email['mailbox_address'] = mailbox
+                    deliver(email)
+
+            try:
+                shared_inbox = context.shared_inbox(mailbox)
+                emails = self._search_mailbox_comprehensive(
+                    shared_inbox, search_text, 'shared', max_results, context, include_body,
+                    filters, sink
+                )
+            except Exception:
+                context.forget_shared_inbox(mailbox)
+                raise
+            for email in emails:
+                email['mailbox_address'] = mailbox
+            return emails
 
         except Exception as e:
-            logger.error(f"Error in mailbox wrapper for {mailbox_type}: {e}")
+            logger.error(f"Error in mailbox search for {mailbox}: {e}")
             return []
-        finally:
-            pythoncom.CoUninitialize()
 
     def _search_mailbox_comprehensive(self, inbox_folder, search_text: str,
-                                      mailbox_type: str, max_results: int):
+                                      mailbox_type: str, max_results: int,
+                                      context: Optional[ComWorkerContext] = None,
+                                      include_body: bool = True,
+                                      filters: Optional[SearchFilters] = None,
+                                      sink: Optional[Callable[[Dict[str, Any]], None]] = None):
         emails = []
         found_ids = set()
 
-        app = inbox_folder.Application  # keep COM objects on this thread
-
-        # ---- Build Scope safely (single-quoted, apostrophes doubled) ----
-        folder_path = inbox_folder.FolderPath or ""
-        scope = self._get_english_folder_path(inbox_folder)
+        # keep COM objects on this thread; the worker's Application carries the event sink
+        app = context.application if context is not None else inbox_folder.Application
+        namespace = context.namespace if context is not None else inbox_folder.Session
 
-        # ---- Build Filter safely (DASL with @SQL=) ----
-        esc = (search_text or "").replace("'", "''")  # single quotes doubled for literals
-        query = (
-            "@SQL="
-            "\"urn:schemas:httpmail:subject\" ci_phrasematch '{t}' "
-            "OR "
-            "\"urn:schemas:httpmail:textdescription\" ci_phrasematch '{t}'"
-        ).format(t=esc)
+        # ---- Phrase and filters as one DASL query (@SQL=) ----
+        query = phrase_filter(search_text, filters)
 
-        # (Optional) keep tags reasonably short; some environments are picky
-        tag = "EmailBodySearch-" + str(uuid.uuid4())[:8]
-
-        logger.info("AdvancedSearch Scope=%s Filter=%s", scope, query)
+        # Inbox first, then the other selected folders of the store
+        folders = [FolderNode.from_folder(inbox_folder)]
+        if filters and filters.folders:
+            try:
+                folders = self._folder_tree(inbox_folder).select(
+                    include=filters.folders, include_sent=True, include_deleted=True
+                )
+            except Exception as e:
+                logger.error("Error reading folder tree: %s", e)
+                folders = [node for node in folders if node.matches(
+                    [pattern.lower() for pattern in filters.folders])]
+            if not folders:
+                return emails
+        elif config.settings.search_all_folders:
+            try:
+                folders = self._folders_to_search(inbox_folder, folders[0])
+            except Exception as e:
+                logger.error("Error reading folder tree: %s", e)
 
         try:
-            # ---- Call positionally to avoid named-arg binding issues ----
-            # Signature: AdvancedSearch(Scope, Filter, SearchSubFolders, Tag)
-            search = app.AdvancedSearch(scope, query, False, tag)
-
-            # Poll until results stabilize or timeout
-            start = time.time()
-            last = -1
-            stable = 0.0
-            while True:
-                results = search.Results  # same-thread COM access
-                count = results.Count
-                if count == last:
-                    stable += 0.1
-                else:
-                    stable = 0.0
-                    last = count
-                if stable >= 0.5 or (time.time() - start) > 30:
-                    break
-                time.sleep(0.1)
-
-            take = min(results.Count, max_results)
-            logger.info("AdvancedSearch returned %d (taking %d)", results.Count, take)
-
-            for i in range(1, take + 1):
-                try:
-                    item = results.Item(i)
-                    entry_id = getattr(item, 'EntryID', '')
-                    if entry_id and entry_id not in found_ids:
-                        email_data = self._extract_email_data(item, inbox_folder.Name, mailbox_type)
-                        if email_data:
-                            emails.append(email_data)
-                            found_ids.add(entry_id)
-                except Exception as e:
-                    logger.debug("Error processing result %d: %s", i, e)
-                    continue
-
-            # Clean up the running search (optional but tidy)
-            try:
-                app.AdvancedSearchStop(search.SearchID)
-            except Exception:
-                pass
+            emails.extend(self._search_folders(
+                app, namespace, inbox_folder.StoreID, folders, query, mailbox_type,
+                max_results, found_ids, context, include_body, sink
+            ))
 
         except Exception as e:
 
@@ -353,111 +1210,199 @@ class OutlookClient:
             logger.info("Falling back to Restrict() search")
 
             # -- Fallback: subject LIKE (fast) --
+            restriction = subject_filter(search_text, filters)
             try:
-                items = inbox_folder.Items
-                items.Sort("[ReceivedTime]", True)
-                esc_like = (search_text or "").replace("'", "''")
-                subject_filter = (
-                    "@SQL=\"urn:schemas:httpmail:subject\" LIKE '%" + esc_like + "%'"
-                )
-                for item in items.Restrict(subject_filter):
-                    if len(emails) >= max_results:
-                        break
-                    entry_id = getattr(item, 'EntryID', '')
-                    if entry_id and entry_id not in found_ids:
-                        email_data = self._extract_email_data(item, inbox_folder.Name, mailbox_type)
-                        if email_data:
-                            emails.append(email_data)
+                table = inbox_folder.GetTable(restriction)
+                FALLBACKS.inc('restrict_table')
+                table.Sort("[ReceivedTime]", True)
+                extractor = TableExtractor(namespace, self._read_body, include_body=include_body)
+                emails.extend(extractor.extract(
+                    table, inbox_folder.Name, mailbox_type, max_results, found_ids, sink
+                ))
+            except Exception as table_error:
+                logger.info("Table fallback unavailable (%s), iterating items", table_error)
+                FALLBACKS.inc('restrict_items')
+                try:
+                    items = inbox_folder.Items
+                    items.Sort("[ReceivedTime]", True)
+                    for item in items.Restrict(restriction):
+                        if len(emails) >= max_results:
+                            break
+                        entry_id = getattr(item, 'EntryID', '')
+                        if entry_id and entry_id not in found_ids:
+                            # Scans and headers-only searches read no body
+                            email_data = self._extract_email_data(
+                                item, inbox_folder.Name, mailbox_type, include_body and sink is None
+                            )
+                            if not email_data:
+                                continue
                             found_ids.add(entry_id)
-            except Exception as fallback_error:
-                logger.error("Fallback subject filter failed: %s", fallback_error)
-
-        # Optional: search sibling folders
-        if len(emails) < max_results and config.get_bool('search_all_folders', True):
-            try:
-                more = self._search_other_folders(
-                    inbox_folder.Parent, search_text, mailbox_type,
-                    max_results - len(emails), found_ids
-                )
-                emails.extend(more)
-            except Exception as e:
-                logger.error("Error searching other folders: %s", e)
+                            if sink is not None:
+                                sink(email_data)
+                            else:
+                                emails.append(email_data)
+                except Exception as fallback_error:
+                    logger.error("Fallback subject filter failed: %s", fallback_error)
 
         return emails
     
-    def _search_other_folders(self, store, search_text: str, mailbox_type: str, 
-                             max_results: int, found_ids: set) -> List[Dict[str, Any]]:
-        """Search other folders using AdvancedSearch for consistency."""
+    def _folder_tree(self, inbox_folder) -> FolderTree:
+        """Cached folder tree of the store an Inbox belongs to.
+        
+        When the store root is not accessible (e.g. only the Inbox of a shared
+        mailbox is shared), the tree is the Inbox and its subfolders.
+        """
+        store_id = inbox_folder.StoreID
+        try:
+            root = inbox_folder.Parent
+            root_id = root.EntryID
+            root.Folders
+        except Exception:
+            root = None
+        if root is None:
+            return self._folder_trees.get(
+                store_id, inbox_folder.EntryID,
+                lambda: self._inbox_tree(store_id, inbox_folder)
+            )
+        return self._folder_trees.get(
+            store_id, root_id,
+            lambda: build_tree(store_id, root, getattr(inbox_folder, 'Store', None))
+        )
+    
+    @staticmethod
+    def _inbox_tree(store_id: str, inbox_folder) -> FolderTree:
+        inbox = FolderNode.from_folder(inbox_folder)
+        subfolders = build_tree(store_id, inbox_folder).folders
+        for node in subfolders:
+            node.depth += 1
+            node.relative_path = f"{inbox.name}/{node.relative_path}"
+        return FolderTree(store_id, inbox.entry_id, [inbox] + subfolders)
+    
+    def _folders_to_search(self, inbox_folder, inbox: FolderNode) -> List[FolderNode]:
+        """Inbox followed by the folders selected by the folder settings.
+        
+        The Inbox is searched whatever the include patterns say, unless an
+        exclude pattern matches it.
+        """
+        tree = self._folder_tree(inbox_folder)
+        exclude = config.get_list('folder_exclude_patterns')
+        selected = tree.select(
+            include=config.get_list('folder_include_patterns'),
+            exclude=exclude,
+            include_sent=config.get_bool('include_sent_items', True),
+            include_deleted=config.get_bool('include_deleted_items', False),
+        )
+        folders = [node for node in selected if node.entry_id != inbox.entry_id]
+        if not inbox.matches([pattern.lower() for pattern in exclude]):
+            folders.insert(0, inbox)
+        return folders
+    
+    def _search_folders(self, app, namespace, store_id: str, folders: List[FolderNode],
+                        query: str, mailbox_type: str, max_results: int, found_ids: set,
+                        context: Optional[ComWorkerContext] = None,
+                        include_body: bool = True,
+                        sink: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Search folders with one AdvancedSearch each, started as a batch.
+        
+        Up to ``max_concurrent_folder_searches`` searches are started before
+        the first is awaited, so Outlook runs them side by side and the waits
+        overlap. Results are taken in folder order until ``max_results``. An
+        error starting the search of the first folder is raised so the caller
+        can fall back; for the other folders it drops the cached folder tree,
+        which may be out of date.
+        """
         emails = []
-        key_folders = ['Sent Items', 'Drafts']  # Extend if needed
+        limit = max(1, config.get_int('max_concurrent_folder_searches', 16))
         
-        for folder_name in key_folders:
+        for batch_start in range(0, len(folders), limit):
             if len(emails) >= max_results:
                 break
+            started = []
+            for node in folders[batch_start:batch_start + limit]:
+                # (Optional) keep tags reasonably short; some environments are picky
+                tag = "EmailBodySearch-" + os.urandom(4).hex()
+                logger.info("AdvancedSearch Scope=%s Filter=%s", node.scope, query)
+                try:
+                    # ---- Call positionally to avoid named-arg binding issues ----
+                    # Signature: AdvancedSearch(Scope, Filter, SearchSubFolders, Tag)
+                    search = app.AdvancedSearch(node.scope, query, False, tag)
+                    COM_OPERATIONS.inc('advanced_search')
+                except Exception as e:
+                    if not started and batch_start == 0:
+                        raise
+                    logger.info("AdvancedSearch in %s failed: %s", node.path, e)
+                    self._folder_trees.invalidate(store_id)
+                    continue
+                started.append((node, search, tag))
             
             try:
-                folder = self._get_folder_by_name(store, folder_name)
-                if folder:
-                    # Use AdvancedSearch for this folder as well
-                    scope = f"'{folder.FolderPath}'"
-                    search_text_escaped = search_text.replace('"', '""')
-                    query = (
-                        f'urn:schemas:httpmail:subject ci_phrasematch "{search_text_escaped}" OR '
-                        f'urn:schemas:httpmail:textdescription ci_phrasematch "{search_text_escaped}"'
-                    )
-                    
-                    logger.info(f"AdvancedSearch in {folder_name} for '{search_text}'")
-                    
-                    search = self.outlook.AdvancedSearch(
-                        Scope=scope, 
-                        Filter=query, 
-                        SearchSubFolders=False, 
-                        Tag=f"OtherFolderSearch_{folder_name}"
-                    )
-                    
-                    # Poll with shorter timeout for secondary folders
-                    start_time = time.time()
-                    while not search.SearchComplete:
-                        time.sleep(0.1)
-                        if time.time() - start_time > 10:  # Shorter timeout for secondary folders
-                            break
-                    
-                    if search.SearchComplete:
-                        results = search.Results
-                        result_count = min(results.Count, max_results - len(emails))
-                        
-                        for i in range(1, result_count + 1):
-                            item = results.Item(i)
-                            entry_id = getattr(item, 'EntryID', '')
-                            if entry_id and entry_id not in found_ids:
-                                email_data = self._extract_email_data(item, folder_name, mailbox_type)
-                                if email_data:
-                                    emails.append(email_data)
-                                    found_ids.add(entry_id)
-            except Exception as e:
-                logger.debug(f"Error searching {folder_name}: {e}")
+                for position, (node, search, tag) in enumerate(started):
+                    if len(emails) >= max_results:
+                        break
+                    primary = batch_start == 0 and position == 0
+                    # The first folder waits up to 30 s; the others ran meanwhile and get 10 s
+                    wait = self._await_search(search, tag, context, timeout=30 if primary else 10,
+                                              stable_window=primary)
+                    if primary or wait.completed:
+                        emails.extend(self._extract_search_results(
+                            search, node.name, mailbox_type, max_results - len(emails),
+                            found_ids, namespace, include_body, sink
+                        ))
+            finally:
+                # Stop searches still running (optional but tidy)
+                for _, search, _ in started:
+                    try:
+                        search.Stop()
+                    except Exception:
+                        pass
         
         return emails
     
+    def _await_search(self, search, tag: str, context: Optional[ComWorkerContext],
+                      timeout: float, stable_window: bool) -> SearchWait:
+        """Wait for an AdvancedSearch and record how long it took."""
+        tracker = context.search_tracker if context is not None else None
+        wait = wait_for_search(search, tag, self.backend, tracker, timeout, stable_window)
+        self.search_waits.append(wait)
+        SEARCH_WAIT_SECONDS.observe(wait.waited, wait.mode)
+        logger.info("AdvancedSearch %s finished via %s in %.3f s (saved %.3f s vs fixed polling)",
+                    tag, wait.mode, wait.waited, wait.saved)
+        return wait
+    
+    def folder_tree_stats(self) -> Dict[str, Any]:
+        """Size and hit counters of the folder tree cache."""
+        return self._folder_trees.stats()
+    
+    def search_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the search result cache."""
+        return self._search_cache.stats()
+    
+    def search_wait_stats(self) -> Dict[str, Any]:
+        """Summary of recent AdvancedSearch waits."""
+        waits = list(self.search_waits)
+        return {
+            "searches": len(waits),
+            "by_mode": {mode: sum(1 for w in waits if w.mode == mode)
+                        for mode in ('event', 'poll', 'timeout')},
+            "total_wait_seconds": round(sum(w.waited for w in waits), 3),
+            "total_saved_seconds": round(sum(w.saved for w in waits), 3),
+            "recent": [w.to_dict() for w in waits[-10:]],
+        }
+    
     def _extract_email_data(self, item, folder_name: str, 
-                           mailbox_type: str) -> Dict[str, Any]:
-        """Extract email data with optimized body and recipient handling."""
+                           mailbox_type: str, include_body: bool = True) -> Dict[str, Any]:
+        """Extract email data with optimized body and recipient handling.
+        
+        With ``include_body=False`` the body is not read and ``body`` is None.
+        """
+        start = time.perf_counter()
         try:
             # Get the full email body
-            body = getattr(item, 'Body', '')
-            
-            # Apply max_body_chars if configured (0 means no limit)
-            max_body_chars = config.get_int('max_body_chars', 0)
-            if max_body_chars > 0 and len(body) > max_body_chars:
-                body = body[:max_body_chars] + " [truncated]"
-            
-            # Clean HTML if configured
-            if config.get_bool('clean_html_content', True) and body:
-                body = self._clean_html(body)
+            body = self._read_body(item) if include_body else None
             
             # Get recipients list with limit for performance
             recipients = []
-            max_recipients = config.get_int('max_recipients_display', 10)
+            max_recipients = config.settings.max_recipients_display
             try:
                 recipient_count = 0
                 for recipient in item.Recipients:
@@ -482,7 +1427,11 @@ class OutlookClient:
                 'size': getattr(item, 'Size', 0),
                 'attachments_count': getattr(item.Attachments, 'Count', 0) if hasattr(item, 'Attachments') else 0,
                 'unread': getattr(item, 'Unread', False),
-                'entry_id': getattr(item, 'EntryID', '')
+                'entry_id': getattr(item, 'EntryID', ''),
+                'last_modified': getattr(item, 'LastModificationTime', None),
+                'conversation_id': getattr(item, 'ConversationID', '') or '',
+                'conversation_index': getattr(item, 'ConversationIndex', '') or '',
+                'internet_message_id': _internet_message_id(item)
             }
             
             # Release COM reference to free memory
@@ -492,6 +1441,54 @@ class OutlookClient:
         except Exception as e:
             logger.error(f"Error extracting email data: {e}")
             return None
+        finally:
+            ITEM_EXTRACT_SECONDS.observe(time.perf_counter() - start, 'item')
+    
+    def _read_body(self, item, truncate: bool = True) -> str:
+        """Body of a MailItem after the configured HTML cleaning and truncation."""
+        settings = config.settings
+        return read_item_text(
+            item,
+            max_chars=settings.max_body_chars if truncate else 0,
+            clean=settings.clean_html_content,
+            prefer_html=settings.prefer_html_body,
+        )
+    
+    def _extract_search_results(self, search, folder_name: str, mailbox_type: str,
+                                max_results: int, found_ids: set, namespace,
+                                include_body: bool = True,
+                                sink: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Extract AdvancedSearch results, in bulk through a Table when possible."""
+        try:
+            table = search.GetTable()
+        except Exception as e:
+            logger.info("Table extraction unavailable (%s), extracting items one by one", e)
+            FALLBACKS.inc('item_extraction')
+        else:
+            extractor = TableExtractor(namespace, self._read_body, include_body=include_body)
+            return extractor.extract(table, folder_name, mailbox_type, max_results, found_ids, sink)
+        
+        emails = []
+        results = search.Results  # same-thread COM access
+        take = min(results.Count, max_results)
+        logger.info("AdvancedSearch returned %d (taking %d)", results.Count, take)
+        
+        for i in range(1, take + 1):
+            try:
+                item = results.Item(i)
+                entry_id = getattr(item, 'EntryID', '')
+                if entry_id and entry_id not in found_ids:
+                    email_data = self._extract_email_data(item, folder_name, mailbox_type, include_body)
+                    if email_data and sink is not None:
+                        sink(email_data)
+                    elif email_data:
+                        emails.append(email_data)
+                        found_ids.add(entry_id)
+            except Exception as e:
+                logger.debug("Error processing result %d: %s", i, e)
+                continue
+        
+        return emails
     
     def _get_store_display_name(self, folder) -> str:
         """Safely get store display name from a folder."""
@@ -505,65 +1502,7 @@ class OutlookClient:
             return "Mailbox"
         except:
             return "Mailbox"
-    
-    def _get_folder_by_name(self, store, name: str):
-        """Get folder by name from cache or store."""
-        cache_key = f"{id(store)}_{name}"
-        
-        if cache_key in self._folder_cache:
-            return self._folder_cache[cache_key]
-        
-        try:
-            for folder in store.GetRootFolder().Folders:
-                if folder.Name.lower() == name.lower():
-                    self._folder_cache[cache_key] = folder
-                    return folder
-        except:
-            pass
-        
-        return None
-    
-    def _clean_html(self, text: str) -> str:
-        """Clean HTML from email body."""
-        import re
-        
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # Decode common HTML entities
-        html_entities = {
-            '&amp;': '&',
-            '&lt;': '<',
-            '&gt;': '>',
-            '&quot;': '"',
-            '&#39;': "'",
-            '&nbsp;': ' '
-        }
-        
-        for entity, char in html_entities.items():
-            text = text.replace(entity, char)
-        
-        # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        return text
-
-    def _get_english_folder_path(self, folder):
-        # Convert localized names (like "Posteingang") to internal English names
-        # Works because MAPIFolder.FolderPath always uses localized names
-        path = folder.FolderPath
-        # Normalize localized root paths for common locales
-        replacements = {
-            "\\Posteingang": "\\Inbox",
-            "\\Gesendete Elemente": "\\Sent Items",
-            "\\Entwürfe": "\\Drafts",
-            "\\Gelöschte Elemente": "\\Deleted Items",
-            "\\Junk-E-Mail": "\\Junk Email",
-        }
-        for de, en in replacements.items():
-            if path.endswith(de):
-                path = path.replace(de, en)
-        return f"'{path.replace("'", "''")}'"
 
-# Global client instance
+# Global client instance; its cache and COM call counters are read when metrics are rendered
 outlook_client = OutlookClient()
+metrics.add_collector(outlook_client.metric_samples)
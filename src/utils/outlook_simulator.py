@@ -0,0 +1,1311 @@
+"""Synthetic in-memory Outlook object model for testing and benchmarking.
+
+The classes here mirror the subset of the Outlook COM object model used by the
+client (Application, Namespace, Store, Folder, Items, Search/Results, MailItem,
+Recipients, Attachments). Mailbox contents are generated deterministically from
+an item index, so mailboxes of a million items cost almost no memory until the
+items are touched.
+
+Every public attribute access on a simulated object counts as one COM call and
+is charged against a configurable latency model, which makes call counts and
+round-trip costs of the client code measurable on any platform.
+"""
+
+import re
+import threading
+import time
+import random
+import zlib
+from functools import lru_cache
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from ..config.config_reader import config
+from .mail_backend import MailBackend
+
+OL_FOLDER_INBOX = 6
+OL_FOLDER_SENT_MAIL = 5
+OL_FOLDER_DRAFTS = 16
+OL_FOLDER_DELETED_ITEMS = 3
+
+DEFAULT_FOLDERS = {
+    OL_FOLDER_INBOX: 'Inbox',
+    OL_FOLDER_SENT_MAIL: 'Sent Items',
+    OL_FOLDER_DRAFTS: 'Drafts',
+    OL_FOLDER_DELETED_ITEMS: 'Deleted Items',
+}
+
+# Share of generated items per folder, in percent
+FOLDER_WEIGHTS = (('Inbox', 80), ('Sent Items', 12), ('Drafts', 3), ('Deleted Items', 5))
+
+THREAD_SIZE = 4
+
+_TOPICS = (
+    "Disk usage above threshold",
+    "Service health check failed",
+    "Nightly backup report",
+    "Certificate expiry warning",
+    "Database replication lag",
+    "Deployment completed",
+    "Queue depth critical",
+    "Login anomaly detected",
+)
+
+_HOSTS = ("app-01", "app-02", "db-01", "db-02", "web-01", "batch-01", "cache-01", "edge-01")
+
+_PEOPLE = (
+    ("Alice Jensen", "alice.jensen@example.com"),
+    ("Bob Madsen", "bob.madsen@example.com"),
+    ("Carla Nielsen", "carla.nielsen@example.com"),
+    ("David Holm", "david.holm@example.com"),
+    ("Eva Lund", "eva.lund@example.com"),
+    ("Frank Berg", "frank.berg@example.com"),
+)
+
+_MONITOR = ("Monitoring System", "monitoring@example.com")
+
+_REPLIES = (
+    "I am looking into this now.",
+    "Restarted the service, monitoring for recurrence.",
+    "This is caused by the scheduled maintenance window.",
+    "Escalating to the platform team.",
+    "Resolved, closing the incident.",
+)
+
+
+def _mix(seed: int, value: int) -> int:
+    """Cheap deterministic 32-bit hash used to derive item attributes."""
+    h = (value * 2654435761 + seed * 40503 + 0x9E3779B9) & 0xFFFFFFFF
+    h ^= h >> 15
+    h = (h * 2246822519) & 0xFFFFFFFF
+    h ^= h >> 13
+    return h
+
+
+class LatencyModel:
+    """Per-call latency model for simulated COM round-trips."""
+
+    def __init__(self, per_call_ms: float = 0.0, jitter_ms: float = 0.0,
+                 search_delay_ms: float = 0.0, seed: int = 0):
+        self.per_call = per_call_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.search_delay = search_delay_ms / 1000.0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    def call(self) -> None:
+        """Account for one COM call and wait out its simulated latency."""
+        with self._lock:
+            self.calls += 1
+            delay = self.per_call
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+        if delay > 0:
+            _wait(delay)
+
+    def reset(self) -> None:
+        """Reset the call counter."""
+        with self._lock:
+            self.calls = 0
+
+
+def _wait(seconds: float) -> None:
+    """Sleep for short intervals more precisely than time.sleep()."""
+    if seconds >= 0.002:
+        time.sleep(seconds)
+        return
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class MailRecord:
+    """Plain data for one synthetic mail item."""
+
+    __slots__ = ('index', 'entry_id', 'folder', 'subject', 'sender_name', 'sender_email',
+                 'to', 'body', 'received_time', 'last_modified', 'importance', 'size',
+                 'attachments', 'unread', 'conversation_id', 'conversation_index', 'message_id')
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+
+# Table column name (lower case) -> value getter; Body/HTMLBody are not supported
+TABLE_COLUMNS = {
+    'entryid': lambda r: r.entry_id,
+    'subject': lambda r: r.subject,
+    'sendername': lambda r: r.sender_name,
+    'senderemailaddress': lambda r: r.sender_email,
+    'receivedtime': lambda r: r.received_time,
+    'creationtime': lambda r: r.received_time,
+    'lastmodificationtime': lambda r: r.last_modified,
+    'messageclass': lambda r: "IPM.Note",
+    'importance': lambda r: r.importance,
+    'size': lambda r: r.size,
+    'unread': lambda r: r.unread,
+    'to': lambda r: "; ".join(name for name, _ in r.to),
+    'urn:schemas:httpmail:displayto': lambda r: "; ".join(name for name, _ in r.to),
+    'urn:schemas:httpmail:displaycc': lambda r: "",
+    'urn:schemas:httpmail:hasattachment': lambda r: r.attachments > 0,
+    'conversationid': lambda r: r.conversation_id,
+    'conversationindex': lambda r: r.conversation_index,
+    'http://schemas.microsoft.com/mapi/proptag/0x1035001f': lambda r: r.message_id,
+}
+
+PR_INTERNET_MESSAGE_ID = "http://schemas.microsoft.com/mapi/proptag/0x1035001F"
+
+
+class SyntheticMailbox:
+    """Deterministically generated mailbox contents.
+
+    Items are organised in threads of THREAD_SIZE messages that share an
+    incident identifier (``INC-000042``), so a search for an identifier returns
+    one small conversation, while searches for a topic return many.
+    """
+
+    def __init__(self, display_name: str, address: str, size: int = 10000,
+                 seed: int = 0, start: datetime = datetime(2024, 1, 1, 8, 0),
+                 days: int = 365):
+        self.display_name = display_name
+        self.address = address
+        self.size = size
+        self.seed = seed
+        self.start = start
+        self.spacing = timedelta(seconds=max(days * 86400 / max(size, 1), 1))
+        self.store_id = f"{zlib.crc32(address.encode('utf-8')):08X}"
+        self._folder_indices: Dict[str, array] = {}
+        self._deleted: set = set()
+        self._lock = threading.Lock()
+        # Replies quote their predecessor, so sequential scans reuse recent bodies
+        self._body = lru_cache(maxsize=1024)(self._build_body)
+
+    def entry_id(self, index: int) -> str:
+        """Entry ID of the item with the given index."""
+        return f"00000000{self.store_id}{index:016X}"
+
+    def index_of(self, entry_id: str) -> Optional[int]:
+        """Reverse of entry_id(), or None for foreign IDs."""
+        prefix = f"00000000{self.store_id}"
+        if not entry_id.startswith(prefix):
+            return None
+        try:
+            index = int(entry_id[len(prefix):], 16)
+        except ValueError:
+            return None
+        return index if 0 <= index < self.size and index not in self._deleted else None
+
+    def folder_of(self, index: int) -> str:
+        """Name of the folder the item with the given index lives in."""
+        bucket = _mix(self.seed + 7, index) % 100
+        for name, weight in FOLDER_WEIGHTS:
+            if bucket < weight:
+                return name
+            bucket -= weight
+        return 'Inbox'
+
+    def folder_indices(self, folder_name: str) -> array:
+        """Item indices belonging to a folder, oldest first."""
+        with self._lock:
+            indices = self._folder_indices.get(folder_name)
+            if indices is None:
+                indices = array('l', (i for i in range(self.size)
+                                      if self.folder_of(i) == folder_name and i not in self._deleted))
+                self._folder_indices[folder_name] = indices
+            return indices
+
+    def append(self, count: int) -> None:
+        """Deliver ``count`` new items, e.g. to exercise incremental sync."""
+        with self._lock:
+            first = self.size
+            self.size += count
+            for name, indices in self._folder_indices.items():
+                indices.extend(i for i in range(first, self.size) if self.folder_of(i) == name)
+
+    def delete(self, index: int) -> None:
+        """Remove the item with the given index for good, e.g. to exercise index reconciliation."""
+        with self._lock:
+            if index in self._deleted:
+                return
+            self._deleted.add(index)
+            indices = self._folder_indices.get(self.folder_of(index))
+            if indices is not None:
+                indices.remove(index)
+
+    def received_time(self, index: int) -> datetime:
+        """Received time of the item with the given index."""
+        return self.start + self.spacing * index
+
+    def record(self, index: int) -> MailRecord:
+        """Materialize the item with the given index."""
+        seed = self.seed
+        h = _mix(seed, index)
+        thread = index // THREAD_SIZE
+        position = index % THREAD_SIZE
+        topic = _TOPICS[_mix(seed, thread) % len(_TOPICS)]
+        incident = f"INC-{thread:06d}"
+
+        if position == 0:
+            sender = _MONITOR
+            subject = f"{topic} {incident}"
+        else:
+            sender = _PEOPLE[h % len(_PEOPLE)]
+            subject = f"RE: {topic} {incident}"
+
+        to = [_PEOPLE[(h >> 4) % len(_PEOPLE)], (self.display_name, self.address)]
+        for extra in range((h >> 8) % 3):
+            to.append(_PEOPLE[(h >> (12 + extra)) % len(_PEOPLE)])
+
+        received = self.received_time(index)
+        body = self._body(index)
+        conversation_id, conversation_index = self.conversation(index)
+        attachments = (h >> 16) % 3 if h % 7 == 0 else 0
+        importance = 2 if h % 10 == 0 else (0 if h % 17 == 0 else 1)
+
+        return MailRecord(
+            index=index,
+            entry_id=self.entry_id(index),
+            folder=self.folder_of(index),
+            subject=subject,
+            sender_name=sender[0],
+            sender_email=sender[1],
+            to=to,
+            body=body,
+            received_time=received,
+            last_modified=received + timedelta(seconds=h % 120),
+            importance=importance,
+            size=len(body) + 2048 + attachments * 24576,
+            attachments=attachments,
+            unread=h % 4 == 0,
+            conversation_id=conversation_id,
+            conversation_index=conversation_index,
+            # Mailboxes generated from the same seed hold copies of the same messages
+            message_id=f"<{thread:x}.{position}.{seed:x}@alerts.example.com>",
+        )
+
+    def conversation(self, index: int):
+        """ConversationID and hex ConversationIndex of the item with the given index.
+
+        The index is the 22-byte thread header (reserved byte, FILETIME bytes
+        of the thread start, conversation GUID) followed by one 5-byte child
+        block per reply, as Outlook builds it.
+        """
+        thread = index // THREAD_SIZE
+        position = index % THREAD_SIZE
+        guid = f"{_mix(self.seed + 11, thread) & 0xFFFFFFFFFFFFFFFF:016X}{thread:016X}"
+        started = int(self.received_time(index - position).timestamp()) & 0xFFFFFFFFFF
+        header = f"01{started:010X}{guid}"
+        replies = "".join(f"{(step * 3600) << 4:010X}" for step in range(1, position + 1))
+        return guid, header + replies
+
+    def _build_body(self, index: int) -> str:
+        """Body text, including the quoted history of earlier thread items."""
+        seed = self.seed
+        h = _mix(seed, index)
+        thread = index // THREAD_SIZE
+        position = index % THREAD_SIZE
+        incident = f"INC-{thread:06d}"
+        host = _HOSTS[_mix(seed, thread) % len(_HOSTS)]
+
+        if position == 0:
+            value = 80 + _mix(seed, thread) % 20
+            body = (
+                f"Alert {incident} raised for host {host}.\r\n"
+                f"Metric value: {value}% (threshold 80%)\r\n"
+                f"<table><tr><td>Host</td><td>{host}</td></tr>"
+                f"<tr><td>Value</td><td>{value}&nbsp;%</td></tr></table>\r\n"
+                f"This is an automated message &amp; requires no reply."
+            )
+            return body
+
+        sender = _PEOPLE[h % len(_PEOPLE)]
+        previous = index - 1
+        previous_sender = _MONITOR if previous % THREAD_SIZE == 0 else _PEOPLE[_mix(seed, previous) % len(_PEOPLE)]
+        return (
+            f"Hi team,\r\n\r\n{_REPLIES[h % len(_REPLIES)]} ({incident} on {host})\r\n\r\n"
+            f"Regards,\r\n{sender[0]}\r\n\r\n"
+            f"________________________________\r\n"
+            f"From: {previous_sender[0]} <{previous_sender[1]}>\r\n"
+            f"Sent: {self.received_time(previous):%A, %B %d, %Y %I:%M %p}\r\n"
+            f"Subject: {_TOPICS[_mix(seed, thread) % len(_TOPICS)]} {incident}\r\n\r\n"
+            f"{self._body(previous)}"
+        )
+
+
+class _ComObject:
+    """Base for simulated COM objects; public attribute access is a COM call."""
+
+    _latency: LatencyModel
+
+    def __getattribute__(self, name):
+        if name[0] != '_':
+            object.__getattribute__(self, '_latency').call()
+        return object.__getattribute__(self, name)
+
+
+class FakeRecipient(_ComObject):
+    """Simulated Outlook Recipient."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', name: str, address: str):
+        self._latency = outlook.latency
+        self._outlook = outlook
+        self._name = name
+        self._address = address
+        self._resolved = False
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+    @property
+    def Address(self) -> str:
+        return self._address
+
+    @property
+    def Resolved(self) -> bool:
+        return self._resolved
+
+    def Resolve(self) -> bool:
+        self._resolved = self._outlook.mailbox(self._address) is not None or '@' in self._address
+        return self._resolved
+
+
+class FakeRecipients(_ComObject):
+    """Simulated Outlook Recipients collection."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', people: List[tuple]):
+        self._latency = outlook.latency
+        self._outlook = outlook
+        self._people = people
+
+    @property
+    def Count(self) -> int:
+        return len(self._people)
+
+    def Item(self, index: int) -> FakeRecipient:
+        name, address = self._people[index - 1]
+        recipient = FakeRecipient(self._outlook, name, address)
+        recipient._resolved = True
+        return recipient
+
+    def __iter__(self):
+        for i in range(1, len(self._people) + 1):
+            yield self.Item(i)
+
+
+class FakePropertyAccessor(_ComObject):
+    """Simulated PropertyAccessor over a fixed map of MAPI property schema names."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', properties: Dict[str, object]):
+        self._latency = outlook.latency
+        self._properties = properties
+
+    def GetProperty(self, schema_name: str):
+        if schema_name not in self._properties:
+            raise KeyError(f"The property \"{schema_name}\" is unknown or cannot be found.")
+        return self._properties[schema_name]
+
+
+# Attachment extension and MIME type by position on the item
+_ATTACHMENT_KINDS = ((".log", "text/plain"), (".csv", "text/csv"))
+ATTACHMENT_SIZE = 24576
+PR_ATTACH_MIME_TAG = "http://schemas.microsoft.com/mapi/proptag/0x370E001F"
+
+
+@lru_cache(maxsize=256)
+def attachment_content(conversation_id: str, index: int) -> bytes:
+    """Deterministic content of an attachment.
+
+    Every item of a thread carries the same attachments, as when an alert's
+    log bundle is forwarded along with the replies.
+    """
+    seed = zlib.crc32(f"{conversation_id}:{index}".encode())
+    lines = []
+    size = 0
+    row = 0
+    while size < ATTACHMENT_SIZE:
+        host = _HOSTS[_mix(seed, row) % len(_HOSTS)]
+        if index % 2:
+            line = f"2024-01-01T00:{row // 60 % 60:02d}:{row % 60:02d}Z {host} WARN check {seed:08x} value={_mix(seed, row) % 1000}\n"
+        else:
+            line = f"{row},{host},{seed:08x},{_mix(seed, row) % 1000}\n"
+        lines.append(line)
+        size += len(line)
+        row += 1
+    return "".join(lines).encode("ascii")[:ATTACHMENT_SIZE]
+
+
+class FakeAttachment(_ComObject):
+    """Simulated Outlook Attachment."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', record: MailRecord, index: int):
+        self._latency = outlook.latency
+        self._outlook = outlook
+        self._record = record
+        self._index = index
+
+    @property
+    def Index(self) -> int:
+        return self._index
+
+    @property
+    def Type(self) -> int:
+        return 1  # olByValue
+
+    @property
+    def FileName(self) -> str:
+        extension = _ATTACHMENT_KINDS[(self._index - 1) % len(_ATTACHMENT_KINDS)][0]
+        return f"{self._record.conversation_id[-8:]}-{self._index}{extension}"
+
+    DisplayName = FileName
+
+    @property
+    def Size(self) -> int:
+        return ATTACHMENT_SIZE
+
+    @property
+    def PropertyAccessor(self) -> FakePropertyAccessor:
+        mime_type = _ATTACHMENT_KINDS[(self._index - 1) % len(_ATTACHMENT_KINDS)][1]
+        return FakePropertyAccessor(self._outlook, {PR_ATTACH_MIME_TAG: mime_type})
+
+    def SaveAsFile(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            f.write(attachment_content(self._record.conversation_id, self._index))
+
+
+class FakeAttachments(_ComObject):
+    """Simulated Outlook Attachments collection."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', record: MailRecord):
+        self._latency = outlook.latency
+        self._outlook = outlook
+        self._record = record
+
+    @property
+    def Count(self) -> int:
+        return self._record.attachments
+
+    def Item(self, index: int) -> FakeAttachment:
+        if not 1 <= index <= self._record.attachments:
+            raise IndexError(index)
+        return FakeAttachment(self._outlook, self._record, index)
+
+    def __iter__(self):
+        for i in range(1, self._record.attachments + 1):
+            yield self.Item(i)
+
+
+class FakeMailItem(_ComObject):
+    """Simulated Outlook MailItem backed by a MailRecord."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', folder: 'FakeFolder', record: MailRecord):
+        self._latency = outlook.latency
+        self._outlook = outlook
+        self._folder = folder
+        self._record = record
+
+    @property
+    def Class(self) -> int:
+        return 43  # olMail
+
+    @property
+    def MessageClass(self) -> str:
+        return "IPM.Note"
+
+    @property
+    def EntryID(self) -> str:
+        return self._record.entry_id
+
+    @property
+    def Subject(self) -> str:
+        return self._record.subject
+
+    @property
+    def SenderName(self) -> str:
+        return self._record.sender_name
+
+    @property
+    def SenderEmailAddress(self) -> str:
+        return self._record.sender_email
+
+    @property
+    def To(self) -> str:
+        return "; ".join(name for name, _ in self._record.to)
+
+    @property
+    def Recipients(self) -> FakeRecipients:
+        return FakeRecipients(self._outlook, self._record.to)
+
+    @property
+    def ReceivedTime(self) -> datetime:
+        return self._record.received_time
+
+    @property
+    def LastModificationTime(self) -> datetime:
+        return self._record.last_modified
+
+    @property
+    def Importance(self) -> int:
+        return self._record.importance
+
+    @property
+    def Body(self) -> str:
+        return self._record.body
+
+    @property
+    def ConversationID(self) -> str:
+        return self._record.conversation_id
+
+    @property
+    def ConversationIndex(self) -> str:
+        return self._record.conversation_index
+
+    @property
+    def HTMLBody(self) -> str:
+        paragraphs = "".join(f"<p>{line}</p>" for line in self._record.body.split("\r\n") if line)
+        return f"<html><head><style>p {{margin:0}}</style></head><body>{paragraphs}</body></html>"
+
+    @property
+    def Size(self) -> int:
+        return self._record.size
+
+    @property
+    def Attachments(self) -> FakeAttachments:
+        return FakeAttachments(self._outlook, self._record)
+
+    @property
+    def PropertyAccessor(self) -> 'FakePropertyAccessor':
+        return FakePropertyAccessor(self._outlook, {PR_INTERNET_MESSAGE_ID: self._record.message_id})
+
+    @property
+    def UnRead(self) -> bool:
+        return self._record.unread
+
+    Unread = UnRead
+
+    @property
+    def Parent(self) -> 'FakeFolder':
+        return self._folder
+
+
+class FakeItems(_ComObject):
+    """Simulated Outlook Items collection over a folder's item indices."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', folder: 'FakeFolder', indices):
+        self._latency = outlook.latency
+        self._outlook = outlook
+        self._folder = folder
+        self._indices = indices
+
+    @property
+    def Count(self) -> int:
+        return len(self._indices)
+
+    def Item(self, index: int) -> FakeMailItem:
+        if not 1 <= index <= len(self._indices):
+            raise IndexError(index)
+        record = self._folder._mailbox.record(self._indices[index - 1])
+        return FakeMailItem(self._outlook, self._folder, record)
+
+    def __iter__(self):
+        for i in range(1, len(self._indices) + 1):
+            yield self.Item(i)
+
+    def Sort(self, property_name: str, descending: bool = False) -> None:
+        # Items are generated in received order; other sort keys are not modelled
+        ordered = sorted(self._indices)
+        self._indices = list(reversed(ordered)) if descending else ordered
+
+    def Restrict(self, filter_text: str) -> 'FakeItems':
+        expression = DaslFilter(filter_text)
+        mailbox = self._folder._mailbox
+        matches = [i for i in self._indices if expression.matches(mailbox.record(i))]
+        return FakeItems(self._outlook, self._folder, matches)
+
+
+class FakeColumns(_ComObject):
+    """Simulated Outlook Columns collection of a Table."""
+
+    def __init__(self, table: 'FakeTable'):
+        self._latency = table._latency
+        self._table = table
+
+    @property
+    def Count(self) -> int:
+        return len(self._table._columns)
+
+    def Add(self, name: str) -> None:
+        if name.lower() not in TABLE_COLUMNS:
+            raise ValueError(f"The property \"{name}\" is not supported in a Table")
+        self._table._columns.append(name)
+
+    def RemoveAll(self) -> None:
+        self._table._columns = []
+
+
+class FakeTable(_ComObject):
+    """Simulated Outlook Table over (folder, item index) rows."""
+
+    DEFAULT_COLUMNS = ['EntryID', 'Subject', 'CreationTime', 'LastModificationTime', 'MessageClass']
+
+    def __init__(self, outlook: 'SimulatedOutlook', rows: list):
+        self._latency = outlook.latency
+        self._outlook = outlook
+        self._rows = rows
+        self._columns = list(self.DEFAULT_COLUMNS)
+        self._position = 0
+
+    @property
+    def Columns(self) -> FakeColumns:
+        return FakeColumns(self)
+
+    @property
+    def EndOfTable(self) -> bool:
+        return self._position >= len(self._rows)
+
+    def GetRowCount(self) -> int:
+        return len(self._rows)
+
+    def MoveToStart(self) -> None:
+        self._position = 0
+
+    def Sort(self, property_name: str, descending: bool = False) -> None:
+        # Rows are generated in received order; other sort keys are not modelled
+        self._rows = sorted(self._rows, key=lambda row: row[1], reverse=descending)
+
+    def Restrict(self, filter_text: str) -> 'FakeTable':
+        expression = DaslFilter(filter_text)
+        rows = [row for row in self._rows if expression.matches(row[0]._mailbox.record(row[1]))]
+        return FakeTable(self._outlook, rows)
+
+    def GetArray(self, max_rows: int) -> tuple:
+        batch = self._rows[self._position:self._position + max_rows]
+        self._position += len(batch)
+        columns = [TABLE_COLUMNS[name.lower()] for name in self._columns]
+        result = []
+        for folder, index in batch:
+            record = folder._mailbox.record(index)
+            result.append(tuple(column(record) for column in columns))
+        return tuple(result)
+
+
+class FakeFolders(_ComObject):
+    """Simulated Outlook Folders collection."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', folders: List['FakeFolder']):
+        self._latency = outlook.latency
+        self._folders = folders
+
+    @property
+    def Count(self) -> int:
+        return len(self._folders)
+
+    def Item(self, key):
+        if isinstance(key, int):
+            return self._folders[key - 1]
+        for folder in self._folders:
+            if folder._name.lower() == str(key).lower():
+                return folder
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        return self.Item(key)
+
+    def __iter__(self):
+        return iter(list(self._folders))
+
+
+class FakeFolder(_ComObject):
+    """Simulated Outlook MAPIFolder."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', mailbox: SyntheticMailbox,
+                 name: str, parent: Optional['FakeFolder'] = None):
+        self._latency = outlook.latency
+        self._outlook = outlook
+        self._mailbox = mailbox
+        self._name = name
+        self._parent = parent
+        self._children: List[FakeFolder] = []
+
+    @property
+    def _path(self) -> str:
+        if self._parent is None:
+            return f"\\\\{self._mailbox.display_name}"
+        return f"{self._parent._path}\\{self._name}"
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+    @property
+    def FolderPath(self) -> str:
+        return self._path
+
+    @property
+    def EntryID(self) -> str:
+        return f"FF{self._mailbox.store_id}{zlib.crc32(self._path.encode('utf-8')):08X}"
+
+    @property
+    def StoreID(self) -> str:
+        return self._mailbox.store_id
+
+    @property
+    def Store(self) -> 'FakeStore':
+        return self._outlook.stores[self._mailbox.address.lower()]
+
+    @property
+    def DefaultItemType(self) -> int:
+        return 0
+
+    @property
+    def Parent(self):
+        return self._parent if self._parent is not None else self._outlook.namespace
+
+    @property
+    def Application(self) -> 'FakeApplication':
+        return FakeApplication(self._outlook)
+
+    @property
+    def Session(self) -> 'FakeNamespace':
+        return self._outlook.namespace
+
+    @property
+    def Folders(self) -> FakeFolders:
+        return FakeFolders(self._outlook, self._children)
+
+    def GetTable(self, filter_text: str = "", table_contents: int = 0) -> FakeTable:
+        indices = self._mailbox.folder_indices(self._name) if self._parent is not None else []
+        table = FakeTable(self._outlook, [(self, index) for index in indices])
+        return table.Restrict(filter_text) if filter_text else table
+
+    @property
+    def Items(self) -> FakeItems:
+        if self._parent is None:
+            return FakeItems(self._outlook, self, [])
+        return FakeItems(self._outlook, self, self._mailbox.folder_indices(self._name))
+
+    def _walk(self) -> Iterable['FakeFolder']:
+        yield self
+        for child in self._children:
+            yield from child._walk()
+
+
+class FakeStore(_ComObject):
+    """Simulated Outlook Store."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', mailbox: SyntheticMailbox):
+        self._latency = outlook.latency
+        self._mailbox = mailbox
+        self._root = FakeFolder(outlook, mailbox, mailbox.display_name)
+        for name in DEFAULT_FOLDERS.values():
+            self._root._children.append(FakeFolder(outlook, mailbox, name, self._root))
+
+    @property
+    def DisplayName(self) -> str:
+        return self._mailbox.display_name
+
+    @property
+    def StoreID(self) -> str:
+        return self._mailbox.store_id
+
+    def _folder(self, name: str) -> FakeFolder:
+        for child in self._root._children:
+            if child._name == name:
+                return child
+        raise KeyError(name)
+
+    def GetRootFolder(self) -> FakeFolder:
+        return self._root
+
+    def _default_folder(self, folder_type: int) -> FakeFolder:
+        return self._root._children[list(DEFAULT_FOLDERS).index(folder_type)]
+
+    def GetDefaultFolder(self, folder_type: int) -> FakeFolder:
+        return self._default_folder(folder_type)
+
+
+class FakeStores(_ComObject):
+    """Simulated Outlook Stores collection."""
+
+    def __init__(self, outlook: 'SimulatedOutlook'):
+        self._latency = outlook.latency
+        self._stores = list(outlook.stores.values())
+
+    @property
+    def Count(self) -> int:
+        return len(self._stores)
+
+    def Item(self, index: int) -> FakeStore:
+        return self._stores[index - 1]
+
+    def __getitem__(self, index: int) -> FakeStore:
+        return self.Item(index)
+
+    def __iter__(self):
+        return iter(list(self._stores))
+
+
+class FakeResults(_ComObject):
+    """Simulated Outlook Results collection of an AdvancedSearch."""
+
+    def __init__(self, search: 'FakeSearch'):
+        self._latency = search._latency
+        self._search = search
+
+    @property
+    def Count(self) -> int:
+        return len(self._search._visible_hits())
+
+    def Item(self, index: int) -> FakeMailItem:
+        folder, record_index = self._search._visible_hits()[index - 1]
+        return FakeMailItem(self._search._outlook, folder, folder._mailbox.record(record_index))
+
+    def __iter__(self):
+        for i in range(1, self.Count + 1):
+            yield self.Item(i)
+
+
+class FakeSearch(_ComObject):
+    """Simulated Outlook Search object returned by AdvancedSearch."""
+
+    def __init__(self, outlook: 'SimulatedOutlook', folders: List[FakeFolder],
+                 filter_text: str, tag: str):
+        self._latency = outlook.latency
+        self._outlook = outlook
+        self._tag = tag
+        self._started = time.monotonic()
+        expression = DaslFilter(filter_text)
+        hits = []
+        for folder in folders:
+            mailbox = folder._mailbox
+            for index in mailbox.folder_indices(folder._name):
+                if expression.matches(mailbox.record(index)):
+                    hits.append((folder, index))
+        self._hits = hits
+
+    def _complete(self) -> bool:
+        return time.monotonic() - self._started >= self._outlook.latency.search_delay
+
+    def _visible_hits(self) -> list:
+        return self._hits if self._complete() else []
+
+    @property
+    def Tag(self) -> str:
+        return self._tag
+
+    @property
+    def SearchComplete(self) -> bool:
+        return self._complete()
+
+    @property
+    def Results(self) -> FakeResults:
+        return FakeResults(self)
+
+    def GetTable(self) -> FakeTable:
+        return FakeTable(self._outlook, list(self._visible_hits()))
+
+    def Stop(self) -> None:
+        self._started = float('-inf')
+
+
+class FakeNamespace(_ComObject):
+    """Simulated Outlook MAPI Namespace."""
+
+    def __init__(self, outlook: 'SimulatedOutlook'):
+        self._latency = outlook.latency
+        self._outlook = outlook
+
+    @property
+    def Stores(self) -> FakeStores:
+        return FakeStores(self._outlook)
+
+    @property
+    def CurrentProfileName(self) -> str:
+        return "Simulated"
+
+    def Logon(self, profile=None, password=None, show_dialog=False, new_session=True) -> None:
+        return None
+
+    def GetDefaultFolder(self, folder_type: int) -> FakeFolder:
+        return self._outlook.stores[self._outlook.personal.address.lower()]._default_folder(folder_type)
+
+    def CreateRecipient(self, address: str) -> FakeRecipient:
+        return FakeRecipient(self._outlook, address, address)
+
+    def GetSharedDefaultFolder(self, recipient: FakeRecipient, folder_type: int) -> FakeFolder:
+        if not recipient._resolved:
+            raise RuntimeError("The recipient has not been resolved")
+        store = self._outlook.stores.get(recipient._address.lower())
+        if store is None:
+            raise RuntimeError(f"Cannot open the shared folder of {recipient._address}")
+        return store._default_folder(folder_type)
+
+    def GetFolderFromID(self, entry_id: str, store_id: Optional[str] = None) -> FakeFolder:
+        for store in self._outlook.stores.values():
+            for folder in store._root._walk():
+                if folder.EntryID == entry_id:
+                    return folder
+        raise KeyError(f"Folder {entry_id} not found")
+
+    def GetItemFromID(self, entry_id: str, store_id: Optional[str] = None) -> FakeMailItem:
+        for store in self._outlook.stores.values():
+            mailbox = store._mailbox
+            index = mailbox.index_of(entry_id)
+            if index is not None:
+                record = mailbox.record(index)
+                return FakeMailItem(self._outlook, store._folder(record.folder), record)
+        raise KeyError(f"Item {entry_id} not found")
+
+
+class FakeApplication(_ComObject):
+    """Simulated Outlook Application."""
+
+    def __init__(self, outlook: 'SimulatedOutlook'):
+        self._latency = outlook.latency
+        self._outlook = outlook
+
+    @property
+    def Version(self) -> str:
+        return "16.0.0.0"
+
+    @property
+    def Session(self) -> FakeNamespace:
+        return self._outlook.namespace
+
+    def GetNamespace(self, name: str) -> FakeNamespace:
+        return self._outlook.namespace
+
+    def AdvancedSearch(self, Scope: str, Filter: str = "", SearchSubFolders: bool = False,
+                       Tag: str = "") -> FakeSearch:
+        folders = self._outlook.resolve_scope(Scope, SearchSubFolders)
+        search = FakeSearch(self._outlook, folders, Filter, Tag)
+        self._outlook.track_search(search)
+        return search
+
+
+class SimulatedOutlook:
+    """Shared state of one simulated Outlook profile."""
+
+    def __init__(self, personal: SyntheticMailbox, shared: Iterable[SyntheticMailbox] = (),
+                 latency: Optional[LatencyModel] = None):
+        self.latency = latency or LatencyModel()
+        self.personal = personal
+        self.stores: Dict[str, FakeStore] = {}
+        for mailbox in [personal, *shared]:
+            self.stores[mailbox.address.lower()] = FakeStore(self, mailbox)
+        self.namespace = FakeNamespace(self)
+        self._sinks: Dict[int, list] = {}
+        self._pending_searches: Dict[int, list] = {}
+        self._events_lock = threading.Lock()
+
+    def connect_sink(self, sink) -> None:
+        """Connect an Application event sink on the calling thread."""
+        with self._events_lock:
+            self._sinks.setdefault(threading.get_ident(), []).append(sink)
+
+    def track_search(self, search: 'FakeSearch') -> None:
+        """Remember a search whose completion event is due on this thread."""
+        thread = threading.get_ident()
+        with self._events_lock:
+            if thread in self._sinks:
+                self._pending_searches.setdefault(thread, []).append(search)
+
+    def deliver_events(self) -> None:
+        """Fire AdvancedSearchComplete for finished searches of this thread."""
+        thread = threading.get_ident()
+        with self._events_lock:
+            pending = self._pending_searches.get(thread, [])
+            finished = [search for search in pending if search._complete()]
+            if not finished:
+                return
+            self._pending_searches[thread] = [search for search in pending if not search._complete()]
+            sinks = list(self._sinks.get(thread, []))
+        for search in finished:
+            for sink in sinks:
+                sink.OnAdvancedSearchComplete(search)
+
+    def mailbox(self, address: str) -> Optional[SyntheticMailbox]:
+        store = self.stores.get((address or '').lower())
+        return store._mailbox if store else None
+
+    def resolve_scope(self, scope: str, search_subfolders: bool) -> List[FakeFolder]:
+        """Map an AdvancedSearch scope string to simulated folders."""
+        paths = [p.replace("''", "'") for p in re.findall(r"'((?:[^']|'')*)'", scope or '')]
+        if not paths and scope:
+            paths = [scope.strip()]
+        folders = []
+        for path in paths:
+            for store in self.stores.values():
+                for folder in store._root._walk():
+                    if folder._path.lower() == path.lower():
+                        folders.extend(folder._walk() if search_subfolders else [folder])
+        return [f for f in folders if f._parent is not None]
+
+
+class SimulatedBackend(MailBackend):
+    """Backend serving a SimulatedOutlook instead of the COM object model."""
+
+    name = "simulated"
+
+    def __init__(self, outlook: SimulatedOutlook):
+        self.outlook = outlook
+
+    @classmethod
+    def build(cls, personal_size: int = 10000, shared: Optional[Dict[str, int]] = None,
+              per_call_ms: float = 0.0, jitter_ms: float = 0.0,
+              search_delay_ms: float = 0.0, seed: int = 0,
+              cc_shared: bool = False) -> 'SimulatedBackend':
+        """Build a backend with a personal mailbox and optional shared mailboxes.
+
+        With ``cc_shared`` the shared mailboxes hold the same messages as the
+        personal mailbox (same Internet Message-IDs, different EntryIDs), as
+        when the user is copied on everything sent to the team.
+        """
+        personal = SyntheticMailbox("Simulated User", "user@example.com", personal_size, seed)
+        shared_mailboxes = [
+            SyntheticMailbox(address.split('@')[0], address, size, seed if cc_shared else seed + n + 1)
+            for n, (address, size) in enumerate((shared or {}).items())
+        ]
+        latency = LatencyModel(per_call_ms, jitter_ms, search_delay_ms, seed)
+        return cls(SimulatedOutlook(personal, shared_mailboxes, latency))
+
+    @classmethod
+    def from_config(cls) -> 'SimulatedBackend':
+        """Build a backend from the simulator_* config keys."""
+        shared_size = config.get_int('simulator_shared_mailbox_size', 10000)
+        shared = {address: shared_size for address in config.settings.shared_mailboxes}
+        return cls.build(
+            personal_size=config.get_int('simulator_mailbox_size', 10000),
+            shared=shared,
+            per_call_ms=float(config.get('simulator_latency_ms', 0) or 0),
+            jitter_ms=float(config.get('simulator_latency_jitter_ms', 0) or 0),
+            search_delay_ms=float(config.get('simulator_search_delay_ms', 0) or 0),
+            seed=config.get_int('simulator_seed', 0),
+            cc_shared=config.get_bool('simulator_cc_shared', False),
+        )
+
+    @property
+    def latency(self) -> LatencyModel:
+        return self.outlook.latency
+
+    def get_application(self) -> FakeApplication:
+        return FakeApplication(self.outlook)
+
+    def dispatch_application(self, events: Optional[type] = None) -> FakeApplication:
+        if events is not None:
+            self.outlook.connect_sink(events())
+        return FakeApplication(self.outlook)
+
+    def pump_messages(self) -> None:
+        self.outlook.deliver_events()
+
+    def com_calls(self) -> Optional[int]:
+        return self.latency.calls
+
+
+class DaslFilter:
+    """Evaluator for the DASL/Jet filter dialect used with AdvancedSearch and Restrict.
+
+    Supports ``@SQL=`` and plain filters with quoted or bracketed property
+    names, the comparison operators, LIKE, ci_phrasematch and ci_startswith,
+    combined with AND/OR/NOT and parentheses.
+    """
+
+    FIELDS = {
+        'urn:schemas:httpmail:subject': 'subject',
+        'urn:schemas:httpmail:textdescription': 'body',
+        'urn:schemas:httpmail:datereceived': 'received_time',
+        'urn:schemas:httpmail:fromname': 'sender_name',
+        'urn:schemas:httpmail:fromemail': 'sender_email',
+        'urn:schemas:httpmail:importance': 'importance',
+        'urn:schemas:httpmail:read': 'read',
+        'urn:schemas:httpmail:hasattachment': 'has_attachments',
+        'urn:schemas:mailheader:subject': 'subject',
+        'http://schemas.microsoft.com/mapi/proptag/0x0042001f': 'sender_name',
+        'http://schemas.microsoft.com/mapi/proptag/0x0065001f': 'sender_email',
+        'http://schemas.microsoft.com/mapi/proptag/0x30080040': 'last_modified',
+        'subject': 'subject',
+        'body': 'body',
+        'receivedtime': 'received_time',
+        'sendername': 'sender_name',
+        'senderemailaddress': 'sender_email',
+        'importance': 'importance',
+        'unread': 'unread',
+        'lastmodificationtime': 'last_modified',
+    }
+
+    _TOKEN = re.compile(
+        r"\s*(?:(\()|(\))|\"((?:[^\"]|\"\")*)\"|'((?:[^']|'')*)'|\[([^\]]+)\]|(<>|<=|>=|=|<|>)|([^\s()'\"\[\]<>=]+))"
+    )
+
+    _DATE_FORMATS = ('%m/%d/%Y %I:%M %p', '%m/%d/%Y %H:%M', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S',
+                     '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d')
+
+    def __init__(self, filter_text: str):
+        text = (filter_text or '').strip()
+        if text.lower().startswith('@sql='):
+            text = text[5:]
+        self._tokens = self._tokenize(text)
+        self._pos = 0
+        self._tree = self._parse_or() if self._tokens else None
+
+    def matches(self, record: MailRecord) -> bool:
+        """Whether a record satisfies the filter."""
+        return self._tree is None or self._eval(self._tree, record)
+
+    # -- parsing ---------------------------------------------------------------
+
+    def _tokenize(self, text: str) -> List[tuple]:
+        tokens = []
+        pos = 0
+        while pos < len(text):
+            match = self._TOKEN.match(text, pos)
+            if not match or match.end() == pos:
+                if text[pos:].strip():
+                    raise ValueError(f"Invalid filter near: {text[pos:]}")
+                break
+            pos = match.end()
+            lparen, rparen, dquoted, squoted, bracketed, operator, word = match.groups()
+            if lparen:
+                tokens.append(('(', lparen))
+            elif rparen:
+                tokens.append((')', rparen))
+            elif dquoted is not None:
+                tokens.append(('dquoted', dquoted.replace('""', '"')))
+            elif squoted is not None:
+                tokens.append(('literal', squoted.replace("''", "'")))
+            elif bracketed is not None:
+                tokens.append(('property', bracketed))
+            elif operator:
+                tokens.append(('op', operator))
+            elif word:
+                tokens.append(('word', word))
+        return tokens
+
+    def _peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self._pos += 1
+        return token
+
+    def _keyword(self, word: str) -> bool:
+        kind, value = self._peek()
+        if kind == 'word' and value.lower() == word:
+            self._pos += 1
+            return True
+        return False
+
+    def _parse_or(self):
+        node = self._parse_and()
+        while self._keyword('or'):
+            node = ('or', node, self._parse_and())
+        return node
+
+    def _parse_and(self):
+        node = self._parse_not()
+        while self._keyword('and'):
+            node = ('and', node, self._parse_not())
+        return node
+
+    def _parse_not(self):
+        if self._keyword('not'):
+            return ('not', self._parse_not())
+        kind, _ = self._peek()
+        if kind == '(':
+            self._next()
+            node = self._parse_or()
+            if self._next()[0] != ')':
+                raise ValueError("Unbalanced parentheses in filter")
+            return node
+        return self._parse_clause()
+
+    def _parse_clause(self):
+        kind, name = self._next()
+        if kind not in ('dquoted', 'property', 'word'):
+            raise ValueError(f"Expected property name, got {name!r}")
+        field = self.FIELDS.get(name.lower())
+        if field is None:
+            raise ValueError(f"Unsupported filter property: {name}")
+
+        kind, operator = self._next()
+        if kind not in ('op', 'word'):
+            raise ValueError(f"Expected operator after {name}")
+        operator = operator.lower()
+        if operator == 'is':
+            negate = self._keyword('not')
+            self._next()  # NULL
+            return ('null', field, negate)
+
+        kind, literal = self._next()
+        if kind not in ('literal', 'dquoted', 'word'):
+            raise ValueError(f"Expected value after {name} {operator}")
+        # DASL (schema-named) date literals are UTC, Jet ([Name]) literals local time
+        return ('cmp', field, operator, self._coerce(field, literal, utc=':' in name))
+
+    def _coerce(self, field: str, literal: str, utc: bool = False):
+        if field in ('received_time', 'last_modified'):
+            for fmt in self._DATE_FORMATS:
+                try:
+                    parsed = datetime.strptime(literal.strip(), fmt)
+                except ValueError:
+                    continue
+                if utc:
+                    parsed = parsed.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+                return parsed
+            raise ValueError(f"Invalid date literal: {literal}")
+        if field == 'importance':
+            return int(literal)
+        if field in ('read', 'unread', 'has_attachments'):
+            return literal.strip().lower() in ('1', 'true', 'yes')
+        return literal
+
+    # -- evaluation --------------------------------------------------------------
+
+    @staticmethod
+    def _value(record: MailRecord, field: str):
+        if field == 'read':
+            return not record.unread
+        if field == 'has_attachments':
+            return record.attachments > 0
+        return getattr(record, field)
+
+    def _eval(self, node, record: MailRecord) -> bool:
+        kind = node[0]
+        if kind == 'or':
+            return self._eval(node[1], record) or self._eval(node[2], record)
+        if kind == 'and':
+            return self._eval(node[1], record) and self._eval(node[2], record)
+        if kind == 'not':
+            return not self._eval(node[1], record)
+        if kind == 'null':
+            value = self._value(record, node[1])
+            return (value not in (None, '')) if node[2] else (value in (None, ''))
+
+        _, field, operator, expected = node
+        value = self._value(record, field)
+        if operator == 'ci_phrasematch':
+            return expected.lower() in str(value).lower()
+        if operator == 'ci_startswith':
+            return str(value).lower().startswith(expected.lower())
+        if operator == 'like':
+            pattern = re.escape(expected.lower()).replace('%', '.*').replace('_', '.')
+            return re.fullmatch(pattern, str(value).lower(), re.DOTALL) is not None
+        if isinstance(expected, str) and isinstance(value, str):
+            value, expected = value.lower(), expected.lower()
+        if operator == '=':
+            return value == expected
+        if operator == '<>':
+            return value != expected
+        if operator == '<':
+            return value < expected
+        if operator == '<=':
+            return value <= expected
+        if operator == '>':
+            return value > expected
+        if operator == '>=':
+            return value >= expected
+        raise ValueError(f"Unsupported filter operator: {operator}")
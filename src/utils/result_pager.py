@@ -0,0 +1,152 @@
+"""Short-lived server-side handles for paging through search results.
+
+The first page of a paged search runs the search header-only and stores the
+full header list under a random handle. Later pages are cut from the stored
+list by cursor, so AdvancedSearch is not re-run and only the bodies of the
+requested page are ever read from Outlook.
+"""
+
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.config_reader import config
+from .dasl import SearchFilters
+from .email_formatter import format_pagination
+
+logger = logging.getLogger(__name__)
+
+
+class ResultHandle:
+    """Header-only results of one search, kept for later pages."""
+
+    __slots__ = ('handle_id', 'search_text', 'emails', 'created', 'expires')
+
+    def __init__(self, handle_id: str, search_text: str,
+                 emails: List[Dict[str, Any]], ttl: float):
+        self.handle_id = handle_id
+        self.search_text = search_text
+        self.emails = emails
+        self.created = time.monotonic()
+        self.expires = self.created + ttl
+
+    @property
+    def total(self) -> int:
+        return len(self.emails)
+
+    def expires_in(self) -> int:
+        return max(0, int(self.expires - time.monotonic()))
+
+    def page(self, offset: int, page_size: int) -> List[Dict[str, Any]]:
+        """Copies of the emails on one page, so loading bodies leaves the handle header-only."""
+        return [dict(email) for email in self.emails[offset:offset + page_size]]
+
+
+def encode_cursor(handle_id: str, offset: int) -> str:
+    return f"{handle_id}:{offset}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Split a cursor into handle id and offset; raises ValueError if malformed."""
+    handle_id, sep, offset = (cursor or '').rpartition(':')
+    if not sep or not handle_id or not offset.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return handle_id, int(offset)
+
+
+class ResultPager:
+    """Bounded, TTL-limited store of ResultHandles."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_handles: Optional[int] = None):
+        if ttl_seconds is None:
+            ttl_seconds = config.get_int('result_handle_ttl_seconds', 300)
+        self.ttl = ttl_seconds
+        self.max_handles = max(1, max_handles or config.get_int('max_result_handles', 50))
+        self._handles: 'OrderedDict[str, ResultHandle]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, search_text: str, emails: List[Dict[str, Any]]) -> ResultHandle:
+        """Store a result list and return its handle; evicts the oldest handles."""
+        handle = ResultHandle(secrets.token_urlsafe(9), search_text, emails, self.ttl)
+        with self._lock:
+            self._expire()
+            self._handles[handle.handle_id] = handle
+            while len(self._handles) > self.max_handles:
+                self._handles.popitem(last=False)
+        return handle
+
+    def get(self, handle_id: str) -> Optional[ResultHandle]:
+        """The live handle for ``handle_id``, or None if unknown or expired."""
+        with self._lock:
+            self._expire()
+            return self._handles.get(handle_id)
+
+    def fetch_page(self, client, search_text: str, include_personal: bool = True,
+                   include_shared: bool = True, cursor: Optional[str] = None,
+                   page_size: Optional[int] = None,
+                   headers_only: bool = False,
+                   mailboxes: Optional[List[str]] = None,
+                   filters: Optional[SearchFilters] = None,
+                   timed_out: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Return one page of emails, and its pagination block.
+
+        Without a cursor the search runs header-only and its results are
+        stored under a new handle; with one, the page is cut from the stored
+        results. Bodies are loaded for the page unless ``headers_only``. The
+        pagination block is None when the search found nothing. Mailboxes
+        whose search timed out are appended to ``timed_out``.
+        """
+        page_size = max(1, int(page_size or config.get_int('default_page_size', 0) or 20))
+
+        if cursor:
+            handle_id, offset = decode_cursor(cursor)
+            handle = self.get(handle_id)
+            if handle is None:
+                raise ValueError("Cursor has expired or is unknown; repeat the search without a cursor")
+            if handle.search_text != search_text:
+                raise ValueError(f"Cursor belongs to a search for '{handle.search_text}'")
+        else:
+            emails = client.search_emails(search_text, include_personal, include_shared,
+                                          include_body=False, mailboxes=mailboxes, filters=filters,
+                                          timed_out=timed_out)
+            logger.info(f"Found {len(emails)} emails containing '{search_text}'")
+            if not emails:
+                return [], None
+            handle = self.create(search_text, emails)
+            offset = 0
+
+        page = handle.page(offset, page_size)
+        if not headers_only:
+            client.load_bodies(page)
+        next_offset = offset + page_size
+        next_cursor = encode_cursor(handle.handle_id, next_offset) if next_offset < handle.total else None
+        logger.info(f"Returning emails {offset + 1}-{offset + len(page)} of {handle.total} for '{search_text}'")
+        return page, format_pagination(
+            encode_cursor(handle.handle_id, offset), offset, page_size, handle.total,
+            next_cursor, handle.expires_in()
+        )
+
+    def release(self, handle_id: str) -> None:
+        with self._lock:
+            self._handles.pop(handle_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._handles)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        # Handles are created with the same TTL, so insertion order is expiry order
+        while self._handles:
+            handle = next(iter(self._handles.values()))
+            if handle.expires > now:
+                break
+            self._handles.popitem(last=False)
+
+
+# Global result pager instance
+result_pager = ResultPager()
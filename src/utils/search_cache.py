@@ -0,0 +1,144 @@
+"""Bounded cache of search results.
+
+Entries expire after a configurable TTL and are evicted in least recently
+used order once either the entry count or the estimated memory of the cached
+results exceeds its cap. Lookups, inserts and evictions are O(1); expired
+entries are dropped as they come due rather than only when their key is hit.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ..config.config_reader import config
+
+# Rough per-email overhead of the dict, datetimes and small values in bytes
+EMAIL_OVERHEAD_BYTES = 600
+
+
+def estimate_size(emails: List[Dict[str, Any]]) -> int:
+    """Approximate memory held by a list of email dicts, in bytes."""
+    size = 64
+    for email in emails:
+        size += EMAIL_OVERHEAD_BYTES
+        for value in email.values():
+            if isinstance(value, str):
+                size += len(value)
+            elif isinstance(value, list):
+                size += sum(len(item) + 56 for item in value if isinstance(item, str))
+    return size
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'expires')
+
+    def __init__(self, value, size: int, expires: float):
+        self.value = value
+        self.size = size
+        self.expires = expires
+
+
+class SearchCache:
+    """TTL and LRU cache capped by entry count and estimated bytes."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        if ttl_seconds is None:
+            ttl_seconds = config.get_int('search_cache_ttl_seconds', 3600)
+        if max_entries is None:
+            max_entries = config.get_int('search_cache_max_entries', 100)
+        if max_bytes is None:
+            max_bytes = config.get_int('search_cache_max_mb', 64) * 1024 * 1024
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Recency order for LRU eviction, and insertion order, which is also
+        # expiry order since all entries share one TTL
+        self._lru: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._expiry: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        """Cached value for ``key``, or None on a miss."""
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._lru.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: str, value: List[Dict[str, Any]]) -> bool:
+        """Cache a result list; returns False if it exceeds the byte cap on its own."""
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return False
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            now = time.monotonic()
+            self._remove(key)
+            entry = _Entry(value, size, now + self.ttl)
+            self._lru[key] = entry
+            self._expiry[key] = entry
+            self._bytes += size
+            self._expire(now)
+            while len(self._lru) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._lru))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._expiry.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            self._expire(time.monotonic())
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._lru.pop(key, None)
+        if entry is not None:
+            del self._expiry[key]
+            self._bytes -= entry.size
+
+    def _expire(self, now: float) -> None:
+        while self._expiry:
+            key, entry = next(iter(self._expiry.items()))
+            if entry.expires > now:
+                break
+            self._remove(key)
+            self.expirations += 1
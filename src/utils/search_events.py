@@ -0,0 +1,147 @@
+"""Completion tracking for Outlook AdvancedSearch.
+
+Outlook signals finished searches through the ``Application.AdvancedSearchComplete``
+event. A COM worker connects an AdvancedSearchEvents sink when it dispatches its
+Application and pumps messages while waiting, so a search returns as soon as
+Outlook is done instead of after a fixed polling window. When no event arrives
+(events unavailable or lost) the waiter falls back to polling ``SearchComplete``
+with an exponential backoff.
+"""
+
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Legacy fixed polling: 100 ms steps, results stable for 500 ms
+LEGACY_POLL_INTERVAL = 0.1
+LEGACY_STABLE_WINDOW = 0.5
+
+# Completion events kept for searches nobody waits for (stopped, or finished after a timed-out wait)
+MAX_COMPLETED_TAGS = 256
+
+
+class AdvancedSearchEvents:
+    """Event sink for Outlook.Application passed to DispatchWithEvents."""
+
+    tracker: Optional['SearchCompletionTracker'] = None
+
+    def OnAdvancedSearchComplete(self, search):
+        if self.tracker is not None:
+            self.tracker.notify(search.Tag)
+
+    def OnAdvancedSearchStopped(self, search):
+        if self.tracker is not None:
+            self.tracker.notify(search.Tag)
+
+
+class SearchCompletionTracker:
+    """Tags of completed searches, fed by an AdvancedSearchEvents sink.
+
+    Events are delivered on the thread that pumps messages, which is the
+    worker thread owning the tracker, so no locking is needed. Tags are
+    forgotten when their wait ends; events no wait picks up are dropped,
+    oldest first, beyond ``max_tags``.
+    """
+
+    def __init__(self, max_tags: int = MAX_COMPLETED_TAGS):
+        self._completed: Dict[str, bool] = {}  # insertion ordered
+        self.max_tags = max_tags
+
+    def sink_class(self) -> type:
+        """Event sink class bound to this tracker."""
+        return type("AdvancedSearchSink", (AdvancedSearchEvents,), {"tracker": self})
+
+    def notify(self, tag: str) -> None:
+        self._completed[tag] = True
+        if len(self._completed) > self.max_tags:
+            del self._completed[next(iter(self._completed))]
+
+    def pop(self, tag: str) -> bool:
+        """Whether the search with ``tag`` completed; forgets the tag."""
+        return self._completed.pop(tag, False)
+
+    def __len__(self) -> int:
+        return len(self._completed)
+
+
+class SearchWait:
+    """Outcome of waiting for one AdvancedSearch."""
+
+    __slots__ = ('tag', 'completed', 'mode', 'waited', 'saved', 'polls')
+
+    def __init__(self, tag: str, completed: bool, mode: str, waited: float,
+                 saved: float, polls: int):
+        self.tag = tag
+        self.completed = completed
+        self.mode = mode  # 'event', 'poll' or 'timeout'
+        self.waited = waited
+        self.saved = saved
+        self.polls = polls
+
+    def to_dict(self):
+        return {
+            "tag": self.tag,
+            "completed": self.completed,
+            "mode": self.mode,
+            "wait_seconds": round(self.waited, 4),
+            "saved_seconds": round(self.saved, 4),
+            "polls": self.polls,
+        }
+
+
+def legacy_wait_estimate(waited: float, stable_window: bool) -> float:
+    """Time the fixed 100 ms polling loop would have spent on the same search."""
+    steps = math.ceil(round(waited / LEGACY_POLL_INTERVAL, 6)) * LEGACY_POLL_INTERVAL
+    return steps + (LEGACY_STABLE_WINDOW if stable_window else 0.0)
+
+
+def wait_for_search(search, tag: str, backend, tracker: Optional[SearchCompletionTracker],
+                    timeout: float, stable_window: bool = True,
+                    initial_poll: float = 0.01, max_poll: float = 0.25) -> SearchWait:
+    """Block until an AdvancedSearch completes, the event fires, or timeout.
+
+    With an event tracker the thread pumps messages every few milliseconds and
+    only polls ``SearchComplete`` rarely as a safety net; without one it polls
+    with a doubling interval starting at ``initial_poll``.
+    """
+    start = time.monotonic()
+    delay = initial_poll
+    next_poll = start + (delay if tracker is None else max_poll)
+    polls = 0
+    mode = 'timeout'
+
+    while True:
+        if tracker is not None:
+            backend.pump_messages()
+            if tracker.pop(tag):
+                mode = 'event'
+                break
+
+        now = time.monotonic()
+        if now >= next_poll:
+            polls += 1
+            if search.SearchComplete:
+                mode = 'poll'
+                break
+            if tracker is None:
+                delay = min(delay * 2, max_poll)
+                next_poll = now + delay
+            else:
+                next_poll = now + max_poll * 4
+
+        if now - start >= timeout:
+            break
+
+        pause = 0.002 if tracker is not None else next_poll - now
+        time.sleep(max(0.0, min(pause, timeout - (now - start))))
+
+    if tracker is not None and mode != 'event':
+        # The event of a search finished by polling or given up on is never awaited
+        tracker.pop(tag)
+    waited = time.monotonic() - start
+    completed = mode != 'timeout'
+    saved = max(0.0, legacy_wait_estimate(waited, stable_window) - waited) if completed else 0.0
+    return SearchWait(tag, completed, mode, waited, saved, polls)
@@ -0,0 +1,154 @@
+"""Background connection supervisor of the Outlook client.
+
+Started from the server's ``main()``, the supervisor connects to Outlook and
+warms the COM workers (resolved shared recipients, Inbox handles and folder
+trees) before the first tool call arrives. Afterwards it probes the session
+every ``supervisor_probe_interval_seconds`` with one cheap property read. When
+a probe fails, the client is marked disconnected and the supervisor reconnects
+with jittered exponential backoff on its own thread, so tool calls never sleep
+through a backoff; they wait at most ``connect_wait_seconds`` for the session.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..config.config_reader import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SUPERVISOR_EVENTS = metrics.counter(
+    'outlook_supervisor_events_total', 'Connection supervisor probes and reconnects, by event',
+    label_names=('event',))
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Delay before retry ``attempt`` (0-based): exponential, capped, with equal jitter.
+
+    Half of the delay is fixed and half random, so retries of several
+    processes spread out without ever retrying immediately.
+    """
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class ConnectionSupervisor:
+    """Owns connecting, warming up and reconnecting an OutlookClient."""
+
+    def __init__(self, client, probe_interval: Optional[float] = None,
+                 backoff_base: Optional[float] = None, backoff_max: Optional[float] = None):
+        self.client = client
+        self.probe_interval = (probe_interval if probe_interval is not None
+                               else config.get_int('supervisor_probe_interval_seconds', 30))
+        self.backoff_base = (backoff_base if backoff_base is not None
+                             else float(config.get('reconnect_backoff_base_seconds', 1) or 1))
+        self.backoff_max = (backoff_max if backoff_max is not None
+                            else float(config.get('reconnect_backoff_max_seconds', 60) or 60))
+        self.state = 'stopped'
+        self.connects = 0
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.last_probe: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.warm_up: Dict[str, Any] = {}
+        self._connected = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self.state = 'starting'
+        self._thread = threading.Thread(target=self._run, name="outlook-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.state = 'stopped'
+
+    def wait_connected(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for a session, cutting a pending backoff short."""
+        if self._connected.is_set():
+            return True
+        self._wake.set()
+        return self._connected.wait(timeout)
+
+    def _sleep(self, seconds: float) -> None:
+        """Sleep until ``seconds`` pass, or until woken or stopped."""
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def _run(self) -> None:
+        backend = self.client.backend
+        backend.initialize_thread()
+        try:
+            attempt = 0
+            while not self._stop.is_set():
+                if not self.client.connected:
+                    self.state = 'reconnecting' if self.connects else 'connecting'
+                    if not self.client.connect_once(attempt):
+                        self.failed_attempts += 1
+                        SUPERVISOR_EVENTS.inc('connect_failed')
+                        delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                        attempt += 1
+                        logger.info(f"Reconnecting to Outlook in {delay:.1f} seconds")
+                        self._sleep(delay)
+                        continue
+                    attempt = 0
+                    self.connects += 1
+                    self._connected.set()
+                    self._warm_up()
+                    self.state = 'connected'
+
+                self._sleep(self.probe_interval)
+                if self._stop.is_set():
+                    break
+                self.last_probe = time.time()
+                if self.client.is_alive():
+                    SUPERVISOR_EVENTS.inc('probe_ok')
+                    continue
+                SUPERVISOR_EVENTS.inc('probe_failed')
+                logger.warning("Outlook session is no longer responding; reconnecting")
+                self._connected.clear()
+                self.client.mark_disconnected()
+                self.reconnects += 1
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Connection supervisor stopped: {e}")
+        finally:
+            self.state = 'stopped'
+            backend.uninitialize_thread()
+
+    def _warm_up(self) -> None:
+        start = time.perf_counter()
+        try:
+            self.warm_up = self.client.warm_up()
+        except Exception as e:
+            logger.error(f"Warm-up failed: {e}")
+            self.warm_up = {"error": str(e)}
+        self.warm_up["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(f"Warm-up finished in {self.warm_up['seconds']} seconds")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "last_probe_age_seconds": (round(time.time() - self.last_probe, 1)
+                                       if self.last_probe else None),
+            "last_error": self.last_error,
+            "warm_up": self.warm_up,
+        }
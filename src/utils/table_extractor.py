@@ -0,0 +1,157 @@
+"""Columnar extraction of search results through the Outlook Table API.
+
+Reading properties one by one from each MailItem costs a cross-process COM
+round-trip per property. A Table returns the header columns of many rows in a
+single ``GetArray`` call, so headers for a whole result set cost one call per
+batch. Full MailItem objects are only opened for fields a Table cannot
+provide: the body, and the attachment count when the row has attachments.
+In header-only mode no items are opened at all; ``body`` (and the attachment
+count of rows with attachments) is left as None for a later body fetch.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ..config.config_reader import config
+from .metrics import COM_OPERATIONS, ITEM_EXTRACT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# (email_data key, Table column) in GetArray order
+HEADER_COLUMNS = (
+    ('entry_id', 'EntryID'),
+    ('subject', 'Subject'),
+    ('sender_name', 'SenderName'),
+    ('sender_email', 'SenderEmailAddress'),
+    ('received_time', 'ReceivedTime'),
+    ('importance', 'Importance'),
+    ('size', 'Size'),
+    ('unread', 'UnRead'),
+    ('to', 'urn:schemas:httpmail:displayto'),
+    ('cc', 'urn:schemas:httpmail:displaycc'),
+    ('has_attachments', 'urn:schemas:httpmail:hasattachment'),
+    ('last_modified', 'LastModificationTime'),
+)
+
+# Message-ID header, the same for copies of a message in different stores
+PR_INTERNET_MESSAGE_ID = 'http://schemas.microsoft.com/mapi/proptag/0x1035001F'
+
+# Columns some stores cannot provide in a Table; left as None when Add fails
+OPTIONAL_COLUMNS = (
+    ('conversation_id', 'ConversationID'),
+    ('conversation_index', 'ConversationIndex'),
+    ('internet_message_id', PR_INTERNET_MESSAGE_ID),
+)
+
+
+def split_display_names(*values: Optional[str]) -> List[str]:
+    """Split Outlook ``To``/``CC`` display strings into names."""
+    names = []
+    for value in values:
+        if value:
+            names.extend(name.strip() for name in value.split(';') if name.strip())
+    return names
+
+
+class TableExtractor:
+    """Builds email_data dicts from a Table, opening items only when needed."""
+
+    def __init__(self, namespace, body_reader: Callable[[Any], str],
+                 batch_size: Optional[int] = None, include_body: bool = True):
+        self.namespace = namespace
+        self.body_reader = body_reader
+        self.include_body = include_body
+        self.batch_size = max(1, batch_size or config.get_int('batch_processing_size', 50))
+
+    def extract(self, table, folder_name: str, mailbox_type: str, max_results: int,
+                found_ids: Set[str],
+                sink: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Extract up to ``max_results`` rows not yet in ``found_ids``.
+
+        With a ``sink`` every email is passed to it as soon as its row is
+        read and nothing is kept, neither the email nor its EntryID, so a
+        scan of any number of rows holds one batch at a time.
+        """
+        columns = table.Columns
+        columns.RemoveAll()
+        keys = []
+        for key, column in HEADER_COLUMNS:
+            columns.Add(column)
+            keys.append(key)
+        for key, column in OPTIONAL_COLUMNS:
+            try:
+                columns.Add(column)
+                keys.append(key)
+            except Exception as e:
+                logger.debug(f"Table column {column} unavailable: {e}")
+
+        emails = []
+        while len(emails) < max_results and not table.EndOfTable:
+            rows = table.GetArray(min(self.batch_size, max_results - len(emails)))
+            COM_OPERATIONS.inc('table_get_array')
+            if not rows:
+                break
+            for row in rows:
+                header = dict(zip(keys, row))
+                entry_id = header.get('entry_id')
+                if not entry_id or entry_id in found_ids:
+                    continue
+                start = time.perf_counter()
+                email_data = self._build_email(header, folder_name, mailbox_type)
+                ITEM_EXTRACT_SECONDS.observe(time.perf_counter() - start, 'table')
+                if not email_data:
+                    continue
+                if sink is not None:
+                    sink(email_data)
+                    continue
+                emails.append(email_data)
+                found_ids.add(entry_id)
+                if len(emails) >= max_results:
+                    break
+        return emails
+
+    def _build_email(self, header: Dict[str, Any], folder_name: str,
+                     mailbox_type: str) -> Optional[Dict[str, Any]]:
+        try:
+            recipients = split_display_names(header.get('to'), header.get('cc'))
+            max_recipients = config.settings.max_recipients_display
+            if len(recipients) > max_recipients:
+                recipients = recipients[:max_recipients] + [f"... and {len(recipients) - max_recipients} more"]
+
+            if self.include_body:
+                # Body and attachment count are not available as Table columns
+                attachments_count = 0
+                item = self.namespace.GetItemFromID(header['entry_id'])
+                COM_OPERATIONS.inc('open_item')
+                body = self.body_reader(item)
+                if header.get('has_attachments'):
+                    attachments_count = item.Attachments.Count
+                item = None
+            else:
+                body = None
+                attachments_count = None if header.get('has_attachments') else 0
+
+            return {
+                'subject': header.get('subject') or 'No Subject',
+                'sender_name': header.get('sender_name') or 'Unknown',
+                'sender_email': header.get('sender_email') or '',
+                'recipients': recipients,
+                'received_time': header.get('received_time') or datetime.now(),
+                'folder_name': folder_name,
+                'mailbox_type': mailbox_type,
+                'importance': header.get('importance') if header.get('importance') is not None else 1,
+                'body': body,
+                'size': header.get('size') or 0,
+                'attachments_count': attachments_count,
+                'unread': bool(header.get('unread')),
+                'entry_id': header['entry_id'],
+                'last_modified': header.get('last_modified'),
+                'conversation_id': header.get('conversation_id') or '',
+                'conversation_index': header.get('conversation_index') or '',
+                'internet_message_id': header.get('internet_message_id') or '',
+            }
+        except Exception as e:
+            logger.error(f"Error extracting email data from table row: {e}")
+            return None
@@ -0,0 +1,76 @@
+"""Conversion of email bodies to compact plain text.
+
+Bodies are reduced to one line of text: markup is removed, character
+references are decoded and whitespace runs collapse to single spaces. Each
+stage is one scan with a precompiled pattern and is skipped when the text
+cannot contain what it removes, so plain-text bodies only pay for the
+whitespace pass.
+"""
+
+import re
+import time
+from html import unescape
+
+from .metrics import HTML_CLEAN_SECONDS
+
+# Elements whose content is never visible text; the case-sensitive pattern is
+# considerably faster and covers the lower-case markup Outlook generates
+_HIDDEN_PATTERN = r'<(?:(script|style|head|title)\b[^>]*>.*?</\1\s*>|!--.*?-->)'
+_HIDDEN = re.compile(_HIDDEN_PATTERN, re.DOTALL)
+_HIDDEN_ANY_CASE = re.compile(_HIDDEN_PATTERN, re.DOTALL | re.IGNORECASE)
+_HIDDEN_HINTS = ('<!--', '<style', '<script', '<head', '<title')
+_HIDDEN_UPPER_HINTS = ('<STYLE', '<SCRIPT', '<HEAD', '<TITLE', '<Style', '<Head')
+
+# Tags, declarations and processing instructions; a literal "<" followed by
+# a space or digit is text and is kept
+_TAGS = re.compile(r'<[!/?]?[A-Za-z][^>]*>')
+
+
+def html_to_text(text: str) -> str:
+    """Plain text of an HTML (or plain) body on a single line.
+
+    Tags become spaces so that table cells and paragraphs stay separate
+    words; whitespace is collapsed afterwards anyway.
+    """
+    if not text:
+        return ''
+    if '<' in text:
+        if any(hint in text for hint in _HIDDEN_UPPER_HINTS):
+            text = _HIDDEN_ANY_CASE.sub(' ', text)
+        elif any(hint in text for hint in _HIDDEN_HINTS):
+            text = _HIDDEN.sub(' ', text)
+        text = _TAGS.sub(' ', text)
+    if '&' in text:
+        # HTML5 named and numeric references, e.g. &nbsp; &amp; &#8211; &eacute;
+        text = unescape(text)
+    return ' '.join(text.split())
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """Cut ``text`` to ``max_chars`` (0 = no limit), marking the cut."""
+    if max_chars > 0 and len(text) > max_chars:
+        return text[:max_chars] + " [truncated]"
+    return text
+
+
+def read_item_text(item, max_chars: int = 0, clean: bool = True, prefer_html: bool = False) -> str:
+    """Processed body of a MailItem.
+
+    With ``prefer_html`` and ``clean`` the body is converted from
+    ``HTMLBody``, which keeps table cells and line breaks apart; otherwise
+    ``Body`` is truncated first and then cleaned, or left as it is without
+    ``clean``.
+    """
+    if prefer_html and clean:
+        html = getattr(item, 'HTMLBody', '') or ''
+        if html:
+            return truncate(_timed_html_to_text(html), max_chars)
+    body = truncate(getattr(item, 'Body', '') or '', max_chars)
+    return _timed_html_to_text(body) if clean else body
+
+
+def _timed_html_to_text(text: str) -> str:
+    start = time.perf_counter()
+    text = html_to_text(text)
+    HTML_CLEAN_SECONDS.observe(time.perf_counter() - start)
+    return text
@@ -0,0 +1,42 @@
+"""Shared pytest fixtures for the Outlook MCP Server tests."""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_path)
+
+from src.config.config_reader import Settings, config  # noqa: E402
+from src.utils.outlook_client import OutlookClient  # noqa: E402
+from src.utils.outlook_simulator import SimulatedBackend  # noqa: E402
+
+# Interactive scripts that need a live Outlook profile
+collect_ignore = ["test_connection.py", "test-shared-mailbox.py"]
+
+SHARED_MAILBOX = "team@example.com"
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Override configuration values for the duration of a test."""
+    def apply(**values):
+        for key, value in values.items():
+            monkeypatch.setitem(config.config, key, value)
+        monkeypatch.setattr(config, 'settings', Settings(config.config))
+    apply(shared_mailbox_email=SHARED_MAILBOX)
+    return apply
+
+
+@pytest.fixture
+def backend():
+    """Simulated backend with a personal and a shared mailbox."""
+    return SimulatedBackend.build(personal_size=2000, shared={SHARED_MAILBOX: 2000})
+
+
+@pytest.fixture
+def client(backend, settings):
+    """Outlook client connected to the simulated backend."""
+    return OutlookClient(backend)
@@ -0,0 +1,114 @@
+"""Tests for the one-pass alert aggregation and the header scan feeding it."""
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+from src.utils.alert_analyzer import AlertAggregator
+from src.utils.email_formatter import format_alert_analysis
+from src.utils.outlook_client import OutlookClient
+from src.utils.outlook_simulator import FakeNamespace, SimulatedBackend
+
+from conftest import SHARED_MAILBOX
+
+
+def alert(n, subject="Disk usage above threshold", sender="monitoring@example.com", **fields):
+    email = {
+        'subject': subject,
+        'sender_name': sender.split('@')[0],
+        'sender_email': sender,
+        'received_time': datetime(2024, 5, 1, 6, 0) + timedelta(hours=5 * n),
+        'mailbox_type': 'personal',
+        'importance': 1,
+        'entry_id': f"ID{n:04d}",
+        'internet_message_id': f"<{n}@example.com>",
+        'body': None,
+    }
+    email.update(fields)
+    return email
+
+
+def test_aggregator_counts_in_one_pass():
+    alerts = [alert(n) for n in range(10)]
+    alerts[1]['importance'] = 2
+    alerts[2]['subject'] = "CRITICAL: Disk usage above threshold"
+    alerts[3]['subject'] = "RE: Disk usage above threshold"
+    alerts[3]['sender_email'] = "eva.lund@example.com"
+    alerts.append(alert(4, mailbox_type='shared', mailbox_address=SHARED_MAILBOX))  # copy of alert 4
+
+    aggregator = AlertAggregator(analyze_importance=True)
+    for email in alerts:
+        aggregator.add(email)
+
+    assert (aggregator.total, aggregator.urgent, aggregator.replies) == (10, 2, 1)
+    assert aggregator.copies_collapsed == 1
+    assert aggregator.mailbox_distribution() == {'personal': 10}
+    assert aggregator.daily_counts()[0] == {"date": "2024-05-01", "alerts": 4, "urgent": 2}
+    assert sum(day["alerts"] for day in aggregator.daily_counts()) == 10
+    assert aggregator.hourly_distribution() == dict(Counter(
+        f"{email['received_time'].hour:02d}" for email in alerts[:10]))
+    assert aggregator.top_senders(1) == [
+        {"name": "monitoring", "email": "monitoring@example.com", "alerts": 9}]
+    assert [email['entry_id'] for email in aggregator.newest()] == [f"ID{n:04d}" for n in range(9, -1, -1)]
+    assert [email['entry_id'] for email in aggregator.newest_urgent()] == ["ID0002", "ID0001"]
+    assert aggregator.daily_frequency() == round(10 / 3, 2)
+
+    plain = AlertAggregator(analyze_importance=False)
+    for email in alerts:
+        plain.add(email)
+    assert plain.urgent == 1
+
+
+def test_top_senders_are_approximate_beyond_the_counter_slots():
+    aggregator = AlertAggregator(sender_slots=4)
+    for n in range(300):
+        # One frequent sender among many one-off senders
+        sender = "monitoring@example.com" if n % 3 == 0 else f"host{n}@example.com"
+        aggregator.add(alert(n, sender=sender))
+
+    assert len(aggregator.senders) <= 4
+    assert aggregator.senders_approximate
+    assert aggregator.top_senders(1)[0]["email"] == "monitoring@example.com"
+    assert format_alert_analysis(aggregator, "Disk")["top_senders_approximate"] is True
+
+
+def test_scan_matches_a_full_search_without_opening_items(settings, monkeypatch):
+    backend = SimulatedBackend.build(personal_size=3000, shared={SHARED_MAILBOX: 3000}, cc_shared=True)
+    client = OutlookClient(backend)
+    opened = []
+    get_item = FakeNamespace.GetItemFromID
+    monkeypatch.setattr(FakeNamespace, 'GetItemFromID',
+                        lambda self, entry_id, store_id=None: opened.append(entry_id)
+                        or get_item(self, entry_id, store_id))
+
+    aggregator = AlertAggregator()
+    scanned = client.scan_headers("Disk usage above threshold", aggregator.add)
+    assert not opened
+
+    settings(max_search_results=100000)
+    emails = client.search_emails("Disk usage above threshold", include_body=False)
+    expected = AlertAggregator()
+    for email in emails:
+        expected.add(email)
+
+    # Every alert is in both mailboxes; the scan sees both copies and counts one
+    assert aggregator.total == len(emails) > 50
+    assert scanned == len(emails) + aggregator.copies_collapsed
+    assert aggregator.copies_collapsed == len(emails)
+    assert (aggregator.urgent, aggregator.replies) == (expected.urgent, expected.replies)
+    assert aggregator.daily_counts() == expected.daily_counts()
+    assert aggregator.top_senders() == expected.top_senders()
+
+    result = format_alert_analysis(aggregator, "Disk usage above threshold")
+    assert result["summary"]["total_alerts"] == len(emails)
+    # Copies share a received time, so either mailbox's copy may come first
+    copies = {location['entry_id'] for location in emails[0].get('locations') or [emails[0]]}
+    assert result["recent_alerts"][0]["entry_id"] in copies
+    assert sum(result["hourly_distribution"].values()) == len(emails)
+
+
+def test_alert_analysis_of_a_list_and_of_nothing():
+    alerts = [alert(n) for n in range(3)]
+    result = format_alert_analysis(alerts, "Disk")
+    assert result["summary"]["total_alerts"] == 3
+    assert result["summary"]["response_indicators"]["replies_per_alert"] == 0
+    assert format_alert_analysis([], "Disk")["status"] == "no_alerts_found"
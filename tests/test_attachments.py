@@ -0,0 +1,138 @@
+"""Tests for attachment listing, chunked extraction and the attachment store."""
+
+import base64
+import hashlib
+import os
+from collections import defaultdict
+
+import pytest
+
+from src.utils import outlook_simulator
+from src.utils.attachment_store import AttachmentStore
+from src.utils.outlook_client import _utf8_boundary
+from src.utils.outlook_simulator import ATTACHMENT_SIZE, attachment_content
+
+
+@pytest.fixture
+def attachment_client(client, settings, tmp_path):
+    settings(attachment_cache_path=str(tmp_path / "attachments"))
+    yield client
+    client.worker_pool.shutdown()
+
+
+def items_with_attachments(client):
+    """EntryIDs of inbox items with attachments, grouped by ConversationID."""
+    inbox = client.backend.get_application().Session.GetDefaultFolder(6)
+    threads = defaultdict(list)
+    for index in range(1, 400):
+        item = inbox.Items.Item(index)
+        if item.Attachments.Count:
+            threads[item.ConversationID].append(item.EntryID)
+    return threads
+
+
+def test_list_attachments_reports_metadata_without_extracting(attachment_client):
+    threads = items_with_attachments(attachment_client)
+    conversation, entry_ids = next(iter(threads.items()))
+
+    results = attachment_client.list_attachments(entry_ids[:1] + ["missing"])
+
+    listed, missing = results
+    first = listed['attachments'][0]
+    assert first == {'index': 1, 'name': f"{conversation[-8:]}-1.log", 'size': ATTACHMENT_SIZE,
+                     'mime_type': 'text/plain', 'type': 'by_value', 'sha256': None}
+    assert listed['subject']
+    assert missing['error']
+    assert attachment_client.attachment_store_stats()['files'] == 0
+
+
+def test_attachment_is_streamed_in_chunks_and_served_from_the_store(attachment_client):
+    conversation, entry_ids = next(iter(items_with_attachments(attachment_client).items()))
+    entry_id = entry_ids[0]
+
+    chunks, offset = [], 0
+    while offset is not None:
+        chunk = attachment_client.get_attachment(entry_id, 1, offset, max_bytes=10000)
+        assert chunk['encoding'] == 'text' and chunk['length'] <= 10000
+        chunks.append(chunk['content'])
+        offset = chunk['next_offset']
+
+    expected = attachment_content(conversation, 1)
+    assert "".join(chunks).encode() == expected
+    assert chunk['sha256'] == hashlib.sha256(expected).hexdigest()
+
+    calls = attachment_client.backend.latency.calls
+    again = attachment_client.get_attachment(entry_id, 1)
+    assert attachment_client.backend.latency.calls == calls
+    assert again['next_offset'] is None and again['content'].encode() == expected
+    assert attachment_client.list_attachments([entry_id])[0]['attachments'][0]['sha256'] == chunk['sha256']
+
+
+def test_attachment_evicted_before_it_is_read_is_extracted_again(attachment_client):
+    conversation, entry_ids = next(iter(items_with_attachments(attachment_client).items()))
+    first = attachment_client.get_attachment(entry_ids[0], 1)
+    store = attachment_client.attachment_store
+    # Another request evicts the file between this request's lookup and read
+    os.remove(store.path(first['sha256']))
+
+    again = attachment_client.get_attachment(entry_ids[0], 1)
+
+    assert 'error' not in again
+    assert again['content'].encode() == attachment_content(conversation, 1)
+    assert os.path.exists(store.path(first['sha256']))
+
+
+def test_store_stats_do_not_open_the_store(attachment_client, tmp_path):
+    assert attachment_client.attachment_store_stats() == {}
+    assert not (tmp_path / "attachments").exists()
+
+
+def test_binary_content_is_base64_and_bad_requests_report_errors(attachment_client, monkeypatch):
+    monkeypatch.setattr(outlook_simulator, '_ATTACHMENT_KINDS', ((".zip", "application/zip"),))
+    conversation, entry_ids = next(iter(items_with_attachments(attachment_client).items()))
+
+    chunk = attachment_client.get_attachment(entry_ids[0], 1, offset=100, max_bytes=64)
+    assert chunk['name'].endswith(".zip") and chunk['encoding'] == 'base64'
+    assert base64.b64decode(chunk['content']) == attachment_content(conversation, 1)[100:164]
+
+    assert 'error' in attachment_client.get_attachment(entry_ids[0], 9)
+    assert 'error' in attachment_client.get_attachment("missing", 1)
+    assert 'error' in attachment_client.get_attachment(entry_ids[0], 1, offset=ATTACHMENT_SIZE + 1)
+
+
+def test_identical_attachments_are_stored_once(attachment_client):
+    threads = items_with_attachments(attachment_client)
+    entry_ids = next(ids for ids in threads.values() if len(ids) > 1)
+
+    first = attachment_client.get_attachment(entry_ids[0], 1)
+    second = attachment_client.get_attachment(entry_ids[1], 1)
+
+    assert first['sha256'] == second['sha256']
+    stats = attachment_client.attachment_store_stats()
+    assert stats['files'] == 1 and stats['deduplicated'] == 1
+
+
+def test_store_evicts_least_recently_used_files_and_survives_restarts(tmp_path):
+    store = AttachmentStore(str(tmp_path), max_bytes=25000)
+    for index, content in enumerate((b"a" * 10000, b"b" * 10000, b"c" * 10000)):
+        spool = store.spool_path("file.log")
+        with open(spool, 'wb') as f:
+            f.write(content)
+        store.add(spool, "entry", index + 1, {'name': 'file.log', 'mime_type': 'text/plain'})
+        if index == 1:
+            assert store.lookup("entry", 1) is not None  # first file becomes most recently used
+
+    assert store.lookup("entry", 2) is None
+    assert store.stats()['files'] == 2 and store.stats()['evictions'] == 1
+
+    reopened = AttachmentStore(str(tmp_path), max_bytes=25000)
+    assert reopened.stats()['bytes'] == 20000
+
+
+def test_text_chunks_end_on_character_boundaries():
+    data = "log é€".encode()
+    assert _utf8_boundary(data[:5], False) == 4
+    assert _utf8_boundary(data[:7], False) == 6
+    assert _utf8_boundary(data[:8], False) == 6
+    assert _utf8_boundary(data, False) == len(data)
+    assert _utf8_boundary(data[:5], True) == 5
@@ -0,0 +1,72 @@
+"""Tests for header-only search and cached body retrieval."""
+
+from datetime import datetime, timedelta
+
+from src.utils.body_cache import BodyCache
+from src.utils.outlook_simulator import FakeNamespace
+
+MODIFIED = datetime(2024, 5, 1, 9, 0)
+
+
+def test_body_is_served_only_for_the_cached_version():
+    cache = BodyCache(max_bytes=10 ** 6)
+    cache.put("ID1", MODIFIED, "body", 2)
+
+    assert cache.get("ID1", MODIFIED) == ("body", 2)
+    assert cache.get("ID1", MODIFIED + timedelta(seconds=1)) is None
+    assert cache.get("ID1", None) is None
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = BodyCache(max_bytes=3000)
+    for n in range(10):
+        cache.put(f"ID{n}", MODIFIED, "x" * 500, 0)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 3000 and stats["evictions"] > 0
+    assert cache.get("ID9", MODIFIED) is not None and cache.get("ID0", MODIFIED) is None
+
+
+def test_header_only_search_opens_no_items(client, backend, monkeypatch):
+    opened = []
+    get_item = FakeNamespace.GetItemFromID
+    monkeypatch.setattr(FakeNamespace, 'GetItemFromID',
+                        lambda self, entry_id, store_id=None: opened.append(entry_id)
+                        or get_item(self, entry_id, store_id))
+    headers = client.search_emails("raised for host", include_body=False)
+    assert not opened
+
+    client._search_cache.clear()
+    client._body_cache.clear()
+    full = client.search_emails("raised for host")
+
+    assert all(email['body'] is None for email in headers)
+    # Only the returned emails are opened, not those cut from each mailbox's results
+    assert sorted(opened) == sorted(e['entry_id'] for e in full)
+    assert [e['entry_id'] for e in headers] == [e['entry_id'] for e in full]
+
+
+def test_bodies_by_entry_id_match_eager_search_and_are_cached(client, backend):
+    eager = {e['entry_id']: e for e in client.search_emails("INC-000010")}
+    client._search_cache.clear()
+    client._body_cache.clear()
+    headers = client.search_emails("INC-000010", include_body=False)
+    entry_ids = [e['entry_id'] for e in headers]
+
+    backend.latency.reset()
+    bodies = client.get_email_bodies(entry_ids)
+    assert backend.latency.calls > 0
+    assert [b['body'] for b in bodies] == [eager[i]['body'] for i in entry_ids]
+    assert [b['attachments_count'] for b in bodies] == [eager[i]['attachments_count'] for i in entry_ids]
+
+    backend.latency.reset()
+    again = client.get_email_bodies(entry_ids)
+    assert backend.latency.calls == 0
+    assert [b['body'] for b in again] == [b['body'] for b in bodies]
+
+
+def test_unknown_entry_id_reports_error(client):
+    bodies = client.get_email_bodies(["00000000DEADBEEF"])
+
+    assert bodies[0]['body'] == '' and bodies[0]['error']
+
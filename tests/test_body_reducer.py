@@ -0,0 +1,94 @@
+"""Tests for quoted-history and signature stripping."""
+
+import pytest
+
+from src.utils.body_reducer import new_content, reduce_body, resolve_body_mode
+from src.utils.email_formatter import format_email_bodies, format_email_chain
+from src.utils.text_normalizer import html_to_text
+
+OUTLOOK_REPLY = (
+    "Hi team,\r\n\r\nRestarted the ingestion service.\r\n\r\nRegards,\r\nErik Berg\r\n\r\n"
+    "________________________________\r\n"
+    "From: Eva Lund <eva.lund@example.com>\r\nSent: Wednesday, May 01, 2024 09:00 AM\r\n"
+    "To: Operations\r\nSubject: Queue backlog\r\n\r\nThe queue is growing."
+)
+
+
+@pytest.mark.parametrize("body", [
+    OUTLOOK_REPLY,
+    html_to_text(OUTLOOK_REPLY),
+    "Hi team,\n\nRestarted the ingestion service.\n\n-----Original Message-----\n"
+    "From: Eva Lund\nSent: 1 May 2024 09:00\nSubject: Queue backlog\n\nThe queue is growing.",
+    "Hi team,\n\nRestarted the ingestion service.\n\nOn Wed, 1 May 2024 at 09:00, Eva Lund "
+    "<eva.lund@example.com> wrote:\n> The queue is growing.",
+    "Hi team, Restarted the ingestion service. From: Eva Lund <eva.lund@example.com> "
+    "Sent: Wednesday To: Operations Subject: Queue backlog The queue is growing.",
+    "Hi team,\n\nRestarted the ingestion service.\n\nThanks!\n\nSent from my phone",
+    "Hi team,\n\nRestarted the ingestion service.\n-- \nErik Berg\nOperations",
+])
+def test_quoted_history_and_signature_are_removed(body):
+    assert " ".join(new_content(body).split()) == "Hi team, Restarted the ingestion service."
+
+
+def test_text_that_only_looks_like_a_closing_is_kept():
+    body = "The disk is full, thanks to the debug logging. I will clean it up tomorrow."
+    assert new_content(body) == body
+    assert new_content("Thanks!") == "Thanks!"
+    # A bare forward has no new content of its own
+    assert new_content("> The queue is growing.") == "> The queue is growing."
+
+
+def test_lines_starting_with_a_greater_than_sign_are_not_all_quotes():
+    assert new_content("Value\n>= 5 is fine\nmore") == "Value\n>= 5 is fine\nmore"
+    assert new_content("Value\n>5\n>6\nold") == "Value"
+    assert new_content("Value\n>\n>> older") == "Value"
+    assert new_content("Value\r\n> quoted") == "Value"
+
+
+def test_content_after_a_closing_line_is_kept():
+    body = ("Hi team,\n\nThanks,\nthe restart fixed the backlog. I will keep an eye on the "
+            "queue today.\n\nErik")
+    assert new_content(body) == body
+    assert new_content(body + "\n\nRegards,\nErik Berg\nOperations") == body
+    # A closing at the very start is not read against the end of the body
+    assert new_content("Thanks,\nErik.") == "Thanks,\nErik."
+
+
+def test_body_modes():
+    new = "Hi team,\r\n\r\nRestarted the ingestion service."
+    assert reduce_body(OUTLOOK_REPLY, 'full') == OUTLOOK_REPLY
+    assert reduce_body(OUTLOOK_REPLY, 'new') == new
+    assert reduce_body(OUTLOOK_REPLY, 'preview', preview_chars=8) == new[:8]
+    assert resolve_body_mode(None) == 'preview'
+    assert resolve_body_mode("New") == 'new'
+    with pytest.raises(ValueError):
+        resolve_body_mode("quoted")
+
+
+def test_email_chain_returns_the_selected_body(settings):
+    emails = [{'entry_id': "ID0001", 'subject': "RE: Queue backlog", 'body': OUTLOOK_REPLY}]
+
+    full = format_email_chain(emails, "Queue", body_mode='full')
+    new = format_email_chain(emails, "Queue", body_mode='new')
+    settings(default_body_mode='preview', body_preview_chars=8)
+    preview = format_email_chain(emails, "Queue")
+
+    assert full["conversations"][0]["emails"][0]["body"] == OUTLOOK_REPLY
+    assert "body_chars_removed" not in full["summary"]
+    assert new["conversations"][0]["emails"][0]["body"].endswith("ingestion service.")
+    assert new["summary"]["body_mode"] == 'new'
+    assert new["summary"]["body_chars_removed"] == len(OUTLOOK_REPLY) - len(
+        new["conversations"][0]["emails"][0]["body"])
+    assert preview["conversations"][0]["emails"][0]["body_preview"] == "Hi team,"
+    assert format_email_bodies(emails)["bodies"][0]["body"] == OUTLOOK_REPLY
+
+
+def test_simulated_thread_keeps_one_copy_of_each_message(client):
+    emails = client.search_emails("INC-000010")
+    full = format_email_chain(emails, "INC-000010", body_mode='full')
+    new = format_email_chain(emails, "INC-000010", body_mode='new')
+
+    bodies = [e["body"] for c in new["conversations"] for e in c["emails"]]
+    assert all("From:" not in body and "Regards" not in body for body in bodies)
+    assert sum(map(len, bodies)) * 2 < sum(
+        len(e["body"]) for c in full["conversations"] for e in c["emails"])
@@ -0,0 +1,91 @@
+"""Tests for the persistent COM worker pool."""
+
+import threading
+
+import pytest
+
+from src.utils.com_worker_pool import ComWorkerPool
+from src.utils.outlook_simulator import SimulatedBackend
+
+from conftest import SHARED_MAILBOX
+
+
+class CountingBackend(SimulatedBackend):
+    """Simulated backend counting Application dispatches and thread inits."""
+
+    def __init__(self, outlook):
+        super().__init__(outlook)
+        self.dispatches = 0
+        self.thread_inits = 0
+
+    def initialize_thread(self):
+        self.thread_inits += 1
+
+    def dispatch_application(self, events=None):
+        self.dispatches += 1
+        return super().dispatch_application(events)
+
+
+@pytest.fixture
+def counting_backend():
+    base = SimulatedBackend.build(personal_size=200, shared={SHARED_MAILBOX: 200})
+    return CountingBackend(base.outlook)
+
+
+def test_workers_reuse_their_outlook_session(counting_backend):
+    pool = ComWorkerPool(counting_backend, size=1, health_check_interval=3600)
+    try:
+        names = [pool.submit(lambda ctx: ctx.personal_inbox().Name).result() for _ in range(5)]
+        threads = {pool.submit(lambda ctx: threading.current_thread().name).result() for _ in range(5)}
+    finally:
+        pool.shutdown()
+
+    assert names == ['Inbox'] * 5
+    assert len(threads) == 1
+    assert counting_backend.dispatches == 1
+    assert counting_backend.thread_inits == 1
+
+
+def test_shared_inbox_is_resolved_once_per_worker(counting_backend):
+    pool = ComWorkerPool(counting_backend, size=1, health_check_interval=3600)
+    try:
+        first = pool.submit(lambda ctx: ctx.shared_inbox(SHARED_MAILBOX)).result()
+        second = pool.submit(lambda ctx: ctx.shared_inbox(SHARED_MAILBOX.upper())).result()
+    finally:
+        pool.shutdown()
+
+    assert first is second
+
+
+def test_failed_health_check_recreates_session(counting_backend, monkeypatch):
+    pool = ComWorkerPool(counting_backend, size=1, health_check_interval=0)
+    try:
+        pool.submit(lambda ctx: None).result()
+        monkeypatch.setattr("src.utils.com_worker_pool.ComWorkerContext.is_alive", lambda self: False)
+        pool.submit(lambda ctx: None).result()
+        stats = pool.stats()
+    finally:
+        pool.shutdown()
+
+    assert counting_backend.dispatches == 2
+    assert stats["workers"][0]["restarts"] == 1
+
+
+def test_job_exceptions_are_propagated(counting_backend):
+    pool = ComWorkerPool(counting_backend, size=2)
+    try:
+        future = pool.submit(lambda ctx: ctx.shared_inbox("nobody@example.com"))
+        with pytest.raises(RuntimeError):
+            future.result()
+    finally:
+        pool.shutdown()
+
+
+def test_search_emails_runs_on_the_pool(client):
+    client.search_emails("INC-000003")
+    client.search_emails("INC-000004")
+
+    stats = client.worker_pool.stats()
+    # Per search: one job per mailbox, then one batch of bodies for the merged results
+    assert sum(w["jobs_completed"] for w in stats["workers"]) == 6
+    client.worker_pool.shutdown()
@@ -0,0 +1,84 @@
+"""Tests for the settings snapshot and config.properties hot reload."""
+
+import pytest
+
+from src.config.config_reader import ConfigReader, Settings
+
+
+@pytest.fixture
+def properties(tmp_path):
+    path = tmp_path / "config.properties"
+    path.write_text("max_body_chars=500\nclean_html_content=true\n", encoding="utf-8")
+    return path
+
+
+def test_settings_are_typed_and_read_only():
+    settings = Settings({'max_body_chars': '700', 'clean_html_content': 'no'})
+
+    assert settings.max_body_chars == 700
+    assert settings.clean_html_content is False
+    assert settings.max_search_results == 500
+    with pytest.raises(AttributeError):
+        settings.max_body_chars = 1
+    with pytest.raises(AttributeError):
+        settings.unknown = 1
+
+
+def test_reload_swaps_snapshot_and_reports_changes(properties):
+    reader = ConfigReader(str(properties))
+    before = reader.settings
+    changes = []
+    reader.add_listener(changes.append)
+
+    assert reader.reload_if_changed(force=True) == set()
+
+    properties.write_text("max_body_chars=2000\nclean_html_content=true\nprefer_html_body=true\n",
+                          encoding="utf-8")
+    changed = reader.reload_if_changed(force=True)
+
+    assert changed == {'max_body_chars', 'prefer_html_body'}
+    assert changes == [changed]
+    assert reader.settings.max_body_chars == 2000 and reader.settings.prefer_html_body
+    assert before.max_body_chars == 500
+
+
+def test_unreadable_file_keeps_current_configuration(properties):
+    reader = ConfigReader(str(properties))
+    properties.unlink()
+
+    assert reader.reload_if_changed(force=True) == set()
+    assert reader.settings.max_body_chars == 500
+
+
+def test_watch_interval_limits_file_checks(properties):
+    reader = ConfigReader(str(properties))
+    reader.config['config_reload_interval_seconds'] = 3600
+    reader.reload_if_changed()
+
+    properties.write_text("max_body_chars=1\n", encoding="utf-8")
+
+    assert reader.reload_if_changed() == set()
+    assert reader.settings.max_body_chars == 500
+
+
+def test_client_drops_caches_for_changed_settings(client):
+    emails = client.search_emails("raised for host")
+    assert len(client._body_cache) and client.search_cache_stats()["entries"]
+
+    client._on_config_change({'include_timestamps'})
+    assert len(client._body_cache) and client.search_cache_stats()["entries"]
+
+    client._on_config_change({'max_body_chars'})
+    assert len(client._body_cache) == 0 and client.search_cache_stats()["entries"] == 0
+    assert emails
+
+
+def test_loading_never_writes_to_stdout(properties, tmp_path, capsys):
+    properties.write_text("max_body_chars=500\nnot a setting\n", encoding="utf-8")
+    reader = ConfigReader(str(properties))
+    ConfigReader(str(tmp_path / "missing.properties"))
+    reader.show_config()
+
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "max_body_chars: 500" in captured.err
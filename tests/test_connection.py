@@ -5,23 +5,25 @@ import sys
 import os
 import platform
 
-# Check if running on Windows
-if platform.system() != 'Windows':
+# Add parent directory to path for imports
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_path)
+
+from src.config.config_reader import config
+
+# Check if running on Windows (the simulated backend runs anywhere)
+if platform.system() != 'Windows' and config.get('mail_backend', 'com') == 'com':
     print("[ERROR] Outlook MCP Server requires Windows with Microsoft Outlook installed")
     print(f"   Current platform: {platform.system()}")
     print("\n[INFO] To use this server:")
     print("   1. Run on a Windows machine with Outlook installed")
     print("   2. Or use a Windows virtual machine")
     print("   3. Or access a remote Windows desktop")
+    print("   4. Or set mail_backend=simulated in config.properties for a synthetic mailbox")
     sys.exit(1)
 
-# Add parent directory to path for imports
-parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, parent_path)
-
 try:
     from src.utils.outlook_client import outlook_client
-    from src.config.config_reader import config
     from src.utils.email_formatter import format_mailbox_status, format_email_chain
 except ImportError as e:
     print(f"[ERROR] Import Error: {e}")
@@ -0,0 +1,83 @@
+"""Tests for search filters compiled into the DASL query."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.utils.dasl import SearchFilters, dasl_date, phrase_filter, subject_filter
+
+QUERY = "raised for host"
+
+
+def test_filters_become_dasl_conditions():
+    filters = SearchFilters(
+        received_after=datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc),
+        senders=["O'Brien"], importance=[2], unread=True, has_attachments=False,
+    )
+    query = phrase_filter("disk full", filters)
+
+    assert query.startswith('@SQL=("urn:schemas:httpmail:subject" ci_phrasematch \'disk full\'')
+    assert "\"urn:schemas:httpmail:datereceived\" >= '05/01/2024 08:00 AM'" in query
+    assert "\"urn:schemas:httpmail:fromname\" LIKE '%O''Brien%'" in query
+    assert '"urn:schemas:httpmail:importance" = 2' in query
+    assert '"urn:schemas:httpmail:read" = 0' in query
+    assert '"urn:schemas:httpmail:hasattachment" = 0' in query
+    assert query.count(' AND ') == 5
+
+    assert phrase_filter("", SearchFilters(unread=False)) == '@SQL="urn:schemas:httpmail:read" = 1'
+    assert subject_filter("50%", None) == "@SQL=(\"urn:schemas:httpmail:subject\" LIKE '%50%%')"
+
+
+def test_dasl_dates_are_utc():
+    local = datetime(2024, 1, 15, 14, 30)
+    expected = local.astimezone(timezone.utc).strftime('%m/%d/%Y %I:%M %p')
+    assert dasl_date(local) == f"'{expected}'"
+
+
+def test_filters_from_tool_arguments():
+    assert SearchFilters.from_arguments({"search_text": "x"}) is None
+
+    filters = SearchFilters.from_arguments({
+        "received_after": "3d", "received_before": "2030-01-01",
+        "from": "monitoring", "importance": ["high", "low"], "folders": ["Inbox/*"],
+    })
+    assert abs(filters.received_after - (datetime.now() - timedelta(days=3))) < timedelta(seconds=5)
+    assert filters.received_before == datetime(2030, 1, 1)
+    assert filters.senders == ("monitoring",)
+    assert filters.importance == (0, 2)
+    assert filters.to_dict()["importance"] == ["low", "high"]
+
+    for bad in ({"received_after": "yesterday"}, {"importance": ["urgent"]},
+                {"unread": "yes"}, {"received_after": "1d", "received_before": "2d"}):
+        with pytest.raises(ValueError):
+            SearchFilters.from_arguments(bad)
+
+
+def test_filters_are_evaluated_by_the_search(client, backend, settings):
+    settings(max_search_results=5000)
+    everything = client.search_emails(QUERY, include_body=False)
+    calls = backend.latency.calls
+    client._search_cache.clear()
+
+    cutoff = sorted(email['received_time'] for email in everything)[len(everything) // 2]
+    cutoff = cutoff.replace(second=0, microsecond=0)
+    filters = SearchFilters(received_after=cutoff, senders=["monitoring"], importance=[2])
+    before = backend.latency.calls
+    filtered = client.search_emails(QUERY, include_body=False, filters=filters)
+
+    expected = {email['entry_id'] for email in everything
+                if email['received_time'] >= cutoff and email['importance'] == 2
+                and email['sender_email'] == 'monitoring@example.com'}
+    assert filtered and {email['entry_id'] for email in filtered} == expected
+    # Outlook only hands back the matching items
+    assert backend.latency.calls - before < calls / 4
+
+
+def test_filters_without_search_text(client, settings):
+    settings(max_search_results=5000)
+    filters = SearchFilters(unread=True, has_attachments=True, folders=["sent items"])
+    emails = client.search_emails("", include_body=False, filters=filters)
+
+    assert emails
+    assert {email['folder_name'] for email in emails} == {'Sent Items'}
+    assert all(email['unread'] for email in emails)
@@ -0,0 +1,178 @@
+"""Tests for conversation grouping and chain formatting in the email formatter."""
+
+from datetime import datetime, timedelta
+
+from src.utils.email_formatter import (
+    format_email_chain, format_search_many, get_date_range, get_mailbox_distribution,
+    get_participants, group_by_conversation,
+)
+from src.utils.json_encoder import JsonEncoder
+
+BASE = datetime(2024, 5, 1, 9, 0)
+
+
+def make_email(n, subject, conversation_id='', conversation_index='', minutes=0):
+    return {
+        'entry_id': f"ID{n:04d}",
+        'subject': subject,
+        'received_time': BASE + timedelta(minutes=minutes),
+        'conversation_id': conversation_id,
+        'conversation_index': conversation_index,
+    }
+
+
+def test_same_subject_in_different_conversations_stays_apart():
+    emails = [
+        make_email(1, "Disk usage above threshold", "A" * 32, "01" + "0" * 42),
+        make_email(2, "Disk usage above threshold", "B" * 32, "01" + "1" * 42),
+        make_email(3, "RE: Disk usage above threshold", "A" * 32, "01" + "0" * 42 + "0000000010"),
+    ]
+
+    groups = group_by_conversation(emails)
+
+    assert sorted(len(group) for group in groups.values()) == [1, 2]
+
+
+def test_subject_fallback_strips_stacked_prefixes():
+    emails = [
+        make_email(1, "Backup failed"),
+        make_email(2, "RE: Fwd: Backup failed"),
+        make_email(3, "Re[2]: backup failed"),
+        make_email(4, "Return of backup jobs"),
+    ]
+
+    groups = group_by_conversation(emails)
+
+    assert sorted(len(group) for group in groups.values()) == [1, 3]
+
+
+def test_thread_order_follows_conversation_index():
+    header = "01" + "0" * 42
+    emails = [
+        make_email(1, "Alert", "C" * 32, header, minutes=10),
+        make_email(2, "RE: Alert", "C" * 32, header + "0000000020", minutes=5),
+        make_email(3, "RE: RE: Alert", "C" * 32, header + "0000000020" + "0000000010", minutes=0),
+    ]
+
+    result = format_email_chain(emails, "Alert")
+
+    conversation = result["conversations"][0]
+    assert conversation["topic"] == "Alert"
+    assert [e["subject"] for e in conversation["emails"]] == ["Alert", "RE: Alert", "RE: RE: Alert"]
+
+
+def test_simulated_thread_is_one_conversation(client, settings):
+    settings(shared_mailbox_email='')
+    emails = client.search_emails("INC-000010")
+
+    result = format_email_chain(emails, "INC-000010")
+
+    assert result["summary"]["conversations"] == 1
+    subjects = [e["subject"] for e in result["conversations"][0]["emails"]]
+    assert not subjects[0].startswith("RE:")
+    assert all(subject.startswith("RE:") for subject in subjects[1:])
+
+
+def sample_emails():
+    people = ["Alice Jensen", "Bob Madsen", "Carol Holm"]
+    emails = []
+    for n in range(12):
+        email = make_email(n, f"Alert {n % 3}", f"{n % 3:032X}", f"01{n:042X}", minutes=n)
+        email.update(sender_name=people[n % 3], sender_email=f"p{n % 3}@example.com",
+                     recipients=[people[(n + 1) % 3]], mailbox_type=('personal', 'shared')[n % 2])
+        emails.append(email)
+    return emails
+
+
+def test_views_share_formatted_emails():
+    result = format_email_chain(sample_emails(), "Alert")
+
+    in_conversations = {id(e) for c in result["conversations"] for e in c["emails"]}
+    assert {id(e) for e in result["all_emails_chronological"]} == in_conversations
+    times = [e["received_time"] for e in result["all_emails_chronological"]]
+    assert times == sorted(times, reverse=True)
+
+
+def test_single_pass_statistics_match_helpers():
+    emails = sample_emails()
+    result = format_email_chain(emails, "Alert", include_chronological=False)
+
+    summary = result["summary"]
+    assert "all_emails_chronological" not in result
+    assert summary["date_range"] == get_date_range(emails)
+    assert summary["mailbox_distribution"] == get_mailbox_distribution(emails)
+    assert summary["participants"] == get_participants(emails)
+    newest = [c["date_range"]["last"] for c in result["conversations"]]
+    assert newest == sorted(newest, reverse=True)
+
+
+def test_chronological_list_follows_setting(settings):
+    settings(include_chronological_list=False)
+
+    assert "all_emails_chronological" not in format_email_chain(sample_emails(), "Alert")
+
+
+def test_collapsed_copies_list_their_locations():
+    email = make_email(1, "Disk usage above threshold")
+    email['locations'] = [
+        {'mailbox_type': 'personal', 'folder_name': 'Inbox', 'entry_id': "ID0001"},
+        {'mailbox_type': 'shared', 'mailbox_address': "team@example.com",
+         'folder_name': 'Alerts', 'entry_id': "ID0002"},
+    ]
+
+    result = format_email_chain([email, make_email(2, "Backup failed")], "Alert")
+
+    assert result["summary"]["copies_collapsed"] == 1
+    formatted = {e["entry_id"]: e for c in result["conversations"] for e in c["emails"]}
+    assert "locations" not in formatted["ID0002"]
+    assert formatted["ID0001"]["locations"] == [
+        {"mailbox": "personal", "folder": "Inbox", "entry_id": "ID0001"},
+        {"mailbox": "team@example.com", "folder": "Alerts", "entry_id": "ID0002"},
+    ]
+
+
+def long_emails(count=20, body_chars=2000):
+    emails = sample_emails() * 2
+    emails = [dict(email, entry_id=f"ID{n:04d}", received_time=BASE + timedelta(minutes=n),
+                   body=f"Message {n}. " + "x" * body_chars) for n, email in enumerate(emails[:count])]
+    return emails
+
+
+def test_response_budget_is_respected_and_omissions_reported():
+    emails = long_emails()
+    encoder = JsonEncoder()
+
+    for limit in (3000, 15000, 40000):
+        result = format_email_chain(emails, "Alert", body_mode='full', max_response_bytes=limit)
+        budget = result["budget"]
+
+        assert len(encoder.dumps(result).encode('utf-8')) <= limit
+        shown = [e["entry_id"] for e in result["all_emails_chronological"]]
+        # The newest emails are kept
+        assert shown == [f"ID{n:04d}" for n in range(19, 19 - len(shown), -1)]
+        assert budget["emails_omitted"] == len(emails) - len(shown)
+        assert sum(c.get("emails_omitted", 0) for c in result["conversations"]) <= budget["emails_omitted"]
+        assert result["summary"]["total_emails"] == len(emails)
+
+
+def test_bodies_are_shortened_before_emails_are_dropped():
+    emails = long_emails()
+    full = format_email_chain(emails, "Alert", body_mode='full')
+    limit = len(JsonEncoder().dumps(full).encode('utf-8')) // 2
+
+    result = format_email_chain(emails, "Alert", body_mode='full', max_response_bytes=limit)
+
+    assert result["budget"]["emails_omitted"] == 0
+    assert result["budget"]["bodies_truncated"] == len(emails)
+    bodies = [e["body"] for e in result["all_emails_chronological"]]
+    assert all(body.startswith("Message") and body.endswith("[truncated]") for body in bodies)
+    assert "budget" not in full
+
+
+def test_search_many_shares_the_budget():
+    results = {"Alert 0": long_emails(10), "Alert 1": long_emails(10)}
+
+    formatted = format_search_many(results, body_mode='full', max_response_bytes=20000)
+
+    assert len(JsonEncoder().dumps(formatted).encode('utf-8')) <= 20000
+    assert all(chain["budget"]["max_response_bytes"] < 20000 for chain in formatted["results"])
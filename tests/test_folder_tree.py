@@ -0,0 +1,107 @@
+"""Tests for the cached folder tree and batched whole-store search."""
+
+import time
+
+import pytest
+
+from src.utils.folder_tree import FolderTree, FolderTreeCache, build_tree, search_scope
+from src.utils.outlook_client import OutlookClient
+from src.utils.outlook_simulator import FakeFolder, SimulatedBackend
+
+QUERY = "raised for host"
+
+
+@pytest.fixture
+def store(backend):
+    store = backend.outlook.stores["user@example.com"]
+    inbox = store.GetDefaultFolder(6)
+    alerts = FakeFolder(backend.outlook, store._mailbox, "Alerts", inbox)
+    inbox._children.append(alerts)
+    alerts._children.append(FakeFolder(backend.outlook, store._mailbox, "Disk", alerts))
+    return store
+
+
+def names(nodes):
+    return [node.relative_path for node in nodes]
+
+
+def test_tree_lists_mail_folders_with_roles(store):
+    tree = build_tree(store.StoreID, store.GetRootFolder(), store)
+
+    assert names(tree.folders) == ['Inbox', 'Inbox/Alerts', 'Inbox/Alerts/Disk',
+                                   'Sent Items', 'Drafts', 'Deleted Items']
+    assert {node.name: node.role for node in tree.folders}['Deleted Items'] == 'deleted'
+    assert tree.folders[0].scope == search_scope(tree.folders[0].path)
+
+
+def test_selection_honours_patterns_and_folder_settings(store):
+    tree = build_tree(store.StoreID, store.GetRootFolder(), store)
+
+    assert names(tree.select()) == ['Inbox', 'Inbox/Alerts', 'Inbox/Alerts/Disk',
+                                    'Sent Items', 'Drafts']
+    assert 'Sent Items' not in names(tree.select(include_sent=False))
+    assert 'Deleted Items' in names(tree.select(include_deleted=True))
+    # excluding a folder excludes its subfolders
+    assert names(tree.select(exclude=['alerts', 'drafts'])) == ['Inbox', 'Sent Items']
+    assert names(tree.select(include=['inbox/*'])) == ['Inbox/Alerts', 'Inbox/Alerts/Disk']
+
+
+def test_cache_is_keyed_by_store_and_expires():
+    cache = FolderTreeCache(ttl_seconds=3600)
+    built = []
+
+    def build():
+        built.append(1)
+        return FolderTree('S1', 'R1', [])
+
+    cache.get('S1', 'R1', build)
+    cache.get('S1', 'R1', build)
+    cache.get('S2', 'R1', build)
+    assert len(built) == 2 and cache.stats()['hits'] == 1
+
+    cache.invalidate('S1')
+    cache.get('S1', 'R1', build)
+    assert len(built) == 3
+
+    cache.ttl_seconds = 0
+    cache.get('S2', 'R1', build)
+    assert len(built) == 4
+
+
+def test_search_covers_selected_folders_and_reuses_the_tree(client, settings):
+    settings(max_search_results=2000)
+    emails = client.search_emails(QUERY, include_body=False)
+    folders = {email['folder_name'] for email in emails}
+
+    assert {'Inbox', 'Sent Items', 'Drafts'} <= folders
+    assert 'Deleted Items' not in folders
+
+    client._search_cache.clear()
+    client.search_emails(QUERY, include_body=False)
+    assert client.folder_tree_stats()['builds'] == 2  # one per store
+
+    settings(include_deleted_items=True, folder_exclude_patterns='drafts')
+    client._search_cache.clear()
+    folders = {email['folder_name'] for email in client.search_emails(QUERY, include_body=False)}
+    assert 'Deleted Items' in folders and 'Drafts' not in folders
+
+    # Exclude patterns apply to the Inbox too
+    settings(folder_exclude_patterns='inbox')
+    client._search_cache.clear()
+    folders = {email['folder_name'] for email in client.search_emails(QUERY, include_body=False)}
+    assert folders == {'Sent Items', 'Drafts', 'Deleted Items'}
+
+
+def test_folder_searches_run_side_by_side(settings):
+    settings(shared_mailbox_email='', max_search_results=2000)
+    backend = SimulatedBackend.build(personal_size=500, search_delay_ms=300)
+    client = OutlookClient(backend)
+
+    start = time.monotonic()
+    emails = client.search_emails(QUERY, include_body=False)
+    elapsed = time.monotonic() - start
+    client.worker_pool.shutdown()
+
+    assert len({email['folder_name'] for email in emails}) == 3
+    # Three folders searched one after another would take at least 0.9 s
+    assert elapsed < 0.8
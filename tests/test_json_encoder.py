@@ -0,0 +1,77 @@
+"""Tests for JSON encoding of tool responses."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from src.utils.email_formatter import format_email_chain
+from src.utils.json_encoder import (
+    JsonEncoder, OrjsonEncoder, compact, create_encoder, estimate_size,
+)
+
+RESPONSE = {
+    "status": "success",
+    "search_subject": "INC-000001",
+    "summary": {"total_emails": 1, "date_range": {"first": None, "last": None}},
+    "all_emails_chronological": [{
+        "subject": "Disk alert",
+        "received_time": datetime(2024, 5, 1, 9, 30),
+        "recipients": [],
+        "body_preview": "",
+        "attachments": 0,
+        "unread": False,
+    }],
+}
+
+
+def encoders():
+    result = [JsonEncoder]
+    try:
+        import orjson  # noqa: F401
+        result.append(OrjsonEncoder)
+    except ImportError:
+        pass
+    return result
+
+
+@pytest.mark.parametrize("encoder_class", encoders())
+def test_output_is_json_with_iso_datetimes(encoder_class):
+    document = json.loads(encoder_class().dumps(RESPONSE))
+
+    email = document["all_emails_chronological"][0]
+    assert email["received_time"] == "2024-05-01T09:30:00"
+    assert email["recipients"] == [] and email["unread"] is False
+
+
+def test_encoders_produce_identical_documents(client):
+    response = format_email_chain(client.search_emails("INC-000010"), "INC-000010")
+
+    for compact_output in (False, True):
+        outputs = {cls(compact_output).dumps(response) for cls in encoders()}
+        assert len(outputs) == 1
+
+
+def test_compact_drops_empty_fields_and_shortens_keys():
+    document = compact(RESPONSE)
+
+    assert document["q"] == "INC-000001"
+    assert "dates" not in document["summary"]
+    assert document["chrono"] == [{"sub": "Disk alert", "at": RESPONSE["all_emails_chronological"][0]["received_time"],
+                                   "att": 0, "unread": False}]
+
+
+def test_create_encoder_reads_config(settings):
+    settings(json_encoder="json", compact_json_output=True)
+    encoder = create_encoder()
+
+    assert type(encoder) is JsonEncoder and encoder.compact_output
+    with pytest.raises(ValueError):
+        create_encoder("yaml")
+
+
+def test_estimate_size_matches_encoded_size():
+    value = dict(RESPONSE, note='quote " backslash \\ line\r\nbreak', names=["Søren", "Åse"],
+                 empty={}, flags=[True, False, None, 1.5])
+
+    assert estimate_size(value) == len(JsonEncoder().dumps(value).encode('utf-8'))
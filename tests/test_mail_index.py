@@ -0,0 +1,328 @@
+"""Tests for the local full-text index and its incremental sync."""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.dasl import SearchFilters
+from src.utils.mail_index import DictMailSource, MailIndex
+from src.utils.outlook_client import OutlookClient
+from src.utils.outlook_simulator import FakeFolder, FakeNamespace
+
+from conftest import SHARED_MAILBOX
+
+BASE = datetime(2024, 5, 1, 9, 0)
+
+
+def make_email(n, subject, body, modified_offset=0, folder='Inbox'):
+    return {
+        'entry_id': f"ID{n:04d}",
+        'subject': subject,
+        'sender_name': 'Monitoring System',
+        'sender_email': 'monitoring@example.com',
+        'recipients': ['Alice Jensen'],
+        'received_time': BASE + timedelta(minutes=n),
+        'folder_name': folder,
+        'mailbox_type': 'personal',
+        'importance': 1,
+        'body': body,
+        'size': 100,
+        'attachments_count': 0,
+        'unread': False,
+        'last_modified': BASE + timedelta(minutes=n + modified_offset),
+    }
+
+
+def test_index_builds_and_searches_from_plain_records():
+    index = MailIndex(':memory:')
+    emails = [
+        make_email(1, "Disk alert INC-000001", "Host db-01 is at 95%"),
+        make_email(2, "RE: Disk alert INC-000001", "Cleaning up logs on db-01"),
+        make_email(3, "Backup report", "All jobs completed", folder='Sent Items'),
+    ]
+
+    stats = index.sync(DictMailSource(emails))
+    hits = index.search("INC-000001")
+
+    assert stats["items"] == 3
+    assert stats["folders"] == 2
+    assert [h['entry_id'] for h in hits] == ['ID0002', 'ID0001']
+    assert index.search("db-01 is at")[0]['entry_id'] == 'ID0001'
+    assert index.search("jobs completed")[0]['folder_name'] == 'Sent Items'
+    assert hits[0]['received_time'] == BASE + timedelta(minutes=2)
+
+
+def test_incremental_sync_only_fetches_changes():
+    index = MailIndex(':memory:')
+    emails = [make_email(n, f"Alert {n}", "body") for n in range(10)]
+    index.sync(DictMailSource(emails))
+
+    emails[3] = make_email(3, "Alert 3 updated", "body", modified_offset=60)
+    emails.append(make_email(50, "Alert 50", "body"))
+    stats = index.sync(DictMailSource(emails))
+
+    # the two changes, plus the item sitting exactly on the inclusive watermark
+    assert stats["items"] == 3
+    assert index.search("Alert 3 updated")[0]['entry_id'] == 'ID0003'
+    assert len(index.search("Alert")) == 11
+
+
+def test_client_answers_from_index_after_crawl(backend, settings):
+    settings(local_index_sync_interval_seconds=3600)
+    client = OutlookClient(backend, mail_index=MailIndex(':memory:'))
+
+    client.build_index()
+    emails = client.search_emails("INC-000011")
+    client.worker_pool.shutdown()
+    client.index_pool.shutdown()
+
+    assert emails
+    assert len(client.search_waits) == 0  # no AdvancedSearch was issued
+    assert {e['mailbox_type'] for e in emails} <= {'personal', 'shared'}
+    assert all('INC-000011' in e['subject'] for e in emails)
+
+
+def test_index_covers_the_folders_a_live_search_covers(backend, settings):
+    settings(folder_exclude_patterns='drafts')
+    client = OutlookClient(backend, mail_index=MailIndex(':memory:'))
+    client.build_index(['personal'])
+    client.index_pool.shutdown()
+
+    hits = client.mail_index.search("raised for host", limit=5000)
+    # Deleted Items is left out by include_deleted_items, Drafts by the pattern
+    assert {email['folder_name'] for email in hits} == {'Inbox', 'Sent Items'}
+
+
+@pytest.mark.parametrize("folders", [["Deleted Items"], ["Inbox/*", "sent*"]])
+def test_folder_filters_find_what_a_live_search_finds(backend, settings, folders):
+    settings(local_index_sync_interval_seconds=3600)
+    store = backend.outlook.stores["user@example.com"]
+    inbox = store.GetDefaultFolder(6)
+    inbox._children.append(FakeFolder(backend.outlook, store._mailbox, "Alerts", inbox))
+    filters = SearchFilters(folders=folders)
+
+    def scanned(client):
+        entry_ids = set()
+        client.scan_headers("raised for host", lambda email: entry_ids.add(email['entry_id']),
+                            mailboxes=['personal'], filters=filters)
+        client.worker_pool.shutdown()
+        return entry_ids
+
+    expected = scanned(OutlookClient(backend))
+    indexed = OutlookClient(backend, mail_index=MailIndex(':memory:'))
+    indexed.build_index(['personal'])
+    found = scanned(indexed)
+    indexed.index_pool.shutdown()
+
+    assert expected
+    assert found == expected
+
+
+def test_index_hits_respect_headers_only(backend, settings, monkeypatch):
+    settings(local_index_sync_interval_seconds=3600)
+    client = OutlookClient(backend, mail_index=MailIndex(':memory:'))
+    client.build_index()
+    opened = []
+    get_item = FakeNamespace.GetItemFromID
+    monkeypatch.setattr(FakeNamespace, 'GetItemFromID',
+                        lambda self, entry_id, store_id=None: opened.append(entry_id)
+                        or get_item(self, entry_id, store_id))
+
+    headers = client.search_emails("INC-000011", include_body=False)
+    assert headers and all(email['body'] is None for email in headers)
+
+    # Bodies of index hits are read from the index, not from Outlook
+    client.load_bodies(headers)
+    client.worker_pool.shutdown()
+    client.index_pool.shutdown()
+    assert all('INC-000011' in email['body'] for email in headers)
+    assert not opened
+
+
+def test_stale_index_syncs_new_items(backend, settings):
+    settings(local_index_sync_interval_seconds=0)
+    client = OutlookClient(backend, mail_index=MailIndex(':memory:'))
+    client.build_index()
+
+    shared = backend.outlook.mailbox(SHARED_MAILBOX)
+    shared.append(8)
+    newest_thread = (shared.size - 1) // 4
+    emails = client.search_emails(f"INC-{newest_thread:06d}")
+    client.worker_pool.shutdown()
+    client.index_pool.shutdown()
+
+    assert any(e['mailbox_type'] == 'shared' for e in emails)
+    assert len(client.search_waits) == 0
+
+
+def test_body_setting_changes_recrawl_the_index(backend, settings):
+    settings(local_index_sync_interval_seconds=3600)
+    client = OutlookClient(backend, mail_index=MailIndex(':memory:'))
+    crawled = client.build_index(['personal'])['personal']['items']
+
+    settings(clean_html_content=False)
+    client._on_config_change({'clean_html_content'})
+    client.search_emails("INC-000011", mailboxes=['personal'])
+    # Searched live meanwhile, then re-read in full
+    assert client.search_waits
+    client.index_pool.submit(lambda context: None).result()
+    recrawled = client.build_index(['personal'])['personal']['items']
+    client.worker_pool.shutdown()
+    client.index_pool.shutdown()
+
+    assert recrawled == crawled
+
+
+def test_reconciling_sync_removes_deleted_items(backend, settings):
+    settings(local_index_sync_interval_seconds=0, local_index_reconcile_interval_seconds=3600)
+    client = OutlookClient(backend, mail_index=MailIndex(':memory:'))
+    client.build_index(['personal'])
+
+    mailbox = backend.outlook.mailbox('user@example.com')
+    inbox = mailbox.folder_indices('Inbox')
+    deleted = [inbox[5], inbox[-1]]
+    for index in deleted:
+        mailbox.delete(index)
+    deleted_ids = {mailbox.entry_id(index) for index in deleted}
+
+    def indexed():
+        return {row[0] for row in client.mail_index._conn.execute("SELECT entry_id FROM messages")}
+
+    # An incremental sync cannot see deletions
+    client.build_index(['personal'])
+    assert deleted_ids <= indexed()
+
+    settings(local_index_reconcile_interval_seconds=0)
+    stats = client.build_index(['personal'])['personal']
+    client.index_pool.shutdown()
+
+    assert stats['removed'] == 2
+    assert not deleted_ids & indexed()
+    assert client.mail_index.search("INC-000011")
+
+
+def test_reconcile_drops_folders_no_longer_selected():
+    index = MailIndex(':memory:')
+    emails = [make_email(1, "Disk alert", "db-01"), make_email(2, "Report", "x", folder='Drafts')]
+    index.sync(DictMailSource(emails))
+
+    index.sync(DictMailSource(emails[:1]), reconcile=True)
+
+    assert [hit['entry_id'] for hit in index.search("", filters=SearchFilters(unread=False))] == ['ID0001']
+    assert index.folder_state('personal:Drafts') is None
+
+
+def test_unindexed_mailbox_falls_back_to_com(backend, settings, monkeypatch):
+    client = OutlookClient(backend, mail_index=MailIndex(':memory:'))
+    release = threading.Event()
+    sync_job = client._sync_index_job
+
+    def held_sync(context, mailbox):
+        release.wait(10)
+        return sync_job(context, mailbox)
+
+    monkeypatch.setattr(client, '_sync_index_job', held_sync)
+    # The crawls hold the index worker; searches still run on the search workers
+    emails = client.search_emails("INC-000011")
+    assert client.mail_index.last_synced('personal') is None
+    release.set()
+    for sync in list(client._index_syncs.values()):
+        sync.result()
+    client.worker_pool.shutdown()
+    client.index_pool.shutdown()
+
+    assert emails
+    assert len(client.search_waits) > 0
+    assert client.mail_index.last_synced('personal') is not None
+
+
+def test_concurrent_searches_start_one_crawl(backend, settings, monkeypatch):
+    client = OutlookClient(backend, mail_index=MailIndex(':memory:'))
+    release = threading.Event()
+    started = []
+
+    def held_sync(context, mailbox):
+        started.append(mailbox)
+        release.wait(10)
+        return {}
+
+    monkeypatch.setattr(client, '_sync_index_job', held_sync)
+    threads = [threading.Thread(target=client._indexed_mailboxes, args=(['personal'],))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+    client._index_syncs['personal'].result()
+    client.index_pool.shutdown()
+
+    assert started == ['personal']
+
+
+def test_partial_crawl_does_not_count_as_synced():
+    index = MailIndex(':memory:')
+
+    class Interrupted(DictMailSource):
+        def changed_since(self, folder, watermark):
+            if folder.name == 'Sent Items':
+                raise RuntimeError("store went offline")
+            return super().changed_since(folder, watermark)
+
+    emails = [make_email(1, "Disk alert", "db-01"), make_email(2, "Report", "x", folder='Sent Items')]
+    with pytest.raises(RuntimeError):
+        index.sync(Interrupted(emails))
+    assert index.folder_state('personal:Inbox') is not None
+    assert index.last_synced('personal') is None
+
+    index.sync(DictMailSource(emails))
+    assert index.last_synced('personal') is not None
+
+
+@pytest.mark.parametrize("phrase", ['"quoted"', "", "a AND b"])
+def test_search_handles_fts_syntax(phrase):
+    index = MailIndex(':memory:')
+    index.sync(DictMailSource([make_email(1, 'He said "quoted" a AND b', 'x')]))
+
+    assert isinstance(index.search(phrase), list)
+
+
+def test_index_search_applies_filters():
+    index = MailIndex(':memory:')
+    emails = [make_email(n, f"Alert {n}", "disk usage high") for n in range(6)]
+    emails[1].update(importance=2, unread=True)
+    emails[4].update(importance=2, sender_name='Alice Jensen', folder_name='Sent Items')
+    emails[5].update(attachments_count=2, sender_email='ops_team@example.com')
+    emails[3].update(folder_name='Disk', folder_path='Inbox/Alerts/Disk')
+    index.sync(DictMailSource(emails))
+
+    def ids(phrase, **filters):
+        return [hit['entry_id'] for hit in index.search(phrase, filters=SearchFilters(**filters))]
+
+    assert ids("disk usage", importance=[2]) == ['ID0004', 'ID0001']
+    assert ids("disk usage", received_after=BASE + timedelta(minutes=2),
+               received_before=BASE + timedelta(minutes=5)) == ['ID0004', 'ID0003', 'ID0002']
+    assert ids("", senders=['alice']) == ['ID0004']
+    assert ids("", senders=['ops_']) == ['ID0005']
+    assert ids("", unread=True) == ['ID0001']
+    assert ids("", has_attachments=True) == ['ID0005']
+    assert ids("", folders=['sent*']) == ['ID0004']
+    assert ids("", folders=['inbox/*']) == ['ID0003']
+    assert ids("", folders=['Inbox']) == ['ID0005', 'ID0002', 'ID0001', 'ID0000']
+    assert index.search("") == []
+
+
+def test_index_scan_passes_every_match_without_bodies():
+    index = MailIndex(':memory:')
+    emails = [make_email(n, f"Disk alert {n}", "db-01 is at 95%") for n in range(25)]
+    emails.append(make_email(30, "Backup report", "All jobs completed"))
+    index.sync(DictMailSource(emails))
+
+    scanned = []
+    count = index.scan("db-01", None, None, scanned.append, batch_size=10)
+
+    assert count == 25
+    assert sorted(e['entry_id'] for e in scanned) == [h['entry_id'] for h in reversed(index.search("db-01"))]
+    assert all(e['body'] is None for e in scanned)
+    assert index.scan("", None, SearchFilters(importance=[2]), scanned.append) == 0
@@ -0,0 +1,125 @@
+"""Tests for searching several shared mailboxes in parallel."""
+
+import threading
+import time
+
+import pytest
+
+from src.utils.outlook_client import OutlookClient
+from src.utils.outlook_simulator import FakeNamespace, SimulatedBackend
+
+TEAM_MAILBOXES = [f"team{n}@example.com" for n in range(4)]
+QUERY = "raised for host"
+
+
+@pytest.fixture
+def team_client(settings):
+    settings(shared_mailbox_email=TEAM_MAILBOXES, com_worker_pool_size=4)
+    backend = SimulatedBackend.build(personal_size=500,
+                                     shared={address: 500 for address in TEAM_MAILBOXES})
+    client = OutlookClient(backend)
+    yield client
+    client.worker_pool.shutdown()
+
+
+def test_results_of_all_mailboxes_are_merged_newest_first(team_client, settings):
+    settings(max_search_results=60)
+    emails = team_client.search_emails(QUERY)
+
+    assert len(emails) == 60
+    times = [email['received_time'] for email in emails]
+    assert times == sorted(times, reverse=True)
+    assert {email.get('mailbox_address') for email in emails} >= set(TEAM_MAILBOXES)
+
+
+def test_mailboxes_argument_selects_a_subset(team_client):
+    emails = team_client.search_emails(QUERY, mailboxes=[TEAM_MAILBOXES[1].upper(), "personal"])
+
+    assert emails
+    assert {email.get('mailbox_address') for email in emails} == {TEAM_MAILBOXES[1], None}
+    assert team_client.select_mailboxes(mailboxes=["shared"]) == TEAM_MAILBOXES
+    with pytest.raises(ValueError):
+        team_client.search_emails(QUERY, mailboxes=["nobody@example.com"])
+
+
+def test_parallel_searches_are_capped(team_client, settings, monkeypatch):
+    settings(max_parallel_mailbox_searches=2)
+    lock = threading.Lock()
+    active = []
+    peak = []
+    search_mailbox_job = team_client._search_mailbox_job
+
+    def tracked(*args, **kwargs):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        try:
+            return search_mailbox_job(*args, **kwargs)
+        finally:
+            with lock:
+                active.pop()
+
+    monkeypatch.setattr(team_client, '_search_mailbox_job', tracked)
+    emails = team_client.search_emails(QUERY)
+
+    assert emails and len(peak) == 5
+    assert max(peak) == 2
+
+
+def test_slow_mailbox_is_left_out_after_timeout(team_client, settings, monkeypatch):
+    settings(mailbox_search_timeout_seconds=1)
+    slow = TEAM_MAILBOXES[0]
+    search_mailbox_job = team_client._search_mailbox_job
+
+    def delayed(context, mailbox, *args, **kwargs):
+        if mailbox == slow:
+            time.sleep(2.5)
+        return search_mailbox_job(context, mailbox, *args, **kwargs)
+
+    monkeypatch.setattr(team_client, '_search_mailbox_job', delayed)
+    start = time.monotonic()
+    timed_out = []
+    emails = team_client.search_emails(QUERY, timed_out=timed_out)
+
+    assert time.monotonic() - start < 2.0
+    assert emails and all(email.get('mailbox_address') != slow for email in emails)
+    assert timed_out == [slow]
+    # The partial result is not cached, so the next search asks every mailbox again
+    assert team_client.search_cache_stats()['entries'] == 0
+
+
+def test_check_access_reports_each_shared_mailbox(team_client):
+    access = team_client.check_access()
+
+    assert [shared["email"] for shared in access["shared_mailboxes"]] == TEAM_MAILBOXES
+    assert access["shared_accessible"]
+    assert all(shared["name"] for shared in access["shared_mailboxes"])
+
+
+def test_copies_in_several_mailboxes_are_collapsed(settings, monkeypatch):
+    settings(shared_mailbox_email=TEAM_MAILBOXES[:2])
+    backend = SimulatedBackend.build(personal_size=500,
+                                     shared={address: 500 for address in TEAM_MAILBOXES[:2]},
+                                     cc_shared=True)
+    client = OutlookClient(backend)
+    opened = []
+    get_item = FakeNamespace.GetItemFromID
+    monkeypatch.setattr(FakeNamespace, 'GetItemFromID',
+                        lambda self, entry_id, store_id=None: opened.append(entry_id)
+                        or get_item(self, entry_id, store_id))
+    try:
+        emails = client.search_emails("INC-000003")
+    finally:
+        client.worker_pool.shutdown()
+
+    message_ids = [email['internet_message_id'] for email in emails]
+    assert emails and len(set(message_ids)) == len(message_ids)
+    for email in emails:
+        locations = email['locations']
+        assert sorted(str(location['mailbox_address']) for location in locations) == [
+            "None", *TEAM_MAILBOXES[:2]]
+        assert locations[0]['entry_id'] == email['entry_id']
+        assert len({location['entry_id'] for location in locations}) == 3
+    # Bodies are read once per message, not once per copy
+    assert sorted(opened) == sorted(email['entry_id'] for email in emails)
@@ -0,0 +1,57 @@
+"""Tests for the latency histograms, counters and their renderings."""
+
+import pytest
+
+from src.utils.metrics import (COM_OPERATIONS, HTML_CLEAN_SECONDS, ITEM_EXTRACT_SECONDS,
+                               SEARCH_WAIT_SECONDS, MetricsRegistry, metrics)
+
+
+def test_histogram_buckets_and_quantiles():
+    registry = MetricsRegistry()
+    latency = registry.histogram('op_seconds', 'Op latency', buckets=(0.1, 1.0), label_names=('op',))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        latency.observe(value, 'read')
+
+    [(labels, cumulative, total, count)] = latency.samples()
+    assert labels == ('read',) and cumulative == [2, 3, 4] and count == 4
+    assert total == pytest.approx(2.6)
+    assert latency.quantile(0.5, cumulative) == pytest.approx(0.1)
+    assert latency.quantile(0.75, cumulative) == pytest.approx(1.0)
+    assert registry.histogram('op_seconds', 'again') is latency
+
+
+def test_prometheus_text_and_json_snapshot():
+    registry = MetricsRegistry()
+    registry.histogram('op_seconds', 'Op latency', buckets=(0.1,)).observe(0.05)
+    registry.counter('ops_total', 'Ops', label_names=('kind',)).inc('a "b"', amount=3)
+    registry.add_collector(lambda: [('hits_total', 'Hits', {(('cache', 'body'),): 7})])
+    registry.add_collector(lambda: 1 / 0)
+
+    text = registry.to_prometheus()
+    assert '# TYPE op_seconds histogram' in text
+    assert 'op_seconds_bucket{le="0.1"} 1' in text
+    assert 'op_seconds_bucket{le="+Inf"} 1' in text
+    assert 'op_seconds_count 1' in text
+    assert 'ops_total{kind="a \\"b\\""} 3' in text
+    assert 'hits_total{cache="body"} 7' in text
+
+    snapshot = registry.snapshot()
+    assert snapshot["histograms"]["op_seconds"][0]["count"] == 1
+    assert snapshot["counters"]["ops_total"] == [{"labels": {"kind": 'a "b"'}, "value": 3}]
+    assert snapshot["counters"]["hits_total"][0]["value"] == 7
+
+
+def test_search_records_phase_metrics(client, backend):
+    metrics.reset()
+    client.search_emails("raised for host")
+
+    waits = sum(count for *_, count in SEARCH_WAIT_SECONDS.samples())
+    assert waits >= 1
+    assert sum(count for *_, count in ITEM_EXTRACT_SECONDS.samples()) > 0
+    assert HTML_CLEAN_SECONDS.samples()
+    assert COM_OPERATIONS.value('advanced_search') >= waits
+
+    client.search_emails("raised for host")
+    samples = {name: values for name, _, values in client.metric_samples()}
+    assert samples['outlook_cache_hits_total'][(('cache', 'search'),)] == 1
+    assert samples['outlook_com_calls_total'][()] == backend.latency.calls
@@ -0,0 +1,71 @@
+"""Tests for the simulated Outlook backend and the client running on top of it."""
+
+from datetime import datetime
+
+from src.utils.email_formatter import format_email_chain
+from src.utils.outlook_simulator import DaslFilter, SimulatedBackend, SyntheticMailbox
+
+
+def test_mailbox_generation_is_deterministic():
+    first = SyntheticMailbox("A", "a@example.com", size=100, seed=3)
+    second = SyntheticMailbox("A", "a@example.com", size=100, seed=3)
+
+    assert first.record(42).body == second.record(42).body
+    assert first.index_of(first.entry_id(42)) == 42
+    assert sum(len(first.folder_indices(name)) for name in
+               ('Inbox', 'Sent Items', 'Drafts', 'Deleted Items')) == 100
+
+
+def test_public_attribute_access_is_counted():
+    backend = SimulatedBackend.build(personal_size=10)
+    namespace = backend.get_application().Session
+    backend.latency.reset()
+
+    inbox = namespace.GetDefaultFolder(6)
+    assert backend.latency.calls == 1
+    inbox.Name
+    assert backend.latency.calls == 2
+
+
+def test_dasl_filter_evaluation():
+    record = SyntheticMailbox("A", "a@example.com", size=8).record(5)
+
+    assert DaslFilter(
+        "@SQL=\"urn:schemas:httpmail:subject\" ci_phrasematch 'inc-000001'"
+    ).matches(record)
+    assert DaslFilter(
+        'urn:schemas:httpmail:textdescription ci_phrasematch "regards"'
+    ).matches(record)
+    assert not DaslFilter(
+        "@SQL=(\"urn:schemas:httpmail:subject\" LIKE '%INC-000002%') OR "
+        "\"urn:schemas:httpmail:datereceived\" < '01/01/2020 12:00 AM'"
+    ).matches(record)
+    assert DaslFilter("[ReceivedTime] >= '01/01/2024'").matches(record)
+
+
+def test_search_emails_across_mailboxes(client):
+    emails = client.search_emails("INC-000007")
+
+    assert emails
+    assert {email['mailbox_type'] for email in emails} <= {'personal', 'shared'}
+    assert all('INC-000007' in email['subject'] for email in emails)
+    received = [email['received_time'] for email in emails]
+    assert received == sorted(received, reverse=True)
+    assert all(isinstance(value, datetime) for value in received)
+
+
+def test_search_results_format_end_to_end(client):
+    emails = client.search_emails("INC-000007")
+    result = format_email_chain(emails, "INC-000007")
+
+    assert result["status"] == "success"
+    assert result["summary"]["total_emails"] == len(emails)
+    assert result["summary"]["conversations"] >= 1
+
+
+def test_check_access_reports_simulated_mailboxes(client):
+    access = client.check_access()
+
+    assert access["personal_accessible"]
+    assert access["shared_accessible"]
+    assert access["errors"] == []
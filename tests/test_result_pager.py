@@ -0,0 +1,78 @@
+"""Tests for cursor paging of search results through result handles."""
+
+import pytest
+
+from src.utils.result_pager import ResultPager, decode_cursor, encode_cursor
+
+QUERY = "raised for host"
+
+
+def test_pages_cover_results_once_without_searching_again(client, settings, monkeypatch):
+    settings(max_search_results=45)
+    searches = []
+    search_emails = client.search_emails
+    monkeypatch.setattr(client, 'search_emails',
+                        lambda *args, **kwargs: searches.append(kwargs) or search_emails(*args, **kwargs))
+    pager = ResultPager(ttl_seconds=60)
+
+    page, pagination = pager.fetch_page(client, QUERY, page_size=20)
+    seen = [email['entry_id'] for email in page]
+    while pagination['has_more']:
+        page, pagination = pager.fetch_page(client, QUERY, cursor=pagination['next_cursor'])
+        seen.extend(email['entry_id'] for email in page)
+
+    assert pagination['total_results'] == 45
+    assert len(seen) == len(set(seen)) == 45
+    assert searches == [{'include_body': False, 'mailboxes': None, 'filters': None, 'timed_out': None}]
+    assert all(email['body'] is not None for email in page)
+
+
+def test_only_requested_page_opens_items(client, backend, settings):
+    settings(max_search_results=200)
+    pager = ResultPager(ttl_seconds=60)
+
+    backend.latency.reset()
+    full = client.search_emails(QUERY)
+    full_calls = backend.latency.calls
+
+    client._search_cache.clear()
+    backend.latency.reset()
+    page, pagination = pager.fetch_page(client, QUERY, page_size=10)
+    paged_calls = backend.latency.calls
+
+    assert len(page) == 10 and pagination['total_results'] == len(full)
+    assert paged_calls * 2 < full_calls
+    assert page == [dict(email) for email in full[:10]]
+    # The stored handle stays header-only
+    handle_id, _ = decode_cursor(pagination['cursor'])
+    assert all(email['body'] is None for email in pager.get(handle_id).emails)
+
+
+def test_expired_and_foreign_cursors_are_rejected(client, settings):
+    settings(max_search_results=30)
+    pager = ResultPager(ttl_seconds=0)
+    _, pagination = pager.fetch_page(client, QUERY, page_size=10)
+
+    with pytest.raises(ValueError, match="expired"):
+        pager.fetch_page(client, QUERY, cursor=pagination['next_cursor'])
+
+    pager = ResultPager(ttl_seconds=60)
+    _, pagination = pager.fetch_page(client, QUERY, page_size=10)
+    with pytest.raises(ValueError, match="belongs to"):
+        pager.fetch_page(client, "something else", cursor=pagination['next_cursor'])
+
+
+def test_handle_store_is_bounded():
+    pager = ResultPager(ttl_seconds=60, max_handles=2)
+    first = pager.create("a", [])
+    pager.create("b", [])
+    pager.create("c", [])
+
+    assert len(pager) == 2
+    assert pager.get(first.handle_id) is None
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("abc:def", 40)) == ("abc:def", 40)
+    with pytest.raises(ValueError):
+        decode_cursor("no-offset")
@@ -0,0 +1,54 @@
+"""Tests for the bounded search result cache."""
+
+import time
+
+from src.utils.search_cache import SearchCache, estimate_size
+
+
+def results(n, body="x" * 100):
+    return [{'entry_id': f"ID{i}", 'subject': "Alert", 'body': body, 'recipients': ["A"]}
+            for i in range(n)]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SearchCache(ttl_seconds=60, max_entries=2, max_bytes=10 ** 6)
+    cache.put("a", results(1))
+    cache.put("b", results(1))
+    cache.get("a")
+    cache.put("c", results(1))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_cap_bounds_memory():
+    entry_size = estimate_size(results(10))
+    cache = SearchCache(ttl_seconds=60, max_entries=100, max_bytes=entry_size * 3)
+    for key in "abcde":
+        cache.put(key, results(10))
+
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["bytes"] <= stats["max_bytes"]
+    assert not cache.put("huge", results(100))
+
+
+def test_expired_entries_are_dropped_without_being_hit():
+    cache = SearchCache(ttl_seconds=0.05, max_entries=10, max_bytes=10 ** 6)
+    cache.put("a", results(1))
+    cache.put("b", results(1))
+    time.sleep(0.06)
+    cache.put("c", results(1))
+
+    stats = cache.stats()
+    assert stats["entries"] == 1 and stats["expirations"] == 2
+
+
+def test_client_search_hits_cache(client, backend):
+    client.search_emails("INC-000010")
+    backend.latency.reset()
+    client.search_emails("INC-000010")
+
+    assert backend.latency.calls == 0
+    stats = client.search_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
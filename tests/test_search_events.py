@@ -0,0 +1,92 @@
+"""Tests for event-driven AdvancedSearch completion."""
+
+import pytest
+
+from src.utils.outlook_simulator import SimulatedBackend
+from src.utils.search_events import SearchCompletionTracker, legacy_wait_estimate, wait_for_search
+
+from conftest import SHARED_MAILBOX
+
+SCOPE = "'\\\\Simulated User\\Inbox'"
+FILTER = "@SQL=\"urn:schemas:httpmail:subject\" ci_phrasematch 'INC-000001'"
+
+
+def test_event_completes_search_without_polling():
+    backend = SimulatedBackend.build(personal_size=100, search_delay_ms=50)
+    tracker = SearchCompletionTracker()
+    app = backend.dispatch_application(events=tracker.sink_class())
+
+    search = app.AdvancedSearch(SCOPE, FILTER, False, "tag-1")
+    wait = wait_for_search(search, "tag-1", backend, tracker, timeout=5)
+
+    assert wait.mode == 'event'
+    assert wait.completed
+    assert 0.04 <= wait.waited < 0.5
+    assert wait.polls == 0
+    assert wait.saved > 0.5
+    assert search.Results.Count > 0
+
+
+def test_backoff_poll_without_events():
+    backend = SimulatedBackend.build(personal_size=100, search_delay_ms=50)
+    app = backend.dispatch_application()
+
+    search = app.AdvancedSearch(SCOPE, FILTER, False, "tag-2")
+    wait = wait_for_search(search, "tag-2", backend, None, timeout=5)
+
+    assert wait.mode == 'poll'
+    assert wait.completed
+    assert wait.polls < 10
+
+
+def test_timeout_is_reported():
+    backend = SimulatedBackend.build(personal_size=100, search_delay_ms=5000)
+    app = backend.dispatch_application()
+
+    search = app.AdvancedSearch(SCOPE, FILTER, False, "tag-3")
+    wait = wait_for_search(search, "tag-3", backend, None, timeout=0.1)
+
+    assert wait.mode == 'timeout'
+    assert not wait.completed
+    assert wait.saved == 0
+
+
+def test_tracker_forgets_events_nobody_waits_for():
+    tracker = SearchCompletionTracker(max_tags=4)
+    # Stopped searches and searches finishing after a timed-out wait
+    for n in range(10):
+        tracker.notify(f"late-{n}")
+    assert len(tracker) == 4
+    assert not tracker.pop("late-0") and tracker.pop("late-9")
+
+    backend = SimulatedBackend.build(personal_size=100, search_delay_ms=5000)
+    app = backend.dispatch_application(events=tracker.sink_class())
+    search = app.AdvancedSearch(SCOPE, FILTER, False, "tag-4")
+    tracker.notify("tag-4")  # completed while another search was awaited
+    wait = wait_for_search(search, "tag-4", backend, tracker, timeout=5)
+    assert wait.mode == 'event' and len(tracker) == 3
+
+    search = app.AdvancedSearch(SCOPE, FILTER, False, "tag-5")
+    assert wait_for_search(search, "tag-5", backend, tracker, timeout=0.05).mode == 'timeout'
+    assert len(tracker) == 3
+
+
+def test_legacy_wait_estimate():
+    assert legacy_wait_estimate(0.05, stable_window=True) == pytest.approx(0.6)
+    assert legacy_wait_estimate(0.2, stable_window=False) == pytest.approx(0.2)
+
+
+@pytest.mark.parametrize("use_events, mode", [(True, 'event'), (False, 'poll')])
+def test_client_records_search_waits(settings, use_events, mode):
+    settings(use_search_events=use_events)
+    from src.utils.outlook_client import OutlookClient
+    client = OutlookClient(SimulatedBackend.build(personal_size=400, shared={SHARED_MAILBOX: 400},
+                                                  search_delay_ms=20))
+
+    client.search_emails("INC-000002")
+    stats = client.search_wait_stats()
+    client.worker_pool.shutdown()
+
+    assert stats["searches"] >= 2
+    assert stats["by_mode"][mode] == stats["searches"]
+    assert stats["total_saved_seconds"] > 0
@@ -0,0 +1,58 @@
+"""Tests for searching several phrases in one combined search."""
+
+import pytest
+
+from src.utils.email_formatter import format_search_many
+
+INCIDENTS = ["INC-000001", "INC-000002", "INC-000003"]
+
+
+def entry_ids(emails):
+    return {email['entry_id'] for email in emails}
+
+
+def test_hits_are_demultiplexed_to_their_queries(client, settings):
+    settings(max_search_results=500)
+    results = client.search_many(INCIDENTS, max_per_query=100)
+    combined_searches = len(client.search_waits)
+
+    assert list(results) == INCIDENTS
+    for incident in INCIDENTS:
+        single = client.search_emails(incident, include_body=False)
+        assert single and entry_ids(results[incident]) == entry_ids(single)
+        assert all(email['body'] is not None for email in results[incident])
+    # One search per folder for all phrases instead of one per phrase
+    assert len(client.search_waits) - combined_searches == len(INCIDENTS) * combined_searches
+
+
+def test_emails_matching_several_queries_are_shared(client):
+    alert = f"Alert {INCIDENTS[0]} raised"
+    results = client.search_many([alert, INCIDENTS[0], INCIDENTS[1]], include_body=False)
+
+    both = entry_ids(results[alert]) & entry_ids(results[INCIDENTS[0]])
+    assert both and not both & entry_ids(results[INCIDENTS[1]])
+    by_id = {email['entry_id']: email for email in results[alert]}
+    assert all(by_id[email['entry_id']] is email
+               for email in results[INCIDENTS[0]] if email['entry_id'] in both)
+    assert all(email['body'] is None for emails in results.values() for email in emails)
+
+    formatted = format_search_many(results, include_chronological=False)
+    assert formatted["summary"]["emails_matching_several_queries"] == len(both)
+    assert [chain["search_subject"] for chain in formatted["results"]] == list(results)
+
+
+def test_noisy_query_does_not_crowd_out_the_others(client):
+    # The old incident's emails are far older than the newest "raised for host" hits
+    results = client.search_many(["raised for host", INCIDENTS[0]], max_per_query=5,
+                                 include_body=False)
+
+    assert len(results["raised for host"]) == 5
+    assert results[INCIDENTS[0]]
+    assert all(INCIDENTS[0] in email['subject'] for email in results[INCIDENTS[0]])
+
+
+def test_query_count_is_capped(client, settings):
+    settings(max_queries_per_search=2)
+    with pytest.raises(ValueError):
+        client.search_many(INCIDENTS)
+    assert client.search_many(["  ", ""]) == {}
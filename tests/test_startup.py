@@ -0,0 +1,36 @@
+"""Tests for the import-time behaviour the stdio server relies on."""
+
+import os
+import subprocess
+import sys
+
+parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-c", code], cwd=parent_path,
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_importing_the_client_keeps_stdout_and_logging_untouched():
+    process = run_python(
+        "import logging, sys\n"
+        "handler = logging.StreamHandler(sys.stderr)\n"
+        "logging.getLogger().addHandler(handler)\n"
+        "import src.utils.outlook_client\n"
+        "assert logging.getLogger().handlers == [handler], logging.getLogger().handlers\n"
+    )
+
+    assert process.returncode == 0, process.stderr
+    assert process.stdout == ""
+
+
+def test_heavy_modules_are_deferred_until_used():
+    process = run_python(
+        "import sys\n"
+        "import src.utils.outlook_client\n"
+        "print(sorted(m for m in ('sqlite3', 'win32com', 'pythoncom', 'uuid') if m in sys.modules))\n"
+    )
+
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip() == "[]"
@@ -0,0 +1,155 @@
+"""Tests for the background connection supervisor."""
+
+import threading
+import time
+
+import pytest
+
+from src.utils.outlook_client import OutlookClient
+from src.utils.outlook_simulator import FakeNamespace, SimulatedBackend
+from src.utils.supervisor import ConnectionSupervisor, backoff_delay
+
+from conftest import SHARED_MAILBOX
+
+
+class FlakyBackend(SimulatedBackend):
+    """Simulated backend whose first ``failures`` connects fail."""
+
+    def __init__(self, outlook, failures=0):
+        super().__init__(outlook)
+        self.failures = failures
+        self.connects = 0
+        self.dispatches = 0
+
+    def get_application(self):
+        self.connects += 1
+        if self.connects <= self.failures:
+            raise OSError("Outlook is not running")
+        return super().get_application()
+
+    def dispatch_application(self, events=None):
+        self.dispatches += 1
+        return super().dispatch_application(events)
+
+
+def make_client(failures=0):
+    base = SimulatedBackend.build(personal_size=200, shared={SHARED_MAILBOX: 200})
+    return OutlookClient(FlakyBackend(base.outlook, failures))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def supervised(settings):
+    clients = []
+
+    def start(failures=0, **options):
+        client = make_client(failures)
+        client.supervisor = ConnectionSupervisor(client, **options)
+        client.supervisor.start()
+        clients.append(client)
+        return client
+
+    yield start
+    for client in clients:
+        client.supervisor.stop()
+        client.worker_pool.shutdown()
+
+
+def test_backoff_is_exponential_capped_and_jittered():
+    delays = [backoff_delay(attempt, 1.0, 8.0) for attempt in range(6)]
+    assert 0.5 <= delays[0] <= 1.0
+    assert 2.0 <= delays[2] <= 4.0
+    assert all(4.0 <= delay <= 8.0 for delay in delays[3:])
+
+
+def test_warm_up_opens_worker_sessions_before_the_first_search(supervised, settings):
+    settings(com_worker_pool_size=2, search_all_folders=True)
+    client = supervised(probe_interval=3600)
+    wait_for(lambda: client.supervisor.state == 'connected')
+
+    warm_up = client.supervisor.warm_up
+    assert warm_up["workers"] == 2 and warm_up["unavailable"] == []
+    assert warm_up["folder_trees"] == 2
+    dispatches = client.backend.dispatches
+    assert dispatches == 2
+
+    assert client.search_emails("raised for host")
+    assert client.backend.dispatches == dispatches
+    assert client.folder_tree_stats()["builds"] == 2
+
+
+def test_warm_up_does_not_wait_long_for_a_busy_worker(settings):
+    settings(com_worker_pool_size=2, connect_wait_seconds=15)
+    client = make_client()
+    client.connect()
+    release = threading.Event()
+    busy = client.worker_pool.submit(lambda context: release.wait(10))
+
+    start = time.monotonic()
+    warm_up = client.warm_up()
+    elapsed = time.monotonic() - start
+    release.set()
+    busy.result()
+    client.worker_pool.shutdown()
+
+    assert warm_up["unavailable"] == []
+    assert elapsed < 3
+
+
+def test_check_access_opens_mailboxes_on_a_worker(supervised, monkeypatch):
+    threads = set()
+    get_default_folder = FakeNamespace.GetDefaultFolder
+    get_shared_default_folder = FakeNamespace.GetSharedDefaultFolder
+    monkeypatch.setattr(FakeNamespace, 'GetDefaultFolder', lambda self, folder_type: threads.add(
+        threading.current_thread().name) or get_default_folder(self, folder_type))
+    monkeypatch.setattr(FakeNamespace, 'GetSharedDefaultFolder', lambda self, recipient, folder_type: threads.add(
+        threading.current_thread().name) or get_shared_default_folder(self, recipient, folder_type))
+    client = supervised(probe_interval=3600)
+
+    access = client.check_access()
+
+    assert access["personal_accessible"] and access["shared_accessible"]
+    # Never the supervisor's (or the caller's) thread, which own other sessions
+    assert threads and all(name.startswith("outlook-com-") for name in threads)
+
+
+def test_failed_connects_are_retried_in_the_background(supervised):
+    client = supervised(failures=2, probe_interval=3600, backoff_base=0.01, backoff_max=0.05)
+
+    assert client.ensure_connected()
+    assert client.supervisor.failed_attempts == 2
+    assert client.check_access()["supervisor"]["connects"] == 1
+
+
+def test_dead_session_is_detected_and_replaced(supervised, monkeypatch):
+    probes = []
+
+    def probe(self):
+        probes.append(1)
+        return len(probes) > 1
+
+    monkeypatch.setattr(OutlookClient, 'is_alive', probe)
+    client = supervised(probe_interval=0.02, backoff_base=0.01)
+    wait_for(lambda: client.supervisor.connects == 2 and client.supervisor.state == 'connected')
+
+    assert client.supervisor.reconnects == 1
+    assert client.worker_pool.session_generation == 1
+    assert client.search_emails("raised for host")
+
+
+def test_callers_wait_for_the_supervisor_instead_of_backing_off(supervised, settings):
+    settings(connect_wait_seconds=0.3)
+    client = supervised(failures=100, probe_interval=3600, backoff_base=30, backoff_max=30)
+    wait_for(lambda: client.supervisor.failed_attempts == 1)
+
+    start = time.monotonic()
+    assert client.search_emails("raised for host") == []
+    assert time.monotonic() - start < 1.0
+    # The caller cut the supervisor's 15-30 s backoff short for one more attempt
+    wait_for(lambda: client.supervisor.failed_attempts == 2)
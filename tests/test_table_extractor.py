@@ -0,0 +1,100 @@
+"""Tests for columnar extraction through the Outlook Table API."""
+
+from src.utils.outlook_simulator import FakeFolder, FakeSearch, SimulatedBackend
+from src.utils.table_extractor import TableExtractor, split_display_names
+
+
+def make_extractor(backend, client, batch_size=10):
+    namespace = backend.get_application().Session
+    return namespace, TableExtractor(namespace, client._read_body, batch_size=batch_size)
+
+
+def test_table_rows_match_per_item_extraction(backend, client):
+    namespace, extractor = make_extractor(backend, client)
+    inbox = namespace.GetDefaultFolder(6)
+
+    from_table = extractor.extract(inbox.GetTable(), 'Inbox', 'personal', 25, set())
+    per_item = [client._extract_email_data(inbox.Items.Item(i), 'Inbox', 'personal')
+                for i in range(1, 26)]
+
+    assert from_table == per_item
+
+
+def test_table_extraction_needs_fewer_com_calls(backend, client):
+    namespace, extractor = make_extractor(backend, client, batch_size=50)
+    inbox = namespace.GetDefaultFolder(6)
+    items = inbox.Items
+    sample = [items.Item(i) for i in range(1, 101)]
+
+    backend.latency.reset()
+    for item in sample:
+        client._extract_email_data(item, 'Inbox', 'personal')
+    per_item_calls = backend.latency.calls
+
+    backend.latency.reset()
+    extractor.extract(inbox.GetTable(), 'Inbox', 'personal', 100, set())
+    table_calls = backend.latency.calls
+
+    assert table_calls * 4 < per_item_calls
+
+
+def test_batches_respect_limit_and_found_ids(backend, client):
+    namespace, extractor = make_extractor(backend, client, batch_size=7)
+    inbox = namespace.GetDefaultFolder(6)
+    first_id = inbox.Items.Item(1).EntryID
+    found = {first_id}
+
+    emails = extractor.extract(inbox.GetTable(), 'Inbox', 'personal', 20, found)
+
+    assert len(emails) == 20
+    assert first_id not in [email['entry_id'] for email in emails]
+    assert len(found) == 21
+
+
+def test_search_uses_search_table(client, backend):
+    # Folder trees are read once per store, not per search
+    client.search_emails("INC-000001", include_body=False)
+    backend.latency.reset()
+    emails = client.search_emails("INC-000010")
+
+    assert emails
+    assert backend.latency.calls < 30 * len(emails)
+
+
+def test_restrict_fallback_scans_headers_only(backend, client, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("unavailable")
+
+    monkeypatch.setattr(client, '_search_folders', unavailable)
+    monkeypatch.setattr(FakeFolder, 'GetTable', unavailable)
+    read = []
+    monkeypatch.setattr(client, '_read_body', lambda item, truncate=True: read.append(item) or '')
+    inbox = backend.get_application().Session.GetDefaultFolder(6)
+
+    scanned = []
+    client._search_mailbox_comprehensive(inbox, "INC-000001", 'personal', 100, sink=scanned.append)
+    headers = client._search_mailbox_comprehensive(inbox, "INC-000001", 'personal', 100,
+                                                   include_body=False)
+
+    assert scanned and all(email['body'] is None for email in scanned)
+    assert [email['entry_id'] for email in headers] == [email['entry_id'] for email in scanned]
+    assert not read
+
+
+def test_item_by_item_extraction_honours_headers_only(client, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("unavailable")
+
+    monkeypatch.setattr(FakeSearch, 'GetTable', unavailable)
+    read = []
+    read_body = client._read_body
+    monkeypatch.setattr(client, '_read_body', lambda item, truncate=True: read.append(item) or read_body(item))
+
+    headers = client.search_emails("INC-000010", include_body=False)
+
+    assert headers and all(email['body'] is None for email in headers)
+    assert not read
+
+
+def test_split_display_names():
+    assert split_display_names("A B; C D", None, "E") == ["A B", "C D", "E"]
@@ -0,0 +1,61 @@
+"""Tests for the HTML-to-text body normalizer."""
+
+from src.utils.text_normalizer import html_to_text, read_item_text, truncate
+
+
+class Item:
+    def __init__(self, body, html_body=''):
+        self.Body = body
+        self.HTMLBody = html_body
+
+
+def test_tags_separate_words():
+    html = "<table><tr><td>CPU</td><td>95%</td></tr></table><p>host<br>db01</p>"
+    assert html_to_text(html) == "CPU 95% host db01"
+
+
+def test_hidden_content_is_removed():
+    html = ("<html><head><title>Alert</title><style>p {margin:0}</style></head>"
+            "<!-- generated --><body><SCRIPT>var x = 1;</SCRIPT><p>Disk full</p></body></html>")
+    assert html_to_text(html) == "Disk full"
+
+
+def test_character_references_are_decoded():
+    assert html_to_text("caf&eacute;&nbsp;&#8211;&#x41;&amp;B") == "café –A&B"
+
+
+def test_escaped_markup_stays_text():
+    assert html_to_text("value &lt;b&gt; 1 < 2") == "value <b> 1 < 2"
+
+
+def test_plain_text_whitespace_is_collapsed():
+    assert html_to_text("  line one\r\n\r\n\tline two  ") == "line one line two"
+    assert html_to_text("") == ""
+
+
+def test_truncate_marks_the_cut():
+    assert truncate("abcdef", 3) == "abc [truncated]"
+    assert truncate("abcdef", 0) == "abcdef"
+
+
+def test_read_item_text_prefers_html_body_when_asked():
+    item = Item("Body text", "<p>HTML</p><p>text</p>")
+    assert read_item_text(item) == "Body text"
+    assert read_item_text(item, prefer_html=True) == "HTML text"
+    assert read_item_text(Item("raw  body"), prefer_html=True) == "raw body"
+    assert read_item_text(Item("raw  body"), clean=False) == "raw  body"
+    # Without cleaning there is no conversion, also not of HTMLBody
+    assert read_item_text(item, clean=False, prefer_html=True) == "Body text"
+
+
+def test_client_reads_html_body_when_configured(client, settings):
+    emails = client.search_emails("raised for host")[:5]
+    settings(prefer_html_body=True, max_body_chars=0)
+    client._body_cache.clear()
+    for email in emails:
+        email['body'] = None
+
+    client.load_bodies(emails)
+
+    assert all(email['body'] and '<' not in email['body'] and 'margin' not in email['body']
+               for email in emails)